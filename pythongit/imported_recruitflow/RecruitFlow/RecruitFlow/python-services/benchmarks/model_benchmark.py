@@ -0,0 +1,116 @@
+"""
+Parse Result Encoding Benchmark
+Compares the previous dict + JSON handoff of parse results with the
+ParsedResume model + msgpack encoding: encoded size, encode and decode time
+per result, and memory retained by a batch of decoded results.
+
+Usage:
+    python benchmarks/model_benchmark.py [--results 5000] [--text-chars 3000]
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resume_parser'))
+
+from contact_mapper import TECH_SKILLS  # noqa: E402
+from models import ParsedResume  # noqa: E402
+
+WORDS = ("managed", "built", "team", "services", "platform", "customers", "delivered", "data", "design", "led")
+
+
+def synthetic_contact_info(rng: random.Random, index: int) -> Dict[str, Any]:
+    """Contact info shaped like extract_contact_info output"""
+    # Fresh string objects, as slices of each resume's text would be
+    skills = [skill.encode("utf-8").decode("utf-8") for skill in rng.sample(TECH_SKILLS, rng.randint(8, 20))]
+    return {
+        "full_name": f"Candidate {index}",
+        "email": f"candidate{index}@example.com",
+        "phone": f"(555) {index % 1000:03d}-{rng.randint(0, 9999):04d}",
+        "address": "Austin, TX 78701",
+        "location": {"city": "Austin", "state": "TX", "postal_code": "78701", "country": "US"},
+        "linkedin": f"https://linkedin.com/in/candidate{index}",
+        "skills": skills,
+        "field_confidence": {
+            "full_name": 0.9, "email": 0.95, "phone": 0.9, "address": 0.9, "linkedin": 1.0, "skills": 1.0,
+        },
+        "affinda_fields": [],
+    }
+
+
+def synthetic_text(rng: random.Random, chars: int) -> str:
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:chars]
+
+
+def measure(
+    results: List[ParsedResume],
+    encode: Callable[[ParsedResume], bytes],
+    decode: Callable[[bytes], Any],
+) -> Dict[str, Any]:
+    start = time.perf_counter()
+    encoded = [encode(result) for result in results]
+    encode_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for data in encoded:
+        decode(data)
+    decode_s = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    retained = [decode(data) for data in encoded]
+    retained_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del retained
+
+    count = len(results)
+    return {
+        "encoded_bytes": round(sum(len(data) for data in encoded) / count, 1),
+        "encode_us": round(encode_s / count * 1e6, 2),
+        "decode_us": round(decode_s / count * 1e6, 2),
+        "retained_bytes": round(retained_bytes / count, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark dict+JSON vs ParsedResume+msgpack parse results")
+    parser.add_argument("--results", type=int, default=5000, help="Parse results in the batch")
+    parser.add_argument("--text-chars", type=int, default=3000, help="Resume text length (0 for fields only)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = [
+        ParsedResume.from_contact_info(
+            f"https://storage.example.com/resumes/{index}.pdf", ".pdf",
+            synthetic_text(rng, args.text_chars), synthetic_contact_info(rng, index),
+        )
+        for index in range(args.results)
+    ]
+
+    print(json.dumps({
+        "results": args.results,
+        "text_chars": args.text_chars,
+        "dict_json": measure(
+            results,
+            lambda result: json.dumps(result.to_response(), ensure_ascii=False).encode("utf-8"),
+            json.loads,
+        ),
+        "model_msgpack": measure(results, ParsedResume.to_bytes, ParsedResume.from_bytes),
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Name Extraction Benchmark
+Compares the gazetteer name recognizer with the previous per-line regex
+extractor on a labelled set: accuracy (exact match, including correctly
+returning no name) and mean latency per document.
+
+Usage:
+    python benchmarks/name_benchmark.py [benchmarks/data/names_labelled.jsonl]
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resume_parser'))
+
+from name_gazetteer import recognize_name  # noqa: E402
+
+DEFAULT_LABELLED_SET = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'names_labelled.jsonl')
+
+
+def regex_extract_name(text: str) -> Optional[str]:
+    """The regex extractor that extract_name used before the gazetteer (baseline)"""
+    lines = text.split('\n')[:10]
+    name_patterns = [
+        r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})$',
+        r'^([A-Z][a-z]+\s+[A-Z]\.\s+[A-Z][a-z]+)$',
+        r'^(?:Mr\.|Ms\.|Mrs\.|Dr\.|Prof\.)?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})',
+    ]
+    for line in lines:
+        line = line.strip()
+        if len(line) > 50 or len(line) < 3:
+            continue
+        if re.search(r'[\d@#$%^&*()_+=\[\]{}|\\:";\'<>?,/]', line):
+            continue
+        for pattern in name_patterns:
+            match = re.match(pattern, line)
+            if match:
+                name = match.group(1) if match.lastindex else match.group(0)
+                if 2 <= len(name.split()) <= 4:
+                    return name.strip()
+    for header in ['Name:', 'Full Name:', 'Candidate Name:', 'Applicant:']:
+        match = re.search(f'{re.escape(header)}\\s*([A-Za-z\\s]+)', text, re.IGNORECASE)
+        if match:
+            name = match.group(1).strip()
+            if 2 <= len(name.split()) <= 4:
+                return name
+    return None
+
+
+def gazetteer_extract_name(text: str) -> Optional[str]:
+    match = recognize_name(text)
+    return match.name if match else None
+
+
+def evaluate(extract: Callable[[str], Optional[str]], cases: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    correct = sum(1 for case in cases if extract(case["text"]) == case["name"])
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            extract(case["text"])
+    elapsed = time.perf_counter() - start
+    return {
+        "accuracy": round(correct / len(cases), 4),
+        "mean_latency_us": round(elapsed / (repeat * len(cases)) * 1e6, 1),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark gazetteer vs regex name extraction")
+    parser.add_argument("labelled", nargs="?", default=DEFAULT_LABELLED_SET, help="JSONL of {text, name}")
+    parser.add_argument("--repeat", type=int, default=200, help="Timing passes over the set")
+    args = parser.parse_args(argv)
+
+    with open(args.labelled, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+
+    print(json.dumps({
+        "cases": len(cases),
+        "regex": evaluate(regex_extract_name, cases, args.repeat),
+        "gazetteer": evaluate(gazetteer_extract_name, cases, args.repeat),
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
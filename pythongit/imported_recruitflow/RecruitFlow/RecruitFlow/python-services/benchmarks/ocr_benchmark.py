@@ -0,0 +1,96 @@
+"""
+OCR Benchmark
+Compares fixed 300 dpi OCR with adaptive-resolution OCR on scanned PDFs:
+wall time, pages escalated, mean confidence and word accuracy.
+
+Accuracy is measured against ground truth when a .txt file with the same
+stem sits next to the PDF, otherwise against the fixed-mode output.
+
+Usage:
+    python benchmarks/ocr_benchmark.py scans/*.pdf
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import difflib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resume_parser'))
+
+import text_extractor  # noqa: E402
+
+
+def word_accuracy(reference: str, candidate: str) -> float:
+    """Similarity of the two texts' word sequences (0-1)"""
+    return round(difflib.SequenceMatcher(None, reference.split(), candidate.split(), autojunk=False).ratio(), 4)
+
+
+def run_mode(mode: str, file_content: bytes) -> Dict[str, Any]:
+    """OCR one PDF in the given mode with the page cache bypassed"""
+    text_extractor.OCR_MODE = mode
+    start = time.perf_counter()
+    blocks = list(text_extractor.iter_ocr_pages(file_content))
+    elapsed = time.perf_counter() - start
+
+    confidences = [b.confidence for b in blocks if b.confidence is not None]
+    return {
+        "seconds": round(elapsed, 2),
+        "pages": len(blocks),
+        "escalated": sum(1 for b in blocks if mode == "adaptive" and b.dpi == text_extractor.OCR_DPI),
+        "mean_confidence": round(sum(confidences) / len(confidences), 1) if confidences else None,
+        "text": "\n".join(b.text for b in blocks),
+    }
+
+
+def benchmark(pdf_path: Path) -> Dict[str, Any]:
+    file_content = pdf_path.read_bytes()
+    fixed = run_mode("fixed", file_content)
+    adaptive = run_mode("adaptive", file_content)
+
+    truth_path = pdf_path.with_suffix(".txt")
+    reference: Optional[str] = truth_path.read_text() if truth_path.exists() else None
+    result = {
+        "file": str(pdf_path),
+        "reference": "ground_truth" if reference is not None else "fixed",
+        "fixed": {k: v for k, v in fixed.items() if k != "text"},
+        "adaptive": {k: v for k, v in adaptive.items() if k != "text"},
+        "speedup": round(fixed["seconds"] / adaptive["seconds"], 2) if adaptive["seconds"] else None,
+    }
+    if reference is not None:
+        result["fixed"]["accuracy"] = word_accuracy(reference, fixed["text"])
+    result["adaptive"]["accuracy"] = word_accuracy(reference if reference is not None else fixed["text"], adaptive["text"])
+    return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark fixed vs adaptive OCR")
+    parser.add_argument("pdfs", nargs="+", help="Scanned (image-only) PDF files")
+    parser.add_argument("--preprocess", action="store_true", help="Preprocess pages (OCR_PREPROCESS) in both modes")
+    args = parser.parse_args(argv)
+    text_extractor.OCR_PREPROCESS = args.preprocess
+
+    # Every run must actually OCR; a warm page cache would hide the cost
+    import ocr_cache
+    ocr_cache._cache = ocr_cache.OCRPageCache(memory_bytes=0)
+
+    results = [benchmark(Path(p)) for p in args.pdfs]
+    for result in results:
+        print(json.dumps(result))
+
+    fixed_total = sum(r["fixed"]["seconds"] for r in results)
+    adaptive_total = sum(r["adaptive"]["seconds"] for r in results)
+    print(json.dumps({
+        "documents": len(results),
+        "fixed_seconds": round(fixed_total, 2),
+        "adaptive_seconds": round(adaptive_total, 2),
+        "speedup": round(fixed_total / adaptive_total, 2) if adaptive_total else None,
+        "mean_adaptive_accuracy": round(sum(r["adaptive"]["accuracy"] for r in results) / len(results), 4),
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
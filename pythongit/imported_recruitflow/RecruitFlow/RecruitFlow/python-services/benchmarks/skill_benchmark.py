@@ -0,0 +1,131 @@
+"""
+Skill Matching Benchmark
+Compares the skill index (alias, compact and typo matching) with the
+previous per-skill regex scan on a labelled set: precision, recall and F1
+against the expected skills, and mean latency per document. Then times
+lookups against taxonomies padded with synthetic entries to show how each
+approach scales with taxonomy size.
+
+Usage:
+    python benchmarks/skill_benchmark.py [benchmarks/data/skills_labelled.jsonl]
+"""
+import os
+import re
+import sys
+import json
+import time
+import random
+import string
+import argparse
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resume_parser'))
+
+from contact_mapper import SKILL_ALIASES, TECH_SKILLS, extract_skills  # noqa: E402
+from normalizer import ResumeDocument  # noqa: E402
+from skill_matcher import SkillIndex  # noqa: E402
+
+DEFAULT_LABELLED_SET = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'skills_labelled.jsonl')
+
+TYPO_QUERIES = ("Kubernates", "Djnago", "Pytorh", "Terrafrom", "Javscript", "Postgress")
+
+
+def regex_scan(text_lower: str, taxonomy: Sequence[str]) -> List[str]:
+    """The per-skill regex scan that extract_skills used before the index"""
+    return [skill for skill in taxonomy if re.search(r'\b' + re.escape(skill.lower()) + r'\b', text_lower)]
+
+
+def regex_extract_skills(text: str) -> List[str]:
+    """The previous extract_skills (baseline): regex scan plus every skills-section item"""
+    document = ResumeDocument(text)
+    found = regex_scan(document.lower, TECH_SKILLS)
+    skill_text = document.sections.get('skills')
+    if skill_text:
+        for item in re.split(r'[,;|\n•·]', skill_text):
+            skill = item.strip(' -').strip()
+            if skill and 2 < len(skill) < 50 and skill not in found:
+                found.append(skill)
+    seen = set()
+    return [skill for skill in found if not (skill.lower() in seen or seen.add(skill.lower()))]
+
+
+def evaluate(extract: Callable[[str], List[str]], cases: List[Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    true_positives = predicted = expected = 0
+    for case in cases:
+        found = {skill.lower() for skill in extract(case["text"])}
+        wanted = {skill.lower() for skill in case["skills"]}
+        true_positives += len(found & wanted)
+        predicted += len(found)
+        expected += len(wanted)
+    precision = true_positives / predicted if predicted else 0.0
+    recall = true_positives / expected if expected else 0.0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for case in cases:
+            extract(case["text"])
+    elapsed = time.perf_counter() - start
+    return {
+        "precision": round(precision, 4),
+        "recall": round(recall, 4),
+        "f1": round(2 * precision * recall / (precision + recall), 4) if precision + recall else 0.0,
+        "mean_latency_us": round(elapsed / (repeat * len(cases)) * 1e6, 1),
+    }
+
+
+def padded_taxonomy(size: int, seed: int = 7) -> tuple:
+    """TECH_SKILLS plus synthetic entries up to `size` entries"""
+    rng = random.Random(seed)
+    extra = [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 12))).capitalize()
+        for _ in range(max(0, size - len(TECH_SKILLS)))
+    ]
+    return TECH_SKILLS + tuple(extra)
+
+
+def _time_us(fn: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return round((time.perf_counter() - start) / repeat * 1e6, 1)
+
+
+def scaling(text: str, sizes: Sequence[int], repeat: int) -> List[Dict[str, Any]]:
+    text_lower = ResumeDocument(text).lower
+    rows = []
+    for size in sizes:
+        taxonomy = padded_taxonomy(size)
+        start = time.perf_counter()
+        index = SkillIndex(taxonomy, SKILL_ALIASES)
+        build_ms = round((time.perf_counter() - start) * 1000, 1)
+        rows.append({
+            "taxonomy": len(taxonomy),
+            "index_build_ms": build_ms,
+            "typo_lookup_us": round(_time_us(lambda: [index.match(q) for q in TYPO_QUERIES], repeat) / len(TYPO_QUERIES), 1),
+            "index_scan_us": _time_us(lambda: index.find(text_lower), repeat),
+            "regex_scan_us": _time_us(lambda: regex_scan(text_lower, taxonomy), max(1, repeat // 10)),
+        })
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark skill index vs regex skill extraction")
+    parser.add_argument("labelled", nargs="?", default=DEFAULT_LABELLED_SET, help="JSONL of {text, skills}")
+    parser.add_argument("--repeat", type=int, default=200, help="Timing passes over the set")
+    parser.add_argument("--sizes", default="230,2300,23000", help="Taxonomy sizes for the scaling run")
+    args = parser.parse_args(argv)
+
+    with open(args.labelled, encoding="utf-8") as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+
+    print(json.dumps({
+        "cases": len(cases),
+        "regex": evaluate(regex_extract_skills, cases, args.repeat),
+        "index": evaluate(extract_skills, cases, args.repeat),
+        "scaling": scaling("\n".join(case["text"] for case in cases),
+                           [int(size) for size in args.sizes.split(",")], args.repeat),
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
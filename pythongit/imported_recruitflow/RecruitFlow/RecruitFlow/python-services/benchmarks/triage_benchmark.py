@@ -0,0 +1,142 @@
+"""
+Triage Benchmark
+Times document triage against the full load the parser did before it knew
+what a document was: the pdfplumber text pass over every page (python-docx
+for DOCX). Reports the pipeline triage chose for each document.
+
+Without arguments, runs on synthetic PDFs: a text resume, a 200-page text
+portfolio, a scanned resume, a mixed document and a file that is not a PDF.
+
+Usage:
+    python benchmarks/triage_benchmark.py [resumes/*.pdf resumes/*.docx]
+"""
+import io
+import os
+import sys
+import json
+import time
+import zlib
+import argparse
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import docx
+import pdfplumber
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resume_parser'))
+
+from triage import triage_document  # noqa: E402
+
+
+def synthetic_pdf(pages: Sequence[str]) -> bytes:
+    """PDF with one page per entry: "text" or "image" (a full-page image XObject)"""
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    next_id = 4
+    for number, kind in enumerate(pages, start=1):
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        kids.append(page_id)
+        if kind == "text":
+            lines = b" ".join(b"(Line %d of page %d: Python, Docker, Kubernetes) Tj T*" % (i, number) for i in range(40))
+            stream = b"BT /F1 10 Tf 12 TL 54 740 Td " + lines + b" ET"
+            resources = b"<< /Font << /F1 3 0 R >> >>"
+        else:
+            pixels = zlib.compress(b"\xff" * 3 * 64 * 64)
+            objects[next_id] = (b"<< /Type /XObject /Subtype /Image /Width 64 /Height 64 /ColorSpace /DeviceRGB "
+                                b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n" % len(pixels)
+                                + pixels + b"\nendstream")
+            stream = b"q 612 0 0 792 0 0 cm /Im1 Do Q"
+            resources = b"<< /XObject << /Im1 %d 0 R >> >>" % next_id
+            next_id += 1
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources " + resources
+                            + b" /Contents %d 0 R >>" % content_id)
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n"
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for obj_id in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref)
+    return bytes(out)
+
+
+def synthetic_documents() -> List[Tuple[str, str, bytes]]:
+    return [
+        ("resume-2p.pdf", ".pdf", synthetic_pdf(["text"] * 2)),
+        ("portfolio-200p.pdf", ".pdf", synthetic_pdf(["text"] * 200)),
+        ("scanned-3p.pdf", ".pdf", synthetic_pdf(["image"] * 3)),
+        ("mixed-4p.pdf", ".pdf", synthetic_pdf(["text", "image", "text", "image"])),
+        ("login-page.pdf", ".pdf", b"<!DOCTYPE html><html><body>Sign in to continue</body></html>"),
+    ]
+
+
+def full_load(content: bytes, file_extension: str) -> Optional[str]:
+    """The pdfplumber/python-docx pass the parser ran before triage; returns the error, if any"""
+    try:
+        if file_extension == ".pdf":
+            with pdfplumber.open(io.BytesIO(content)) as pdf:
+                for page in pdf.pages:
+                    page.extract_text()
+                    page.close()
+        else:
+            docx.Document(io.BytesIO(content))
+    except Exception as e:
+        return type(e).__name__
+    return None
+
+
+def _best_ms(fn: Callable[[], Any], repeat: int) -> Tuple[float, Any]:
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return round(best, 2), result
+
+
+def benchmark(name: str, file_extension: str, content: bytes, repeat: int) -> Dict[str, Any]:
+    triage_ms, triage = _best_ms(lambda: triage_document(content, file_extension), repeat)
+    load_ms, load_error = _best_ms(lambda: full_load(content, file_extension), repeat)
+    return {
+        "document": name,
+        "bytes": len(content),
+        "pipeline": triage.pipeline,
+        "pages": triage.pages,
+        "reason": triage.reason,
+        "triage_ms": triage_ms,
+        "full_load_ms": load_ms,
+        "full_load_error": load_error,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark document triage vs the full text pass")
+    parser.add_argument("files", nargs="*", help="PDF/DOCX files (default: synthetic documents)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per document; times are the best run")
+    args = parser.parse_args(argv)
+
+    if args.files:
+        documents = [(Path(f).name, Path(f).suffix.lower(), Path(f).read_bytes()) for f in args.files]
+    else:
+        documents = synthetic_documents()
+    # First call pays pdfminer's imports
+    triage_document(synthetic_pdf(["text"]), ".pdf")
+
+    for name, file_extension, content in documents:
+        print(json.dumps(benchmark(name, file_extension, content, args.repeat)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
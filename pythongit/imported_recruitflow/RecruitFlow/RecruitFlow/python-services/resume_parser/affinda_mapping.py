@@ -0,0 +1,188 @@
+"""
+Affinda Response Mapping Module
+Flattens an Affinda JSON response once into a key-path index and resolves
+contact fields from declarative, versioned mapping schemas
+"""
+import os
+import re
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Wrapper objects Affinda (and similar parsers) nest the real fields under.
+# Descending into one of these does not count as going deeper in the tree,
+# so `data.email` ranks the same as a top-level `email`.
+CONTAINER_KEYS = frozenset({
+    "data", "parsed", "parsed_resume", "personal", "contact",
+    "personal_details", "attributes", "profile",
+})
+
+# Mapping schemas: output field -> candidate keys, in order of preference.
+# Add a new version rather than editing an old one so stored results stay
+# reproducible; select the active version with AFFINDA_MAPPING_VERSION.
+MAPPING_SCHEMAS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "v1": {
+        "full_name": ("name", "full_name", "given_name", "first_name", "formatted_name"),
+        "email": ("email", "emails"),
+        "phone": ("phone", "phones", "mobile"),
+        "address": ("address", "location", "locations", "addresses"),
+        "linkedin": ("linkedin", "linkedin_url", "linkedin_profile", "profile_url"),
+        "skills": ("skills", "skill", "keywords", "expertise"),
+    },
+}
+
+DEFAULT_SCHEMA_VERSION = os.getenv("AFFINDA_MAPPING_VERSION", "v1")
+
+Path = Tuple[Any, ...]
+# (path, depth) for every non-empty keyed value, in document order
+Shape = Tuple[Tuple[Path, int], ...]
+
+# Stands in for list indices in resolution keys (JSON object keys are never None),
+# so responses listing two emails or ten jobs share a key with those listing one
+ANY_INDEX = None
+
+
+def flatten_affinda(data: Any) -> Tuple[Shape, Dict[Path, Any]]:
+    """
+    Walk an Affinda response once and index every non-empty keyed value
+
+    Args:
+        data: Parsed Affinda JSON
+
+    Returns:
+        (shape, values) where shape lists (path, depth) in document order and
+        values maps each path to its value
+    """
+    shape: List[Tuple[Path, int]] = []
+    values: Dict[Path, Any] = {}
+
+    stack: List[Tuple[Any, Path, int]] = [(data, (), 0)]
+    while stack:
+        node, path, depth = stack.pop()
+        if isinstance(node, dict):
+            items = list(node.items())
+        elif isinstance(node, list):
+            items = list(enumerate(node))
+        else:
+            continue
+
+        children = []
+        for key, value in items:
+            child_path = path + (key,)
+            if isinstance(key, str) and value:
+                shape.append((child_path, depth))
+                values[child_path] = value
+            if isinstance(value, (dict, list)):
+                is_container = isinstance(key, str) and key in CONTAINER_KEYS and isinstance(value, dict)
+                children.append((value, child_path, depth if is_container else depth + 1))
+
+        # Push in reverse so children are visited in document order
+        stack.extend(reversed(children))
+
+    return tuple(shape), values
+
+
+@lru_cache(maxsize=None)
+def _candidate_keys(schema_version: str) -> frozenset:
+    return frozenset(key for keys in MAPPING_SCHEMAS[schema_version].values() for key in keys)
+
+
+def _candidate_patterns(schema_version: str, shape: Shape) -> Tuple[Shape, Dict[Path, Path]]:
+    """
+    Candidate-key paths of a response with list indices collapsed
+
+    Returns:
+        (patterns, first) where patterns lists (pattern, depth) in document
+        order, once per pattern, and first maps each pattern to the first
+        concrete path it stands for
+    """
+    candidates = _candidate_keys(schema_version)
+    patterns: List[Tuple[Path, int]] = []
+    first: Dict[Path, Path] = {}
+    for path, depth in shape:
+        if path[-1] not in candidates:
+            continue
+        pattern = tuple(ANY_INDEX if isinstance(key, int) else key for key in path)
+        if pattern not in first:
+            first[pattern] = path
+            patterns.append((pattern, depth))
+    return tuple(patterns), first
+
+
+@lru_cache(maxsize=256)
+def _resolve_paths(schema_version: str, patterns: Shape) -> Dict[str, Optional[Path]]:
+    """
+    Pick the best path pattern for every field of a schema
+
+    The shallowest match wins; ties go to the earlier candidate key and then
+    to document order. Paths sharing a pattern have the same depth and key,
+    so the first of them would win anyway; responses whose candidate paths
+    differ only in list lengths share the result.
+    """
+    schema = MAPPING_SCHEMAS[schema_version]
+    key_rank = {
+        field: {key: rank for rank, key in enumerate(keys)}
+        for field, keys in schema.items()
+    }
+
+    best: Dict[str, Tuple[Tuple[int, int, int], Path]] = {}
+    for order, (path, depth) in enumerate(patterns):
+        key = path[-1]
+        for field, ranks in key_rank.items():
+            rank = ranks.get(key)
+            if rank is None:
+                continue
+            score = (depth, rank, order)
+            if field not in best or score < best[field][0]:
+                best[field] = (score, path)
+
+    return {field: best[field][1] if field in best else None for field in schema}
+
+
+def normalize_skills(raw: Any) -> List[str]:
+    """
+    Normalize a skills value from Affinda into a list of strings
+
+    Args:
+        raw: List, delimited string or scalar
+
+    Returns:
+        List of skill names
+    """
+    if raw is None:
+        return []
+    if isinstance(raw, list):
+        return [str(x) for x in raw]
+    if isinstance(raw, str):
+        # split common delimiters
+        return [s.strip() for s in re.split(r'[;,|\n]+', raw) if s.strip()]
+    return [str(raw)]
+
+
+def map_affinda_response(data: Any, schema_version: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Map an Affinda response onto the contact-info fields used by /parse
+
+    Args:
+        data: Parsed Affinda JSON
+        schema_version: Mapping schema to apply (defaults to DEFAULT_SCHEMA_VERSION)
+
+    Returns:
+        Dictionary with the same keys as extract_contact_info
+    """
+    version = schema_version or DEFAULT_SCHEMA_VERSION
+    if version not in MAPPING_SCHEMAS:
+        raise ValueError(f"Unknown Affinda mapping schema: {version}")
+
+    shape, values = flatten_affinda(data)
+    patterns, first = _candidate_patterns(version, shape)
+    resolved = _resolve_paths(version, patterns)
+
+    contact_info: Dict[str, Any] = {
+        field: values[first[pattern]] if pattern is not None else None
+        for field, pattern in resolved.items()
+    }
+    contact_info["skills"] = normalize_skills(contact_info.get("skills"))
+    return contact_info
@@ -0,0 +1,388 @@
+"""
+Bulk Resume Import
+Parses folders and zip archives of resumes across all cores, writing
+/parse-equivalent records as NDJSON or CSV. Progress is checkpointed next to
+the output, so re-running the same command resumes where it stopped.
+
+Usage:
+    python bulk_import.py resumes/ archive.zip -o results.ndjson
+"""
+import os
+import sys
+import csv
+import json
+import time
+import zipfile
+import argparse
+import logging
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+try:
+    from models import ParsedResume
+    from pipeline import SUPPORTED_EXTENSIONS, parse_document, store_parse
+except ImportError:
+    from resume_parser.models import ParsedResume
+    from resume_parser.pipeline import SUPPORTED_EXTENSIONS, parse_document, store_parse
+
+logger = logging.getLogger(__name__)
+
+# Separator between an archive path and a member name in document ids
+ZIP_MEMBER_SEPARATOR = "!"
+
+CSV_FIELDS = [
+    "file_path", "success", "file_type", "name", "email", "phone", "address",
+    "linkedin", "skills", "text_length", "text", "error",
+]
+
+# A document source: (document id, archive path or None, path or member name)
+Source = Tuple[str, Optional[str], str]
+
+# Outcome of one document: (document id, parse result or None, error or None)
+Outcome = Tuple[str, Optional[ParsedResume], Optional[str]]
+
+
+def iter_sources(inputs: List[str]) -> Iterator[Source]:
+    """
+    Enumerate resumes under directories, zip archives and plain files
+
+    Zip archives are listed from their central directory; nothing is
+    unpacked to disk.
+
+    Args:
+        inputs: Paths to directories, .zip archives or resume files
+
+    Yields:
+        Sources in a stable (sorted) order
+    """
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    yield from iter_sources([os.path.join(root, name)])
+        elif path.suffix.lower() == ".zip":
+            try:
+                with zipfile.ZipFile(path) as archive:
+                    for info in archive.infolist():
+                        if info.is_dir() or Path(info.filename).suffix.lower() not in SUPPORTED_EXTENSIONS:
+                            continue
+                        doc_id = f"{path}{ZIP_MEMBER_SEPARATOR}{info.filename}"
+                        yield doc_id, str(path), info.filename
+            except zipfile.BadZipFile as e:
+                logger.warning(f"Skipping unreadable archive {path}: {e}")
+        elif path.suffix.lower() in SUPPORTED_EXTENSIONS and path.is_file():
+            yield str(path), None, str(path)
+
+
+# Open archives per worker process, so each central directory is read once
+_open_archives: Dict[str, zipfile.ZipFile] = {}
+
+
+def _read_source(archive_path: Optional[str], name: str) -> bytes:
+    if archive_path is None:
+        with open(name, "rb") as f:
+            return f.read()
+    archive = _open_archives.get(archive_path)
+    if archive is None:
+        archive = _open_archives[archive_path] = zipfile.ZipFile(archive_path)
+    return archive.read(name)
+
+
+def _parse_outcome(source: Source) -> Outcome:
+    doc_id, archive_path, name = source
+    try:
+        content = _read_source(archive_path, name)
+        resume = parse_document(content, name)
+    except Exception as e:
+        return doc_id, None, str(e)
+    resume.file_path = doc_id
+    store_parse(resume)
+    return doc_id, resume, None
+
+
+def _outcome_record(outcome: Outcome) -> Dict[str, Any]:
+    doc_id, resume, error = outcome
+    if resume is None:
+        return {"file_path": doc_id, "success": False, "error": error}
+    return resume.to_response()
+
+
+def parse_source(source: Source) -> Dict[str, Any]:
+    """
+    Parse one document; failures become records instead of exceptions
+
+    Args:
+        source: Source from iter_sources
+
+    Returns:
+        /parse-equivalent record, or a failure record with an 'error' field
+    """
+    return _outcome_record(_parse_outcome(source))
+
+
+def parse_source_packed(source: Source) -> Tuple[str, Optional[bytes], Optional[str]]:
+    """
+    Worker-process variant of parse_source
+
+    The result crosses the process boundary in the ParsedResume binary
+    encoding, which is smaller and cheaper to pickle than the record dict.
+
+    Args:
+        source: Source from iter_sources
+
+    Returns:
+        (document id, ParsedResume.to_bytes() or None, error or None)
+    """
+    doc_id, resume, error = _parse_outcome(source)
+    return doc_id, resume.to_bytes() if resume is not None else None, error
+
+
+def unpack_source_result(result: Tuple[str, Optional[bytes], Optional[str]]) -> Dict[str, Any]:
+    """Turn the output of parse_source_packed into the record parse_source returns"""
+    doc_id, packed, error = result
+    resume = ParsedResume.from_bytes(packed) if packed is not None else None
+    return _outcome_record((doc_id, resume, error))
+
+
+def parse_source_isolated(source: Source) -> Dict[str, Any]:
+    """
+    Parse one document in a worker process of its own
+
+    Used for the documents that were in flight when a worker died: only
+    the one that kills its own worker again is recorded as failed.
+
+    Args:
+        source: Source from iter_sources
+
+    Returns:
+        Record as from parse_source; a failure record if the worker crashed
+    """
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        try:
+            return unpack_source_result(executor.submit(parse_source_packed, source).result())
+        except BrokenProcessPool:
+            return {"file_path": source[0], "success": False, "error": "Worker process crashed"}
+
+
+def checkpoint_path(output_path: Path) -> Path:
+    """Checkpoint file that records completed documents for an output"""
+    return output_path.with_name(output_path.name + ".checkpoint")
+
+
+def load_checkpoint(output_path: Path) -> Set[str]:
+    """
+    Read completed document ids and roll the output back to the last one
+
+    Each checkpoint line holds the output's byte offset after a record was
+    flushed, followed by that record's document id. Anything written after
+    the last checkpointed record (e.g. a half-written row from a crash) is
+    truncated away so the output can be appended to safely.
+
+    Args:
+        output_path: NDJSON or CSV output file
+
+    Returns:
+        Set of completed document ids
+
+    Raises:
+        ValueError: The output exists but has no checkpoint to resume from
+    """
+    checkpoint = checkpoint_path(output_path)
+    if not checkpoint.exists():
+        if output_path.exists() and output_path.stat().st_size:
+            raise ValueError(f"{output_path} exists but has no checkpoint; remove it or choose another output")
+        return set()
+
+    completed = set()
+    offset = 0
+    with open(checkpoint, encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            position, _, doc_id = line.rstrip("\n").partition("\t")
+            completed.add(doc_id)
+            offset = int(position)
+
+    if output_path.exists():
+        with open(output_path, "rb+") as f:
+            f.truncate(offset)
+    return completed
+
+
+class RecordWriter:
+    """Appends records to NDJSON or CSV and checkpoints each one"""
+
+    def __init__(self, stream: TextIO, checkpoint: TextIO, output_format: str):
+        self.stream = stream
+        self.checkpoint = checkpoint
+        self.csv_writer = None
+        if output_format == "csv":
+            self.csv_writer = csv.DictWriter(stream, fieldnames=CSV_FIELDS, extrasaction="ignore")
+            if stream.tell() == 0:
+                self.csv_writer.writeheader()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self.csv_writer is not None:
+            row = dict(record)
+            row["skills"] = "; ".join(record.get("skills") or [])
+            self.csv_writer.writerow(row)
+        else:
+            self.stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.stream.flush()
+        self.checkpoint.write(f"{self.stream.tell()}\t{record['file_path']}\n")
+        self.checkpoint.flush()
+
+
+class Progress:
+    """Prints throughput and ETA to stderr at a fixed interval"""
+
+    def __init__(self, total: int, interval: float = 5.0, stream: Optional[TextIO] = None):
+        self.total = total
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._last_report = self.started
+
+    def update(self, record: Dict[str, Any]) -> None:
+        self.done += 1
+        if not record.get("success"):
+            self.failed += 1
+        now = time.monotonic()
+        if now - self._last_report >= self.interval:
+            self._last_report = now
+            self.report()
+
+    def report(self) -> None:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        rate = self.done / elapsed
+        remaining = self.total - self.done
+        eta = remaining / rate if rate else float("inf")
+        self.stream.write(
+            f"[bulk-import] {self.done}/{self.total} docs, {self.failed} failed, "
+            f"{rate:.1f} docs/s, ETA {eta:.0f}s\n"
+        )
+        self.stream.flush()
+
+
+def run_bulk_import(
+    inputs: List[str],
+    output: str,
+    output_format: Optional[str] = None,
+    workers: Optional[int] = None,
+    progress_interval: float = 5.0,
+) -> Dict[str, int]:
+    """
+    Parse every resume under `inputs` into `output`, resuming if it exists
+
+    Args:
+        inputs: Directories, zip archives or files
+        output: Output file path
+        output_format: 'ndjson' or 'csv' (inferred from the extension if None)
+        workers: Worker processes (defaults to all cores; 1 runs in-process)
+        progress_interval: Seconds between progress lines
+
+    Returns:
+        Counts of parsed, failed and skipped documents
+    """
+    output_path = Path(output)
+    if output_format is None:
+        output_format = "csv" if output_path.suffix.lower() == ".csv" else "ndjson"
+    workers = workers or os.cpu_count() or 1
+
+    completed = load_checkpoint(output_path)
+    sources = [source for source in iter_sources(inputs) if source[0] not in completed]
+    skipped = len(completed)
+    progress = Progress(len(sources), interval=progress_interval)
+
+    with open(output_path, "a", newline="", encoding="utf-8") as stream, \
+            open(checkpoint_path(output_path), "a", encoding="utf-8") as checkpoint:
+        writer = RecordWriter(stream, checkpoint, output_format)
+
+        if workers <= 1:
+            for source in sources:
+                record = parse_source(source)
+                writer.write(record)
+                progress.update(record)
+        else:
+            # Keep a bounded window of submitted work so memory stays flat
+            window = workers * 4
+            pending: Dict[Future, Source] = {}
+            crashed: List[Source] = []
+            source_iter = iter(sources)
+            executor = ProcessPoolExecutor(max_workers=workers)
+            try:
+                while True:
+                    while len(pending) < window and not crashed:
+                        source = next(source_iter, None)
+                        if source is None:
+                            break
+                        try:
+                            pending[executor.submit(parse_source_packed, source)] = source
+                        except BrokenProcessPool:
+                            crashed.append(source)
+                    if not pending and not crashed:
+                        break
+                    if pending:
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            source = pending.pop(future)
+                            try:
+                                record = unpack_source_result(future.result())
+                            except BrokenProcessPool:
+                                crashed.append(source)
+                                continue
+                            writer.write(record)
+                            progress.update(record)
+                    if crashed:
+                        # A dead worker breaks the whole pool and fails everything in
+                        # flight; retry those one at a time so only the culprit fails
+                        crashed.extend(pending.values())
+                        pending.clear()
+                        executor.shutdown(wait=True)
+                        logger.warning(f"Worker process crashed; retrying {len(crashed)} documents one at a time")
+                        for source in crashed:
+                            record = parse_source_isolated(source)
+                            writer.write(record)
+                            progress.update(record)
+                        crashed = []
+                        executor = ProcessPoolExecutor(max_workers=workers)
+            finally:
+                executor.shutdown(wait=True)
+
+    progress.report()
+    return {
+        "parsed": progress.done - progress.failed,
+        "failed": progress.failed,
+        "skipped": skipped,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Bulk-import resumes from folders and zip archives")
+    parser.add_argument("inputs", nargs="+", help="Directories, .zip archives or resume files")
+    parser.add_argument("-o", "--output", required=True, help="Output file (.ndjson or .csv); re-run to resume")
+    parser.add_argument("--format", choices=["ndjson", "csv"], help="Output format (default: from extension)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    counts = run_bulk_import(
+        args.inputs,
+        args.output,
+        output_format=args.format,
+        workers=args.workers,
+        progress_interval=args.progress_interval,
+    )
+    print(json.dumps(counts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Cancellation Module
+Per-request cancel tokens (deadline or client disconnect) checked between
+extraction steps, plus counters for how much work was abandoned
+"""
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+REASON_DEADLINE = "deadline"
+REASON_DISCONNECT = "disconnect"
+
+
+class ParseCancelled(Exception):
+    """Raised when a parse is abandoned because of its deadline or a disconnect"""
+
+    def __init__(self, reason: str):
+        super().__init__(f"parse cancelled: {reason}")
+        self.reason = reason
+
+
+class CancellationStats:
+    """Thread-safe counters of cancelled work"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {REASON_DEADLINE: 0, REASON_DISCONNECT: 0}
+        self.pages_skipped = 0
+        self.affinda_calls_cancelled = 0
+
+    def record_request(self, reason: str) -> None:
+        with self._lock:
+            self.requests[reason] = self.requests.get(reason, 0) + 1
+
+    def record_pages(self, count: int) -> None:
+        with self._lock:
+            self.pages_skipped += count
+
+    def record_affinda(self) -> None:
+        with self._lock:
+            self.affinda_calls_cancelled += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests_cancelled": dict(self.requests),
+                "pages_skipped": self.pages_skipped,
+                "affinda_calls_cancelled": self.affinda_calls_cancelled,
+            }
+
+
+cancel_stats = CancellationStats()
+
+
+class CancelToken:
+    """
+    Cancellation flag shared between the request handler and extraction
+    threads. Cancelled explicitly (client disconnect) or implicitly once the
+    deadline passes.
+    """
+
+    def __init__(self, deadline: Optional[float] = None):
+        """
+        Args:
+            deadline: time.monotonic() value after which work is abandoned
+        """
+        self.deadline = deadline
+        self.reason: Optional[str] = None
+        self._event = threading.Event()
+
+    @classmethod
+    def from_budget_ms(cls, budget_ms: Optional[float]) -> "CancelToken":
+        """Create a token expiring `budget_ms` from now (no deadline if None)"""
+        if budget_ms is None:
+            return cls()
+        return cls(time.monotonic() + budget_ms / 1000.0)
+
+    def cancel(self, reason: str) -> None:
+        if not self._event.is_set():
+            self.reason = reason
+            self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if not self._event.is_set() and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel(REASON_DEADLINE)
+        return self._event.is_set()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left before the deadline, or None without one"""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def checkpoint(self, pending_pages: int = 0) -> None:
+        """
+        Raise ParseCancelled if the token has been cancelled
+
+        Args:
+            pending_pages: Pages that will be skipped by stopping here
+        """
+        if self.cancelled:
+            if pending_pages:
+                cancel_stats.record_pages(pending_pages)
+            raise ParseCancelled(self.reason)
+
+
+async def await_cancellable(awaitable: Awaitable[Any], token: CancelToken, poll_interval: float = 0.05) -> Any:
+    """
+    Await a coroutine, cancelling it as soon as the token is cancelled
+
+    Args:
+        awaitable: Work to run
+        token: Cancel token for the request
+        poll_interval: Seconds between token checks
+
+    Returns:
+        The awaitable's result
+
+    Raises:
+        ParseCancelled: The token was cancelled before the work finished
+    """
+    task = asyncio.ensure_future(awaitable)
+    try:
+        while True:
+            timeout = poll_interval
+            remaining = token.remaining()
+            if remaining is not None:
+                timeout = min(timeout, remaining)
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                return task.result()
+            if token.cancelled:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                raise ParseCancelled(token.reason)
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+
+async def watch_for_disconnect(request: Any, token: CancelToken, poll_interval: float = 0.25) -> None:
+    """
+    Cancel the token when the HTTP client goes away
+
+    Args:
+        request: Starlette request of the parse
+        token: Cancel token for the request
+        poll_interval: Seconds between disconnect checks
+    """
+    while not token.cancelled:
+        if await request.is_disconnected():
+            logger.info("Client disconnected; cancelling parse")
+            token.cancel(REASON_DISCONNECT)
+            return
+        await asyncio.sleep(poll_interval)
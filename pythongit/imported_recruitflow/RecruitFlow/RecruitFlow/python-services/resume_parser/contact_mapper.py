@@ -3,11 +3,111 @@ Contact Information Extraction Module
 Uses regex patterns to extract contact details from resume text
 """
 import re
+import hashlib
 import logging
-from typing import Dict, Optional, List
+from typing import Dict, Optional, List, Union
+
+try:
+    from normalizer import ResumeDocument, as_document
+    from name_gazetteer import recognize_name
+    from location_gazetteer import extract_location
+    from skill_matcher import get_skill_index
+except ImportError:
+    from resume_parser.normalizer import ResumeDocument, as_document
+    from resume_parser.name_gazetteer import recognize_name
+    from resume_parser.location_gazetteer import extract_location
+    from resume_parser.skill_matcher import get_skill_index
 
 logger = logging.getLogger(__name__)
 
+# Unmatched skills-section items longer than this are sentences, not skills
+MAX_FREEFORM_SKILL_WORDS = 4
+MAX_FREEFORM_SKILL_CHARS = 40
+
+# Comprehensive tech skills database. Adding skills changes
+# taxonomy_version(), which marks stored parses for re-extraction.
+TECH_SKILLS = (
+    # Programming Languages
+    'Python', 'Java', 'JavaScript', 'TypeScript', 'C++', 'C#', 'Ruby', 'Go', 'Rust', 'PHP', 'Swift', 'Kotlin',
+    'Scala', 'Perl', 'R', 'MATLAB', 'Objective-C', 'Dart', 'Elixir', 'Haskell', 'Lua', 'Julia', 'VB.NET',
+    
+    # Frontend
+    'React', 'Angular', 'Vue', 'Vue.js', 'Svelte', 'jQuery', 'Bootstrap', 'Tailwind', 'Material-UI', 'Next.js',
+    'Nuxt.js', 'Gatsby', 'HTML', 'HTML5', 'CSS', 'CSS3', 'SASS', 'SCSS', 'LESS', 'Webpack', 'Vite', 'Babel',
+    
+    # Backend
+    'Node.js', 'Express', 'Django', 'Flask', 'FastAPI', 'Spring', 'Spring Boot', 'Ruby on Rails', 'ASP.NET',
+    '.NET', '.NET Core', 'Laravel', 'Symfony', 'NestJS', 'Koa', 'Gin', 'Echo',
+    
+    # Databases
+    'PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'Cassandra', 'DynamoDB', 'Oracle', 'SQL Server', 'SQLite',
+    'MariaDB', 'CouchDB', 'Neo4j', 'Elasticsearch', 'InfluxDB', 'Firebase', 'Supabase',
+    
+    # Cloud & DevOps
+    'AWS', 'Azure', 'GCP', 'Google Cloud', 'Docker', 'Kubernetes', 'Jenkins', 'GitLab CI', 'GitHub Actions',
+    'CircleCI', 'Travis CI', 'Terraform', 'Ansible', 'Chef', 'Puppet', 'Vagrant', 'Nginx', 'Apache',
+    
+    # Data & AI/ML
+    'TensorFlow', 'PyTorch', 'Keras', 'Scikit-learn', 'Pandas', 'NumPy', 'SciPy', 'Matplotlib', 'Seaborn',
+    'Tableau', 'Power BI', 'Spark', 'Hadoop', 'Kafka', 'Airflow', 'Databricks', 'Snowflake', 'BigQuery',
+    
+    # Mobile
+    'React Native', 'Flutter', 'iOS', 'Android', 'Xamarin', 'Ionic', 'Cordova', 'SwiftUI',
+    
+    # Testing
+    'Jest', 'Mocha', 'Chai', 'Jasmine', 'Pytest', 'JUnit', 'Selenium', 'Cypress', 'TestNG', 'Cucumber',
+    
+    # Tools & Version Control
+    'Git', 'GitHub', 'GitLab', 'Bitbucket', 'SVN', 'JIRA', 'Confluence', 'Slack', 'VS Code', 'IntelliJ',
+    
+    # Methodologies
+    'Agile', 'Scrum', 'Kanban', 'DevOps', 'CI/CD', 'TDD', 'BDD', 'Microservices', 'REST', 'GraphQL', 'SOAP',
+    
+    # ERP & Business Systems
+    'SAP', 'Oracle ERP', 'Salesforce', 'Dynamics 365', 'NetSuite', 'Workday', 'ServiceNow', 'PeopleSoft',
+    'JD Edwards', 'Epicor', 'Infor', 'Microsoft Dynamics', 'Odoo', 'Zoho',
+    
+    # Supply Chain & Logistics
+    'WMS', 'OMS', 'TMS', 'ERP', 'SCM', '3PL', 'EPC', 'RFID', 'Warehouse Management', 'Order Management',
+    'Supply Chain', 'Logistics', 'Inventory Management', 'Manhattan WMS', 'Blue Yonder', 'JDA',
+    'Oracle WMS', 'SAP EWM', 'Infor WMS', 'Ecommerce', 'E-commerce', 'Omnichannel', 'Retail',
+    
+    # Other Technologies
+    'Blockchain', 'IoT', 'AR', 'VR', 'Machine Learning', 'Deep Learning', 'NLP', 'Computer Vision',
+    'API', 'Microservices', 'Serverless', 'Lambda', 'gRPC', 'WebSocket', 'OAuth', 'JWT', 'SSL', 'TLS'
+)
+
+# Other spellings of taxonomy entries, reported as the entry. Compact forms
+# ("NodeJS", "PowerBI", "Scikit Learn") and typos match without an alias.
+SKILL_ALIASES = {
+    'JavaScript': ('JS', 'ES6'),
+    'C#': ('CSharp',),
+    'Go': ('Golang',),
+    'Objective-C': ('ObjC',),
+    'React': ('ReactJS', 'React.js'),
+    'Angular': ('AngularJS', 'Angular.js'),
+    'Tailwind': ('Tailwind CSS',),
+    'Material-UI': ('MUI',),
+    'Node.js': ('Node',),
+    'Express': ('Express.js', 'ExpressJS'),
+    'Ruby on Rails': ('Rails', 'RoR'),
+    'PostgreSQL': ('Postgres', 'Postgre', 'psql'),
+    'MongoDB': ('Mongo',),
+    'SQL Server': ('MSSQL', 'MS SQL', 'Microsoft SQL Server'),
+    'AWS': ('Amazon Web Services',),
+    'GCP': ('Google Cloud Platform',),
+    'Kubernetes': ('K8s',),
+    'Scikit-learn': ('sklearn',),
+    'VS Code': ('Visual Studio Code',),
+    'NLP': ('Natural Language Processing',),
+}
+
+
+def taxonomy_version() -> str:
+    """Short hash identifying the current skills taxonomy and aliases"""
+    aliases = [f"{skill}={'|'.join(names)}" for skill, names in sorted(SKILL_ALIASES.items())]
+    return hashlib.blake2b("\n".join(TECH_SKILLS + tuple(aliases)).encode("utf-8"), digest_size=6).hexdigest()
+
 
 def extract_email(text: str) -> Optional[str]:
     """
@@ -19,8 +119,9 @@ def extract_email(text: str) -> Optional[str]:
     Returns:
         Email address or None
     """
-    # Comprehensive email regex pattern
-    email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    # Comprehensive email regex pattern. Local part and domain are bounded
+    # (RFC 5321 limits) so long runs of word characters cannot backtrack.
+    email_pattern = r'\b[A-Za-z0-9._%+-]{1,64}@[A-Za-z0-9.-]{1,253}\.[A-Z|a-z]{2,}\b'
     
     matches = re.findall(email_pattern, text)
     if matches:
@@ -71,49 +172,8 @@ def extract_name(text: str) -> Optional[str]:
     Returns:
         Full name or None
     """
-    # Get the first few lines where name is likely to appear
-    lines = text.split('\n')[:10]
-    
-    # Common name patterns
-    name_patterns = [
-        # Look for lines with 2-4 capitalized words
-        r'^([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})$',
-        # Name with middle initial
-        r'^([A-Z][a-z]+\s+[A-Z]\.\s+[A-Z][a-z]+)$',
-        # Name with titles (Mr., Ms., Dr., etc.)
-        r'^(?:Mr\.|Ms\.|Mrs\.|Dr\.|Prof\.)?\s*([A-Z][a-z]+(?:\s+[A-Z][a-z]+){1,3})',
-    ]
-    
-    for line in lines:
-        line = line.strip()
-        # Skip lines that are too long (likely not names)
-        if len(line) > 50 or len(line) < 3:
-            continue
-            
-        # Skip lines with numbers or special characters (except dots and spaces)
-        if re.search(r'[\d@#$%^&*()_+=\[\]{}|\\:";\'<>?,/]', line):
-            continue
-            
-        for pattern in name_patterns:
-            match = re.match(pattern, line)
-            if match:
-                name = match.group(1) if match.lastindex else match.group(0)
-                # Additional validation
-                words = name.split()
-                if 2 <= len(words) <= 4:
-                    return name.strip()
-    
-    # Fallback: Try to find name after common headers
-    name_headers = ['Name:', 'Full Name:', 'Candidate Name:', 'Applicant:']
-    for header in name_headers:
-        pattern = f'{re.escape(header)}\\s*([A-Za-z\\s]+)'
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            name = match.group(1).strip()
-            if 2 <= len(name.split()) <= 4:
-                return name
-    
-    return None
+    match = recognize_name(text)
+    return match.name if match else None
 
 
 def extract_address(text: str) -> Optional[str]:
@@ -126,45 +186,8 @@ def extract_address(text: str) -> Optional[str]:
     Returns:
         Address or location string or None
     """
-    # Common address patterns
-    address_patterns = [
-        # City, State ZIP format
-        r'\b([A-Za-z\s]+,\s*[A-Z]{2}\s+\d{5}(?:-\d{4})?)\b',
-        # City, State format
-        r'\b([A-Za-z\s]+,\s*[A-Z]{2})\b',
-        # Street address
-        r'\b(\d+\s+[A-Za-z\s]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr|Court|Ct|Place|Pl|Circle|Cir)\.?)\b',
-    ]
-    
-    # Look for location after common headers
-    location_headers = ['Address:', 'Location:', 'City:', 'Residence:', 'Lives in:', 'Based in:']
-    for header in location_headers:
-        pattern = f'{re.escape(header)}\\s*([^\\n]+)'
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            location = match.group(1).strip()
-            if location and len(location) < 100:
-                return location
-    
-    # Try general patterns
-    for pattern in address_patterns:
-        matches = re.findall(pattern, text)
-        if matches:
-            return matches[0]
-    
-    # Look for common city names or state abbreviations
-    state_pattern = r'\b(?:AL|AK|AZ|AR|CA|CO|CT|DE|FL|GA|HI|ID|IL|IN|IA|KS|KY|LA|ME|MD|MA|MI|MN|MS|MO|MT|NE|NV|NH|NJ|NM|NY|NC|ND|OH|OK|OR|PA|RI|SC|SD|TN|TX|UT|VT|VA|WA|WV|WI|WY)\b'
-    state_matches = re.findall(state_pattern, text)
-    
-    if state_matches:
-        # Try to find city before state
-        for state in state_matches:
-            city_pattern = f'([A-Za-z\\s]+),?\\s*{state}'
-            match = re.search(city_pattern, text)
-            if match:
-                return match.group(0).strip()
-    
-    return None
+    location = extract_location(text)
+    return location.text if location else None
 
 
 def extract_linkedin(text: str) -> Optional[str]:
@@ -196,95 +219,41 @@ def extract_linkedin(text: str) -> Optional[str]:
     return None
 
 
-def extract_skills(text: str) -> List[str]:
+def extract_skills(text: Union[str, ResumeDocument]) -> List[str]:
     """
     Extract skills from text using comprehensive tech skills database
     
+    Skills written anywhere in the text are matched by their taxonomy,
+    alias or compact spelling. Items of the skills section are also
+    matched with typos; items that match nothing are kept as written when
+    they read like a skill name rather than a sentence.
+    
     Args:
-        text: Input text
+        text: Input text, or a ResumeDocument to reuse its lowercased view
+            and sections
         
     Returns:
-        List of skills found in the text
+        List of skills found in the text, taxonomy entries first
     """
-    # Comprehensive tech skills database
-    tech_skills = [
-        # Programming Languages
-        'Python', 'Java', 'JavaScript', 'TypeScript', 'C++', 'C#', 'Ruby', 'Go', 'Rust', 'PHP', 'Swift', 'Kotlin',
-        'Scala', 'Perl', 'R', 'MATLAB', 'Objective-C', 'Dart', 'Elixir', 'Haskell', 'Lua', 'Julia', 'VB.NET',
-        
-        # Frontend
-        'React', 'Angular', 'Vue', 'Vue.js', 'Svelte', 'jQuery', 'Bootstrap', 'Tailwind', 'Material-UI', 'Next.js',
-        'Nuxt.js', 'Gatsby', 'HTML', 'HTML5', 'CSS', 'CSS3', 'SASS', 'SCSS', 'LESS', 'Webpack', 'Vite', 'Babel',
-        
-        # Backend
-        'Node.js', 'Express', 'Django', 'Flask', 'FastAPI', 'Spring', 'Spring Boot', 'Ruby on Rails', 'ASP.NET',
-        '.NET', '.NET Core', 'Laravel', 'Symfony', 'NestJS', 'Koa', 'Gin', 'Echo',
-        
-        # Databases
-        'PostgreSQL', 'MySQL', 'MongoDB', 'Redis', 'Cassandra', 'DynamoDB', 'Oracle', 'SQL Server', 'SQLite',
-        'MariaDB', 'CouchDB', 'Neo4j', 'Elasticsearch', 'InfluxDB', 'Firebase', 'Supabase',
-        
-        # Cloud & DevOps
-        'AWS', 'Azure', 'GCP', 'Google Cloud', 'Docker', 'Kubernetes', 'Jenkins', 'GitLab CI', 'GitHub Actions',
-        'CircleCI', 'Travis CI', 'Terraform', 'Ansible', 'Chef', 'Puppet', 'Vagrant', 'Nginx', 'Apache',
-        
-        # Data & AI/ML
-        'TensorFlow', 'PyTorch', 'Keras', 'Scikit-learn', 'Pandas', 'NumPy', 'SciPy', 'Matplotlib', 'Seaborn',
-        'Tableau', 'Power BI', 'Spark', 'Hadoop', 'Kafka', 'Airflow', 'Databricks', 'Snowflake', 'BigQuery',
-        
-        # Mobile
-        'React Native', 'Flutter', 'iOS', 'Android', 'Xamarin', 'Ionic', 'Cordova', 'SwiftUI',
-        
-        # Testing
-        'Jest', 'Mocha', 'Chai', 'Jasmine', 'Pytest', 'JUnit', 'Selenium', 'Cypress', 'TestNG', 'Cucumber',
-        
-        # Tools & Version Control
-        'Git', 'GitHub', 'GitLab', 'Bitbucket', 'SVN', 'JIRA', 'Confluence', 'Slack', 'VS Code', 'IntelliJ',
-        
-        # Methodologies
-        'Agile', 'Scrum', 'Kanban', 'DevOps', 'CI/CD', 'TDD', 'BDD', 'Microservices', 'REST', 'GraphQL', 'SOAP',
-        
-        # ERP & Business Systems
-        'SAP', 'Oracle ERP', 'Salesforce', 'Dynamics 365', 'NetSuite', 'Workday', 'ServiceNow', 'PeopleSoft',
-        'JD Edwards', 'Epicor', 'Infor', 'Microsoft Dynamics', 'Odoo', 'Zoho',
-        
-        # Supply Chain & Logistics
-        'WMS', 'OMS', 'TMS', 'ERP', 'SCM', '3PL', 'EPC', 'RFID', 'Warehouse Management', 'Order Management',
-        'Supply Chain', 'Logistics', 'Inventory Management', 'Manhattan WMS', 'Blue Yonder', 'JDA',
-        'Oracle WMS', 'SAP EWM', 'Infor WMS', 'Ecommerce', 'E-commerce', 'Omnichannel', 'Retail',
-        
-        # Other Technologies
-        'Blockchain', 'IoT', 'AR', 'VR', 'Machine Learning', 'Deep Learning', 'NLP', 'Computer Vision',
-        'API', 'Microservices', 'Serverless', 'Lambda', 'gRPC', 'WebSocket', 'OAuth', 'JWT', 'SSL', 'TLS'
-    ]
-    
-    found_skills = []
-    text_lower = text.lower()
-    
-    # Search for each skill in the text (case-insensitive)
-    for skill in tech_skills:
-        # Create pattern that matches skill as a whole word
-        pattern = r'\b' + re.escape(skill.lower()) + r'\b'
-        if re.search(pattern, text_lower):
-            found_skills.append(skill)
+    document = as_document(text)
+    index = get_skill_index(TECH_SKILLS, SKILL_ALIASES)
+    found_skills = index.find(document.lower)
     
-    # Also extract from explicit skills sections
-    skill_headers = [
-        'Skills:', 'Technical Skills:', 'Core Competencies:', 'Expertise:', 'Technologies:',
-        'Programming Languages:', 'Tools:', 'Certifications:', 'Qualifications:'
-    ]
-    
-    for header in skill_headers:
-        pattern = f'{re.escape(header)}\\s*([^\\n]+(?:\\n[^\\n]+)*?)(?=\\n\\n|\\n[A-Z][A-Z]|$)'
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            skill_text = match.group(1)
-            # Split by common delimiters
-            skill_items = re.split(r'[,;|\n•·]', skill_text)
-            for item in skill_items:
-                skill = item.strip(' -').strip()
-                if skill and 2 < len(skill) < 50 and skill not in found_skills:
-                    found_skills.append(skill)
+    # Also extract from the explicit skills section(s) found by the segmenter
+    skill_text = document.sections.get('skills')
+    if skill_text:
+        # Split by common delimiters
+        skill_items = re.split(r'[,;|\n•·]', skill_text)
+        for item in skill_items:
+            # "Languages: Python" -> "Python"
+            skill = item.rpartition(':')[2].strip(' -').strip()
+            if not skill:
+                continue
+            match = index.match(skill)
+            if match is not None:
+                found_skills.append(match.skill)
+            elif _is_freeform_skill(skill) and not index.find(skill.lower()):
+                found_skills.append(skill)
     
     # Deduplicate while preserving order
     seen = set()
@@ -299,29 +268,85 @@ def extract_skills(text: str) -> List[str]:
     return unique_skills
 
 
-def extract_contact_info(text: str) -> Dict[str, Optional[str]]:
+def _is_freeform_skill(item: str) -> bool:
+    """Whether an unmatched skills-section item reads like a skill name"""
+    return (
+        2 < len(item) < MAX_FREEFORM_SKILL_CHARS
+        and len(item.split()) <= MAX_FREEFORM_SKILL_WORDS
+        and not item.endswith('.')
+        and any(ch.isalpha() for ch in item)
+    )
+
+
+def extract_contact_info(text: Union[str, ResumeDocument], include_skills: bool = True) -> Dict[str, Optional[str]]:
     """
     Extract all contact information from resume text
     
+    The text is normalized and segmented once; contact fields are looked up
+    in the header and contact sections first and only fall back to the full
+    text when the candidate put them elsewhere.
+    
     Args:
-        text: Resume text
+        text: Resume text or an already normalized ResumeDocument
+        include_skills: Also scan for skills (False: contact fields only,
+            skills is [])
         
     Returns:
-        Dictionary with extracted contact information
+        Dictionary with extracted contact information, plus
+        'field_confidence' mapping each field to a score in [0, 1]
     """
     logger.info("Starting contact information extraction")
     
+    document = as_document(text)
+    sections = document.sections
+    full_text = document.text
+    contact_region = sections.contact_region
+    
+    # Confidence of each field in [0, 1]: how sure the extractor is that the
+    # value is right, with 0.0 for fields that were not found
+    confidence = {}
+    
+    def _contact_field(field, extractor, region_confidence, fallback_confidence):
+        value = extractor(contact_region) if contact_region else None
+        confidence[field] = region_confidence if value is not None else 0.0
+        if value is None and contact_region != full_text:
+            value = extractor(full_text)
+            confidence[field] = fallback_confidence if value is not None else 0.0
+        return value
+    
+    name = recognize_name(sections.get('header') or full_text)
+    location = extract_location(contact_region or full_text)
+    email = _contact_field('email', extract_email, 0.95, 0.8)
+    phone = _contact_field('phone', extract_phone, 0.9, 0.7)
+    if phone is not None and len(re.sub(r'\D', '', phone)) > 11:
+        # Long digit runs may be IDs or account numbers rather than phones
+        confidence['phone'] -= 0.3
+    linkedin = _contact_field('linkedin', extract_linkedin, 1.0, 0.9)
+    skills = extract_skills(document) if include_skills else []
+    
+    confidence['full_name'] = name.confidence if name else 0.0
+    if location is None:
+        confidence['address'] = 0.0
+    elif location.city and (location.state or location.country):
+        confidence['address'] = 0.9
+    else:
+        confidence['address'] = 0.6
+    confidence['skills'] = min(1.0, len(skills) / 5)
+    
     contact_info = {
-        'full_name': extract_name(text),
-        'email': extract_email(text),
-        'phone': extract_phone(text),
-        'address': extract_address(text),
-        'linkedin': extract_linkedin(text),
-        'skills': extract_skills(text)
+        'full_name': name.name if name else None,
+        'name_confidence': confidence['full_name'],
+        'email': email,
+        'phone': phone,
+        'address': location.text if location else None,
+        'location': location.fields() if location else None,
+        'linkedin': linkedin,
+        'skills': skills,
+        'field_confidence': {field: round(value, 3) for field, value in confidence.items()},
     }
     
     # Log what was extracted
-    extracted_count = sum(1 for v in contact_info.values() if v and (v != []))
+    extracted_count = sum(1 for field in confidence if contact_info[field])
     logger.info(f"Extracted {extracted_count} contact fields")
     
-    return contact_info
\ No newline at end of file
+    return contact_info
@@ -0,0 +1,169 @@
+"""
+Affinda Escalation Module
+Local-first parsing: fields are extracted locally, and Affinda is called
+only when the text or a required field is not trustworthy enough. Affinda's
+values replace the low-confidence fields one by one.
+"""
+import os
+import threading
+from typing import Any, Dict, List, Optional
+
+# "escalate" calls Affinda only for low-confidence parses; "always" calls it
+# for every parse first and falls back to local extraction (the old behaviour)
+AFFINDA_MODE = os.getenv("AFFINDA_MODE", "escalate").lower()
+
+# Fields whose confidence decides escalation, and the threshold below which
+# a field counts as unreliable
+ESCALATION_FIELDS = tuple(
+    field.strip() for field in os.getenv("ESCALATION_FIELDS", "full_name,email,phone").split(",") if field.strip()
+)
+ESCALATION_MIN_CONFIDENCE = float(os.getenv("ESCALATION_MIN_CONFIDENCE", "0.6"))
+
+# Affinda latency assumed before any call has been timed, for the savings counter
+AFFINDA_EXPECTED_LATENCY_MS = float(os.getenv("AFFINDA_EXPECTED_LATENCY_MS", "3000"))
+
+# Confidence given to a field taken from Affinda
+AFFINDA_FIELD_CONFIDENCE = 0.9
+
+# Smoothing of the measured Affinda latency
+LATENCY_ALPHA = 0.2
+
+
+def effective_confidence(contact_info: Dict[str, Any], text_quality: float) -> Dict[str, float]:
+    """
+    Field confidences discounted by the quality of the text they came from
+
+    Args:
+        contact_info: Result of extract_contact_info
+        text_quality: Quality of the extracted text (pipeline.text_quality)
+
+    Returns:
+        Field -> confidence in [0, 1]
+    """
+    confidence = contact_info.get("field_confidence") or {}
+    return {field: round(score * text_quality, 3) for field, score in confidence.items()}
+
+
+def low_confidence_fields(
+    confidence: Dict[str, float],
+    fields: tuple = ESCALATION_FIELDS,
+    threshold: float = ESCALATION_MIN_CONFIDENCE,
+) -> List[str]:
+    """
+    Required fields too unreliable to return without asking Affinda
+
+    Args:
+        confidence: From effective_confidence
+        fields: Required fields
+        threshold: Minimum acceptable confidence
+
+    Returns:
+        Fields below the threshold, in `fields` order
+    """
+    return [field for field in fields if confidence.get(field, 0.0) < threshold]
+
+
+def merge_contact_info(
+    local: Dict[str, Any],
+    affinda: Dict[str, Any],
+    confidence: Dict[str, float],
+    threshold: float = ESCALATION_MIN_CONFIDENCE,
+) -> Dict[str, Any]:
+    """
+    Replace low-confidence local fields with Affinda's values
+
+    A field is taken from Affinda only when Affinda has a value for it.
+    Skills are combined (local first) rather than replaced, and the
+    structured location is dropped when the address it describes is.
+
+    Args:
+        local: Result of extract_contact_info
+        affinda: Result of map_affinda_response
+        confidence: Local confidences from effective_confidence
+        threshold: Confidence below which a local field is replaced
+
+    Returns:
+        Merged contact info; 'affinda_fields' lists the fields Affinda
+        supplied and 'field_confidence' is updated to match
+    """
+    merged = dict(local)
+    merged_confidence = dict(confidence)
+    taken = []
+    for field, score in confidence.items():
+        value = affinda.get(field)
+        if score >= threshold or not value:
+            continue
+        if field == "skills":
+            seen = {skill.lower() for skill in local.get("skills") or []}
+            extra = [skill for skill in value if skill.lower() not in seen]
+            if not extra:
+                continue
+            merged["skills"] = list(local.get("skills") or []) + extra
+        else:
+            merged[field] = value
+            if field == "address":
+                merged["location"] = None
+        merged_confidence[field] = AFFINDA_FIELD_CONFIDENCE
+        taken.append(field)
+    merged["field_confidence"] = merged_confidence
+    merged["name_confidence"] = merged_confidence.get("full_name", 0.0)
+    merged["affinda_fields"] = taken
+    return merged
+
+
+class EscalationStats:
+    """Share of parses escalated to Affinda and the Affinda time avoided"""
+
+    def __init__(self, expected_latency_ms: float = AFFINDA_EXPECTED_LATENCY_MS):
+        self.requests = 0
+        self.escalated = 0
+        self.by_field: Dict[str, int] = {}
+        self.affinda_failures = 0
+        self.affinda_latency_ms = expected_latency_ms
+        self.latency_saved_ms = 0.0
+        self._measured = False
+        self._lock = threading.Lock()
+
+    def record_local(self, affinda_available: bool) -> None:
+        """A parse answered from local extraction alone"""
+        with self._lock:
+            self.requests += 1
+            if affinda_available:
+                self.latency_saved_ms += self.affinda_latency_ms
+
+    def record_escalation(self, fields: List[str], latency_ms: Optional[float], failed: bool = False) -> None:
+        """
+        A parse that called Affinda
+
+        Args:
+            fields: Low-confidence fields that triggered it ([] when the
+                text itself was unusable)
+            latency_ms: Duration of the Affinda call
+            failed: The call raised and local fields were kept
+        """
+        with self._lock:
+            self.requests += 1
+            self.escalated += 1
+            for field in fields or ["text"]:
+                self.by_field[field] = self.by_field.get(field, 0) + 1
+            if failed:
+                self.affinda_failures += 1
+            if latency_ms is not None:
+                if self._measured:
+                    self.affinda_latency_ms += LATENCY_ALPHA * (latency_ms - self.affinda_latency_ms)
+                else:
+                    self.affinda_latency_ms = latency_ms
+                    self._measured = True
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": AFFINDA_MODE,
+                "requests": self.requests,
+                "escalated": self.escalated,
+                "escalation_rate": round(self.escalated / self.requests, 4) if self.requests else 0.0,
+                "escalated_by_field": dict(self.by_field),
+                "affinda_failures": self.affinda_failures,
+                "affinda_latency_ms": round(self.affinda_latency_ms, 1),
+                "latency_saved_ms": round(self.latency_saved_ms, 1),
+            }
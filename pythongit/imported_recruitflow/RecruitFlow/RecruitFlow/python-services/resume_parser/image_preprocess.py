@@ -0,0 +1,197 @@
+"""
+Image Preprocessing Module
+Vectorized cleanup of rasterized pages before Tesseract: downscale, grayscale,
+adaptive binarization, speck removal, border trimming, blank-page detection,
+deskew and cropping to the text area
+"""
+import os
+import logging
+from typing import Any, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Bump when preprocessing changes its output; part of the OCR cache key
+PREPROCESS_VERSION = "1"
+
+# Pages are never handed to Tesseract above this many pixels per inch of
+# the longest side of a 14" (US Legal) page
+PAGE_MAX_SIDE_IN = 14.0
+
+# A pixel is ink when darker than (1 - BINARIZE_SENSITIVITY) x its local
+# mean over a window of about BINARIZE_WINDOW_IN inches (Bradley-Roth)
+BINARIZE_SENSITIVITY = 0.15
+BINARIZE_WINDOW_IN = 0.25
+
+# Pages with less ink than this fraction (after speck removal) are blank
+OCR_BLANK_INK_RATIO = float(os.getenv("OCR_BLANK_INK_RATIO", "0.0005"))
+
+# Edge rows/columns with more ink than this are scanner borders
+BORDER_INK_RATIO = 0.5
+
+# Skew search range and step in degrees, and the smallest correction applied
+MAX_SKEW_DEG = 5.0
+SKEW_STEP_DEG = 0.25
+MIN_SKEW_DEG = 0.3
+SKEW_SAMPLE_POINTS = 20000
+
+# Margin (pixels) kept around the text when cropping
+CROP_MARGIN_PX = 10
+
+
+def to_grayscale(image: Any) -> np.ndarray:
+    """PIL image -> 2-D uint8 array"""
+    if image.mode != "L":
+        image = image.convert("L")
+    return np.asarray(image, dtype=np.uint8)
+
+
+def downscale(gray: np.ndarray, dpi: int) -> Tuple[np.ndarray, int]:
+    """
+    Shrink oversized pages by an integer factor using block means
+
+    Args:
+        gray: Grayscale page
+        dpi: Resolution the page was rendered at
+
+    Returns:
+        (page, effective dpi)
+    """
+    max_side = int(dpi * PAGE_MAX_SIDE_IN)
+    factor = -(-max(gray.shape) // max_side)
+    if factor < 2:
+        return gray, dpi
+    height = gray.shape[0] // factor * factor
+    width = gray.shape[1] // factor * factor
+    blocks = gray[:height, :width].reshape(height // factor, factor, width // factor, factor)
+    return (blocks.sum(axis=(1, 3), dtype=np.uint32) // (factor * factor)).astype(np.uint8), dpi // factor
+
+
+def _box_sum(values: np.ndarray, window: int, axis: int) -> np.ndarray:
+    """Sum over a centred window along one axis (edges use a shorter window)"""
+    half = window // 2
+    cumulative = np.cumsum(values, axis=axis, dtype=np.int32)
+    pad = [(0, 0), (0, 0)]
+    pad[axis] = (half + 1, 0)
+    cumulative = np.pad(cumulative, pad)
+    pad[axis] = (0, half)
+    cumulative = np.pad(cumulative, pad, mode="edge")
+    size = values.shape[axis]
+    if axis == 0:
+        return cumulative[window:window + size] - cumulative[:size]
+    return cumulative[:, window:window + size] - cumulative[:, :size]
+
+
+def _window_counts(size: int, window: int) -> np.ndarray:
+    """Number of in-bounds positions in each centred window along one axis"""
+    half = window // 2
+    positions = np.arange(size)
+    return (np.minimum(positions + half, size - 1) - np.maximum(positions - half, 0) + 1).astype(np.int32)
+
+
+def binarize(gray: np.ndarray, dpi: int) -> np.ndarray:
+    """
+    Adaptive (local-mean) binarization
+
+    Handles uneven lighting and shadows that defeat a global threshold.
+    The window sums are computed separably from cumulative sums, so the cost
+    is linear in the pixel count regardless of window size.
+
+    Returns:
+        Boolean ink mask (True = ink)
+    """
+    window = max(15, int(dpi * BINARIZE_WINDOW_IN)) | 1
+    sums = _box_sum(_box_sum(gray, window, axis=1), window, axis=0)
+    counts = _window_counts(gray.shape[0], window)[:, None] * _window_counts(gray.shape[1], window)[None, :]
+    # gray < mean * (1 - sensitivity), in integers: gray * count * 100 < sum * 85
+    return gray * counts * 100 < sums * int(round(100 * (1 - BINARIZE_SENSITIVITY)))
+
+
+def remove_specks(mask: np.ndarray) -> np.ndarray:
+    """Drop ink pixels with fewer than two ink neighbours (scanner noise)"""
+    padded = np.pad(mask, 1).astype(np.uint8)
+    height, width = mask.shape
+    neighbours = np.zeros(mask.shape, dtype=np.uint8)
+    for dy in (0, 1, 2):
+        for dx in (0, 1, 2):
+            if dy != 1 or dx != 1:
+                neighbours += padded[dy:dy + height, dx:dx + width]
+    return mask & (neighbours >= 2)
+
+
+def trim_borders(mask: np.ndarray) -> np.ndarray:
+    """Strip mostly-black scanner borders from the page edges"""
+    rows = np.flatnonzero(mask.mean(axis=1) <= BORDER_INK_RATIO)
+    cols = np.flatnonzero(mask.mean(axis=0) <= BORDER_INK_RATIO)
+    if rows.size == 0 or cols.size == 0:
+        return mask[:0, :0]
+    return mask[rows[0]:rows[-1] + 1, cols[0]:cols[-1] + 1]
+
+
+def is_blank(mask: np.ndarray) -> bool:
+    return mask.size == 0 or mask.mean() < OCR_BLANK_INK_RATIO
+
+
+def estimate_skew(mask: np.ndarray) -> float:
+    """
+    Estimate text skew in degrees by projection profiles
+
+    Ink coordinates are projected onto the vertical axis at each candidate
+    angle; text lines line up, and the histogram is sharpest, at the skew
+    angle. All angles are evaluated in one vectorized pass over a sample of
+    ink pixels.
+
+    Returns:
+        Angle (positive = lines descend to the right)
+    """
+    ys, xs = np.nonzero(mask)
+    if ys.size < 2:
+        return 0.0
+    step = max(1, ys.size // SKEW_SAMPLE_POINTS)
+    ys = ys[::step].astype(np.float32)
+    xs = xs[::step].astype(np.float32)
+
+    angles = np.arange(-MAX_SKEW_DEG, MAX_SKEW_DEG + SKEW_STEP_DEG / 2, SKEW_STEP_DEG)
+    radians = np.deg2rad(angles).astype(np.float32)
+    projected = ys[:, None] * np.cos(radians) - xs[:, None] * np.sin(radians)
+    bins = np.rint(projected - projected.min()).astype(np.int64)
+    n_bins = int(bins.max()) + 1
+    histogram = np.bincount((bins + np.arange(len(angles)) * n_bins).ravel(), minlength=n_bins * len(angles))
+    scores = (histogram.reshape(len(angles), n_bins).astype(np.float64) ** 2).sum(axis=1)
+    return float(angles[int(np.argmax(scores))])
+
+
+def crop_to_content(mask: np.ndarray) -> np.ndarray:
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    top = max(rows[0] - CROP_MARGIN_PX, 0)
+    left = max(cols[0] - CROP_MARGIN_PX, 0)
+    return mask[top:rows[-1] + CROP_MARGIN_PX + 1, left:cols[-1] + CROP_MARGIN_PX + 1]
+
+
+def preprocess_page(image: Any, dpi: int) -> Optional[Any]:
+    """
+    Prepare a rasterized page for Tesseract
+
+    Args:
+        image: PIL image from pdf2image
+        dpi: Resolution it was rendered at
+
+    Returns:
+        Deskewed, cropped black-on-white PIL image, or None for a blank page
+    """
+    gray, dpi = downscale(to_grayscale(image), dpi)
+    mask = trim_borders(remove_specks(binarize(gray, dpi)))
+    if is_blank(mask):
+        return None
+
+    angle = estimate_skew(mask)
+    if abs(angle) >= MIN_SKEW_DEG:
+        logger.info(f"Deskewing page by {angle:.2f} degrees")
+        rotated = Image.fromarray(mask).rotate(angle, resample=Image.NEAREST, expand=True, fillcolor=0)
+        mask = np.asarray(rotated, dtype=bool)
+
+    mask = crop_to_content(mask)
+    return Image.fromarray(np.where(mask, 0, 255).astype(np.uint8), mode="L")
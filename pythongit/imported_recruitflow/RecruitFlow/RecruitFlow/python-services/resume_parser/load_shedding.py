@@ -0,0 +1,185 @@
+"""
+Load Shedding Module
+Quality tiers for /parse under overload: when the admission queue backs up,
+interactive parses switch to a degraded fast path (text layer and contact
+fields only, no OCR or Affinda), and full-quality reparses can be queued
+in the background for the caller to collect later
+"""
+import os
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+TIER_FULL = "full"
+TIER_DEGRADED = "degraded"
+
+# Queued parses at which interactive requests switch to the degraded tier
+# (0 disables load shedding), and the depth at or below which they switch
+# back. The gap keeps the tier from flapping around a single threshold.
+LOAD_SHED_QUEUE_DEPTH = int(os.getenv("LOAD_SHED_QUEUE_DEPTH", "0"))
+LOAD_SHED_RECOVER_DEPTH = int(os.getenv("LOAD_SHED_RECOVER_DEPTH", str(LOAD_SHED_QUEUE_DEPTH // 2)))
+
+# Degraded parses run in their own admission lane so they never wait behind
+# full parses
+LOAD_SHED_FAST_CONCURRENCY = int(os.getenv("LOAD_SHED_FAST_CONCURRENCY", str(max(1, (os.cpu_count() or 2) // 2))))
+
+# Queue a background full-quality reparse for every degraded response
+LOAD_SHED_REPARSE = os.getenv("LOAD_SHED_REPARSE", "true").lower() in ("1", "true", "yes")
+# Reparses allowed to wait or run at once, and finished results kept
+LOAD_SHED_MAX_PENDING_REPARSES = int(os.getenv("LOAD_SHED_MAX_PENDING_REPARSES", "100"))
+LOAD_SHED_RESULT_CAPACITY = int(os.getenv("LOAD_SHED_RESULT_CAPACITY", "1000"))
+
+# Recent tier switches kept for /metrics
+SWITCH_HISTORY = 20
+
+
+class LoadShedder:
+    """
+    Chooses the quality tier for each request from the admission queue depth
+
+    The tier is a single worker-wide state with hysteresis: it degrades
+    when the queue reaches `enter_depth` and recovers once it drains to
+    `exit_depth`. Every switch is logged and counted.
+    """
+
+    def __init__(self, enter_depth: int = LOAD_SHED_QUEUE_DEPTH, exit_depth: int = LOAD_SHED_RECOVER_DEPTH):
+        self.enter_depth = enter_depth
+        self.exit_depth = min(exit_depth, max(enter_depth - 1, 0))
+        self.tier = TIER_FULL
+        self.since = time.time()
+        self.switches = 0
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=SWITCH_HISTORY)
+        self.requests = {TIER_FULL: 0, TIER_DEGRADED: 0}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.enter_depth > 0
+
+    def _switch(self, tier: str, queue_depth: int) -> None:
+        now = time.time()
+        logger.warning(
+            f"Quality tier {self.tier} -> {tier} at queue depth {queue_depth} "
+            f"(after {now - self.since:.1f}s)"
+        )
+        self.history.append({"at": now, "from": self.tier, "to": tier, "queue_depth": queue_depth})
+        self.tier = tier
+        self.since = now
+        self.switches += 1
+
+    def observe(self, queue_depth: int) -> str:
+        """Update the tier from the current queue depth and return it"""
+        with self._lock:
+            if self.enabled:
+                if self.tier == TIER_FULL and queue_depth >= self.enter_depth:
+                    self._switch(TIER_DEGRADED, queue_depth)
+                elif self.tier == TIER_DEGRADED and queue_depth <= self.exit_depth:
+                    self._switch(TIER_FULL, queue_depth)
+            return self.tier
+
+    def choose(self, queue_depth: int, priority: str, allow_degraded: bool = True) -> str:
+        """
+        Tier for one request
+
+        Only interactive requests are degraded; background requests already
+        tolerate long queues and would only be reparsed again.
+        """
+        tier = self.observe(queue_depth)
+        if not allow_degraded or priority != "interactive":
+            tier = TIER_FULL
+        with self._lock:
+            self.requests[tier] += 1
+        return tier
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "tier": self.tier,
+                "tier_since": self.since,
+                "enter_queue_depth": self.enter_depth,
+                "exit_queue_depth": self.exit_depth,
+                "switches": self.switches,
+                "recent_switches": list(self.history),
+                "requests": dict(self.requests),
+            }
+
+
+class ReparseQueue:
+    """
+    Background full-quality reparses of degraded responses
+
+    Each reparse gets an id the caller can poll; finished results are kept
+    in a bounded LRU. Pending reparses are capped so a long overload cannot
+    pile up unbounded background work.
+    """
+
+    def __init__(self, max_pending: int = LOAD_SHED_MAX_PENDING_REPARSES, capacity: int = LOAD_SHED_RESULT_CAPACITY):
+        self.max_pending = max_pending
+        self.capacity = capacity
+        self._results: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._tasks: Set["asyncio.Task[Any]"] = set()
+        self.enqueued = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, work: Callable[[], Awaitable[Any]]) -> Optional[str]:
+        """
+        Start a reparse
+
+        Args:
+            work: Coroutine function producing the full-quality result
+
+        Returns:
+            Reparse id, or None if too many reparses are already pending
+        """
+        if len(self._tasks) >= self.max_pending:
+            self.rejected += 1
+            return None
+        reparse_id = uuid.uuid4().hex
+        self._store(reparse_id, {"status": "pending"})
+        task = asyncio.ensure_future(self._run(reparse_id, work))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        self.enqueued += 1
+        return reparse_id
+
+    async def _run(self, reparse_id: str, work: Callable[[], Awaitable[Any]]) -> None:
+        try:
+            result = await work()
+        except asyncio.CancelledError:
+            self._store(reparse_id, {"status": "failed", "error": "cancelled"})
+            raise
+        except Exception as e:
+            self.failed += 1
+            detail = getattr(e, "detail", None) or str(e)
+            logger.warning(f"Background reparse {reparse_id} failed: {detail}")
+            self._store(reparse_id, {"status": "failed", "error": detail})
+        else:
+            self.completed += 1
+            self._store(reparse_id, {"status": "done", "result": result})
+
+    def _store(self, reparse_id: str, entry: Dict[str, Any]) -> None:
+        self._results[reparse_id] = entry
+        self._results.move_to_end(reparse_id)
+        while len(self._results) > self.capacity:
+            self._results.popitem(last=False)
+
+    def get(self, reparse_id: str) -> Optional[Dict[str, Any]]:
+        return self._results.get(reparse_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": len(self._tasks),
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
@@ -0,0 +1,343 @@
+"""
+Location Gazetteer Module
+Finds the candidate's location in one linear pass over the contact section
+using a precompiled trie of US states, major US cities and countries, and
+returns it as structured city/state/postal/country fields
+"""
+import os
+import re
+import logging
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+STATES_FILE = os.path.join(DATA_DIR, "us_states.txt")
+CITIES_FILE = os.path.join(DATA_DIR, "us_cities.txt")
+COUNTRIES_FILE = os.path.join(DATA_DIR, "countries.txt")
+
+UNITED_STATES = "United States"
+
+# Labelled location lines are returned as written (up to this length)
+MAX_LABELLED_CHARS = 100
+
+# Only the start of the region is scanned. When a resume has no section
+# headings the whole text is its "header"; places further down are employer
+# and school locations, not the candidate's.
+LOCATION_SCAN_CHARS = int(os.getenv("LOCATION_SCAN_CHARS", "3000"))
+
+# Gazetteer entry kinds
+CITY, STATE, COUNTRY = "city", "state", "country"
+
+# Separators allowed between the parts of "City, ST 12345, Country"
+_GAP_RE = re.compile(r"[ \t]*,?[ \t]*")
+# Up to four words ending the line just before ", ST 12345" or ", Country";
+# the capitalized ones are taken as a city missing from the gazetteer
+_CITY_BEFORE_RE = re.compile(r"((?:[^\W\d_][\w'.-]*[ \t]+){0,3}[^\W\d_][\w'.-]*)[ \t]*,[ \t]*$")
+
+
+class Location(NamedTuple):
+    text: str                       # Location as written in the resume
+    city: Optional[str] = None
+    state: Optional[str] = None     # Two-letter postal code
+    postal: Optional[str] = None
+    country: Optional[str] = None
+
+    def fields(self) -> Dict[str, Optional[str]]:
+        """Structured fields without the source text"""
+        return {"city": self.city, "state": self.state, "postal": self.postal, "country": self.country}
+
+
+class _Hit(NamedTuple):
+    kind: str            # "label", "postal", "place", "code" or "comma"
+    start: int
+    end: int
+    line_start: int      # Offset of the start of the hit's line
+    entries: Dict[str, List[str]]
+
+
+class LocationTrie:
+    """
+    Word-level trie over gazetteer phrases, stored in flat arrays
+
+    Node i's children live in `children[i]` (lowercased word -> node index)
+    and its entries in `entries[i]` (kind -> values). `pattern()` compiles
+    the trie into one prefix-factored regular expression, so a text is
+    matched against every phrase in a single left-to-right scan without the
+    regex engine retrying hundreds of alternatives at each position.
+    """
+
+    def __init__(self):
+        self.children: List[Dict[str, int]] = [{}]
+        self.entries: List[Dict[str, List[str]]] = [{}]
+
+    def add(self, phrase: str, kind: str, value: str) -> None:
+        node = 0
+        for word in _words(phrase):
+            child = self.children[node].get(word)
+            if child is None:
+                child = len(self.children)
+                self.children[node][word] = child
+                self.children.append({})
+                self.entries.append({})
+            node = child
+        self.entries[node].setdefault(kind, []).append(value)
+
+    def lookup(self, phrase: str) -> Dict[str, List[str]]:
+        node = 0
+        for word in _words(phrase):
+            node = self.children[node].get(word, -1)
+            if node < 0:
+                return {}
+        return self.entries[node]
+
+    def pattern(self) -> str:
+        """
+        Regex source matching the longest phrase in the trie
+
+        The words are re-factored character by character, so each position
+        of the text is tested against a handful of first letters rather than
+        every phrase in turn.
+        """
+        phrases: Dict[str, bool] = {}
+        stack = [(0, "")]
+        while stack:
+            node, prefix = stack.pop()
+            if self.entries[node]:
+                phrases[prefix] = True
+            for word, child in self.children[node].items():
+                stack.append((child, f"{prefix} {word}" if prefix else word))
+
+        chars: Dict = {}
+        for phrase in phrases:
+            branch = chars
+            for char in phrase:
+                branch = branch.setdefault(char, {})
+            branch[""] = {}
+        return _char_pattern(chars)
+
+
+def _char_pattern(branch: Dict) -> str:
+    terminal = "" in branch
+    alternatives = []
+    for char in sorted(c for c in branch if c):
+        # A space between words also matches an abbreviation dot ("St. Louis")
+        head = r"\.?[ \t]+" if char == " " else re.escape(char)
+        alternatives.append(head + _char_pattern(branch[char]))
+    if not alternatives:
+        return ""
+    body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+    # Greedy: try the longer phrase first, fall back to the shorter one
+    return f"(?:{body})?" if terminal else body
+
+
+def _words(phrase: str) -> List[str]:
+    return [word.rstrip(".").lower() for word in phrase.split()]
+
+
+def _load_pairs(path: str) -> List[Tuple[str, str]]:
+    with open(path, encoding="utf-8") as f:
+        return [tuple(line.strip().split("|", 1)) for line in f if line.strip() and not line.startswith("#")]
+
+
+def _build() -> Tuple[LocationTrie, Dict[str, Dict[str, List[str]]], "re.Pattern[str]"]:
+    trie = LocationTrie()
+    # Codes ("CA", "UK") only count when written in capitals
+    codes: Dict[str, Dict[str, List[str]]] = {}
+    for code, name in _load_pairs(STATES_FILE):
+        codes.setdefault(code, {}).setdefault(STATE, []).append(code)
+        trie.add(name, STATE, code)
+    for city, state in _load_pairs(CITIES_FILE):
+        trie.add(city, CITY, state)
+    for name, canonical in _load_pairs(COUNTRIES_FILE):
+        if name.isupper():
+            codes.setdefault(name, {}).setdefault(COUNTRY, []).append(canonical)
+        else:
+            trie.add(name, COUNTRY, canonical)
+
+    code_pattern = "|".join(sorted(codes, key=len, reverse=True))
+    # Words that start no gazetteer phrase are consumed whole by the final
+    # \w+ so the engine does not retry the alternatives inside them. Place
+    # names must start with a capital letter (or be in capitals).
+    scanner = re.compile(
+        r"(?P<label>^[ \t]*(?:(?:address|location|city|residence)[ \t]*:|(?:lives|based)[ \t]+in\b[ \t]*:?))"
+        r"|(?P<comma>,)"
+        r"|(?P<newline>\n)"
+        r"|(?<!\w)(?:"
+        r"(?P<postal>\d{5}(?:-\d{4})?\b)"
+        r"|(?-i:(?=[A-Z]))"
+        rf"(?:(?P<place>{trie.pattern()}\b)|(?P<code>(?-i:{code_pattern})\b))"
+        r"|\w+)",
+        re.IGNORECASE | re.MULTILINE,
+    )
+    return trie, codes, scanner
+
+
+TRIE, CODES, _SCANNER = _build()
+
+
+def _scan(text: str) -> List[_Hit]:
+    """Every label, ZIP code, gazetteer phrase, code and comma, in one pass"""
+    hits = []
+    line_start = 0
+    for match in _SCANNER.finditer(text):
+        kind = match.lastgroup
+        if kind is None:
+            continue
+        if kind == "newline":
+            line_start = match.end()
+            continue
+        entries = {}
+        if kind == "place":
+            entries = TRIE.lookup(match.group())
+        elif kind == "code":
+            entries = CODES[match.group()]
+        hits.append(_Hit(kind, match.start(), match.end(), line_start, entries))
+    return hits
+
+
+def _adjacent(text: str, first: _Hit, second: _Hit) -> bool:
+    """True if only spaces and at most one comma separate the hits on one line"""
+    return first.line_start == second.line_start and _GAP_RE.fullmatch(text, first.end, second.start) is not None
+
+
+def _city_before(text: str, hit: _Hit, prose_check: bool) -> Optional[Tuple[int, str]]:
+    """
+    (start, name) of an unlisted city written just before ", <hit>"
+
+    With `prose_check` the city must begin its line or follow punctuation,
+    so "Experience in Python, India" is not read as a place.
+    """
+    match = _CITY_BEFORE_RE.search(text, hit.line_start, hit.start)
+    if match is None:
+        return None
+    words = list(re.finditer(r"\S+", match.group(1)))
+    first = len(words)
+    while first > 0 and words[first - 1].group()[0].isupper():
+        first -= 1
+    if first == len(words):
+        return None
+    start = match.start(1) + words[first].start()
+    if prose_check and (first > 0 or text[hit.line_start:start].rstrip()[-1:].isalnum()):
+        return None
+    return start, text[start:match.end(1)]
+
+
+def _anchor(text: str, hits: List[_Hit], index: int) -> Optional[Location]:
+    """Build an anchored Location around the state or country at hits[index]"""
+    hit = hits[index]
+    before = index - 2 if index > 1 and hits[index - 1].kind == "comma" else index - 1
+    previous = hits[before] if before >= 0 else None
+    following = [h for h in hits[index + 1:index + 5] if h.kind != "comma"]
+
+    if STATE in hit.entries:
+        state = hit.entries[STATE][0]
+        last = hit
+        postal = None
+        if following and following[0].kind == "postal" and _adjacent(text, hit, following[0]):
+            last = following.pop(0)
+            postal = text[last.start:last.end]
+        if following and COUNTRY in following[0].entries and _adjacent(text, last, following[0]):
+            if following[0].entries[COUNTRY][0] != UNITED_STATES:
+                return None
+            last = following[0]
+
+        city = None
+        if previous is not None and state in previous.entries.get(CITY, ()) and _adjacent(text, previous, hit):
+            city = (previous.start, text[previous.start:previous.end])
+        elif postal is not None:
+            city = _city_before(text, hit, prose_check=False)
+        if city is None and postal is None:
+            # A bare state ("Python, CA") is not a location
+            return None
+        start = city[0] if city else hit.start
+        return Location(text[start:last.end], city[1] if city else None, state, postal, UNITED_STATES)
+
+    if COUNTRY in hit.entries:
+        country = hit.entries[COUNTRY][0]
+        if previous is not None and CITY in previous.entries and _adjacent(text, previous, hit):
+            if country != UNITED_STATES:
+                return None
+            states = previous.entries[CITY]
+            return Location(
+                text[previous.start:hit.end],
+                text[previous.start:previous.end],
+                states[0] if len(states) == 1 else None,
+                None,
+                country,
+            )
+        city = _city_before(text, hit, prose_check=True)
+        if city is None:
+            return None
+        return Location(text[city[0]:hit.end], city[1], None, None, country)
+    return None
+
+
+def _labelled_line(text: str, hits: List[_Hit]) -> Optional[Tuple[int, str]]:
+    """(line start, text after the label) of the first non-empty labelled line"""
+    for hit in hits:
+        if hit.kind != "label":
+            continue
+        newline = text.find("\n", hit.end)
+        value = text[hit.end:newline if newline >= 0 else len(text)].strip()
+        if value and len(value) < MAX_LABELLED_CHARS:
+            return hit.line_start, value
+    return None
+
+
+def _loose(text: str, hits: List[_Hit], labelled: Tuple[int, str]) -> Location:
+    """Fields from whatever gazetteer entries appear on a labelled line"""
+    line_start, written = labelled
+    city = state = postal = country = None
+    for hit in hits:
+        if hit.line_start != line_start:
+            continue
+        if CITY in hit.entries and city is None:
+            city = text[hit.start:hit.end]
+            if len(hit.entries[CITY]) == 1:
+                state = state or hit.entries[CITY][0]
+        elif STATE in hit.entries:
+            state = hit.entries[STATE][0]
+        elif COUNTRY in hit.entries:
+            country = hit.entries[COUNTRY][0]
+        elif hit.kind == "postal" and postal is None:
+            postal = text[hit.start:hit.end]
+    if state is not None and country is None:
+        country = UNITED_STATES
+    return Location(written, city, state, postal, country)
+
+
+def extract_location(text: str) -> Optional[Location]:
+    """
+    Find the candidate's location
+
+    The text is scanned once for gazetteer phrases, state and country codes,
+    ZIP codes and location labels. A place is accepted when it is anchored:
+    a listed city next to its state, a state followed by a ZIP code, a city
+    followed by a country, or anything on a line labelled "Location:",
+    "Address:", "Based in" etc. A bare state code after an unrelated word
+    ("Python, CA") is not.
+
+    Args:
+        text: Contact section (or full text) of the resume
+
+    Returns:
+        Location, or None if no anchored location was found
+    """
+    if not text:
+        return None
+    text = text[:LOCATION_SCAN_CHARS]
+    hits = _scan(text)
+    labelled = _labelled_line(text, hits)
+
+    for index, hit in enumerate(hits):
+        if labelled is not None and hit.line_start != labelled[0]:
+            continue
+        location = _anchor(text, hits, index)
+        if location is not None:
+            return location if labelled is None else location._replace(text=labelled[1])
+
+    if labelled is not None:
+        # Labelled lines are trusted even when nothing on them is anchored
+        return _loose(text, hits, labelled)
+    return None
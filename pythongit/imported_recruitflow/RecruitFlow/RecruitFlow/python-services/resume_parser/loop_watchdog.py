@@ -0,0 +1,316 @@
+"""
+Event-Loop Watchdog Module
+Measures event-loop lag continuously and reports what blocked the loop.
+
+A sampler coroutine sleeps for a fixed interval and records how late it
+wakes up. A watchdog thread watches the sampler's heartbeat: when the loop
+has been stuck for LOOP_SLOW_CALLBACK_MS it logs the loop thread's stack
+and the request whose task is running, while the loop is still blocked.
+Lag percentiles feed /health, which reports the instance unhealthy while
+the p99 lag over the recent window is above LOOP_LAG_UNHEALTHY_MS.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+import weakref
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sampling interval (0 disables the watchdog)
+LOOP_LAG_INTERVAL_MS = float(os.getenv("LOOP_LAG_INTERVAL_MS", "100"))
+
+# Loop stalls at least this long are logged with the blocking stack and request
+LOOP_SLOW_CALLBACK_MS = float(os.getenv("LOOP_SLOW_CALLBACK_MS", "250"))
+
+# /health reports unhealthy while p99 lag over the window is above this (0: never)
+LOOP_LAG_UNHEALTHY_MS = float(os.getenv("LOOP_LAG_UNHEALTHY_MS", "1000"))
+
+# Seconds of samples the percentiles cover
+LOOP_LAG_WINDOW_S = float(os.getenv("LOOP_LAG_WINDOW_S", "60"))
+
+# Slow-callback reports kept for /metrics, and stack frames per report
+MAX_SLOW_CALLBACKS = 20
+STACK_FRAMES = 12
+
+# Longest request label kept (method and path)
+MAX_LABEL_CHARS = 200
+
+# Frames of the event loop machinery, left out of stall stacks
+_ASYNCIO_DIR = os.path.dirname(asyncio.__file__)
+
+_request: ContextVar[Optional[str]] = ContextVar("loop_watchdog_request", default=None)
+
+
+def request_label(scope: Dict[str, Any]) -> str:
+    """
+    'GET /parse' for an ASGI HTTP scope
+
+    The query string is left out: file_path is often a pre-signed URL whose
+    signature must not end up in logs or /metrics.
+    """
+    return f"{scope.get('method', '')} {scope.get('path', '')}"[:MAX_LABEL_CHARS]
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LoopWatchdog:
+    """Event-loop lag sampler, stall detector and slow-callback log"""
+
+    def __init__(
+        self,
+        interval_ms: float = LOOP_LAG_INTERVAL_MS,
+        slow_callback_ms: float = LOOP_SLOW_CALLBACK_MS,
+        unhealthy_ms: float = LOOP_LAG_UNHEALTHY_MS,
+        window_s: float = LOOP_LAG_WINDOW_S,
+    ):
+        self.interval_ms = interval_ms
+        self.slow_callback_ms = slow_callback_ms
+        self.unhealthy_ms = unhealthy_ms
+        self.window_s = window_s
+        # (monotonic time, lag ms); bounded in case samples arrive faster than expected
+        capacity = int(window_s * 1000 / interval_ms) * 4 if interval_ms > 0 else 1
+        self._samples: Deque[Tuple[float, float]] = deque(maxlen=max(capacity, 100))
+        self._slow: Deque[Dict[str, Any]] = deque(maxlen=MAX_SLOW_CALLBACKS)
+        self._labels: "weakref.WeakKeyDictionary[asyncio.Task, str]" = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.stalls = 0
+        self.total_stall_ms = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._previous_factory: Optional[Callable[..., Any]] = None
+        self._sampler: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        # When the sampler went to sleep, and the stall report for that sleep
+        self._beat: Optional[float] = None
+        self._stall: Optional[Dict[str, Any]] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval_ms > 0
+
+    @property
+    def running(self) -> bool:
+        return self._sampler is not None
+
+    def start(self) -> None:
+        """Start sampling the running loop (call from a coroutine, e.g. the app lifespan)"""
+        if not self.enabled or self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        # Tasks created while serving a request inherit its label
+        self._previous_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self._task_factory)
+        self._stop.clear()
+        self._beat = time.monotonic()
+        self._sampler = self._loop.create_task(self._sample())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._sampler.cancel()
+        try:
+            await self._sampler
+        except asyncio.CancelledError:
+            pass
+        self._sampler = None
+        if self._loop.get_task_factory() == self._task_factory:
+            self._loop.set_task_factory(self._previous_factory)
+        self._thread.join(timeout=1)
+
+    def tag(self, task: Optional[asyncio.Task], label: str) -> None:
+        """Attribute `task` to a request in stall reports"""
+        if task is not None:
+            self._labels[task] = label
+
+    def _task_factory(self, loop: asyncio.AbstractEventLoop, coro: Any, **kwargs: Any) -> asyncio.Task:
+        if self._previous_factory is not None:
+            task = self._previous_factory(loop, coro, **kwargs)
+        else:
+            task = asyncio.Task(coro, loop=loop, **kwargs)
+        label = _request.get()
+        if label is not None:
+            self._labels[task] = label
+        return task
+
+    async def _sample(self) -> None:
+        interval = self.interval_ms / 1000
+        while True:
+            self._beat = time.monotonic()
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            # Awake: nothing for the watchdog thread to catch until the next sleep.
+            # Taken under the lock, so a capture either lands before this or not at all
+            with self._lock:
+                beat, self._beat = self._beat, None
+                stall, self._stall = self._stall, None
+            lag_ms = max(0.0, (now - beat - interval) * 1000)
+            self.record_lag(lag_ms, now)
+            if stall is not None:
+                stall["lag_ms"] = round(lag_ms, 1)
+                with self._lock:
+                    self.total_stall_ms += lag_ms
+                logger.warning(f"Event loop unblocked after {lag_ms:.0f} ms ({stall['request'] or 'no request'})")
+            elif self.slow_callback_ms > 0 and lag_ms >= self.slow_callback_ms:
+                # Blocked in code holding the GIL: the watchdog thread never got to look
+                self._report({"request": None, "task": None, "stack": [], "lag_ms": round(lag_ms, 1)})
+                with self._lock:
+                    self.total_stall_ms += lag_ms
+                logger.warning(f"Event loop blocked for {lag_ms:.0f} ms (stack not captured)")
+
+    def _watch(self) -> None:
+        interval = self.interval_ms / 1000
+        poll = min(interval, self.slow_callback_ms / 2000) if self.slow_callback_ms > 0 else interval
+        while not self._stop.wait(poll):
+            beat = self._beat
+            if beat is None or self.slow_callback_ms <= 0 or self._stall is not None:
+                continue
+            overdue_ms = (time.monotonic() - beat - interval) * 1000
+            if overdue_ms >= self.slow_callback_ms:
+                self._capture(beat, overdue_ms)
+
+    def _capture(self, beat: float, overdue_ms: float) -> None:
+        """Record what the loop thread is running right now"""
+        task = asyncio.current_task(self._loop)
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = []
+        if frame is not None:
+            frames = [entry for entry in traceback.extract_stack(frame) if not entry.filename.startswith(_ASYNCIO_DIR)]
+            stack = traceback.format_list(frames[-STACK_FRAMES:])
+        stall = {
+            "request": self._labels.get(task) if task is not None else None,
+            "task": task.get_name() if task is not None else None,
+            "stack": [line.rstrip() for line in stack],
+            "lag_ms": None,
+        }
+        if not self._report(stall, beat):
+            return  # the loop woke up meanwhile
+        logger.warning(
+            f"Event loop blocked for {overdue_ms:.0f} ms by {stall['request'] or 'no request'} "
+            f"(task {stall['task']}):\n" + "\n".join(stall["stack"])
+        )
+
+    def _report(self, stall: Dict[str, Any], beat: Optional[float] = None) -> bool:
+        """
+        Log a stall; with `beat`, only if the sampler is still asleep since then
+
+        The stall found mid-sleep is handed to the sampler under the same lock
+        it wakes up under, so it is completed exactly once or not recorded.
+        """
+        stall["at"] = time.time()
+        with self._lock:
+            if beat is not None:
+                if self._beat != beat:
+                    return False
+                self._stall = stall
+            self.stalls += 1
+            self._slow.append(stall)
+        return True
+
+    def record_lag(self, lag_ms: float, now: Optional[float] = None) -> None:
+        """
+        Add one sample, plus the ticks a long stall swallowed
+
+        A sampler that wakes 1000 ms late at a 100 ms interval missed nine
+        ticks that would have seen 900, 800, ... 100 ms; they are added so
+        percentiles reflect how long the loop was unresponsive, not how
+        many times it was sampled.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._samples.append((now, lag_ms))
+            missed = lag_ms - self.interval_ms
+            while missed > 0:
+                self._samples.append((now, missed))
+                missed -= self.interval_ms
+
+    def _window(self) -> List[float]:
+        cutoff = time.monotonic() - self.window_s
+        with self._lock:
+            while self._samples and self._samples[0][0] < cutoff:
+                self._samples.popleft()
+            return sorted(lag for _, lag in self._samples)
+
+    def lag(self) -> Optional[Dict[str, float]]:
+        """p50/p95/p99/max lag in ms over the window (None before the first sample)"""
+        ordered = self._window()
+        if not ordered:
+            return None
+        return {
+            "p50": round(percentile(ordered, 0.50), 1),
+            "p95": round(percentile(ordered, 0.95), 1),
+            "p99": round(percentile(ordered, 0.99), 1),
+            "max": round(ordered[-1], 1),
+        }
+
+    def healthy(self, lag: Optional[Dict[str, float]] = None) -> bool:
+        """False while p99 lag is above the unhealthy threshold"""
+        if self.unhealthy_ms <= 0:
+            return True
+        lag = self.lag() if lag is None else lag
+        return lag is None or lag["p99"] <= self.unhealthy_ms
+
+    def summary(self) -> Dict[str, Any]:
+        """Lag percentiles and health, for /health"""
+        lag = self.lag()
+        return {
+            "healthy": self.healthy(lag),
+            "lag_ms": lag,
+            "unhealthy_ms": self.unhealthy_ms,
+            "window_s": self.window_s,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """summary() plus stall counts and the recent slow-callback reports, for /metrics"""
+        with self._lock:
+            slow = [dict(stall) for stall in self._slow]
+            stalls, total = self.stalls, self.total_stall_ms
+        return dict(
+            self.summary(),
+            running=self.running,
+            interval_ms=self.interval_ms,
+            slow_callback_ms=self.slow_callback_ms,
+            stalls=stalls,
+            stall_ms_total=round(total, 1),
+            slow_callbacks=slow,
+        )
+
+
+class RequestTagMiddleware:
+    """
+    ASGI middleware labelling each HTTP request's task for stall reports
+
+    Plain ASGI rather than BaseHTTPMiddleware, so the endpoint runs in the
+    tagged task; tasks it creates are labelled through the task factory.
+    """
+
+    def __init__(self, app: Any, watchdog: LoopWatchdog):
+        self.app = app
+        self.watchdog = watchdog
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http" or not self.watchdog.running:
+            await self.app(scope, receive, send)
+            return
+        label = request_label(scope)
+        self.watchdog.tag(asyncio.current_task(), label)
+        token = _request.set(label)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request.reset(token)
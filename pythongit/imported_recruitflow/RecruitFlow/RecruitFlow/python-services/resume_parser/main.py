@@ -3,21 +3,78 @@ FastAPI Resume Parsing Service
 Main application file that handles resume parsing requests
 """
 import os
+import json
+import time
+import functools
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 from pathlib import Path
 import httpx
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 
 try:
-    from text_extractor import extract_text_from_pdf, extract_text_from_docx
     from contact_mapper import extract_contact_info
+    from models import ParsedResume
+    from pipeline import (
+        SUPPORTED_EXTENSIONS, build_parse_response, build_parsed_resume, extract_scored_text, extract_text,
+        page_stats, store_parse, text_quality
+    )
+    from escalation import (
+        AFFINDA_MODE, EscalationStats, effective_confidence, low_confidence_fields, merge_contact_info
+    )
+    from affinda_mapping import map_affinda_response
+    from scheduler import AdmissionScheduler, AdmissionTicket, PRIORITY_CLASSES, DEFAULT_PRIORITY, QueueTimeout
+    from cancellation import (
+        CancelToken, ParseCancelled, REASON_DEADLINE, REASON_DISCONNECT, await_cancellable, cancel_stats,
+        watch_for_disconnect
+    )
+    from memory_governor import MEMORY_DEBUG_ENABLED, MemoryBudgetExceeded, MemoryGovernor, tracemalloc_snapshot
+    from profiling import ProfileSession, ProfilingController, activate, profiled_call, stage
+    from recorder import TrafficRecorder, note_affinda, note_document, record_into
+    from triage import PIPELINE_OCR, PIPELINE_TEXT, DocumentTriage, TriageRejected, TriageStats, triage_document
+    from single_flight import SingleFlight, content_key, path_key
+    from load_shedding import (
+        LOAD_SHED_FAST_CONCURRENCY, LOAD_SHED_REPARSE, TIER_DEGRADED, TIER_FULL, LoadShedder, ReparseQueue
+    )
+    from loop_watchdog import LoopWatchdog, RequestTagMiddleware
 except ImportError:
     # Fallback for different import contexts
-    from resume_parser.text_extractor import extract_text_from_pdf, extract_text_from_docx
     from resume_parser.contact_mapper import extract_contact_info
+    from resume_parser.models import ParsedResume
+    from resume_parser.pipeline import (
+        SUPPORTED_EXTENSIONS, build_parse_response, build_parsed_resume, extract_scored_text, extract_text,
+        page_stats, store_parse, text_quality
+    )
+    from resume_parser.escalation import (
+        AFFINDA_MODE, EscalationStats, effective_confidence, low_confidence_fields, merge_contact_info
+    )
+    from resume_parser.affinda_mapping import map_affinda_response
+    from resume_parser.scheduler import (
+        AdmissionScheduler, AdmissionTicket, PRIORITY_CLASSES, DEFAULT_PRIORITY, QueueTimeout
+    )
+    from resume_parser.cancellation import (
+        CancelToken, ParseCancelled, REASON_DEADLINE, REASON_DISCONNECT, await_cancellable, cancel_stats,
+        watch_for_disconnect
+    )
+    from resume_parser.memory_governor import (
+        MEMORY_DEBUG_ENABLED, MemoryBudgetExceeded, MemoryGovernor, tracemalloc_snapshot
+    )
+    from resume_parser.profiling import ProfileSession, ProfilingController, activate, profiled_call, stage
+    from resume_parser.recorder import TrafficRecorder, note_affinda, note_document, record_into
+    from resume_parser.triage import (
+        PIPELINE_OCR, PIPELINE_TEXT, DocumentTriage, TriageRejected, TriageStats, triage_document
+    )
+    from resume_parser.single_flight import SingleFlight, content_key, path_key
+    from resume_parser.load_shedding import (
+        LOAD_SHED_FAST_CONCURRENCY, LOAD_SHED_REPARSE, TIER_DEGRADED, TIER_FULL, LoadShedder, ReparseQueue
+    )
+    from resume_parser.loop_watchdog import LoopWatchdog, RequestTagMiddleware
     # Affinda client (optional third-party resume parser)
     from resume_parser.affinda_client import parse_with_affinda
 else:
@@ -28,8 +85,21 @@ else:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Event-loop lag sampling and slow-callback reports (LOOP_LAG_INTERVAL_MS=0 disables)
+loop_watchdog = LoopWatchdog()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_watchdog.start()
+    try:
+        yield
+    finally:
+        await loop_watchdog.stop()
+
+
 # Create FastAPI app
-app = FastAPI(title="Resume Parser Service", version="1.0.0")
+app = FastAPI(title="Resume Parser Service", version="1.0.0", lifespan=lifespan)
 
 # Configure CORS to allow requests from the Node.js backend
 app.add_middleware(
@@ -40,6 +110,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Label each request's task so loop stalls name the request that caused them
+app.add_middleware(RequestTagMiddleware, watchdog=loop_watchdog)
+
+# Admission control in front of the extraction stages
+scheduler = AdmissionScheduler()
+
+# Worker RSS tracking and recycling
+governor = MemoryGovernor()
+
+# Concurrent requests for the same document share one parse
+single_flight = SingleFlight()
+
+# Quality tiers under overload: degraded parses get their own small lane,
+# and full-quality reparses of them run at background priority
+load_shedder = LoadShedder()
+fast_scheduler = AdmissionScheduler(max_concurrent=LOAD_SHED_FAST_CONCURRENCY)
+reparses = ReparseQueue()
+
+# Share of parses escalated to Affinda and the Affinda time saved
+escalation_stats = EscalationStats()
+
+# Pipelines chosen by triage and documents rejected before parsing
+triage_stats = TriageStats()
+
+# Token-gated request profiling (disabled unless PROFILING_TOKEN is set)
+profiler = ProfilingController()
+
+PROFILE_MODES = ("return", "save")
+
+# Opt-in capture of /parse traffic for replay.py (disabled unless RECORD_DIR is set)
+recorder = TrafficRecorder()
+
 
 async def download_file_from_storage(file_path: str) -> bytes:
     """Download file from object storage if it's a URL"""
@@ -82,151 +184,421 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+    """
+    Health check endpoint for monitoring
+
+    503 while the event loop's p99 lag is above LOOP_LAG_UNHEALTHY_MS, so
+    probes take a replica whose loop keeps stalling out of rotation.
+    """
+    event_loop = loop_watchdog.summary()
+    if not event_loop["healthy"]:
+        return JSONResponse(
+            status_code=503,
+            content={"status": "unhealthy", "service": "resume-parser", "event_loop": event_loop},
+        )
+    return {"status": "healthy", "service": "resume-parser", "event_loop": event_loop}
+
+
+async def call_affinda(file_path: str, file_content: bytes, api_key: str) -> Tuple[Any, str]:
+    """
+    Parse a resume with Affinda
+
+    Args:
+        file_path: Original path or URL (its basename is sent as the filename)
+        file_content: Raw file bytes
+        api_key: Affinda API key
+
+    Returns:
+        (raw Affinda response, its text transcript or a JSON dump of the
+        response when it has none)
+    """
+    # filename may be needed by Affinda (use basename of path)
+    filename = Path(file_path).name or "resume"
+    try:
+        with stage("affinda"):
+            affinda_response, affinda_text = await parse_with_affinda(file_content, filename=filename, api_key=api_key)
+    except asyncio.CancelledError:
+        cancel_stats.record_affinda()
+        raise
+    except Exception as e:
+        note_affinda(error=str(e))
+        raise
+    if not affinda_text:
+        # fallback: try to serialize returned JSON summary into text
+        try:
+            affinda_text = json.dumps(affinda_response)
+        except Exception:
+            affinda_text = ""
+    note_affinda(affinda_response, affinda_text)
+    return affinda_response, affinda_text
+
+
+async def triage_upload(file_content: bytes, file_extension: str) -> DocumentTriage:
+    """
+    Triage a downloaded document before it queues for extraction
+
+    Raises:
+        TriageRejected: The document cannot be parsed (not a real PDF/DOCX,
+            password-protected, over the page limits)
+    """
+    with stage("triage"):
+        triage = triage_stats.record(await run_in_threadpool(triage_document, file_content, file_extension))
+    if triage.rejected:
+        raise TriageRejected(triage)
+    return triage
+
+
+async def run_extraction(
+    file_path: str,
+    file_extension: str,
+    file_content: bytes,
+    cancel_token: Optional[CancelToken] = None,
+    progress: Optional[Callable[[str, Any], None]] = None,
+    triage: Optional[DocumentTriage] = None,
+) -> ParsedResume:
+    """
+    Run the extraction stages (local text extraction, contact mapping, and
+    Affinda when local confidence is too low)
+
+    Blocking extraction work runs in the threadpool so the event loop stays
+    responsive while admitted parses execute.
+
+    Args:
+        file_path: Original path or URL of the resume
+        file_extension: Lowercased file extension
+        file_content: Raw file bytes
+        cancel_token: Checked between stages and pages
+        progress: Called (possibly from a worker thread) with ("block",
+            TextBlock) for each extracted block and ("contact_info", fields)
+            once local fields are extracted
+        triage: Triage of the document (run here when not given)
+
+    Returns:
+        Parse result; to_response() gives the flat /parse payload
+    """
+    note_document(file_content, file_extension)
+    if triage is None:
+        triage = await triage_upload(file_content, file_extension)
+    extract = extract_scored_text
+    if progress is not None:
+        extract = functools.partial(extract_scored_text, on_block=lambda block: progress("block", block))
+    if triage.pipeline != PIPELINE_TEXT:
+        # Scanned pages go straight to OCR instead of a pdfplumber pass first
+        extract = functools.partial(extract, plan=triage)
+
+    # Affinda is used when `AFFINDA_API_KEY` is set (and optionally
+    # `AFFINDA_API_URL`): only for low-confidence parses by default, or for
+    # every parse with AFFINDA_MODE=always.
+    affinda_key = os.getenv("AFFINDA_API_KEY")
+
+    extracted_text = ""
+    affinda_response = None
+    if affinda_key and AFFINDA_MODE == "always":
+        try:
+            affinda_response, extracted_text = await call_affinda(file_path, file_content, affinda_key)
+        except Exception as e:
+            logger.warning(f"Affinda parsing failed, falling back to local extraction: {e}")
+
+    # Local extraction first (or as the fallback when Affinda gave no text)
+    quality = 1.0
+    if not extracted_text:
+        if cancel_token is not None:
+            cancel_token.checkpoint()
+        try:
+            with stage("extract_text"):
+                extracted_text, quality = await run_in_threadpool(
+                    profiled_call, extract, file_content, file_extension, cancel_token
+                )
+        except (ParseCancelled, MemoryBudgetExceeded):
+            raise
+        except Exception as e:
+            if not affinda_key or affinda_response is not None:
+                raise
+            # Affinda may still read what the local extractors cannot
+            logger.warning(f"Local text extraction failed, escalating to Affinda: {e}")
+            extracted_text = ""
+    
+    logger.info(f"Extracted text length: {len(extracted_text) if extracted_text else 0}")
+    logger.info(f"First 500 chars: {extracted_text[:500] if extracted_text else 'NO TEXT'}")
+    
+    # Extract contact information
+    # If Affinda returned structured fields, prefer them. Otherwise run local contact extraction.
+    contact_info = {}
+    if affinda_response and isinstance(affinda_response, dict):
+        # Resolve all fields from one flattened pass over the response
+        contact_info = map_affinda_response(affinda_response)
+
+    # If Affinda didn't provide structured info, use the local extractor on extracted_text
+    local_fields = bool(extracted_text) and not any(contact_info.values())
+    if local_fields:
+        if cancel_token is not None:
+            cancel_token.checkpoint()
+        logger.info("Running local contact extraction...")
+        with stage("contact_info"):
+            contact_info = await run_in_threadpool(profiled_call, extract_contact_info, extracted_text)
+        contact_info["field_confidence"] = effective_confidence(contact_info, quality)
+        logger.info(f"Local extraction results: {contact_info}")
+        if progress is not None:
+            progress("contact_info", contact_info)
+
+    if affinda_response is None and affinda_key and AFFINDA_MODE != "always":
+        # Escalate to Affinda only when there is no text or a required
+        # field is unreliable, and then only take over the weak fields
+        low_fields = low_confidence_fields(contact_info["field_confidence"]) if local_fields else []
+        if local_fields and not low_fields:
+            escalation_stats.record_local(affinda_available=True)
+        else:
+            if cancel_token is not None:
+                cancel_token.checkpoint()
+            logger.info(f"Escalating to Affinda (low confidence: {', '.join(low_fields) or 'no text'})")
+            start = time.perf_counter()
+            try:
+                affinda_response, affinda_text = await call_affinda(file_path, file_content, affinda_key)
+            except Exception as e:
+                escalation_stats.record_escalation(low_fields, (time.perf_counter() - start) * 1000, failed=True)
+                logger.warning(f"Affinda escalation failed, keeping local fields: {e}")
+            else:
+                escalation_stats.record_escalation(low_fields, (time.perf_counter() - start) * 1000)
+                affinda_fields = (
+                    map_affinda_response(affinda_response) if isinstance(affinda_response, dict) else {}
+                )
+                if local_fields:
+                    contact_info = merge_contact_info(contact_info, affinda_fields, contact_info["field_confidence"])
+                    local_fields = not contact_info["affinda_fields"]
+                elif affinda_text:
+                    extracted_text = affinda_text
+                    contact_info = affinda_fields
+                    if not any(contact_info.values()):
+                        contact_info = await run_in_threadpool(profiled_call, extract_contact_info, extracted_text)
+    elif local_fields and not affinda_key:
+        escalation_stats.record_local(affinda_available=False)
+
+    if not extracted_text:
+        raise HTTPException(
+            status_code=422,
+            detail="Failed to extract text from the file. The file might be corrupted or empty."
+        )
+    
+    resume = build_parsed_resume(file_path, file_extension, extracted_text, contact_info)
+    if local_fields:
+        # Keep the text so the fields can be re-extracted when the skills
+        # taxonomy changes (no-op unless TEXT_STORE_DIR is set)
+        await run_in_threadpool(store_parse, resume)
+    return resume
+
+
+async def run_fast_extraction(
+    file_path: str,
+    file_extension: str,
+    file_content: bytes,
+    cancel_token: Optional[CancelToken] = None,
+    triage: Optional[DocumentTriage] = None,
+) -> ParsedResume:
+    """
+    Degraded extraction used under overload
+
+    Reads the PDF text layer (or DOCX text) only, with no Affinda call or
+    OCR, and extracts contact fields without skills. Scanned documents
+    come back with empty text and fields.
+
+    Args:
+        file_path: Original path or URL of the resume
+        file_extension: Lowercased file extension
+        file_content: Raw file bytes
+        cancel_token: Checked between pages
+        triage: Triage of the document (run here when not given)
+
+    Returns:
+        Parse result marked degraded
+    """
+    note_document(file_content, file_extension)
+    if triage is None:
+        triage = await triage_upload(file_content, file_extension)
+    extracted_text = ""
+    if triage.pipeline != PIPELINE_OCR:
+        with stage("extract_text"):
+            extracted_text = await run_in_threadpool(
+                profiled_call, extract_text, file_content, file_extension, cancel_token, False
+            )
+    contact_info = {}
+    if extracted_text:
+        with stage("contact_info"):
+            contact_info = await run_in_threadpool(profiled_call, extract_contact_info, extracted_text, False)
+    return build_parsed_resume(file_path, file_extension, extracted_text, contact_info, degraded=True)
 
 
 @app.get("/parse")
 async def parse_resume(
-    file_path: str = Query(..., description="Path to the resume file (local or URL)")
+    request: Request,
+    file_path: str = Query(..., description="Path to the resume file (local or URL)"),
+    priority: str = Query(DEFAULT_PRIORITY, description="Priority class: interactive or background"),
+    caller: Optional[str] = Query(None, description="Caller identity used for fair sharing"),
+    deadline_ms: Optional[int] = Query(None, gt=0, description="Time budget for the whole parse in milliseconds"),
+    x_parse_deadline_ms: Optional[int] = Header(None, gt=0),
+    profile: Optional[str] = Query(None, description="Profile this parse: return (in the response) or save (to disk)"),
+    x_profile_token: Optional[str] = Header(None),
+    allow_degraded: bool = Query(True, description="Allow the degraded fast path under overload"),
+    reparse: bool = Query(LOAD_SHED_REPARSE, description="Queue a full reparse when the response is degraded"),
 ) -> Dict[str, Any]:
     """
     Parse a resume from a file path or URL
     
     Args:
         file_path: Path to the resume file (can be local path or URL)
+        priority: Scheduling class; interactive requests run before background ones
+        caller: Identity for fair sharing within a class (defaults to client address)
+        deadline_ms: Time budget for the parse (or the X-Parse-Deadline-Ms header);
+            work is abandoned once it passes or the client disconnects
+        profile: Capture a CPU profile, stage flame graph and allocation
+            statistics; requires the X-Profile-Token header
+        allow_degraded: When false, always run the full pipeline even under
+            overload
+        reparse: For degraded responses, queue a full-quality reparse whose
+            result can be fetched from /parse/reparse/{reparse_id}
         
     Returns:
         Structured JSON with extracted resume information
     """
-    try:
-        logger.info(f"Starting resume parse for: {file_path}")
-        
-        # Determine file extension
-        file_extension = Path(file_path).suffix.lower()
-        
-        if file_extension not in ['.pdf', '.docx', '.doc']:
+    if profile is not None:
+        if profile not in PROFILE_MODES:
             raise HTTPException(
                 status_code=400,
-                detail=f"Unsupported file format: {file_extension}. Supported formats: .pdf, .docx"
+                detail=f"Unknown profile mode: {profile}. Supported modes: {', '.join(PROFILE_MODES)}"
             )
-        
-        # Download or read the file
-        file_content = await download_file_from_storage(file_path)
+        if not profiler.authorized(x_profile_token):
+            raise HTTPException(status_code=403, detail="Profiling not permitted")
+    profiling = profile is not None or (profiler.enabled and profiler.window_active)
+    recording = recorder.begin(file_path, {
+        "priority": priority,
+        "deadline_ms": deadline_ms or x_parse_deadline_ms,
+        "allow_degraded": allow_degraded,
+        "reparse": reparse,
+        "affinda_available": bool(os.getenv("AFFINDA_API_KEY")),
+        "affinda_mode": AFFINDA_MODE,
+    })
+    if not profiling and recording is None:
+        return await _parse(
+            request, file_path, priority, caller, deadline_ms or x_parse_deadline_ms, allow_degraded, reparse
+        )
 
-        # If an Affinda API key is configured, prefer using Affinda for parsing.
-        # Set `AFFINDA_API_KEY` in the environment (and optionally `AFFINDA_API_URL`).
-        affinda_key = os.getenv("AFFINDA_API_KEY")
+    # Recording alone only needs the stage timings, not CPU or allocation profiles
+    session = ProfileSession(label=file_path, capture_allocations=profiling, capture_cpu=profiling)
+    saved = None
+    try:
+        with activate(session), record_into(recording), stage("parse"):
+            response = await _parse(
+                request, file_path, priority, caller, deadline_ms or x_parse_deadline_ms, allow_degraded, reparse
+            )
+    except HTTPException as e:
+        if recording is not None:
+            await run_in_threadpool(
+                recorder.finish, recording, session.stages, session.wall_ms,
+                status_code=e.status_code, error=str(e.detail),
+            )
+        raise
+    finally:
+        # Window-mode profiles are kept even when the parse fails
+        if profiling and profile != "return":
+            saved = await run_in_threadpool(session.save, profiler.output_dir)
+            logger.info(f"Saved profile of {file_path} to {saved['report']}")
 
-        extracted_text = ""
-        affinda_response = None
-        if affinda_key:
-            try:
-                # filename may be needed by Affinda (use basename of path)
-                filename = Path(file_path).name or "resume"
-                affinda_response, affinda_text = await parse_with_affinda(file_content, filename=filename, api_key=affinda_key)
-                if affinda_text:
-                    extracted_text = affinda_text
-                else:
-                    # fallback: try to serialize returned JSON summary into text
-                    try:
-                        import json
-                        extracted_text = json.dumps(affinda_response)
-                    except Exception:
-                        extracted_text = ""
-            except Exception as e:
-                logger.warning(f"Affinda parsing failed, falling back to local extraction: {e}")
-
-        # If we didn't get good text yet, fallback to local extraction
-        if not extracted_text:
-            if file_extension == '.pdf':
-                extracted_text = extract_text_from_pdf(file_content)
-            elif file_extension in ['.docx', '.doc']:
-                extracted_text = extract_text_from_docx(file_content)
+    if recording is not None:
+        await run_in_threadpool(recorder.finish, recording, session.stages, session.wall_ms, response)
+
+    if profile == "return":
+        response["profile"] = session.report()
+    elif profile == "save":
+        response["profile"] = {"saved": saved}
+    return response
+
+
+async def _parse(
+    request: Request,
+    file_path: str,
+    priority: str,
+    caller: Optional[str],
+    deadline_ms: Optional[int],
+    allow_degraded: bool = True,
+    reparse: bool = LOAD_SHED_REPARSE,
+) -> Dict[str, Any]:
+    """Body of /parse; see parse_resume for the parameters"""
+    try:
+        logger.info(f"Starting resume parse for: {file_path}")
         
-        logger.info(f"Extracted text length: {len(extracted_text) if extracted_text else 0}")
-        logger.info(f"First 500 chars: {extracted_text[:500] if extracted_text else 'NO TEXT'}")
+        file_extension = check_parse_request(file_path, priority)
+        caller = caller or (request.client.host if request.client else "anonymous")
+        cancel_token = CancelToken.from_budget_ms(deadline_ms)
         
-        if not extracted_text:
-            raise HTTPException(
-                status_code=422,
-                detail="Failed to extract text from the file. The file might be corrupted or empty."
+        # Shed load before queueing: past the threshold interactive parses
+        # take the degraded fast path instead of joining the backlog
+        tier = load_shedder.choose(scheduler.queue_depth(), priority, allow_degraded)
+        # Admits the coalesced parse; raised if a higher-priority request joins it
+        ticket = AdmissionTicket(priority, caller)
+
+        # URLs are coalesced by content hash, so download first; local files
+        # by path + mtime, so identical requests read the file only once
+        file_content = None
+        if file_path.startswith(("http://", "https://")):
+            with stage("download"):
+                file_content = await download_file_from_storage(file_path)
+            flight_key = content_key(file_content)
+        else:
+            flight_key = path_key(file_path)
+
+        def admitted_extraction(tier: str, ticket: AdmissionTicket):
+            async def extraction(flight_token: CancelToken):
+                content = file_content
+                if content is None:
+                    with stage("download"):
+                        content = await download_file_from_storage(file_path)
+                # Unparseable documents fail here, before taking a slot
+                triage = await triage_upload(content, file_extension)
+                if tier == TIER_DEGRADED:
+                    async with fast_scheduler.admit(ticket=ticket, deadline=flight_token.deadline):
+                        with stage("extraction"):
+                            return await run_fast_extraction(
+                                file_path, file_extension, content, flight_token, triage=triage
+                            )
+                async with scheduler.admit(ticket=ticket, deadline=flight_token.deadline):
+                    with stage("extraction"):
+                        return await run_extraction(
+                            file_path, file_extension, content, flight_token, triage=triage
+                        )
+            return extraction
+
+        watcher = asyncio.create_task(watch_for_disconnect(request, cancel_token))
+        governor.job_started()
+        try:
+            shared = await await_cancellable(
+                single_flight.do(
+                    f"{file_extension}:{tier}:{flight_key}", admitted_extraction(tier, ticket), cancel_token.deadline,
+                    ticket,
+                ),
+                cancel_token,
             )
-        
-        # Extract contact information
-        # If Affinda returned structured fields, prefer them. Otherwise run local contact extraction.
-        contact_info = {}
-        def _recursive_search(obj, candidate_keys):
-            # Search dicts and lists recursively for any of the candidate keys
-            if obj is None:
-                return None
-            if isinstance(obj, dict):
-                for key in candidate_keys:
-                    if key in obj and obj[key]:
-                        return obj[key]
-                # search common containers first
-                for container in ("data", "parsed", "parsed_resume", "personal", "contact", "personal_details", "attributes", "profile"):
-                    node = obj.get(container)
-                    if isinstance(node, dict):
-                        for key in candidate_keys:
-                            if key in node and node[key]:
-                                return node[key]
-                # then recurse
-                for v in obj.values():
-                    res = _recursive_search(v, candidate_keys)
-                    if res:
-                        return res
-            elif isinstance(obj, list):
-                for item in obj:
-                    res = _recursive_search(item, candidate_keys)
-                    if res:
-                        return res
-            return None
-
-        def _normalize_skills(raw):
-            if raw is None:
-                return []
-            if isinstance(raw, list):
-                return [str(x) for x in raw]
-            if isinstance(raw, str):
-                # split common delimiters
-                return [s.strip() for s in re.split(r'[;,|\\n]+', raw) if s.strip()]
-            return [str(raw)]
-
-        import re
-
-        if affinda_response and isinstance(affinda_response, dict):
-            # Attempt to extract common fields using flexible searches
-            contact_info["full_name"] = _recursive_search(affinda_response, ["name", "full_name", "given_name", "first_name", "formatted_name"]) or None
-            contact_info["email"] = _recursive_search(affinda_response, ["email", "emails"]) or None
-            contact_info["phone"] = _recursive_search(affinda_response, ["phone", "phones", "mobile"]) or None
-            contact_info["address"] = _recursive_search(affinda_response, ["address", "location", "locations", "addresses"]) or None
-            contact_info["linkedin"] = _recursive_search(affinda_response, ["linkedin", "linkedin_url", "linkedin_profile", "profile_url"]) or None
-            raw_skills = _recursive_search(affinda_response, ["skills", "skill", "keywords", "expertise"]) or []
-            contact_info["skills"] = _normalize_skills(raw_skills)
-
-        # If Affinda didn't provide structured info, use the local extractor on extracted_text
-        if not any(contact_info.values()):
-            logger.info("Running local contact extraction...")
-            contact_info = extract_contact_info(extracted_text)
-            logger.info(f"Local extraction results: {contact_info}")
-        
-        # Prepare response with flat structure matching Express backend expectations
-        response = {
-            "success": True,
-            "file_path": file_path,
-            "file_type": file_extension,
-            # Flat structure that Express backend expects
-            "text": extracted_text,  # Full resume text (Express expects 'text' not 'raw_text')
-            "name": contact_info.get('full_name') or '',  # Map full_name to name
-            "email": contact_info.get('email') or '',
-            "phone": contact_info.get('phone') or '',
-            "address": contact_info.get('address') or '',
-            "linkedin": contact_info.get('linkedin') or '',
-            "skills": contact_info.get('skills') or [],
-            # Keep text_length for debugging/info
-            "text_length": len(extracted_text)
-        }
+            # The result is shared between coalesced requests; each gets its own payload
+            response = shared.to_response(file_path=file_path)
+            if tier == TIER_DEGRADED:
+                response["reparse_id"] = None
+                if reparse:
+                    # Full quality at background priority, coalesced with any
+                    # other full parse of the same document
+                    full_key = f"{file_extension}:full:{flight_key}"
+
+                    async def full_reparse():
+                        background = AdmissionTicket("background", caller)
+                        shared = await single_flight.do(
+                            full_key, admitted_extraction(TIER_FULL, background), ticket=background
+                        )
+                        # Finished results wait to be fetched in their compact encoding
+                        return shared.replace(file_path=file_path).to_bytes()
+
+                    response["reparse_id"] = reparses.submit(full_reparse)
+        except (MemoryBudgetExceeded, QueueTimeout, ParseCancelled) as e:
+            raise parse_error(e, file_path, priority)
+        finally:
+            watcher.cancel()
+            governor.job_finished()
         
         logger.info(f"Successfully parsed resume: {file_path}")
         logger.info(f"Extracted fields - Name: {response['name']}, Email: {response['email']}, Skills count: {len(response['skills'])}")
@@ -235,17 +607,335 @@ async def parse_resume(
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error parsing resume {file_path}: {str(e)}")
+        raise parse_error(e, file_path, priority)
+
+
+# Fields of the first "contact" event of /parse/stream
+STREAM_CONTACT_FIELDS = ("name", "email", "phone", "address", "location", "linkedin", "confidence")
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def _contact_event(file_extension: str, text: str, contact_info: Dict[str, Any], final: bool) -> Dict[str, Any]:
+    response = build_parse_response("", file_extension, text, contact_info)
+    return dict({field: response[field] for field in STREAM_CONTACT_FIELDS}, final=final)
+
+
+@app.get("/parse/stream")
+async def parse_resume_stream(
+    request: Request,
+    file_path: str = Query(..., description="Path to the resume file (local or URL)"),
+    priority: str = Query(DEFAULT_PRIORITY, description="Priority class: interactive or background"),
+    caller: Optional[str] = Query(None, description="Caller identity used for fair sharing"),
+    deadline_ms: Optional[int] = Query(None, gt=0, description="Time budget for the whole parse in milliseconds"),
+    x_parse_deadline_ms: Optional[int] = Header(None, gt=0),
+) -> StreamingResponse:
+    """
+    Parse a resume, streaming results as Server-Sent Events
+
+    Events, in order:
+        contact: name, email, phone, address, location, linkedin and
+            confidence from the first page ("final": false), sent again
+            from the whole text ("final": true) when anything changed
+        skills: {"skills": [...]}
+        text: {"text": ..., "text_length": n, "stats": page_stats}
+        result: the same payload /parse returns
+        error: {"status_code": n, "detail": ...} instead of the rest
+
+    Streamed parses always run the full pipeline. They are coalesced with
+    /parse and other streams of the same document; a stream that joins a
+    parse already in flight gets no page-by-page events, only everything
+    from the result. They are recorded like /parse, and profiled while a
+    profiling window is open.
+
+    Args:
+        file_path: Path to the resume file (can be local path or URL)
+        priority: Scheduling class; interactive requests run before background ones
+        caller: Identity for fair sharing within a class (defaults to client address)
+        deadline_ms: Time budget for the parse (or the X-Parse-Deadline-Ms header)
+
+    Returns:
+        text/event-stream response
+    """
+    file_extension = check_parse_request(file_path, priority)
+    caller = caller or (request.client.host if request.client else "anonymous")
+    cancel_token = CancelToken.from_budget_ms(deadline_ms or x_parse_deadline_ms)
+    ticket = AdmissionTicket(priority, caller)
+    loop = asyncio.get_running_loop()
+    updates: "asyncio.Queue[Tuple[str, Any]]" = asyncio.Queue()
+
+    def progress(kind: str, data: Any) -> None:
+        # Called from the extraction thread as well as the event loop
+        loop.call_soon_threadsafe(updates.put_nowait, (kind, data))
+
+    recording = recorder.begin(file_path, {
+        "priority": priority,
+        "deadline_ms": deadline_ms or x_parse_deadline_ms,
+        "allow_degraded": False,
+        "reparse": False,
+        "affinda_available": bool(os.getenv("AFFINDA_API_KEY")),
+        "affinda_mode": AFFINDA_MODE,
+    })
+    profiling = profiler.enabled and profiler.window_active
+    session = None
+    if profiling or recording is not None:
+        # Recording alone only needs the stage timings, not CPU or allocation profiles
+        session = ProfileSession(label=file_path, capture_allocations=profiling, capture_cpu=profiling)
+
+    async def parse() -> Dict[str, Any]:
+        # Same coalescing keys as _parse, so /parse requests can share this parse
+        file_content = None
+        if file_path.startswith(("http://", "https://")):
+            with stage("download"):
+                file_content = await download_file_from_storage(file_path)
+            flight_key = content_key(file_content)
+        else:
+            flight_key = path_key(file_path)
+
+        async def extraction(flight_token: CancelToken):
+            content = file_content
+            if content is None:
+                with stage("download"):
+                    content = await download_file_from_storage(file_path)
+            triage = await triage_upload(content, file_extension)
+            async with scheduler.admit(ticket=ticket, deadline=flight_token.deadline):
+                with stage("extraction"):
+                    return await run_extraction(
+                        file_path, file_extension, content, flight_token, progress, triage=triage
+                    )
+
+        shared = await await_cancellable(
+            single_flight.do(f"{file_extension}:{TIER_FULL}:{flight_key}", extraction, cancel_token.deadline, ticket),
+            cancel_token,
+        )
+        return shared.to_response(file_path=file_path)
+
+    async def produce() -> None:
+        governor.job_started()
+        response = error = None
+        try:
+            with (activate(session) if session is not None else nullcontext()), record_into(recording), stage("parse"):
+                response = await parse()
+        except Exception as e:
+            error = parse_error(e, file_path, priority)
+        finally:
+            governor.job_finished()
+
+        # Before the last event: the stream stops this task once it is sent
+        if recording is not None:
+            await run_in_threadpool(
+                recorder.finish, recording, session.stages, session.wall_ms, response,
+                status_code=200 if error is None else error.status_code,
+                error=None if error is None else str(error.detail),
+            )
+        if profiling:
+            saved = await run_in_threadpool(session.save, profiler.output_dir)
+            logger.info(f"Saved profile of {file_path} to {saved['report']}")
+        if error is None:
+            progress("result", response)
+        else:
+            progress("error", error)
+
+    async def events() -> AsyncIterator[str]:
+        producer = asyncio.create_task(produce())
+        watcher = asyncio.create_task(watch_for_disconnect(request, cancel_token))
+        blocks: List[Any] = []
+        contact = None
+        sent_skills = sent_text = False
+        try:
+            while True:
+                kind, data = await updates.get()
+                if kind == "block":
+                    blocks.append(data)
+                    if contact is None and data.text.strip():
+                        # Contact fields usually sit on the first page
+                        page_info = await run_in_threadpool(extract_contact_info, data.text, False)
+                        page_info["field_confidence"] = effective_confidence(page_info, text_quality([data]))
+                        contact = _contact_event(file_extension, data.text, page_info, final=False)
+                        yield sse_event("contact", contact)
+                elif kind == "contact_info":
+                    text = "\n".join(block.text for block in blocks).strip()
+                    final_contact = _contact_event(file_extension, text, data, final=True)
+                    if contact is None or dict(contact, final=True) != final_contact:
+                        contact = final_contact
+                        yield sse_event("contact", contact)
+                    yield sse_event("skills", {"skills": data.get("skills") or []})
+                    yield sse_event("text", {"text": text, "text_length": len(text), "stats": page_stats(blocks)})
+                    sent_skills = sent_text = True
+                elif kind == "result":
+                    # Fields Affinda replaced, or text that never went
+                    # through the local extractors, arrive with the result
+                    if data.get("affinda_fields") or contact is None:
+                        yield sse_event("contact", dict({f: data[f] for f in STREAM_CONTACT_FIELDS}, final=True))
+                    if not sent_skills or "skills" in data.get("affinda_fields", []):
+                        yield sse_event("skills", {"skills": data["skills"]})
+                    if not sent_text:
+                        yield sse_event("text", {
+                            "text": data["text"], "text_length": data["text_length"], "stats": page_stats(blocks),
+                        })
+                    yield sse_event("result", data)
+                    return
+                elif kind == "error":
+                    yield sse_event("error", {"status_code": data.status_code, "detail": data.detail})
+                    return
+        finally:
+            watcher.cancel()
+            if not producer.done():
+                # The client went away mid-stream; stop the parse
+                cancel_token.cancel(REASON_DISCONNECT)
+                producer.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def check_parse_request(file_path: str, priority: str) -> str:
+    """
+    Validate the parameters shared by /parse and /parse/stream
+
+    Returns:
+        Lowercased file extension
+
+    Raises:
+        HTTPException: 400 for an unsupported format or priority, 503 while
+            the worker is draining
+    """
+    # Determine file extension
+    file_extension = Path(file_path).suffix.lower()
+    
+    if file_extension not in SUPPORTED_EXTENSIONS:
         raise HTTPException(
-            status_code=500,
-            detail=f"Internal error while parsing resume: {str(e)}"
+            status_code=400,
+            detail=f"Unsupported file format: {file_extension}. Supported formats: .pdf, .docx"
         )
+    
+    if priority not in PRIORITY_CLASSES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown priority: {priority}. Supported priorities: {', '.join(PRIORITY_CLASSES)}"
+        )
+    
+    if governor.draining:
+        # This worker is about to be recycled; the caller should retry
+        raise HTTPException(
+            status_code=503,
+            detail="Parser worker is restarting",
+            headers={"Retry-After": "1"}
+        )
+    return file_extension
 
 
-@app.get("/health")
-async def health_check():
-    """Health check endpoint for monitoring"""
-    return {"status": "healthy", "service": "resume-parser"}
+def parse_error(error: Exception, file_path: str, priority: str) -> HTTPException:
+    """
+    Map a parse failure to its HTTP error, recording it in the counters
+
+    Args:
+        error: Exception raised by the parse
+        file_path: Document being parsed
+        priority: Its scheduling class
+
+    Returns:
+        HTTPException to raise (or to report as an SSE error event)
+    """
+    if isinstance(error, HTTPException):
+        return error
+    if isinstance(error, MemoryBudgetExceeded):
+        governor.record_rejection()
+        return HTTPException(status_code=413, detail=f"Document too large to process: {error}")
+    if isinstance(error, TriageRejected):
+        logger.info(f"Triage rejected {file_path}: {error}")
+        return HTTPException(status_code=error.status_code, detail=str(error))
+    if isinstance(error, QueueTimeout):
+        return HTTPException(
+            status_code=503,
+            detail=f"Parser busy: {priority} request expired in the queue",
+            headers={"Retry-After": "5"}
+        )
+    if isinstance(error, ParseCancelled):
+        cancel_stats.record_request(error.reason)
+        logger.info(f"Parse of {file_path} cancelled: {error.reason}")
+        if error.reason == REASON_DEADLINE:
+            return HTTPException(status_code=504, detail="Parse deadline exceeded")
+        # 499: client closed request; nobody is listening for the body
+        return HTTPException(status_code=499, detail="Client disconnected")
+    logger.error(f"Error parsing resume {file_path}: {str(error)}")
+    return HTTPException(
+        status_code=500,
+        detail=f"Internal error while parsing resume: {str(error)}"
+    )
+
+
+@app.get("/metrics")
+async def metrics() -> Dict[str, Any]:
+    """Operational metrics for the parser service"""
+    return {
+        "scheduler": scheduler.stats(),
+        "cancellation": cancel_stats.snapshot(),
+        "memory": governor.stats(),
+        "single_flight": single_flight.stats(),
+        "load_shedding": dict(
+            load_shedder.stats(),
+            fast_lane=fast_scheduler.stats(),
+            reparses=reparses.stats(),
+        ),
+        "escalation": escalation_stats.stats(),
+        "recording": recorder.stats(),
+        "triage": triage_stats.stats(),
+        "event_loop": loop_watchdog.stats(),
+    }
+
+
+@app.get("/parse/reparse/{reparse_id}")
+async def reparse_result(reparse_id: str) -> Dict[str, Any]:
+    """
+    Result of a background full-quality reparse queued by a degraded /parse
+
+    Returns:
+        {"status": "pending"}, {"status": "done", "result": {...}} or
+        {"status": "failed", "error": "..."}
+    """
+    entry = reparses.get(reparse_id)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"Unknown reparse id: {reparse_id}")
+    entry = dict(entry, reparse_id=reparse_id)
+    if "result" in entry:
+        entry["result"] = ParsedResume.from_bytes(entry["result"]).to_response()
+    return entry
+
+
+@app.get("/debug/memory")
+async def debug_memory(
+    top: int = Query(20, ge=1, le=200, description="Number of allocation sites to return"),
+    start: bool = Query(False, description="Start tracemalloc tracing if it is off"),
+    stop: bool = Query(False, description="Stop tracing after this snapshot"),
+) -> Dict[str, Any]:
+    """Worker memory state and tracemalloc top allocations (MEMORY_DEBUG_ENABLED only)"""
+    if not MEMORY_DEBUG_ENABLED:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return {
+        "memory": governor.stats(),
+        "tracemalloc": tracemalloc_snapshot(top=top, start=start, stop=stop),
+    }
+
+
+@app.post("/debug/profile")
+async def open_profile_window(
+    seconds: float = Query(60, gt=0, description="How long to profile every parse"),
+    x_profile_token: Optional[str] = Header(None),
+) -> Dict[str, Any]:
+    """Profile every /parse for a time window, saving to PROFILE_OUTPUT_DIR (PROFILING_TOKEN only)"""
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not profiler.authorized(x_profile_token):
+        raise HTTPException(status_code=403, detail="Profiling not permitted")
+    until = profiler.open_window(seconds)
+    return {"profiling_until": until, "output_dir": profiler.output_dir}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,206 @@
+"""
+Memory Governor Module
+Tracks worker RSS, recycles the worker gracefully after a number of jobs or
+above an RSS limit, and rejects documents whose rasterization would not fit
+the memory budget
+"""
+import os
+import sys
+import signal
+import logging
+import threading
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Recycle the worker after this many parses / above this RSS (0 disables).
+# Recycling sends SIGTERM to the worker itself, so uvicorn finishes in-flight
+# requests and exits; the supervisor (uvicorn --workers, start_persistent.py
+# or the platform) starts a fresh process.
+WORKER_MAX_JOBS = int(os.getenv("WORKER_MAX_JOBS", "0"))
+WORKER_MAX_RSS_MB = float(os.getenv("WORKER_MAX_RSS_MB", "0"))
+
+# Memory allowed for the rasterized pages of one document held at once during
+# OCR (one page when pages are rendered one by one, else the whole document)
+RASTER_BUDGET_MB = float(os.getenv("RASTER_BUDGET_MB", "1024"))
+
+# Expose tracemalloc snapshots on /debug/memory
+MEMORY_DEBUG_ENABLED = os.getenv("MEMORY_DEBUG_ENABLED", "").lower() in ("1", "true", "yes")
+
+# US Letter page, RGB, as produced by pdf2image
+PAGE_WIDTH_IN = 8.5
+PAGE_HEIGHT_IN = 11.0
+RASTER_BYTES_PER_PIXEL = 3
+
+
+class MemoryBudgetExceeded(Exception):
+    """Raised when a document would need more raster memory than allowed"""
+
+
+def current_rss_bytes() -> int:
+    """
+    Resident set size of this process in bytes
+
+    Reads /proc/self/statm on Linux; elsewhere falls back to the peak RSS
+    reported by getrusage, which overestimates but never underestimates
+    (0 where neither is available).
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def estimate_raster_bytes(page_count: int, dpi: int) -> int:
+    """Estimate memory needed to hold `page_count` pages rendered at `dpi`"""
+    pixels = (PAGE_WIDTH_IN * dpi) * (PAGE_HEIGHT_IN * dpi)
+    return int(page_count * pixels * RASTER_BYTES_PER_PIXEL)
+
+
+def check_raster_budget(page_count: int, dpi: int, budget_mb: Optional[float] = None) -> None:
+    """
+    Reject rasterization that would exceed the memory budget
+
+    Args:
+        page_count: Pages that will be held in memory at once
+        dpi: Rasterization resolution
+        budget_mb: Budget in MB (defaults to RASTER_BUDGET_MB; <= 0 disables)
+
+    Raises:
+        MemoryBudgetExceeded: The estimate is over budget
+    """
+    if budget_mb is None:
+        budget_mb = RASTER_BUDGET_MB
+    if budget_mb <= 0:
+        return
+    needed = estimate_raster_bytes(page_count, dpi)
+    if needed > budget_mb * 1024 * 1024:
+        raise MemoryBudgetExceeded(
+            f"{page_count} pages at {dpi} dpi need ~{needed // (1024 * 1024)} MB, "
+            f"over the {budget_mb:.0f} MB raster budget"
+        )
+
+
+def _terminate_self() -> None:
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+class MemoryGovernor:
+    """
+    Counts parses and watches RSS; once a limit is hit the worker stops
+    taking new parses and recycles itself as soon as in-flight ones finish
+    """
+
+    def __init__(
+        self,
+        max_jobs: int = WORKER_MAX_JOBS,
+        max_rss_mb: float = WORKER_MAX_RSS_MB,
+        recycle: Callable[[], None] = _terminate_self,
+    ):
+        self.max_jobs = max_jobs
+        self.max_rss_bytes = int(max_rss_mb * 1024 * 1024)
+        self._recycle = recycle
+        self._lock = threading.Lock()
+        self.jobs_completed = 0
+        self.in_flight = 0
+        self.draining = False
+        self.drain_reason: Optional[str] = None
+        self.peak_rss_bytes = 0
+        self.rejected_over_budget = 0
+        self._recycled = False
+
+    def job_started(self) -> None:
+        with self._lock:
+            self.in_flight += 1
+
+    def job_finished(self) -> None:
+        """Record a finished parse and recycle the worker if a limit is hit"""
+        rss = current_rss_bytes()
+        with self._lock:
+            self.in_flight -= 1
+            self.jobs_completed += 1
+            self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+
+            if not self.draining:
+                if self.max_jobs and self.jobs_completed >= self.max_jobs:
+                    self.draining, self.drain_reason = True, f"completed {self.jobs_completed} jobs"
+                elif self.max_rss_bytes and rss > self.max_rss_bytes:
+                    self.draining, self.drain_reason = True, f"RSS {rss // (1024 * 1024)} MB over limit"
+                if self.draining:
+                    logger.warning(f"Worker {os.getpid()} draining for recycle: {self.drain_reason}")
+
+            recycle_now = self.draining and self.in_flight == 0 and not self._recycled
+            if recycle_now:
+                self._recycled = True
+
+        if recycle_now:
+            logger.warning(f"Recycling worker {os.getpid()}")
+            self._recycle()
+
+    def record_rejection(self) -> None:
+        with self._lock:
+            self.rejected_over_budget += 1
+
+    def stats(self) -> Dict[str, Any]:
+        rss = current_rss_bytes()
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "rss_mb": round(rss / (1024 * 1024), 1),
+                "peak_rss_mb": round(max(self.peak_rss_bytes, rss) / (1024 * 1024), 1),
+                "jobs_completed": self.jobs_completed,
+                "in_flight": self.in_flight,
+                "max_jobs": self.max_jobs,
+                "max_rss_mb": round(self.max_rss_bytes / (1024 * 1024), 1),
+                "draining": self.draining,
+                "drain_reason": self.drain_reason,
+                "rejected_over_budget": self.rejected_over_budget,
+            }
+
+
+def tracemalloc_snapshot(top: int = 20, start: bool = False, stop: bool = False) -> Dict[str, Any]:
+    """
+    Report the top allocation sites from tracemalloc
+
+    Tracing is off by default because it slows allocation down; pass
+    start=True to begin tracing and request again later to see what grew.
+
+    Args:
+        top: Number of allocation sites to return
+        start: Start tracing if it is not running
+        stop: Stop tracing after taking the snapshot
+
+    Returns:
+        Dictionary with tracing state and the top allocations by size
+    """
+    if start and not tracemalloc.is_tracing():
+        tracemalloc.start(25)
+
+    result: Dict[str, Any] = {"tracing": tracemalloc.is_tracing(), "top": []}
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        result["traced_mb"] = round(current / (1024 * 1024), 2)
+        result["traced_peak_mb"] = round(peak / (1024 * 1024), 2)
+        top_stats: List[Any] = tracemalloc.take_snapshot().statistics("lineno")[:top]
+        result["top"] = [
+            {
+                "location": str(stat.traceback[0]),
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            for stat in top_stats
+        ]
+        if stop:
+            tracemalloc.stop()
+            result["tracing"] = False
+    return result
@@ -0,0 +1,253 @@
+"""
+Parsed Resume Model
+Typed result of a parse, passed between the pipeline stages, the single-flight
+waiters, bulk-import worker processes and the text store instead of ad-hoc
+dicts. The /parse JSON payload is produced from it only at the edge, and
+internally it travels as a compact, schema-versioned msgpack array.
+"""
+import sys
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import msgpack
+
+# Bump when the positional layout of to_bytes changes; from_bytes rejects
+# versions it does not know rather than misreading them
+SCHEMA_VERSION = 1
+
+# /parse fields derived from the text by the field extractors
+FIELD_KEYS = ("name", "email", "phone", "address", "location", "linkedin", "skills")
+
+
+def _text(value: Any) -> str:
+    """
+    Coerce a field value to a string
+
+    Affinda can return lists (several phone numbers) or objects (a name
+    with parts) where the local extractors return strings; the first usable
+    entry is kept.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            text = _text(item)
+            if text:
+                return text
+        return ""
+    if isinstance(value, dict):
+        for key in ("raw", "formatted", "text", "value"):
+            if value.get(key):
+                return _text(value[key])
+        return ""
+    return str(value)
+
+
+def intern_skills(skills: Optional[Iterable[Any]]) -> Tuple[str, ...]:
+    """
+    Skill names as interned strings
+
+    Skills come from a small taxonomy, so interning makes every parse share
+    one copy of each name instead of holding its own.
+    """
+    return tuple(sys.intern(str(skill)) for skill in skills or () if skill)
+
+
+class ParsedResume:
+    """
+    Fields of one parsed resume
+
+    Attributes:
+        file_path: Original path or URL of the resume
+        file_type: Lowercased file extension
+        text: Full extracted text
+        name, email, phone, address, linkedin: Contact fields ('' when missing)
+        location: Structured city/state/postal/country ({} when missing)
+        skills: Interned skill names
+        confidence: Field -> confidence in [0, 1]
+        affinda_fields: Fields taken from Affinda
+        degraded: Produced by the overload fast path
+    """
+
+    __slots__ = (
+        "file_path", "file_type", "text", "name", "email", "phone", "address",
+        "location", "linkedin", "skills", "confidence", "affinda_fields", "degraded",
+    )
+
+    def __init__(
+        self,
+        file_path: str = "",
+        file_type: str = "",
+        text: str = "",
+        name: str = "",
+        email: str = "",
+        phone: str = "",
+        address: str = "",
+        location: Optional[Dict[str, Any]] = None,
+        linkedin: str = "",
+        skills: Optional[Iterable[str]] = None,
+        confidence: Optional[Dict[str, float]] = None,
+        affinda_fields: Optional[Iterable[str]] = None,
+        degraded: bool = False,
+    ):
+        self.file_path = file_path
+        self.file_type = sys.intern(file_type)
+        self.text = text
+        self.name = _text(name)
+        self.email = _text(email)
+        self.phone = _text(phone)
+        self.address = _text(address)
+        self.location = dict(location) if isinstance(location, dict) else {}
+        self.linkedin = _text(linkedin)
+        self.skills = intern_skills(skills)
+        self.confidence = {sys.intern(field): float(score) for field, score in (confidence or {}).items()}
+        self.affinda_fields = tuple(sys.intern(field) for field in affinda_fields or ())
+        self.degraded = bool(degraded)
+
+    @classmethod
+    def from_contact_info(
+        cls,
+        file_path: str,
+        file_type: str,
+        text: str,
+        contact_info: Dict[str, Any],
+        degraded: bool = False,
+    ) -> "ParsedResume":
+        """
+        Build from the result of extract_contact_info or the Affinda mapping
+
+        Args:
+            file_path: Original path or URL of the resume
+            file_type: Lowercased file extension
+            text: Full resume text
+            contact_info: Contact-info dictionary ('full_name', 'email', ...)
+            degraded: Produced by the overload fast path
+
+        Returns:
+            ParsedResume
+        """
+        return cls(
+            file_path=file_path,
+            file_type=file_type,
+            text=text,
+            name=contact_info.get("full_name"),
+            email=contact_info.get("email"),
+            phone=contact_info.get("phone"),
+            address=contact_info.get("address"),
+            location=contact_info.get("location"),
+            linkedin=contact_info.get("linkedin"),
+            skills=contact_info.get("skills"),
+            confidence=contact_info.get("field_confidence"),
+            affinda_fields=contact_info.get("affinda_fields"),
+            degraded=degraded,
+        )
+
+    @classmethod
+    def from_fields(cls, fields: Dict[str, Any]) -> "ParsedResume":
+        """Build from a FIELD_KEYS dictionary (see fields())"""
+        return cls(**{key: fields.get(key) for key in FIELD_KEYS})
+
+    def replace(self, **changes: Any) -> "ParsedResume":
+        """Copy with some attributes changed"""
+        values = {slot: getattr(self, slot) for slot in self.__slots__}
+        values.update(changes)
+        return ParsedResume(**values)
+
+    def fields(self) -> Dict[str, Any]:
+        """The FIELD_KEYS entries of the /parse payload"""
+        return {
+            "name": self.name,
+            "email": self.email,
+            "phone": self.phone,
+            "address": self.address,
+            "location": dict(self.location),
+            "linkedin": self.linkedin,
+            "skills": list(self.skills),
+        }
+
+    def to_response(self, **overrides: Any) -> Dict[str, Any]:
+        """
+        The flat /parse payload the Express backend expects
+
+        Args:
+            **overrides: Entries replaced in the payload (e.g. file_path for
+                a request that shared another request's parse)
+
+        Returns:
+            A new response dictionary
+        """
+        response = {
+            "success": True,
+            "file_path": self.file_path,
+            "file_type": self.file_type,
+            # Express expects 'text', not 'raw_text'
+            "text": self.text,
+            "name": self.name,
+            "email": self.email,
+            "phone": self.phone,
+            "address": self.address,
+            "location": dict(self.location),
+            "linkedin": self.linkedin,
+            "skills": list(self.skills),
+            "confidence": dict(self.confidence),
+            "affinda_fields": list(self.affinda_fields),
+            # Kept for debugging/info
+            "text_length": len(self.text),
+            "degraded": self.degraded,
+        }
+        response.update(overrides)
+        return response
+
+    def to_bytes(self) -> bytes:
+        """
+        Compact binary encoding: a msgpack array headed by SCHEMA_VERSION
+
+        Fields are positional (no key names are stored), in __slots__ order.
+        """
+        return msgpack.packb(
+            [SCHEMA_VERSION] + [getattr(self, slot) for slot in self.__slots__],
+            use_bin_type=True,
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "ParsedResume":
+        """
+        Decode the output of to_bytes
+
+        Raises:
+            ValueError: Not an encoded ParsedResume, or an unknown schema version
+        """
+        try:
+            values = msgpack.unpackb(data, raw=False, use_list=False, strict_map_key=False)
+        except (msgpack.UnpackException, ValueError) as e:
+            raise ValueError(f"Invalid ParsedResume encoding: {e}")
+        if not isinstance(values, tuple) or not values:
+            raise ValueError("Invalid ParsedResume encoding")
+        if values[0] != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported ParsedResume schema version: {values[0]}")
+        if len(values) != len(cls.__slots__) + 1:
+            raise ValueError(f"Invalid ParsedResume encoding: {len(values) - 1} fields")
+        # Encoded values were coerced when the resume was built, so skip
+        # __init__ and only re-intern the shared strings
+        resume = cls.__new__(cls)
+        for slot, value in zip(cls.__slots__, values[1:]):
+            setattr(resume, slot, value)
+        try:
+            resume.file_type = sys.intern(resume.file_type)
+            resume.skills = tuple(map(sys.intern, resume.skills))
+            resume.affinda_fields = tuple(map(sys.intern, resume.affinda_fields))
+        except TypeError as e:
+            raise ValueError(f"Invalid ParsedResume encoding: {e}")
+        return resume
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ParsedResume):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __repr__(self) -> str:
+        return (
+            f"ParsedResume(file_path={self.file_path!r}, name={self.name!r}, "
+            f"skills={len(self.skills)}, text_length={len(self.text)})"
+        )
@@ -0,0 +1,234 @@
+"""
+Name Gazetteer Module
+Recognizes the candidate's name in the resume header by scoring each line
+once against a preloaded first-name/surname gazetteer held in Bloom filters
+"""
+import os
+import re
+import math
+import zlib
+import logging
+import unicodedata
+from typing import List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+FIRST_NAMES_FILE = os.path.join(DATA_DIR, "first_names.txt")
+SURNAMES_FILE = os.path.join(DATA_DIR, "surnames.txt")
+
+# False-positive rate of the gazetteer filters. A false positive only nudges
+# a line's score, so a compact filter is preferred over an exact set.
+GAZETTEER_ERROR_RATE = 0.01
+
+# Only the first lines of the header region are considered
+MAX_NAME_LINES = 10
+MAX_NAME_LINE_CHARS = 60
+
+# Lines scoring below this are not returned as names
+MIN_NAME_CONFIDENCE = 0.35
+
+NAME_LABELS = ("name", "full name", "candidate name", "applicant", "candidate")
+TITLES = {"mr", "mrs", "ms", "miss", "mx", "dr", "prof", "sir"}
+SUFFIXES = {
+    "jr", "sr", "ii", "iii", "iv", "phd", "md", "mba", "cpa", "pe", "pmp", "esq",
+    "msc", "bsc", "ma", "ba", "rn", "cfa", "dds", "jd",
+}
+# Lowercase particles that may appear inside names
+PARTICLES = {"van", "von", "de", "da", "di", "del", "della", "dos", "das", "du", "la", "le", "bin", "binti", "al", "el", "ter", "ten"}
+
+# Words that show a line is a heading, title or address rather than a name
+NOT_NAME_WORDS = {
+    "resume", "curriculum", "vitae", "cv", "summary", "profile", "objective", "experience",
+    "education", "skills", "contact", "information", "references", "projects", "certifications",
+    "engineer", "developer", "manager", "analyst", "consultant", "director", "scientist",
+    "designer", "architect", "specialist", "administrator", "coordinator", "assistant",
+    "intern", "officer", "lead", "senior", "junior", "principal", "head", "chief", "executive",
+    "software", "data", "web", "full", "stack", "frontend", "backend", "devops", "cloud",
+    "product", "project", "marketing", "sales", "operations", "finance", "accountant",
+    "nurse", "teacher", "technician", "representative", "supervisor", "associate", "president",
+    "email", "phone", "mobile", "address", "street", "avenue", "road", "suite", "linkedin",
+    "github", "portfolio", "university", "college", "school", "institute", "inc", "llc",
+    "ltd", "corp", "company", "page", "confidential", "available", "upon", "request",
+}
+
+
+_NON_LETTERS = re.compile(r"[^a-z]+")
+# Digits, e-mail/URL and other symbols never appear in a name line
+_NOT_NAME_CHARS = re.compile(r"[\d@#$%^&*()_+=\[\]{}\\;\"<>?/~`]")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (bit array + double hashing)"""
+
+    __slots__ = ("size", "hashes", "bits")
+
+    def __init__(self, capacity: int, error_rate: float = GAZETTEER_ERROR_RATE):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+        self.hashes = max(1, int(round(self.size / capacity * math.log(2))))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item: str) -> List[int]:
+        # A fixed hash rather than the per-process salted built-in one, so
+        # false positives (and therefore recognized names) are reproducible
+        data = item.encode("utf-8")
+        first, second = zlib.crc32(data), zlib.adler32(data) | 1
+        return [(first + i * second) % self.size for i in range(self.hashes)]
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        for position in self._positions(item):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+def fold(token: str) -> str:
+    """Lowercase, strip accents and drop non-letters ("O'Brien" -> "obrien", "José" -> "jose")"""
+    lowered = token.lower()
+    if lowered.isalpha() and lowered.isascii():
+        return lowered
+    if lowered.isascii():
+        return _NON_LETTERS.sub("", lowered)
+    decomposed = unicodedata.normalize("NFKD", lowered)
+    return "".join(ch for ch in decomposed if ch.isalpha() and not unicodedata.combining(ch))
+
+
+def _load_names(path: str) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.startswith("#")]
+
+
+def _build_filter(names: List[str]) -> BloomFilter:
+    bloom = BloomFilter(len(names))
+    for name in names:
+        bloom.add(fold(name))
+    return bloom
+
+
+FIRST_NAMES = _build_filter(_load_names(FIRST_NAMES_FILE))
+SURNAMES = _build_filter(_load_names(SURNAMES_FILE))
+
+
+class NameMatch(NamedTuple):
+    name: str
+    confidence: float  # 0-1
+    line: int          # index of the line within the scanned region
+
+
+def _is_name_token(token: str) -> bool:
+    """Letters (any script), optionally joined by ' - . and ending in '.' for initials"""
+    core = token[:-1] if token.endswith(".") else token
+    if not core:
+        return False
+    for part in core.replace("'", "-").replace("\u2019", "-").replace(".", "-").split("-"):
+        if not part.isalpha():
+            return False
+    return True
+
+
+def _display(tokens: List[str], all_caps: bool) -> str:
+    if not all_caps:
+        return " ".join(tokens)
+    return " ".join("-".join(part.capitalize() for part in token.split("-")) for token in tokens)
+
+
+def score_line(line: str, index: int, total: int) -> Optional[NameMatch]:
+    """
+    Score one line as the candidate's name
+
+    Args:
+        line: Stripped line of text
+        index: Position of the line in the scanned region
+        total: Number of lines scanned
+
+    Returns:
+        NameMatch, or None if the line cannot be a name
+    """
+    if _NOT_NAME_CHARS.search(line):
+        return None
+    labelled = False
+    head, sep, rest = line.partition(":")
+    if sep:
+        if head.strip().lower() not in NAME_LABELS:
+            return None
+        line, labelled = rest.strip(), True
+
+    if not line or len(line) > MAX_NAME_LINE_CHARS:
+        return None
+    # "Jane Doe | Data Engineer": keep the part before
+    for separator in ("|", " - ", " \u2013 "):
+        line = line.split(separator, 1)[0].strip()
+    # "Jane Doe, PhD" is a name; "Austin, TX" is a place
+    line, _, credentials = line.partition(",")
+    if any(fold(word) not in SUFFIXES for word in credentials.replace(",", " ").split()):
+        return None
+
+    tokens = line.split()
+    if not 2 <= len(tokens) <= 7:
+        return None
+    folded = [fold(t) for t in tokens]
+    while folded and folded[0] in TITLES:
+        tokens, folded = tokens[1:], folded[1:]
+    while folded and folded[-1] in SUFFIXES:
+        tokens, folded = tokens[:-1], folded[:-1]
+    if not 2 <= len(tokens) <= 5 or not all(_is_name_token(t) for t in tokens):
+        return None
+    if any(f in NOT_NAME_WORDS for f in folded):
+        return None
+
+    letters = "".join(ch for ch in line if ch.isalpha())
+    all_caps = letters.isupper()
+    for token, key in zip(tokens, folded):
+        if not (token[0].isupper() or key in PARTICLES):
+            return None
+
+    score = 0.2
+    if folded[0] in FIRST_NAMES:
+        score += 0.35
+    if folded[-1] in SURNAMES:
+        score += 0.3
+    elif folded[-1] in FIRST_NAMES:
+        score += 0.15
+    score += 0.05 * sum(1 for key in folded[1:-1] if key in FIRST_NAMES or key in SURNAMES)
+    score += 0.15 * (1 - index / max(total, 1))
+    if labelled:
+        score += 0.3
+    return NameMatch(_display(tokens, all_caps), round(min(score, 1.0), 2), index)
+
+
+def recognize_name(text: str, max_lines: int = MAX_NAME_LINES) -> Optional[NameMatch]:
+    """
+    Find the candidate's name in the header region of a resume
+
+    The first `max_lines` non-empty lines are each scored once (shape,
+    casing, gazetteer hits, position, "Name:" labels) and the best line wins.
+
+    Args:
+        text: Header region (or start) of the resume
+        max_lines: Number of non-empty lines to consider
+
+    Returns:
+        Best NameMatch with confidence >= MIN_NAME_CONFIDENCE, or None
+    """
+    lines = []
+    for raw in (text or "").split("\n"):
+        stripped = raw.strip()
+        if stripped:
+            lines.append(stripped)
+            if len(lines) == max_lines:
+                break
+
+    best: Optional[NameMatch] = None
+    for index, line in enumerate(lines):
+        match = score_line(line, index, len(lines))
+        if match is not None and (best is None or match.confidence > best.confidence):
+            best = match
+    if best is None or best.confidence < MIN_NAME_CONFIDENCE:
+        return None
+    return best
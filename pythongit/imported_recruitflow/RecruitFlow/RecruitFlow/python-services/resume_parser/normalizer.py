@@ -0,0 +1,97 @@
+"""
+Text Normalization Module
+Canonicalizes extracted resume text once (Unicode form, ligatures, soft
+hyphens, hyphenated line breaks, whitespace) and shares the result with every
+field extractor through a ResumeDocument
+"""
+import re
+import unicodedata
+from typing import Optional, Union
+
+try:
+    from segmenter import ResumeSections, segment_resume
+except ImportError:
+    from resume_parser.segmenter import ResumeSections, segment_resume
+
+# Characters removed outright: soft hyphen, zero-width space/joiners, BOM
+_DROP_CHARS = "\u00ad\u200b\u200c\u200d\u2060\ufeff"
+
+# Characters NFKC leaves alone but extractors treat as plain ASCII
+_CHAR_MAP = {
+    **{ord(ch): None for ch in _DROP_CHARS},
+    0x2010: "-",  # hyphen
+    0x2011: "-",  # non-breaking hyphen
+    0x2012: "-",  # figure dash
+    0x2013: "-",  # en dash
+    0x2014: "-",  # em dash
+    0x2212: "-",  # minus sign
+    0x2018: "'",
+    0x2019: "'",
+    0x201c: '"',
+    0x201d: '"',
+    ord("\r"): "\n",
+    ord("\f"): "\n",
+    ord("\v"): "\n",
+    0x2028: "\n",  # line separator
+    0x2029: "\n",  # paragraph separator
+}
+
+# A word broken across lines by a hyphen ("manage-\nment"). Only joins when
+# the next line continues in lowercase, so "Jean-\nPaul" and list dashes stay.
+_HYPHEN_BREAK = re.compile(r"(?<=[a-z])-[ \t]*\n[ \t]*(?=[a-z])")
+_INLINE_SPACE = re.compile(r"[ \t]+")
+_SPACE_AROUND_NEWLINE = re.compile(r" ?\n ?")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+
+def normalize_text(text: str) -> str:
+    """
+    Return the canonical form of extracted text
+
+    NFKC folds ligatures (ﬁ -> fi), non-breaking and other exotic spaces and
+    full-width forms; dashes and quotes become ASCII; soft hyphens and
+    zero-width characters are dropped; hyphenated line breaks are joined;
+    runs of spaces collapse to one, lines are stripped and at most one blank
+    line is kept between paragraphs.
+
+    Args:
+        text: Raw extracted text
+
+    Returns:
+        Normalized text
+    """
+    if not text:
+        return ""
+    if not text.isascii():
+        text = unicodedata.normalize("NFKC", text)
+    text = text.replace("\r\n", "\n").translate(_CHAR_MAP)
+    text = _HYPHEN_BREAK.sub("", text)
+    text = _INLINE_SPACE.sub(" ", text)
+    text = _SPACE_AROUND_NEWLINE.sub("\n", text)
+    text = _BLANK_LINES.sub("\n\n", text)
+    return text.strip()
+
+
+class ResumeDocument:
+    """
+    Normalized resume text shared by all field extractors
+
+    Attributes:
+        text: Normalized (and budget-truncated) text
+        lower: Lowercased view of text, computed once
+        sections: Section view from the segmenter
+    """
+
+    __slots__ = ("text", "lower", "sections")
+
+    def __init__(self, text: str, max_chars: Optional[int] = None):
+        self.sections: ResumeSections = segment_resume(normalize_text(text), max_chars)
+        self.text = self.sections.text
+        self.lower = self.text.lower()
+
+
+def as_document(text: Union[str, ResumeDocument]) -> ResumeDocument:
+    """Wrap raw text in a ResumeDocument; documents are returned unchanged"""
+    if isinstance(text, ResumeDocument):
+        return text
+    return ResumeDocument(text)
@@ -0,0 +1,218 @@
+"""
+OCR Page Cache Module
+Two-tier (memory + disk) cache of OCR text keyed by a hash of the
+rasterized page and the OCR settings used to read it
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Memory tier budget (MB of cached text) and optional disk tier
+OCR_CACHE_MEMORY_MB = float(os.getenv("OCR_CACHE_MEMORY_MB", "16"))
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "")
+OCR_CACHE_DISK_MB = float(os.getenv("OCR_CACHE_DISK_MB", "256"))
+
+# Bump when the OCR pipeline changes in a way that alters output for the
+# same page image, so stale entries are never served
+OCR_CACHE_VERSION = "1"
+
+
+def page_cache_key(image: Any, settings: Dict[str, Any]) -> str:
+    """
+    Build a cache key for one rasterized page
+
+    Args:
+        image: PIL image of the page as handed to Tesseract
+        settings: OCR settings that affect the output (dpi, lang, config, ...)
+
+    Returns:
+        Hex digest identifying the page pixels plus settings
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(OCR_CACHE_VERSION.encode())
+    digest.update(json.dumps(settings, sort_keys=True, default=str).encode())
+    digest.update(f"{image.mode}:{image.size[0]}x{image.size[1]}".encode())
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+def _write_atomic(path: Path, text: str) -> None:
+    """
+    Write via a temp file and rename, so neither a crash mid-write nor a
+    worker reading concurrently ever sees a truncated entry
+    """
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp, path)
+    except OSError:
+        try:
+            tmp.unlink()
+        except OSError:
+            pass
+        raise
+
+
+class OCRPageCache:
+    """
+    LRU cache of OCR page text with a bounded memory tier and an optional
+    bounded disk tier. Memory misses fall through to disk, and disk hits are
+    promoted back into memory. Safe to share between threads.
+    """
+
+    def __init__(self, memory_bytes: int, disk_dir: Optional[str] = None, disk_bytes: int = 0):
+        self.memory_bytes = memory_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_bytes = disk_bytes
+
+        self._memory: "OrderedDict[str, str]" = OrderedDict()
+        self._memory_used = 0
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_used = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.disk_dir:
+            self._load_disk_index()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.txt"
+
+    def _load_disk_index(self) -> None:
+        """Rebuild the disk LRU order from file modification times"""
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.disk_dir.glob("*/*.txt"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_used += size
+        self._evict_disk()
+
+    def _store_memory(self, key: str, text: str) -> None:
+        size = len(text.encode("utf-8"))
+        if size > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_used -= len(self._memory.pop(key).encode("utf-8"))
+        self._memory[key] = text
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_used -= len(evicted.encode("utf-8"))
+            self.evictions += 1
+
+    def _evict_disk(self) -> None:
+        while self._disk_used > self.disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_used -= size
+            self.evictions += 1
+            try:
+                self._entry_path(key).unlink()
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up cached OCR text
+
+        Args:
+            key: Key from page_cache_key
+
+        Returns:
+            Cached text (possibly empty for blank pages) or None on a miss
+        """
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key]
+
+            if self.disk_dir and key in self._disk:
+                path = self._entry_path(key)
+                try:
+                    text = path.read_text(encoding="utf-8")
+                    os.utime(path)
+                except OSError:
+                    self._disk_used -= self._disk.pop(key)
+                else:
+                    self._disk.move_to_end(key)
+                    self._store_memory(key, text)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return text
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        """
+        Store OCR text for a page in both tiers
+
+        Args:
+            key: Key from page_cache_key
+            text: Text Tesseract produced for the page
+        """
+        with self._lock:
+            self._store_memory(key, text)
+
+            if not self.disk_dir or key in self._disk:
+                return
+            path = self._entry_path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                _write_atomic(path, text)
+            except OSError as e:
+                logger.warning(f"Failed to write OCR cache entry {key}: {e}")
+                return
+            size = path.stat().st_size
+            self._disk[key] = size
+            self._disk_used += size
+            self._evict_disk()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and tier usage"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "disk_entries": len(self._disk),
+                "disk_bytes": self._disk_used,
+            }
+
+
+_cache: Optional[OCRPageCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_ocr_cache() -> OCRPageCache:
+    """Return the process-wide OCR page cache, configured from the environment"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = OCRPageCache(
+                memory_bytes=int(OCR_CACHE_MEMORY_MB * 1024 * 1024),
+                disk_dir=OCR_CACHE_DIR or None,
+                disk_bytes=int(OCR_CACHE_DISK_MB * 1024 * 1024),
+            )
+        return _cache
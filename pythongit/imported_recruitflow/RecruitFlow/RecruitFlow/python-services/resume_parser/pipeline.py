@@ -0,0 +1,252 @@
+"""
+Local Parsing Pipeline
+Synchronous text + contact extraction producing the ParsedResume behind
+/parse, shared by the HTTP service and the offline tools
+"""
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    from text_extractor import TextBlock, iter_document_blocks
+    from contact_mapper import extract_contact_info, taxonomy_version
+    from cancellation import CancelToken
+    from text_store import get_text_store
+    from models import FIELD_KEYS, ParsedResume
+    from triage import DocumentTriage, triage_document
+except ImportError:
+    from resume_parser.text_extractor import TextBlock, iter_document_blocks
+    from resume_parser.contact_mapper import extract_contact_info, taxonomy_version
+    from resume_parser.cancellation import CancelToken
+    from resume_parser.text_store import get_text_store
+    from resume_parser.models import FIELD_KEYS, ParsedResume
+    from resume_parser.triage import DocumentTriage, triage_document
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc')
+
+# Bump when a field extractor changes its output for the same text; skills
+# taxonomy changes are picked up through taxonomy_version()
+PARSER_VERSION = "2"
+
+# Quality assumed for OCR'd pages without a measured Tesseract confidence
+OCR_UNSCORED_QUALITY = 0.7
+
+
+def extractor_version() -> str:
+    """Version of the local field extractors, e.g. '1+3fa2c01b9e4d'"""
+    return f"{PARSER_VERSION}+{taxonomy_version()}"
+
+
+def extract_scored_text(
+    file_content: bytes,
+    file_extension: str,
+    cancel_token: Optional[CancelToken] = None,
+    ocr: bool = True,
+    on_block: Optional[Callable[[TextBlock], None]] = None,
+    plan: Optional[DocumentTriage] = None,
+) -> Tuple[str, float]:
+    """
+    Run the local text extractor for the file type and score the text
+
+    Text is streamed page by page (or block by block for DOCX), so only the
+    text itself, not the parser's per-page state, is kept for the document.
+
+    Args:
+        file_content: Raw file bytes
+        file_extension: Lowercased extension including the dot
+        cancel_token: Optional cancel token checked between pages
+        ocr: OCR PDFs without a text layer (False: text layer only)
+        on_block: Called with each block as soon as it is extracted
+        plan: Triage of the document; picks the text, hybrid or OCR pipeline
+
+    Returns:
+        (extracted text, "" for unsupported types; its quality from 0 to 1,
+        see text_quality)
+    """
+    blocks = []
+    for block in iter_document_blocks(file_content, file_extension, cancel_token, ocr_fallback=ocr, plan=plan):
+        blocks.append(block)
+        if on_block is not None:
+            on_block(block)
+    return "\n".join(block.text for block in blocks).strip(), text_quality(blocks)
+
+
+def extract_text(
+    file_content: bytes,
+    file_extension: str,
+    cancel_token: Optional[CancelToken] = None,
+    ocr: bool = True,
+    plan: Optional[DocumentTriage] = None,
+) -> str:
+    """
+    Run the local text extractor for the file type
+
+    Args:
+        file_content: Raw file bytes
+        file_extension: Lowercased extension including the dot
+        cancel_token: Optional cancel token checked between pages
+        ocr: OCR PDFs without a text layer (False: text layer only)
+        plan: Triage of the document; picks the text, hybrid or OCR pipeline
+
+    Returns:
+        Extracted text ("" for unsupported types)
+    """
+    return extract_scored_text(file_content, file_extension, cancel_token, ocr, plan=plan)[0]
+
+
+def text_quality(blocks: Iterable[TextBlock]) -> float:
+    """
+    How far extracted text can be trusted, from 0 to 1
+
+    Text layers and DOCX text count as exact. OCR'd pages count by their
+    Tesseract confidence (OCR_UNSCORED_QUALITY when it was not measured),
+    weighted by characters.
+
+    Args:
+        blocks: Blocks the text was joined from
+
+    Returns:
+        Quality score (0.0 when there is no text)
+    """
+    weighted = 0.0
+    chars = 0
+    for block in blocks:
+        if block.engine != "ocr":
+            quality = 1.0
+        elif block.confidence is not None:
+            quality = block.confidence / 100
+        else:
+            quality = OCR_UNSCORED_QUALITY
+        weighted += quality * block.char_count
+        chars += block.char_count
+    return round(weighted / chars, 3) if chars else 0.0
+
+
+def page_stats(blocks: List[TextBlock]) -> Dict[str, Any]:
+    """
+    Summarize how a document's text was extracted
+
+    Args:
+        blocks: Blocks the text was joined from
+
+    Returns:
+        Block count, blocks per engine, OCR'd pages, characters, extraction
+        time and text quality
+    """
+    engines: Dict[str, int] = {}
+    for block in blocks:
+        engines[block.engine] = engines.get(block.engine, 0) + 1
+    return {
+        "blocks": len(blocks),
+        "pages": sum(1 for block in blocks if block.kind == "page"),
+        "engines": engines,
+        "ocr_pages": engines.get("ocr", 0),
+        "chars": sum(block.char_count for block in blocks),
+        "extract_ms": round(sum(block.elapsed_ms for block in blocks), 1),
+        "quality": text_quality(blocks),
+    }
+
+
+def build_parsed_resume(
+    file_path: str,
+    file_extension: str,
+    extracted_text: str,
+    contact_info: Dict[str, Any],
+    degraded: bool = False,
+) -> ParsedResume:
+    """
+    Build the typed parse result
+
+    Args:
+        file_path: Original path or URL of the resume
+        file_extension: Lowercased file extension
+        extracted_text: Full resume text
+        contact_info: Fields from extract_contact_info or the Affinda mapping
+        degraded: Produced by the overload fast path (no OCR, Affinda or skills)
+
+    Returns:
+        ParsedResume
+    """
+    return ParsedResume.from_contact_info(file_path, file_extension, extracted_text, contact_info, degraded)
+
+
+def build_parse_response(
+    file_path: str,
+    file_extension: str,
+    extracted_text: str,
+    contact_info: Dict[str, Any],
+    degraded: bool = False,
+) -> Dict[str, Any]:
+    """
+    Build the flat /parse payload the Express backend expects
+
+    Same arguments as build_parsed_resume.
+
+    Returns:
+        Response dictionary
+    """
+    return build_parsed_resume(file_path, file_extension, extracted_text, contact_info, degraded).to_response()
+
+
+def extract_fields(text: str) -> Dict[str, Any]:
+    """
+    Run the local field extractors over already extracted text
+
+    Args:
+        text: Resume text
+
+    Returns:
+        The FIELD_KEYS entries of the /parse payload
+    """
+    return build_parsed_resume("", "", text, extract_contact_info(text)).fields()
+
+
+def store_parse(resume: ParsedResume) -> None:
+    """
+    Keep the text and fields of a locally parsed resume in the text store
+
+    Does nothing when TEXT_STORE_DIR is unset. Store failures are logged
+    and never fail the parse.
+
+    Args:
+        resume: Parse result whose fields came from the local extractors
+    """
+    store = get_text_store()
+    if store is None or not resume.text:
+        return
+    try:
+        store.record(resume.file_path, resume.text, resume.fields(), extractor_version())
+    except OSError as e:
+        logger.warning(f"Failed to store extracted text for {resume.file_path}: {e}")
+
+
+def parse_document(file_content: bytes, file_path: str) -> ParsedResume:
+    """
+    Parse a resume with the local extractors only
+
+    Args:
+        file_content: Raw file bytes
+        file_path: Path or identifier of the document (used for its extension)
+
+    Returns:
+        Parse result (to_response() gives the /parse payload)
+
+    Raises:
+        ValueError: Unsupported format, rejected by triage, or no text could
+            be extracted
+    """
+    file_extension = Path(file_path).suffix.lower()
+    if file_extension not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file format: {file_extension}")
+    plan = triage_document(file_content, file_extension)
+    if plan.rejected:
+        raise ValueError(plan.reason)
+
+    extracted_text = extract_text(file_content, file_extension, plan=plan)
+    if not extracted_text:
+        raise ValueError("Failed to extract text from the file. The file might be corrupted or empty.")
+
+    contact_info = extract_contact_info(extracted_text)
+    return build_parsed_resume(file_path, file_extension, extracted_text, contact_info)
@@ -0,0 +1,256 @@
+"""
+Profiling Module
+Opt-in, token-gated profiling of /parse requests: a CPU profile of the
+extraction work, a wall-clock flame graph of the extraction stages and
+allocation statistics. With no active session every hook is a no-op.
+"""
+import os
+import io
+import hmac
+import json
+import time
+import pstats
+import cProfile
+import logging
+import tempfile
+import threading
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Profiling is only available when a token is configured; callers must send
+# it in the X-Profile-Token header
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_OUTPUT_DIR = os.getenv("PROFILE_OUTPUT_DIR", os.path.join(tempfile.gettempdir(), "resume-parser-profiles"))
+
+# Longest profiling window that can be requested, in seconds
+MAX_WINDOW_SECONDS = 600
+
+# Number of functions / allocation sites included in reports
+REPORT_TOP = 30
+
+_session: ContextVar[Optional["ProfileSession"]] = ContextVar("profile_session", default=None)
+_stage_path: ContextVar[Tuple[str, ...]] = ContextVar("profile_stage_path", default=())
+
+# tracemalloc is process-wide; overlapping sessions share one tracing period,
+# and tracing started elsewhere (/debug/memory) is left running
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _acquire_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracing() -> None:
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+class ProfileSession:
+    """Collects stage timings, CPU profiles and allocations for one request"""
+
+    def __init__(self, label: str, capture_allocations: bool = True, capture_cpu: bool = True):
+        self.label = label
+        self.capture_allocations = capture_allocations
+        self.capture_cpu = capture_cpu
+        self.started = time.perf_counter()
+        self.wall_ms = 0.0
+        self.stages: List[Tuple[str, float]] = []
+        self._profiles: List[cProfile.Profile] = []
+        self._alloc_start: Optional[tracemalloc.Snapshot] = None
+        self._alloc_top: List[Dict[str, Any]] = []
+
+    def start(self) -> None:
+        if self.capture_allocations:
+            _acquire_tracing()
+            self._alloc_start = tracemalloc.take_snapshot()
+
+    def finish(self) -> None:
+        self.wall_ms = round((time.perf_counter() - self.started) * 1000, 2)
+        if self._alloc_start is not None:
+            diff = tracemalloc.take_snapshot().compare_to(self._alloc_start, "lineno")[:REPORT_TOP]
+            self._alloc_top = [
+                {
+                    "location": str(stat.traceback[0]),
+                    "size_diff_kb": round(stat.size_diff / 1024, 1),
+                    "count_diff": stat.count_diff,
+                }
+                for stat in diff
+            ]
+            self._alloc_start = None
+            _release_tracing()
+
+    def record_stage(self, path: Tuple[str, ...], duration_ms: float) -> None:
+        self.stages.append((";".join(path), duration_ms))
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking function under cProfile (in whichever thread calls this)"""
+        if not self.capture_cpu:
+            return func(*args, **kwargs)
+        profiler = cProfile.Profile()
+        self._profiles.append(profiler)
+        return profiler.runcall(func, *args, **kwargs)
+
+    def collapsed_stacks(self) -> List[str]:
+        """
+        Stage timings in collapsed-stack format ("a;b;c <microseconds>"),
+        ready for flamegraph.pl or speedscope. Values are self time.
+        """
+        totals: Dict[str, float] = {}
+        for path, duration in self.stages:
+            totals[path] = totals.get(path, 0.0) + duration
+        child_time: Dict[str, float] = {}
+        for path, duration in totals.items():
+            parent, sep, _ = path.rpartition(";")
+            if sep:
+                child_time[parent] = child_time.get(parent, 0.0) + duration
+        return [
+            f"{path} {max(0, int((duration - child_time.get(path, 0.0)) * 1000))}"
+            for path, duration in totals.items()
+        ]
+
+    def _stats(self) -> Optional[pstats.Stats]:
+        if not self._profiles:
+            return None
+        stats = pstats.Stats(self._profiles[0], stream=io.StringIO())
+        for profiler in self._profiles[1:]:
+            stats.add(profiler)
+        return stats
+
+    def cpu_summary(self) -> str:
+        stats = self._stats()
+        if stats is None:
+            return ""
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats("cumulative").print_stats(REPORT_TOP)
+        return stream.getvalue()
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "label": self.label,
+            "wall_ms": self.wall_ms,
+            "stages": [{"stage": path, "ms": duration} for path, duration in self.stages],
+            "flamegraph": self.collapsed_stacks(),
+            "cpu": self.cpu_summary(),
+            "allocations": self._alloc_top,
+        }
+
+    def save(self, directory: str) -> Dict[str, str]:
+        """
+        Write the profile to `directory`
+
+        Returns:
+            Paths of the cProfile dump (.prof), collapsed stacks (.folded)
+            and JSON report (.json)
+        """
+        out_dir = Path(directory)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        base = out_dir / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{id(self):x}"
+        paths = {}
+
+        stats = self._stats()
+        if stats is not None:
+            paths["cpu"] = str(base.with_suffix(".prof"))
+            stats.dump_stats(paths["cpu"])
+        paths["flamegraph"] = str(base.with_suffix(".folded"))
+        Path(paths["flamegraph"]).write_text("\n".join(self.collapsed_stacks()) + "\n")
+        paths["report"] = str(base.with_suffix(".json"))
+        Path(paths["report"]).write_text(json.dumps(self.report(), indent=2))
+        return paths
+
+
+def current_session() -> Optional[ProfileSession]:
+    return _session.get()
+
+
+@contextmanager
+def activate(session: ProfileSession) -> Iterator[ProfileSession]:
+    """Make `session` current for this context (and threads started from it)"""
+    token = _session.set(session)
+    session.start()
+    try:
+        yield session
+    finally:
+        session.finish()
+        _session.reset(token)
+
+
+@contextmanager
+def _timed_stage(session: ProfileSession, name: str) -> Iterator[None]:
+    path = _stage_path.get() + (name,)
+    token = _stage_path.set(path)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        session.record_stage(path, round((time.perf_counter() - start) * 1000, 3))
+        _stage_path.reset(token)
+
+
+@contextmanager
+def _null_stage() -> Iterator[None]:
+    yield
+
+
+def stage(name: str):
+    """
+    Time a named extraction stage for the flame graph
+
+    Stages nest, so a stage opened inside another shows up under it.
+    Without an active session this returns a no-op context manager.
+    """
+    session = _session.get()
+    if session is None:
+        return _null_stage()
+    return _timed_stage(session, name)
+
+
+def profiled_call(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Call `func`, under cProfile if a session is active"""
+    session = _session.get()
+    if session is None:
+        return func(*args, **kwargs)
+    return session.call(func, *args, **kwargs)
+
+
+class ProfilingController:
+    """Token check and time-window state for request profiling"""
+
+    def __init__(self, token: str = PROFILING_TOKEN, output_dir: str = PROFILE_OUTPUT_DIR):
+        self.token = token
+        self.output_dir = output_dir
+        self.window_until = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.token)
+
+    def authorized(self, supplied: Optional[str]) -> bool:
+        return self.enabled and supplied is not None and hmac.compare_digest(supplied.encode(), self.token.encode())
+
+    def open_window(self, seconds: float) -> float:
+        """Profile every parse for the next `seconds`; returns the window end (epoch)"""
+        seconds = min(max(seconds, 0.0), MAX_WINDOW_SECONDS)
+        self.window_until = time.time() + seconds
+        logger.info(f"Profiling window open for {seconds:.0f}s; profiles go to {self.output_dir}")
+        return self.window_until
+
+    @property
+    def window_active(self) -> bool:
+        return time.time() < self.window_until
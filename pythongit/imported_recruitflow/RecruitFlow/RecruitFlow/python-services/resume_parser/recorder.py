@@ -0,0 +1,295 @@
+"""
+Traffic Recorder Module
+Opt-in capture of production /parse traffic for offline replay: the document
+(its bytes, or only its content hash), request parameters, stage timings,
+Affinda responses and the response, written to a local archive that
+replay.py re-runs against a new build. Personal data in the recorded output
+is replaced by keyed digests, so outputs can still be compared without
+being readable.
+"""
+import os
+import json
+import time
+import uuid
+import random
+import hashlib
+import logging
+import secrets
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Archive directory (unset disables recording)
+RECORD_DIR = os.getenv("RECORD_DIR", "")
+
+# Share of /parse requests recorded
+RECORD_SAMPLE_RATE = float(os.getenv("RECORD_SAMPLE_RATE", "1.0"))
+
+# "bytes" keeps each document in the archive, unredacted (the raw resume);
+# "hash" keeps only its content hash, and replay needs the original files
+RECORD_DOCUMENTS = os.getenv("RECORD_DOCUMENTS", "bytes").lower()
+
+# Recorded fields replaced by digests. "affinda" drops Affinda responses,
+# which hold the resume transcript and contact details verbatim; remove it
+# to keep them for replay (replay cannot reproduce fields taken from them)
+RECORD_REDACT = os.getenv("RECORD_REDACT", "name,email,phone,address,location,linkedin,text,file_path,affinda")
+
+# Stop recording once the archive holds this much
+RECORD_MAX_MB = float(os.getenv("RECORD_MAX_MB", "1024"))
+
+REDACTED_PREFIX = "redacted:"
+
+_recording: ContextVar[Optional["Recording"]] = ContextVar("parse_recording", default=None)
+
+
+def document_key(content: bytes) -> str:
+    """Content hash naming a recorded document"""
+    return hashlib.blake2b(content, digest_size=20).hexdigest()
+
+
+def redact_value(value: Any, salt: bytes) -> Any:
+    """
+    Replace a value with a keyed digest
+
+    Empty values are kept, so a field going missing still shows in a diff.
+    """
+    if value in (None, "", [], {}):
+        return value
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return REDACTED_PREFIX + hashlib.blake2b(data, key=salt, digest_size=8).hexdigest()
+
+
+def redact_output(output: Dict[str, Any], fields: List[str], salt: bytes) -> Dict[str, Any]:
+    """Copy of a /parse payload with `fields` redacted"""
+    return {key: redact_value(value, salt) if key in fields else value for key, value in output.items()}
+
+
+def stage_totals(stages: List[Any]) -> Dict[str, float]:
+    """Sum (path, ms) stage timings by path"""
+    totals: Dict[str, float] = {}
+    for path, duration in stages:
+        totals[path] = round(totals.get(path, 0.0) + duration, 3)
+    return totals
+
+
+class Recording:
+    """What one recorded request saw, filled in while it runs"""
+
+    def __init__(self, file_path: str, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.recorded_at = time.time()
+        self.file_path = file_path
+        self.params = params
+        self.content: Optional[bytes] = None
+        self.file_type = ""
+        self.affinda: List[Dict[str, Any]] = []
+
+
+@contextmanager
+def record_into(recording: Optional[Recording]) -> Iterator[None]:
+    """Make `recording` current for this context (a no-op for None)"""
+    if recording is None:
+        yield
+        return
+    token = _recording.set(recording)
+    try:
+        yield
+    finally:
+        _recording.reset(token)
+
+
+def note_document(content: bytes, file_extension: str) -> None:
+    """Hook: the document bytes being parsed"""
+    recording = _recording.get()
+    if recording is not None and recording.content is None:
+        recording.content = content
+        recording.file_type = file_extension
+
+
+def note_affinda(response: Any = None, text: str = "", error: Optional[str] = None) -> None:
+    """Hook: an Affinda call and its result or error, in call order"""
+    recording = _recording.get()
+    if recording is not None:
+        recording.affinda.append({"response": response, "text": text, "error": error})
+
+
+class TrafficRecorder:
+    """
+    Archive layout:
+        salt                        key for the redaction digests
+        documents/ab/<key>.bin      document bytes (RECORD_DOCUMENTS=bytes)
+        records-<pid>.ndjson        one JSON record per request, per process
+    """
+
+    def __init__(
+        self,
+        directory: str = RECORD_DIR,
+        sample_rate: float = RECORD_SAMPLE_RATE,
+        documents: str = RECORD_DOCUMENTS,
+        redact: str = RECORD_REDACT,
+        max_mb: float = RECORD_MAX_MB,
+    ):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.store_documents = documents != "hash"
+        self.redact = [field.strip() for field in redact.split(",") if field.strip()]
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self._salt: Optional[bytes] = None
+        self._archive_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self.recorded = 0
+        self.skipped_full = 0
+        self.failed = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.directory) and self.sample_rate > 0
+
+    def begin(self, file_path: str, params: Dict[str, Any]) -> Optional[Recording]:
+        """
+        Decide whether to record a request
+
+        Returns:
+            A Recording to make current with record_into, or None when
+            recording is off or the request is not sampled
+        """
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        return Recording(file_path, params)
+
+    def salt(self) -> bytes:
+        """The archive's redaction key, created with the archive"""
+        if self._salt is None:
+            self._salt = load_salt(self.directory, create=True)
+        return self._salt
+
+    def finish(
+        self,
+        recording: Recording,
+        stages: List[Any],
+        latency_ms: float,
+        output: Optional[Dict[str, Any]] = None,
+        status_code: int = 200,
+        error: Optional[str] = None,
+    ) -> Optional[str]:
+        """
+        Write a finished request to the archive
+
+        Requests that never reached extraction (e.g. a failed download, or
+        a request coalesced onto another's parse) have no document and are
+        not recorded. Write failures are logged and never fail the request.
+
+        Args:
+            recording: From begin
+            stages: (path, ms) stage timings of the request
+            latency_ms: Wall time of the request
+            output: /parse payload, for successful requests
+            status_code: HTTP status returned
+            error: Error detail, for failed requests
+
+        Returns:
+            Record id, or None if nothing was written
+        """
+        if recording.content is None:
+            return None
+        try:
+            with self._lock:
+                if self._archive_bytes is None:
+                    self._archive_bytes = _directory_size(Path(self.directory))
+                if self._archive_bytes >= self.max_bytes:
+                    self.skipped_full += 1
+                    return None
+                salt = self.salt()
+                key = document_key(recording.content)
+                stored = False
+                if self.store_documents:
+                    path = Path(self.directory) / "documents" / key[:2] / f"{key}.bin"
+                    if not path.exists():
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        path.write_bytes(recording.content)
+                        self._archive_bytes += len(recording.content)
+                    stored = True
+                record = {
+                    "id": recording.id,
+                    "recorded_at": recording.recorded_at,
+                    "file_path": redact_value(recording.file_path, salt)
+                    if "file_path" in self.redact else recording.file_path,
+                    "file_type": recording.file_type,
+                    "document": {"key": key, "size": len(recording.content), "stored": stored},
+                    "params": recording.params,
+                    "affinda": [] if "affinda" in self.redact else recording.affinda,
+                    "affinda_redacted": "affinda" in self.redact and bool(recording.affinda),
+                    "stages": stage_totals(stages),
+                    "latency_ms": latency_ms,
+                    "status_code": status_code,
+                    "error": error,
+                    "output": redact_output(output, self.redact, salt) if output is not None else None,
+                    "redacted": self.redact,
+                }
+                line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+                with open(Path(self.directory) / f"records-{os.getpid()}.ndjson", "a", encoding="utf-8") as f:
+                    f.write(line)
+                self._archive_bytes += len(line)
+                self.recorded += 1
+                return recording.id
+        except OSError as e:
+            self.failed += 1
+            logger.warning(f"Failed to record parse of {recording.file_path}: {e}")
+            return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "recorded": self.recorded,
+            "skipped_full": self.skipped_full,
+            "failed": self.failed,
+        }
+
+
+def load_salt(directory: str, create: bool = False) -> bytes:
+    """
+    Read (or create) the redaction key of an archive
+
+    Raises:
+        FileNotFoundError: The archive has no key and create is False
+    """
+    path = Path(directory) / "salt"
+    if not path.exists() and create:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(secrets.token_hex(16))
+    return bytes.fromhex(path.read_text().strip())
+
+
+def _directory_size(root: Path) -> int:
+    if not root.exists():
+        return 0
+    return sum(path.stat().st_size for path in root.rglob("*") if path.is_file())
+
+
+def iter_records(directory: str) -> Iterator[Dict[str, Any]]:
+    """Yield every record in an archive, oldest first"""
+    records = []
+    for path in sorted(Path(directory).glob("records-*.ndjson")):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # A line cut short by a crash
+                        logger.warning(f"Skipping unreadable record in {path}")
+    yield from sorted(records, key=lambda record: record["recorded_at"])
+
+
+def load_document(directory: str, key: str) -> Optional[bytes]:
+    """Bytes of a recorded document, or None if only its hash was kept"""
+    path = Path(directory) / "documents" / key[:2] / f"{key}.bin"
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,158 @@
+"""
+Batch Field Re-extraction
+Reruns the local field extractors over the text store after the skills
+taxonomy or an extractor changes, without re-downloading or re-parsing any
+file. Documents already at the current extractor version are skipped, and
+only documents whose fields changed are written out (NDJSON), so the output
+can be applied to candidates directly.
+
+Usage:
+    python reextract.py --store /var/lib/resume-text -o changed.ndjson
+"""
+import os
+import sys
+import json
+import argparse
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    from pipeline import FIELD_KEYS, extract_fields, extractor_version
+    from text_store import TEXT_STORE_DIR, TextStore
+except ImportError:
+    from resume_parser.pipeline import FIELD_KEYS, extract_fields, extractor_version
+    from resume_parser.text_store import TEXT_STORE_DIR, TextStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 200
+
+
+def reextract_chunk(store_root: str, doc_ids: List[str], version: str) -> Dict[str, Any]:
+    """
+    Re-extract the fields of a chunk of stored documents
+
+    Each document's record is updated to the new fields and version, so an
+    interrupted run picks up where it stopped.
+
+    Args:
+        store_root: Text store directory
+        doc_ids: Documents to process
+        version: Current extractor version
+
+    Returns:
+        {"changed": [change records], "unchanged": n, "failed": n}
+    """
+    store = TextStore(store_root)
+    changed = []
+    unchanged = failed = 0
+    for doc_id in doc_ids:
+        try:
+            record = store.load_document(doc_id)
+            fields = extract_fields(store.get_text(record["text_key"]))
+        except Exception as e:
+            logger.warning(f"Re-extraction of {doc_id} failed: {e}")
+            failed += 1
+            continue
+        previous = record.get("fields") or {}
+        changed_keys = [key for key in FIELD_KEYS if fields.get(key) != previous.get(key)]
+        store.save_document(doc_id, record["text_key"], fields, version)
+        if changed_keys:
+            changed.append(dict(
+                fields,
+                file_path=doc_id,
+                version=version,
+                previous_version=record.get("version"),
+                changed=changed_keys,
+            ))
+        else:
+            unchanged += 1
+    return {"changed": changed, "unchanged": unchanged, "failed": failed}
+
+
+def _chunks(doc_ids: List[str], size: int) -> Iterator[List[str]]:
+    for start in range(0, len(doc_ids), size):
+        yield doc_ids[start:start + size]
+
+
+def run_reextract(
+    store_root: str,
+    output: str,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    force: bool = False,
+) -> Dict[str, Any]:
+    """
+    Re-extract every stale document in the store and write the changed ones
+
+    Args:
+        store_root: Text store directory
+        output: NDJSON file for the change records
+        workers: Worker processes (defaults to all cores; 1 runs in-process)
+        chunk_size: Documents handed to a worker at a time
+        force: Also re-extract documents already at the current version
+
+    Returns:
+        Counts of changed, unchanged, up-to-date and failed documents, and
+        the extractor version applied
+    """
+    version = extractor_version()
+    store = TextStore(store_root)
+    doc_ids = []
+    up_to_date = 0
+    for record in store.iter_documents():
+        if record.get("version") == version and not force:
+            up_to_date += 1
+        else:
+            doc_ids.append(record["doc_id"])
+
+    workers = workers or os.cpu_count() or 1
+    counts = {"changed": 0, "unchanged": 0, "up_to_date": up_to_date, "failed": 0, "version": version}
+    with open(output, "w", encoding="utf-8") as stream:
+        if workers <= 1:
+            results = (reextract_chunk(store_root, chunk, version) for chunk in _chunks(doc_ids, chunk_size))
+            for result in results:
+                _write_result(stream, result, counts)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                chunks = list(_chunks(doc_ids, chunk_size))
+                for result in executor.map(reextract_chunk, [store_root] * len(chunks), chunks, [version] * len(chunks)):
+                    _write_result(stream, result, counts)
+    return counts
+
+
+def _write_result(stream, result: Dict[str, Any], counts: Dict[str, Any]) -> None:
+    for record in result["changed"]:
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+    stream.flush()
+    counts["changed"] += len(result["changed"])
+    counts["unchanged"] += result["unchanged"]
+    counts["failed"] += result["failed"]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-extract resume fields from stored text")
+    parser.add_argument("--store", default=TEXT_STORE_DIR, help="Text store directory (default: $TEXT_STORE_DIR)")
+    parser.add_argument("-o", "--output", required=True, help="NDJSON file for documents whose fields changed")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Documents per worker task")
+    parser.add_argument("--force", action="store_true", help="Also re-extract documents at the current version")
+    args = parser.parse_args(argv)
+    if not args.store:
+        parser.error("--store is required when TEXT_STORE_DIR is not set")
+
+    logging.basicConfig(level=logging.WARNING)
+    counts = run_reextract(
+        args.store,
+        args.output,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        force=args.force,
+    )
+    print(json.dumps(counts))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
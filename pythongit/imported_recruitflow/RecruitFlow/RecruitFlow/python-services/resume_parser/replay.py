@@ -0,0 +1,336 @@
+"""
+Traffic Replay
+Re-runs a recorded /parse archive (see recorder.py) against the current
+build, offline and deterministically. Documents come from the archive,
+Affinda answers with the responses recorded for each document, and the OCR
+cache and text store are bypassed. Documents run one at a time. Writes one
+NDJSON line per document with the extraction latency delta, per-stage deltas
+and output differences, and prints a summary.
+
+Usage (from python-services/):
+    python -m resume_parser.replay /var/lib/parse-records -o replay.ndjson
+"""
+import os
+import sys
+import json
+import asyncio
+import argparse
+import logging
+import statistics
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException
+
+try:
+    import main as service
+    import ocr_cache
+    import text_store
+    from profiling import ProfileSession, activate, stage
+    from recorder import document_key, iter_records, load_document, load_salt, redact_output, stage_totals
+except ImportError:
+    import resume_parser.main as service
+    import resume_parser.ocr_cache as ocr_cache
+    import resume_parser.text_store as text_store
+    from resume_parser.profiling import ProfileSession, activate, stage
+    from resume_parser.recorder import (
+        document_key, iter_records, load_document, load_salt, redact_output, stage_totals
+    )
+
+logger = logging.getLogger(__name__)
+
+# Stage compared between recording and replay: the extraction itself,
+# without the download and queueing that only production has
+EXTRACTION_STAGE = "parse;extraction"
+
+# Response entries that differ between runs by design
+IGNORED_FIELDS = ("file_path", "reparse_id", "profile")
+
+# Response entries filled from each field Affinda can take over
+AFFINDA_RESPONSE_FIELDS = {"full_name": ("name",), "address": ("address", "location")}
+
+
+@contextmanager
+def offline() -> Iterator[None]:
+    """Bypass the OCR cache and text store, so every replay does the full work"""
+    saved = (ocr_cache._cache, text_store.TEXT_STORE_DIR)
+    ocr_cache._cache = ocr_cache.OCRPageCache(memory_bytes=0)
+    text_store.TEXT_STORE_DIR = ""
+    try:
+        yield
+    finally:
+        ocr_cache._cache, text_store.TEXT_STORE_DIR = saved
+
+
+@contextmanager
+def recorded_affinda(record: Dict[str, Any]) -> Iterator[None]:
+    """
+    Answer Affinda calls with the recorded responses, in order
+
+    A call with no recorded response (the new build escalates where the
+    recorded one did not) fails like an Affinda outage, so local fields
+    are kept.
+    """
+    pending = list(record.get("affinda") or [])
+    params = record.get("params") or {}
+
+    async def stub(file_bytes: bytes, filename: str = "resume", api_key: Optional[str] = None):
+        if not pending:
+            raise RuntimeError("No recorded Affinda response")
+        call = pending.pop(0)
+        if call.get("error"):
+            raise RuntimeError(call["error"])
+        return call["response"], call["text"]
+
+    saved = (service.parse_with_affinda, service.AFFINDA_MODE, os.environ.get("AFFINDA_API_KEY"))
+    service.parse_with_affinda = stub
+    service.AFFINDA_MODE = params.get("affinda_mode", service.AFFINDA_MODE)
+    if params.get("affinda_available"):
+        os.environ["AFFINDA_API_KEY"] = "replay"
+    else:
+        os.environ.pop("AFFINDA_API_KEY", None)
+    try:
+        yield
+    finally:
+        service.parse_with_affinda, service.AFFINDA_MODE, key = saved
+        if key is None:
+            os.environ.pop("AFFINDA_API_KEY", None)
+        else:
+            os.environ["AFFINDA_API_KEY"] = key
+
+
+async def replay_document(record: Dict[str, Any], content: bytes) -> Dict[str, Any]:
+    """
+    Parse one recorded document with the current build
+
+    Args:
+        record: Archive record
+        content: Document bytes
+
+    Returns:
+        {"output", "status_code", "error", "latency_ms", "stages"}
+    """
+    file_extension = record["file_type"]
+    # Only the basename reaches Affinda, which is stubbed anyway
+    file_path = f"replay{file_extension}"
+    degraded = bool((record.get("output") or {}).get("degraded"))
+    session = ProfileSession(label=record["id"], capture_allocations=False, capture_cpu=False)
+    output, status_code, error = None, 200, None
+    try:
+        with recorded_affinda(record), activate(session), stage("parse"), stage("extraction"):
+            run = service.run_fast_extraction if degraded else service.run_extraction
+            resume = await run(file_path, file_extension, content)
+        output = resume.to_response()
+    except Exception as e:
+        http_error = e if isinstance(e, HTTPException) else service.parse_error(e, file_path, "background")
+        status_code, error = http_error.status_code, str(http_error.detail)
+    return {
+        "output": output,
+        "status_code": status_code,
+        "error": error,
+        "latency_ms": session.wall_ms,
+        "stages": stage_totals(session.stages),
+    }
+
+
+def diff_outputs(recorded: Optional[Dict[str, Any]], replayed: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fields whose values differ, as {field: {"recorded": ..., "replayed": ...}}"""
+    recorded, replayed = recorded or {}, replayed or {}
+    diff = {}
+    for field in list(recorded) + [field for field in replayed if field not in recorded]:
+        if field in IGNORED_FIELDS:
+            continue
+        if recorded.get(field) != replayed.get(field):
+            diff[field] = {"recorded": recorded.get(field), "replayed": replayed.get(field)}
+    return diff
+
+
+def _delta(recorded: Optional[float], replayed: Optional[float]) -> Dict[str, Any]:
+    entry: Dict[str, Any] = {"recorded": recorded, "replayed": replayed}
+    if recorded is not None and replayed is not None:
+        entry["delta"] = round(replayed - recorded, 3)
+        entry["delta_pct"] = round((replayed - recorded) / recorded * 100, 1) if recorded else None
+    return entry
+
+
+def compare(record: Dict[str, Any], runs: List[Dict[str, Any]], salt: Optional[bytes]) -> Dict[str, Any]:
+    """
+    Report line for one document
+
+    Args:
+        record: Archive record
+        runs: Results of replay_document, one per repeat
+        salt: Archive redaction key (None when nothing was redacted)
+
+    Returns:
+        Latency and stage deltas (replay medians), changed fields and diff
+    """
+    first = runs[0]
+    output = first["output"]
+    if output is not None and record.get("redacted") and salt is not None:
+        output = redact_output(output, record["redacted"], salt)
+    diff = diff_outputs(record.get("output"), output)
+    unverified: List[str] = []
+    if record.get("affinda_redacted"):
+        # Affinda's answers were not kept, so replay cannot reproduce the
+        # fields that were taken from them
+        unverified = list((record.get("output") or {}).get("affinda_fields") or [])
+        for field in unverified:
+            for entry in AFFINDA_RESPONSE_FIELDS.get(field, (field,)):
+                diff.pop(entry, None)
+        diff.pop("affinda_fields", None)
+        confidence = diff.get("confidence")
+        if confidence and all(isinstance(value, dict) for value in confidence.values()):
+            recorded, replayed = (
+                {key: value for key, value in confidence[side].items() if key not in unverified}
+                for side in ("recorded", "replayed")
+            )
+            if recorded == replayed:
+                del diff["confidence"]
+
+    stages = {}
+    for path in sorted(set(record.get("stages") or {}) | set(first["stages"])):
+        replayed = [run["stages"][path] for run in runs if path in run["stages"]]
+        stages[path] = _delta((record.get("stages") or {}).get(path),
+                              round(statistics.median(replayed), 3) if replayed else None)
+    extraction = stages.get(EXTRACTION_STAGE)
+    if not extraction or "delta" not in extraction:
+        # Records without the stage (coalesced or failed early): whole request
+        extraction = _delta(record.get("latency_ms"), statistics.median(run["latency_ms"] for run in runs))
+
+    return {
+        "id": record["id"],
+        "file_type": record["file_type"],
+        "status": "changed" if diff or record.get("status_code") != first["status_code"] else "unchanged",
+        "status_code": {"recorded": record.get("status_code"), "replayed": first["status_code"]},
+        "error": first["error"],
+        "extraction_ms": extraction,
+        "stages": stages,
+        "changed": list(diff),
+        "diff": diff,
+        "unverified": unverified,
+        "nondeterministic": any(run["output"] != first["output"] for run in runs[1:]),
+    }
+
+
+def index_documents(directory: str) -> Dict[str, Path]:
+    """Content hash -> path of every file under `directory` (for hash-only archives)"""
+    index = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            path = Path(root) / name
+            try:
+                index[document_key(path.read_bytes())] = path
+            except OSError:
+                continue
+    return index
+
+
+def find_document(archive: str, record: Dict[str, Any], originals: Dict[str, Path]) -> Optional[bytes]:
+    key = record["document"]["key"]
+    content = load_document(archive, key)
+    if content is not None:
+        return content
+    candidates = [originals[key]] if key in originals else []
+    if os.path.isfile(record.get("file_path") or ""):
+        candidates.append(Path(record["file_path"]))
+    for path in candidates:
+        content = path.read_bytes()
+        if document_key(content) == key:
+            return content
+    return None
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 3)
+
+
+def run_replay(
+    archive: str,
+    output: str,
+    documents: Optional[str] = None,
+    repeat: int = 1,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Replay an archive and write the per-document report
+
+    Args:
+        archive: Recorder archive directory
+        output: NDJSON report file
+        documents: Directory of original files, for hash-only archives
+        repeat: Runs per document (latencies are medians)
+        limit: Replay at most this many records
+
+    Returns:
+        Summary: counts, changes by field and extraction latency deltas
+    """
+    try:
+        salt: Optional[bytes] = load_salt(archive)
+    except FileNotFoundError:
+        salt = None
+    originals = index_documents(documents) if documents else {}
+    summary: Dict[str, Any] = {"records": 0, "replayed": 0, "missing": 0, "changed": 0, "changed_by_field": {}}
+    recorded_ms: List[float] = []
+    replayed_ms: List[float] = []
+    deltas: List[float] = []
+
+    loop = asyncio.new_event_loop()
+    try:
+        with offline(), open(output, "w", encoding="utf-8") as stream:
+            for record in iter_records(archive):
+                if limit is not None and summary["records"] >= limit:
+                    break
+                summary["records"] += 1
+                content = find_document(archive, record, originals)
+                if content is None:
+                    summary["missing"] += 1
+                    stream.write(json.dumps({"id": record["id"], "status": "missing"}) + "\n")
+                    continue
+                runs = [loop.run_until_complete(replay_document(record, content)) for _ in range(max(1, repeat))]
+                line = compare(record, runs, salt)
+                stream.write(json.dumps(line, ensure_ascii=False) + "\n")
+                summary["replayed"] += 1
+                if line["status"] == "changed":
+                    summary["changed"] += 1
+                    for field in line["changed"] or ["status_code"]:
+                        summary["changed_by_field"][field] = summary["changed_by_field"].get(field, 0) + 1
+                timing = line["extraction_ms"]
+                if timing.get("delta") is not None:
+                    recorded_ms.append(timing["recorded"])
+                    replayed_ms.append(timing["replayed"])
+                    deltas.append(timing["delta"])
+    finally:
+        loop.close()
+
+    summary["extraction_ms"] = {
+        "recorded_median": round(statistics.median(recorded_ms), 3) if recorded_ms else None,
+        "replayed_median": round(statistics.median(replayed_ms), 3) if replayed_ms else None,
+        "delta_median": round(statistics.median(deltas), 3) if deltas else None,
+        "delta_p95": _percentile(deltas, 0.95),
+    }
+    return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay recorded /parse traffic against this build")
+    parser.add_argument("archive", help="Recorder archive directory (RECORD_DIR)")
+    parser.add_argument("-o", "--output", required=True, help="NDJSON report, one line per document")
+    parser.add_argument("--documents", help="Directory of original files, for archives recorded with hashes only")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per document; latencies are medians")
+    parser.add_argument("--limit", type=int, default=None, help="Replay at most this many records")
+    args = parser.parse_args(argv)
+
+    # main configures INFO logging on import; keep the report readable
+    logging.basicConfig(level=logging.WARNING, force=True)
+    summary = run_replay(args.archive, args.output, args.documents, args.repeat, args.limit)
+    print(json.dumps(summary))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,506 @@
+"""
+Replica Router
+Gateway mode for several parser replicas. Documents are routed by content
+hash over a consistent-hash ring, so repeat parses of a document land on the
+replica whose OCR cache, single-flight table and warm state already hold it.
+Replicas are health-checked; an unhealthy replica's documents go to the next
+replica on the ring, and adding a replica moves only about 1/n of the
+documents to it.
+
+Usage:
+    ROUTER_REPLICAS=http://localhost:8001,http://localhost:8002 python router.py
+"""
+import os
+import bisect
+import asyncio
+import hashlib
+import hmac
+import logging
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import httpx
+from fastapi import FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+import uvicorn
+
+try:
+    from single_flight import content_key
+except ImportError:
+    from resume_parser.single_flight import content_key
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated base URLs of the parser replicas
+ROUTER_REPLICAS = os.getenv("ROUTER_REPLICAS", "")
+
+# Points per replica on the ring; more points spread documents more evenly
+ROUTER_VNODES = int(os.getenv("ROUTER_VNODES", "160"))
+
+# Seconds between /health probes and per probe, and consecutive failures
+# (probes or forwarded requests) after which a replica leaves rotation
+ROUTER_HEALTH_INTERVAL = float(os.getenv("ROUTER_HEALTH_INTERVAL", "5"))
+ROUTER_HEALTH_TIMEOUT = float(os.getenv("ROUTER_HEALTH_TIMEOUT", "2"))
+ROUTER_FAIL_THRESHOLD = int(os.getenv("ROUTER_FAIL_THRESHOLD", "2"))
+
+# Timeout for a forwarded parse (OCR of long scans can take minutes)
+ROUTER_TIMEOUT = float(os.getenv("ROUTER_TIMEOUT", "300"))
+
+# Token for adding and removing replicas at runtime (unset disables it)
+ROUTER_ADMIN_TOKEN = os.getenv("ROUTER_ADMIN_TOKEN", "")
+
+# Request headers passed on to the replica
+FORWARDED_HEADERS = ("x-parse-deadline-ms", "x-profile-token")
+
+# Response headers that describe one connection, not the response, and are
+# not relayed; content-length is recomputed for the relayed body
+HOP_BY_HOP_HEADERS = frozenset({
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+    "te", "trailer", "transfer-encoding", "upgrade", "content-length",
+})
+
+# Separator between the replica id and the replica's own reparse id
+REPARSE_ID_SEPARATOR = "."
+
+
+def _ring_hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def replica_id(replica: str) -> str:
+    """Short stable id of a replica URL"""
+    return hashlib.blake2b(replica.encode("utf-8"), digest_size=4).hexdigest()
+
+
+class HashRing:
+    """
+    Consistent-hash ring of replicas with virtual nodes
+
+    Each replica is placed at `vnodes` points; a key belongs to the first
+    point clockwise from its hash. Adding or removing a replica only moves
+    the keys between its points and their predecessors.
+    """
+
+    def __init__(self, replicas: Iterable[str] = (), vnodes: int = ROUTER_VNODES):
+        self.vnodes = vnodes
+        self._points: List[int] = []
+        self._owners: List[str] = []
+        self._replicas: List[str] = []
+        for replica in replicas:
+            self.add(replica)
+
+    @property
+    def replicas(self) -> List[str]:
+        return list(self._replicas)
+
+    def add(self, replica: str) -> None:
+        if replica in self._replicas:
+            return
+        self._replicas.append(replica)
+        for index in range(self.vnodes):
+            point = _ring_hash(f"{replica}#{index}")
+            position = bisect.bisect(self._points, point)
+            self._points.insert(position, point)
+            self._owners.insert(position, replica)
+
+    def remove(self, replica: str) -> None:
+        if replica not in self._replicas:
+            return
+        self._replicas.remove(replica)
+        keep = [(point, owner) for point, owner in zip(self._points, self._owners) if owner != replica]
+        self._points = [point for point, _ in keep]
+        self._owners = [owner for _, owner in keep]
+
+    def preference(self, key: str) -> List[str]:
+        """
+        Replicas in the order they should serve a key
+
+        Args:
+            key: Routing key
+
+        Returns:
+            Every replica once, starting with the key's owner and continuing
+            clockwise (the failover order)
+        """
+        if not self._points:
+            return []
+        start = bisect.bisect(self._points, _ring_hash(key))
+        ordered: List[str] = []
+        for offset in range(len(self._points)):
+            owner = self._owners[(start + offset) % len(self._points)]
+            if owner not in ordered:
+                ordered.append(owner)
+                if len(ordered) == len(self._replicas):
+                    break
+        return ordered
+
+
+class ReplicaPool:
+    """Replicas on the ring plus their health and routing counters"""
+
+    def __init__(
+        self,
+        replicas: Iterable[str] = (),
+        vnodes: int = ROUTER_VNODES,
+        fail_threshold: int = ROUTER_FAIL_THRESHOLD,
+    ):
+        self.ring = HashRing(vnodes=vnodes)
+        self.fail_threshold = fail_threshold
+        self._state: Dict[str, Dict[str, Any]] = {}
+        self.failovers = 0
+        for replica in replicas:
+            self.add(replica)
+
+    def add(self, replica: str) -> None:
+        replica = replica.rstrip("/")
+        if replica not in self._state:
+            self._state[replica] = {"healthy": True, "failures": 0, "routed": 0, "errors": 0}
+        self.ring.add(replica)
+
+    def remove(self, replica: str) -> bool:
+        replica = replica.rstrip("/")
+        if replica not in self._state:
+            return False
+        self.ring.remove(replica)
+        del self._state[replica]
+        return True
+
+    def find(self, rid: str) -> Optional[str]:
+        """Replica with the given replica_id, if it is still in the pool"""
+        for replica in self._state:
+            if replica_id(replica) == rid:
+                return replica
+        return None
+
+    def candidates(self, key: str) -> List[str]:
+        """
+        Replicas to try for a key: healthy ones in ring order, then the rest
+
+        Unhealthy replicas stay at the end as a last resort, so a key still
+        gets an attempt when every probe is failing.
+        """
+        ordered = self.ring.preference(key)
+        healthy = [replica for replica in ordered if self._state[replica]["healthy"]]
+        return healthy + [replica for replica in ordered if replica not in healthy]
+
+    def mark_success(self, replica: str) -> None:
+        state = self._state.get(replica)
+        if state is not None:
+            if not state["healthy"]:
+                logger.info(f"Replica {replica} is healthy again")
+            state.update(healthy=True, failures=0)
+
+    def mark_failure(self, replica: str) -> None:
+        state = self._state.get(replica)
+        if state is None:
+            return
+        state["failures"] += 1
+        state["errors"] += 1
+        if state["healthy"] and state["failures"] >= self.fail_threshold:
+            state["healthy"] = False
+            logger.warning(f"Replica {replica} marked unhealthy after {state['failures']} failures")
+
+    def record_routed(self, replica: str, failover: bool) -> None:
+        state = self._state.get(replica)
+        if state is not None:
+            state["routed"] += 1
+        if failover:
+            self.failovers += 1
+
+    async def check(self, client: httpx.AsyncClient) -> None:
+        """Probe every replica's /health once"""
+        async def probe(replica: str) -> None:
+            try:
+                response = await client.get(f"{replica}/health", timeout=ROUTER_HEALTH_TIMEOUT)
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                self.mark_success(replica)
+            else:
+                self.mark_failure(replica)
+
+        await asyncio.gather(*(probe(replica) for replica in list(self._state)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "replicas": {
+                replica: dict(state, id=replica_id(replica)) for replica, state in self._state.items()
+            },
+            "healthy": sum(1 for state in self._state.values() if state["healthy"]),
+            "failovers": self.failovers,
+            "vnodes": self.ring.vnodes,
+        }
+
+
+async def routing_key(client: httpx.AsyncClient, file_path: str, content_hash: Optional[str] = None) -> str:
+    """
+    Content-based routing key of a document, found without parsing it
+
+    Args:
+        client: HTTP client for the HEAD request
+        file_path: Path or URL passed to /parse
+        content_hash: Hash supplied by the caller (e.g. computed at upload)
+
+    Returns:
+        The caller's hash if given; for URLs the storage ETag (a content
+        hash on common object stores), else the URL; for local files the
+        hash of their bytes, else the path
+    """
+    if content_hash:
+        return f"content:{content_hash}"
+    if file_path.startswith(("http://", "https://")):
+        try:
+            response = await client.head(file_path, follow_redirects=True)
+            etag = response.headers.get("etag") if response.status_code == 200 else None
+        except httpx.HTTPError:
+            etag = None
+        return f"etag:{etag.removeprefix('W/').strip(chr(34))}" if etag else f"url:{file_path}"
+    try:
+        return await run_in_threadpool(lambda: content_key(Path(file_path).read_bytes()))
+    except OSError:
+        return f"path:{file_path}"
+
+
+def json_object(response: httpx.Response) -> Optional[Dict[str, Any]]:
+    """A replica's JSON object body, or None if it sent anything else (e.g. a proxy error page)"""
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def reached_replica(error: httpx.TransportError) -> bool:
+    """
+    Whether a failed request may have got to the replica
+
+    Only a request that never connected is safe to send to another
+    replica; one that timed out or broke mid-response may still be
+    running there, and a slow replica is not a failed one.
+    """
+    return not isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout))
+
+
+def replica_error(replica: str, error: httpx.TransportError) -> HTTPException:
+    """504 for a replica that did not answer in time, 502 for a broken response"""
+    if isinstance(error, httpx.TimeoutException):
+        return HTTPException(status_code=504, detail=f"Replica {replica} did not answer in time")
+    return HTTPException(status_code=502, detail=f"Replica {replica} failed mid-request: {error}")
+
+
+def relayed_headers(
+    response: httpx.Response,
+    extra: Optional[Dict[str, str]] = None,
+    decoded: bool = True,
+) -> Dict[str, str]:
+    """
+    End-to-end headers of a replica response (e.g. Retry-After on a 503)
+
+    Args:
+        response: Replica response
+        extra: Headers to add (e.g. X-Parse-Replica)
+        decoded: The body is relayed as httpx decoded it, so its
+            content-encoding no longer applies
+
+    Returns:
+        Headers for the relayed response
+    """
+    skip = HOP_BY_HOP_HEADERS | {"content-encoding"} if decoded else HOP_BY_HOP_HEADERS
+    headers = {name: value for name, value in response.headers.items() if name.lower() not in skip}
+    headers.update(extra or {})
+    return headers
+
+
+def relay(response: httpx.Response, headers: Optional[Dict[str, str]] = None) -> Response:
+    """Pass a replica response through unchanged"""
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        headers=relayed_headers(response, headers),
+    )
+
+
+def create_app(
+    replicas: Optional[Iterable[str]] = None,
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+    health_interval: float = ROUTER_HEALTH_INTERVAL,
+) -> FastAPI:
+    """
+    Build the router application
+
+    Args:
+        replicas: Replica base URLs (defaults to ROUTER_REPLICAS)
+        transport: HTTP transport for replica and storage requests (tests)
+        health_interval: Seconds between health probes (0 disables them)
+
+    Returns:
+        FastAPI app; its pool is app.state.pool
+    """
+    if replicas is None:
+        replicas = [replica.strip() for replica in ROUTER_REPLICAS.split(",") if replica.strip()]
+    pool = ReplicaPool(replicas)
+    client = httpx.AsyncClient(transport=transport, timeout=ROUTER_TIMEOUT)
+
+    async def health_loop() -> None:
+        while True:
+            await pool.check(client)
+            await asyncio.sleep(health_interval)
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        checker = asyncio.create_task(health_loop()) if health_interval > 0 else None
+        try:
+            yield
+        finally:
+            if checker is not None:
+                checker.cancel()
+            await client.aclose()
+
+    app = FastAPI(title="Resume Parser Router", version="1.0.0", lifespan=lifespan)
+    app.state.pool = pool
+
+    def forward_params(request: Request) -> Dict[str, str]:
+        params = dict(request.query_params)
+        params.pop("content_hash", None)
+        # Replicas share capacity fairly per caller; keep the original one
+        if not params.get("caller") and request.client:
+            params["caller"] = request.client.host
+        return params
+
+    def forward_headers(request: Request) -> Dict[str, str]:
+        return {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+
+    async def send(request: Request, path: str, key: str, stream: bool = False) -> httpx.Response:
+        """Send to the key's replica, failing over along the ring"""
+        params, headers = forward_params(request), forward_headers(request)
+        tried = 0
+        for replica in pool.candidates(key):
+            tried += 1
+            outgoing = client.build_request("GET", f"{replica}{path}", params=params, headers=headers)
+            try:
+                response = await client.send(outgoing, stream=stream)
+            except httpx.TransportError as e:
+                if reached_replica(e):
+                    # Retrying elsewhere would run the same parse twice
+                    logger.warning(f"Replica {replica} failed after receiving the request: {e!r}")
+                    raise replica_error(replica, e)
+                logger.warning(f"Replica {replica} unreachable, failing over: {e}")
+                pool.mark_failure(replica)
+                continue
+            if response.status_code == 503 and tried < len(pool.ring.replicas):
+                # Overloaded or shutting down: let the next replica take it
+                await response.aclose()
+                continue
+            pool.mark_success(replica)
+            pool.record_routed(replica, failover=tried > 1)
+            response.extensions["replica"] = replica
+            return response
+        raise HTTPException(status_code=503, detail="No parser replica available")
+
+    @app.get("/parse")
+    async def parse(
+        request: Request,
+        file_path: str = Query(..., description="Path to the resume file (local or URL)"),
+        content_hash: Optional[str] = Query(None, description="Content hash of the file, if the caller knows it"),
+    ) -> Response:
+        """Forward /parse to the document's replica"""
+        key = await routing_key(client, file_path, content_hash)
+        response = await send(request, "/parse", key)
+        replica = response.extensions["replica"]
+        data = json_object(response) if response.status_code == 200 else None
+        if data is not None and data.get("reparse_id"):
+            # Reparse results live on the replica that queued them
+            data["reparse_id"] = f"{replica_id(replica)}{REPARSE_ID_SEPARATOR}{data['reparse_id']}"
+            return JSONResponse(data, headers={"X-Parse-Replica": replica})
+        return relay(response, headers={"X-Parse-Replica": replica})
+
+    @app.get("/parse/stream")
+    async def parse_stream(
+        request: Request,
+        file_path: str = Query(..., description="Path to the resume file (local or URL)"),
+        content_hash: Optional[str] = Query(None, description="Content hash of the file, if the caller knows it"),
+    ) -> StreamingResponse:
+        """Forward /parse/stream to the document's replica, relaying events as they arrive"""
+        key = await routing_key(client, file_path, content_hash)
+        response = await send(request, "/parse/stream", key, stream=True)
+        return StreamingResponse(
+            response.aiter_raw(),
+            status_code=response.status_code,
+            headers=relayed_headers(
+                response, {"X-Parse-Replica": response.extensions["replica"]}, decoded=False
+            ),
+            background=BackgroundTask(response.aclose),
+        )
+
+    @app.get("/parse/reparse/{reparse_id}")
+    async def reparse_result(reparse_id: str) -> Response:
+        """Fetch a reparse result from the replica that queued it"""
+        rid, _, local_id = reparse_id.partition(REPARSE_ID_SEPARATOR)
+        replica = pool.find(rid) if local_id else None
+        if replica is None:
+            raise HTTPException(status_code=404, detail=f"Unknown reparse id: {reparse_id}")
+        try:
+            response = await client.get(f"{replica}/parse/reparse/{local_id}")
+        except httpx.TransportError as e:
+            if reached_replica(e):
+                raise replica_error(replica, e)
+            pool.mark_failure(replica)
+            raise HTTPException(status_code=503, detail=f"Replica {replica} unavailable")
+        data = json_object(response)
+        if data is None:
+            return relay(response)
+        if "reparse_id" in data:
+            data["reparse_id"] = reparse_id
+        return JSONResponse(data, status_code=response.status_code)
+
+    @app.get("/health")
+    async def health() -> Dict[str, Any]:
+        """Router health: healthy while at least one replica is"""
+        healthy = pool.stats()["healthy"]
+        if not healthy:
+            raise HTTPException(status_code=503, detail="No healthy parser replica")
+        return {"status": "healthy", "service": "resume-parser-router", "healthy_replicas": healthy}
+
+    @app.get("/router/status")
+    async def status() -> Dict[str, Any]:
+        """Replica health and routing counters"""
+        return pool.stats()
+
+    def authorize(token: Optional[str]) -> None:
+        if not ROUTER_ADMIN_TOKEN or token is None or not hmac.compare_digest(token.encode(), ROUTER_ADMIN_TOKEN.encode()):
+            raise HTTPException(status_code=403, detail="Replica changes not permitted")
+
+    @app.post("/router/replicas")
+    async def add_replica(
+        url: str = Query(..., description="Base URL of the replica"),
+        x_router_token: Optional[str] = Header(None),
+    ) -> Dict[str, Any]:
+        """Add a replica; it takes over its share of documents from the others"""
+        authorize(x_router_token)
+        pool.add(url)
+        return pool.stats()
+
+    @app.delete("/router/replicas")
+    async def remove_replica(
+        url: str = Query(..., description="Base URL of the replica"),
+        x_router_token: Optional[str] = Header(None),
+    ) -> Dict[str, Any]:
+        """Remove a replica; its documents move to the next replicas on the ring"""
+        authorize(x_router_token)
+        if not pool.remove(url):
+            raise HTTPException(status_code=404, detail=f"Unknown replica: {url}")
+        return pool.stats()
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)), log_level="info")
@@ -0,0 +1,247 @@
+"""
+Admission Scheduler Module
+Priority- and deadline-aware admission control in front of the extraction
+stages, with per-caller fair sharing inside each priority class
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Priority classes, highest first. Interactive uploads always go ahead of
+# background reparses; within a class, callers take turns.
+PRIORITY_CLASSES = ("interactive", "background")
+DEFAULT_PRIORITY = "interactive"
+
+# Parses allowed to run at once, and the default time a request may wait in
+# the queue before it is dropped (per class, in milliseconds)
+PARSE_MAX_CONCURRENCY = int(os.getenv("PARSE_MAX_CONCURRENCY", str(os.cpu_count() or 2)))
+QUEUE_TIMEOUT_MS = {
+    "interactive": int(os.getenv("PARSE_QUEUE_TIMEOUT_INTERACTIVE_MS", "30000")),
+    "background": int(os.getenv("PARSE_QUEUE_TIMEOUT_BACKGROUND_MS", "600000")),
+}
+
+# Number of recent wait times kept per class for percentiles
+WAIT_SAMPLES = 256
+
+
+class QueueTimeout(Exception):
+    """Raised when a request's queue-time deadline passes before admission"""
+
+
+class _Waiter:
+    __slots__ = ("future", "priority", "caller", "enqueued", "deadline")
+
+    def __init__(self, future: asyncio.Future, priority: str, caller: str, deadline: float):
+        self.future = future
+        self.priority = priority
+        self.caller = caller
+        self.enqueued = time.monotonic()
+        self.deadline = deadline
+
+
+class AdmissionTicket:
+    """
+    Priority and caller of work that several requests wait on
+
+    A coalesced parse is admitted once for all of its requests. When a
+    request of a higher class joins, the ticket is raised to that class and
+    caller, moving the work up the queue if it is still waiting; once the
+    work is admitted raising it has no effect.
+    """
+
+    def __init__(self, priority: str = DEFAULT_PRIORITY, caller: str = "anonymous"):
+        self.priority = priority
+        self.caller = caller
+        self._scheduler: Optional["AdmissionScheduler"] = None
+        self._waiter: Optional[_Waiter] = None
+
+    def raise_to(self, priority: str, caller: str) -> bool:
+        """Take `priority` and `caller` if that class is higher; returns whether it was"""
+        if PRIORITY_CLASSES.index(priority) >= PRIORITY_CLASSES.index(self.priority):
+            return False
+        self.priority, self.caller = priority, caller
+        if self._waiter is not None and not self._waiter.future.done():
+            self._scheduler._requeue(self._waiter, priority, caller)
+        return True
+
+
+class _ClassState:
+    """Queue and counters for one priority class"""
+
+    def __init__(self):
+        # caller -> waiters; iteration order is the round-robin order
+        self.callers: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self.depth = 0
+        self.running = 0
+        self.admitted = 0
+        self.expired = 0
+        self.waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+
+    def push(self, waiter: _Waiter) -> None:
+        self.callers.setdefault(waiter.caller, deque()).append(waiter)
+        self.depth += 1
+
+    def pop(self) -> Optional[_Waiter]:
+        """Take the next waiter, rotating between callers"""
+        while self.callers:
+            caller, waiters = self.callers.popitem(last=False)
+            waiter = waiters.popleft()
+            self.depth -= 1
+            if waiters:
+                self.callers[caller] = waiters
+            return waiter
+        return None
+
+    def remove(self, waiter: _Waiter) -> None:
+        waiters = self.callers.get(waiter.caller)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        self.depth -= 1
+        if not waiters:
+            del self.callers[waiter.caller]
+
+
+class AdmissionScheduler:
+    """
+    Admits at most `max_concurrent` parses at a time
+
+    Waiting requests are served strictly by priority class, round-robin by
+    caller within a class, and are dropped with QueueTimeout once their
+    queue-time deadline passes so no CPU is spent on work nobody awaits.
+    """
+
+    def __init__(self, max_concurrent: int = PARSE_MAX_CONCURRENCY, classes: Tuple[str, ...] = PRIORITY_CLASSES):
+        self.max_concurrent = max(1, max_concurrent)
+        self.classes = classes
+        self._state: Dict[str, _ClassState] = {name: _ClassState() for name in classes}
+        self._running = 0
+
+    def _dispatch(self) -> None:
+        """Hand free slots to the best eligible waiters"""
+        now = time.monotonic()
+        for name in self.classes:
+            state = self._state[name]
+            while self._running < self.max_concurrent:
+                waiter = state.pop()
+                if waiter is None:
+                    break
+                if waiter.future.done():
+                    continue
+                if waiter.deadline <= now:
+                    state.expired += 1
+                    waiter.future.set_exception(QueueTimeout(f"queued {name} request expired"))
+                    continue
+                self._running += 1
+                state.running += 1
+                state.admitted += 1
+                state.waits.append(now - waiter.enqueued)
+                waiter.future.set_result(None)
+
+    def _requeue(self, waiter: _Waiter, priority: str, caller: str) -> None:
+        """Move a queued waiter to another class and caller"""
+        self._state[waiter.priority].remove(waiter)
+        waiter.priority, waiter.caller = priority, caller
+        self._state[priority].push(waiter)
+        self._dispatch()
+
+    def _release(self, priority: str) -> None:
+        self._running -= 1
+        self._state[priority].running -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(
+        self,
+        priority: str = DEFAULT_PRIORITY,
+        caller: str = "anonymous",
+        deadline: Optional[float] = None,
+        ticket: Optional[AdmissionTicket] = None,
+    ) -> AsyncIterator[None]:
+        """
+        Wait for an execution slot
+
+        Args:
+            priority: One of the scheduler's priority classes
+            caller: Identity used for fair sharing within the class
+            deadline: time.monotonic() value after which the request is
+                dropped if still queued (defaults to the class queue timeout)
+            ticket: Shared work's ticket; its priority and caller are used
+                instead, and raising it while queued moves this request up
+
+        Raises:
+            ValueError: Unknown priority class
+            QueueTimeout: Deadline passed before a slot became free
+        """
+        if ticket is not None:
+            priority, caller = ticket.priority, ticket.caller
+        if priority not in self._state:
+            raise ValueError(f"Unknown priority class: {priority}")
+        if deadline is None:
+            deadline = time.monotonic() + QUEUE_TIMEOUT_MS.get(priority, 30000) / 1000.0
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, caller, deadline)
+        self._state[priority].push(waiter)
+        if ticket is not None:
+            ticket._scheduler, ticket._waiter = self, waiter
+        self._dispatch()
+
+        # The waiter's class can change while it is queued (see AdmissionTicket)
+        try:
+            timeout = max(0.0, deadline - time.monotonic())
+            await asyncio.wait_for(asyncio.shield(waiter.future), timeout)
+        except asyncio.TimeoutError:
+            self._state[waiter.priority].remove(waiter)
+            if waiter.future.done() and not waiter.future.exception():
+                # Admitted in the same tick the timer fired; give the slot back
+                self._release(waiter.priority)
+            elif not waiter.future.done():
+                self._state[waiter.priority].expired += 1
+                waiter.future.cancel()
+            raise QueueTimeout(f"queued {waiter.priority} request expired")
+        except BaseException:
+            self._state[waiter.priority].remove(waiter)
+            if waiter.future.done() and not waiter.future.cancelled() and not waiter.future.exception():
+                self._release(waiter.priority)
+            else:
+                waiter.future.cancel()
+            raise
+        finally:
+            if ticket is not None:
+                ticket._waiter = None
+
+        try:
+            yield
+        finally:
+            self._release(waiter.priority)
+
+    def queue_depth(self) -> int:
+        """Requests currently waiting for a slot, across all classes"""
+        return sum(state.depth for state in self._state.values())
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, running count and wait times per class"""
+        classes = {}
+        for name in self.classes:
+            state = self._state[name]
+            waits = sorted(state.waits)
+            classes[name] = {
+                "queue_depth": state.depth,
+                "running": state.running,
+                "admitted": state.admitted,
+                "expired": state.expired,
+                "wait_ms_p50": round(waits[len(waits) // 2] * 1000, 1) if waits else 0.0,
+                "wait_ms_p95": round(waits[int(len(waits) * 0.95)] * 1000, 1) if waits else 0.0,
+                "wait_ms_max": round(waits[-1] * 1000, 1) if waits else 0.0,
+            }
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self._running,
+            "classes": classes,
+        }
@@ -0,0 +1,162 @@
+"""
+Resume Section Segmenter
+Splits resume text into sections (header, skills, experience, education, ...)
+in a single linear pass so field extractors only scan the text they need
+"""
+import os
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the number of characters handed to the field extractors.
+# A 40-page CV is roughly 120k characters; anything beyond the budget is
+# truncated before extraction so worst-case latency stays bounded.
+MAX_TEXT_CHARS = int(os.getenv("RESUME_MAX_TEXT_CHARS", "200000"))
+
+# Headings longer than this are treated as ordinary content lines
+MAX_HEADING_CHARS = 40
+
+HEADER_SECTION = "header"
+
+# Canonical section name -> heading spellings (compared lowercased, without
+# trailing colon). Lookups go through the flattened dict below, so adding
+# aliases does not slow down segmentation.
+SECTION_HEADINGS = {
+    "contact": (
+        "contact", "contact information", "contact info", "contact details",
+        "personal information", "personal details",
+    ),
+    "summary": (
+        "summary", "professional summary", "profile", "professional profile",
+        "objective", "career objective", "about me",
+    ),
+    "skills": (
+        "skills", "technical skills", "core competencies", "expertise",
+        "technologies", "programming languages", "tools", "certifications",
+        "qualifications", "key skills", "skills and tools",
+    ),
+    "experience": (
+        "experience", "work experience", "professional experience",
+        "employment", "employment history", "work history", "career history",
+        "relevant experience",
+    ),
+    "education": (
+        "education", "education and training", "academic background",
+        "academic qualifications", "training",
+    ),
+    "projects": ("projects", "key projects", "selected projects"),
+    "references": ("references",),
+}
+
+_HEADING_LOOKUP = {
+    alias: section
+    for section, aliases in SECTION_HEADINGS.items()
+    for alias in aliases
+}
+
+
+class ResumeSections:
+    """
+    Section view over a resume's text
+
+    Attributes:
+        text: The (budget-truncated) full text
+        sections: Mapping of section name -> section text. Repeated headings
+            for the same section are concatenated in document order.
+        truncated: True if the input exceeded MAX_TEXT_CHARS
+    """
+
+    __slots__ = ("text", "sections", "truncated")
+
+    def __init__(self, text: str, sections: Dict[str, str], truncated: bool = False):
+        self.text = text
+        self.sections = sections
+        self.truncated = truncated
+
+    def get(self, name: str, default: str = "") -> str:
+        """Return the text of a section, or default if it is absent"""
+        return self.sections.get(name, default)
+
+    @property
+    def contact_region(self) -> str:
+        """Header plus any explicit contact section"""
+        header = self.sections.get(HEADER_SECTION, "")
+        contact = self.sections.get("contact", "")
+        if header and contact:
+            return header + "\n" + contact
+        return header or contact
+
+
+def _match_heading(line: str) -> Optional[Tuple[str, str]]:
+    """
+    Classify a single line as a section heading
+
+    Args:
+        line: A stripped line of text
+
+    Returns:
+        (section_name, inline_content) if the line is a heading, else None.
+        Inline content is anything after the colon in "Skills: Python, Go".
+    """
+    if not line:
+        return None
+
+    head, sep, rest = line.partition(":")
+    if sep:
+        key = head.strip().lower()
+        if len(key) <= MAX_HEADING_CHARS and key in _HEADING_LOOKUP:
+            return _HEADING_LOOKUP[key], rest.strip()
+        return None
+
+    if len(line) > MAX_HEADING_CHARS:
+        return None
+    key = line.strip(" \t-=_*#|").lower()
+    if key in _HEADING_LOOKUP:
+        return _HEADING_LOOKUP[key], ""
+    return None
+
+
+def segment_resume(text: str, max_chars: Optional[int] = None) -> ResumeSections:
+    """
+    Split resume text into sections in a single pass
+
+    Every line is classified once with a constant-time dictionary lookup, so
+    the cost is linear in the length of the text.
+
+    Args:
+        text: Resume text
+        max_chars: Input-size budget (defaults to MAX_TEXT_CHARS)
+
+    Returns:
+        ResumeSections with a 'header' section for everything before the first
+        recognised heading, plus one entry per heading found
+    """
+    if max_chars is None:
+        max_chars = MAX_TEXT_CHARS
+
+    text = text or ""
+    truncated = len(text) > max_chars
+    if truncated:
+        logger.warning(f"Resume text of {len(text)} chars exceeds budget of {max_chars}; truncating")
+        text = text[:max_chars]
+
+    buckets: Dict[str, List[str]] = {HEADER_SECTION: []}
+    current = buckets[HEADER_SECTION]
+
+    for line in text.split("\n"):
+        heading = _match_heading(line.strip())
+        if heading is None:
+            current.append(line)
+            continue
+
+        name, inline = heading
+        current = buckets.setdefault(name, [])
+        if inline:
+            current.append(inline)
+
+    sections = {
+        name: "\n".join(lines).strip("\n")
+        for name, lines in buckets.items()
+    }
+    return ResumeSections(text, sections, truncated)
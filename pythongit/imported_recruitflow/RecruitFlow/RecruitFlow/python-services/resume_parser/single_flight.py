@@ -0,0 +1,137 @@
+"""
+Single-Flight Module
+Coalesces concurrent parses of the same document (same content, or same
+local file and modification time) into one underlying parse whose result
+every waiter shares
+"""
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+try:
+    from cancellation import CancelToken, REASON_DISCONNECT
+    from scheduler import AdmissionTicket
+except ImportError:
+    from resume_parser.cancellation import CancelToken, REASON_DISCONNECT
+    from resume_parser.scheduler import AdmissionTicket
+
+logger = logging.getLogger(__name__)
+
+
+def content_key(file_content: bytes) -> str:
+    """Coalescing key for downloaded bytes"""
+    return "content:" + hashlib.blake2b(file_content, digest_size=20).hexdigest()
+
+
+def path_key(file_path: str) -> str:
+    """
+    Coalescing key for a local file: its resolved path, mtime and size
+
+    Files that cannot be stat'ed fall back to the path alone, so concurrent
+    requests for a missing file also share one (failing) attempt.
+    """
+    try:
+        resolved = os.path.realpath(file_path)
+        stat = os.stat(resolved)
+    except OSError:
+        return f"path:{file_path}"
+    return f"path:{resolved}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+class _Flight:
+    __slots__ = ("task", "token", "ticket", "waiters")
+
+    def __init__(self, token: CancelToken, ticket: Optional[AdmissionTicket]):
+        self.token = token
+        self.ticket = ticket
+        self.task: Optional["asyncio.Future[Any]"] = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Runs at most one parse per key at a time
+
+    The first caller for a key starts the work; callers arriving while it
+    runs wait on the same task. The work gets its own cancel token whose
+    deadline is the latest of its waiters' deadlines, and it is cancelled
+    only when every waiter has gone. The work is admitted on the first
+    caller's ticket, which a higher-priority joiner raises to its own class
+    and caller. Finished flights are forgotten
+    immediately, so this coalesces concurrent work and does not cache.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(
+        self,
+        key: str,
+        work: Callable[[CancelToken], Awaitable[Any]],
+        deadline: Optional[float] = None,
+        ticket: Optional[AdmissionTicket] = None,
+    ) -> Any:
+        """
+        Run `work` for `key`, or join the run already in flight
+
+        Args:
+            key: Document key (content_key or path_key plus anything else
+                that changes the result)
+            work: Coroutine function taking the shared cancel token
+            deadline: This caller's deadline (time.monotonic()), None for none
+            ticket: This caller's priority and identity; the work passes
+                the first caller's ticket to the scheduler
+
+        Returns:
+            The shared result (treat it as read-only)
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(CancelToken(deadline), ticket)
+            flight.task = asyncio.ensure_future(self._run(key, flight, work))
+            # Mark the outcome retrieved even if every waiter has left
+            flight.task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            self._flights[key] = flight
+            with self._lock:
+                self.executions += 1
+        else:
+            with self._lock:
+                self.coalesced += 1
+            logger.info(f"Joining in-flight parse for {key}")
+            current = flight.token.deadline
+            if current is not None:
+                flight.token.deadline = None if deadline is None else max(current, deadline)
+            if ticket is not None and flight.ticket is not None:
+                if flight.ticket.raise_to(ticket.priority, ticket.caller):
+                    logger.info(f"Raised in-flight parse for {key} to {ticket.priority} priority")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Everyone waiting on this parse has gone away
+                flight.token.cancel(REASON_DISCONNECT)
+                flight.task.cancel()
+
+    async def _run(self, key: str, flight: _Flight, work: Callable[[CancelToken], Awaitable[Any]]) -> Any:
+        try:
+            return await work(flight.token)
+        finally:
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "parses_saved": self.coalesced,
+                "in_flight": len(self._flights),
+            }
@@ -0,0 +1,235 @@
+"""
+Skill Matching Module
+Finds skills from the taxonomy in resume text and canonicalizes spelling
+variants ("Postgres", "ReactJS", "Node") and typos ("Kubernates") to the
+taxonomy entry. Exact and alias spellings are dictionary lookups per token;
+typos are resolved through a precomputed deletion index (SymSpell), so a
+lookup costs the same however large the taxonomy grows.
+"""
+import os
+import re
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Set, Tuple
+
+# Largest edit distance a typo may be from a taxonomy entry (0 disables
+# typo matching; spelling variants and aliases still match)
+SKILL_MAX_EDIT_DISTANCE = int(os.getenv("SKILL_MAX_EDIT_DISTANCE", "2"))
+
+# Edits allowed by length of the typed skill: short words are exact only,
+# as "Scale" is not a misspelled "Scala"
+ONE_EDIT_MIN_LENGTH = 6
+TWO_EDITS_MIN_LENGTH = 10
+
+# Compact forms shorter than this only match exactly (".NET" is not "net")
+COMPACT_MIN_LENGTH = 4
+
+# Tokens keep the punctuation inside skill names ("node.js", "c++", "c#",
+# "objective-c", ".net"); "/" separates ("ci/cd" is "ci" "cd"). A token
+# neither starts nor ends next to another letter or digit, so no ASCII
+# fragment is cut from an accented word ("résumé" is not "r" "sum")
+_TOKEN = re.compile(r"(?<![^\W_])(?:(?<![\w.])\.)?[a-z0-9]+[+#]*(?:[.\-'][a-z0-9]+[+#]*)*(?![^\W_])")
+
+# Separators dropped from the compact form ("Node.js" == "NodeJS")
+_COMPACT = str.maketrans("", "", " .-_/'")
+
+
+class SkillMatch(NamedTuple):
+    skill: str      # taxonomy entry
+    distance: int   # edits from the text (0 for exact and alias spellings)
+
+
+def tokenize(text: str) -> List[str]:
+    """Skill tokens of lowercased text"""
+    return _TOKEN.findall(text)
+
+
+def compact(text: str) -> str:
+    """Lowercase with separators removed ("Scikit Learn" -> "scikitlearn")"""
+    return text.lower().translate(_COMPACT)
+
+
+def allowed_edits(length: int, max_distance: int = SKILL_MAX_EDIT_DISTANCE) -> int:
+    """Edits a typed skill of `length` characters may have"""
+    if length >= TWO_EDITS_MIN_LENGTH:
+        edits = 2
+    elif length >= ONE_EDIT_MIN_LENGTH:
+        edits = 1
+    else:
+        edits = 0
+    return min(edits, max_distance)
+
+
+def deletes(word: str, depth: int) -> Set[str]:
+    """`word` and every string made by deleting up to `depth` characters from it"""
+    results = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {w[:i] + w[i + 1:] for w in frontier for i in range(len(w))}
+        results |= frontier
+    return results
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent swaps)
+
+    Gives up early: any distance above `limit` is returned as limit + 1.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class SkillIndex:
+    """
+    Lookup tables over a skills taxonomy
+
+    exact: token key ("node.js", "ruby on rails") -> entry
+    compact: compact key ("nodejs", "rubyonrails") -> entry
+    fuzzy: compact strings with up to 1-2 characters deleted -> entries
+
+    Built once per taxonomy; all lookups are dictionary hits whose number
+    depends on the length of the text looked up, not on the taxonomy.
+    """
+
+    def __init__(
+        self,
+        taxonomy: Sequence[str],
+        aliases: Optional[Mapping[str, Iterable[str]]] = None,
+        max_distance: int = SKILL_MAX_EDIT_DISTANCE,
+    ):
+        self.taxonomy = taxonomy
+        self.aliases = aliases or {}
+        self.max_distance = max_distance
+        self.rank: Dict[str, int] = {}
+        self.exact: Dict[str, str] = {}
+        self.compact: Dict[str, str] = {}
+        # First tokens of multi-token keys, and the longest key in tokens
+        self.starts: Set[str] = set()
+        self.max_tokens = 1
+        self._terms: List[Tuple[str, str]] = []
+        self._fuzzy: Dict[str, List[int]] = {}
+
+        for skill in taxonomy:
+            self.rank.setdefault(skill, len(self.rank))
+        # Taxonomy spellings win over aliases, and aliases over compact forms
+        spellings = [(skill, skill) for skill in self.rank]
+        spellings += [(alias, skill) for skill, names in self.aliases.items() if skill in self.rank for alias in names]
+        for spelling, skill in spellings:
+            tokens = tokenize(spelling.lower())
+            if tokens:
+                key = " ".join(tokens)
+                self.exact.setdefault(key, skill)
+                if len(tokens) > 1:
+                    self.starts.add(tokens[0])
+                    self.max_tokens = max(self.max_tokens, len(tokens))
+        for spelling, skill in spellings:
+            key = compact(spelling)
+            if len(key) >= COMPACT_MIN_LENGTH and key not in self.compact:
+                self.compact[key] = skill
+                self._add_term(key, skill)
+
+    def _add_term(self, key: str, skill: str) -> None:
+        # A typed skill within one edit is at least ONE_EDIT_MIN_LENGTH - 1
+        # characters long, within two at least TWO_EDITS_MIN_LENGTH - 2
+        if len(key) >= TWO_EDITS_MIN_LENGTH - 2:
+            depth = min(2, self.max_distance)
+        elif len(key) >= ONE_EDIT_MIN_LENGTH - 1:
+            depth = min(1, self.max_distance)
+        else:
+            return
+        if depth <= 0:
+            return
+        term_id = len(self._terms)
+        self._terms.append((key, skill))
+        for variant in deletes(key, depth):
+            self._fuzzy.setdefault(variant, []).append(term_id)
+
+    def match(self, phrase: str) -> Optional[SkillMatch]:
+        """
+        Canonicalize one phrase that is expected to be a single skill
+
+        Args:
+            phrase: e.g. an item of the skills section
+
+        Returns:
+            SkillMatch for the closest taxonomy entry, or None
+        """
+        key = " ".join(tokenize(phrase.lower()))
+        skill = self.exact.get(key)
+        if skill is None:
+            skill = self.compact.get(compact(phrase))
+        if skill is not None:
+            return SkillMatch(skill, 0)
+        return self.closest(compact(phrase))
+
+    def closest(self, query: str) -> Optional[SkillMatch]:
+        """
+        Nearest taxonomy entry to a compact string through the deletion index
+
+        Ties go to the entry listed first in the taxonomy.
+        """
+        limit = allowed_edits(len(query), self.max_distance)
+        if limit <= 0:
+            return None
+        candidates: Set[int] = set()
+        for variant in deletes(query, limit):
+            candidates.update(self._fuzzy.get(variant, ()))
+        best: Optional[Tuple[int, int, str]] = None
+        for term_id in candidates:
+            term, skill = self._terms[term_id]
+            distance = edit_distance(query, term, limit)
+            if distance <= limit:
+                candidate = (distance, self.rank[skill], skill)
+                if best is None or candidate < best:
+                    best = candidate
+        return SkillMatch(best[2], best[0]) if best else None
+
+    def find(self, text: str) -> List[str]:
+        """
+        Every taxonomy entry written anywhere in the text, in taxonomy order
+
+        Matches exact, alias and compact spellings only: running prose has
+        too many ordinary words a typo away from a skill name.
+
+        Args:
+            text: Lowercased text
+        """
+        found: Set[str] = set()
+        tokens = tokenize(text)
+        exact, compact_keys, starts = self.exact, self.compact, self.starts
+        for i, token in enumerate(tokens):
+            skill = exact.get(token) or compact_keys.get(token.translate(_COMPACT))
+            if skill is not None:
+                found.add(skill)
+            if token in starts:
+                for n in range(2, self.max_tokens + 1):
+                    skill = exact.get(" ".join(tokens[i:i + n]))
+                    if skill is not None:
+                        found.add(skill)
+        return sorted(found, key=self.rank.__getitem__)
+
+
+_index: Optional[SkillIndex] = None
+_index_source: Tuple[object, object] = (None, None)
+
+
+def get_skill_index(taxonomy: Sequence[str], aliases: Optional[Mapping[str, Iterable[str]]] = None) -> SkillIndex:
+    """The index for this taxonomy, rebuilt only when the taxonomy or aliases object changes"""
+    global _index, _index_source
+    if _index is None or _index_source[0] is not taxonomy or _index_source[1] is not aliases:
+        _index = SkillIndex(taxonomy, aliases)
+        _index_source = (taxonomy, aliases)
+    return _index
@@ -1,180 +1,558 @@
 """
 Text Extraction Module
 Handles extraction of text from various document formats (PDF, DOCX)
+
+The iter_* functions stream a document one page (or block) at a time with
+per-block metadata, releasing each PDF page's caches before moving on, so
+memory stays flat regardless of page count. The extract_text_* functions
+are thin wrappers that join the streamed text.
 """
 import io
+import json
+import time
 import logging
 import os
-from typing import Optional
+from typing import Any, Iterator, NamedTuple, Optional, Sequence, Tuple
 import pdfplumber
 from docx import Document
 
+try:
+    from ocr_cache import get_ocr_cache, page_cache_key
+    from cancellation import CancelToken, ParseCancelled
+    from memory_governor import MemoryBudgetExceeded, check_raster_budget
+    from profiling import stage
+    from triage import PIPELINE_HYBRID, PIPELINE_OCR, DocumentTriage
+except ImportError:
+    from resume_parser.ocr_cache import get_ocr_cache, page_cache_key
+    from resume_parser.cancellation import CancelToken, ParseCancelled
+    from resume_parser.memory_governor import MemoryBudgetExceeded, check_raster_budget
+    from resume_parser.profiling import stage
+    from resume_parser.triage import PIPELINE_HYBRID, PIPELINE_OCR, DocumentTriage
+
+# Page preprocessing needs NumPy; without it pages reach Tesseract as rendered
+try:
+    from image_preprocess import PREPROCESS_VERSION, preprocess_page
+except ImportError:
+    try:
+        from resume_parser.image_preprocess import PREPROCESS_VERSION, preprocess_page
+    except ImportError:
+        PREPROCESS_VERSION, preprocess_page = None, None
+
 logger = logging.getLogger(__name__)
 
+# Rasterization resolution for OCR. Part of the OCR cache key, together with
+# the Tesseract language and config, since all three change the output.
+OCR_DPI = 300
+OCR_LANG = os.getenv("OCR_LANG", "eng")
+OCR_TESSERACT_CONFIG = os.getenv("OCR_TESSERACT_CONFIG", "")
+
+# "fixed" OCRs every page at OCR_DPI. "adaptive" first reads a grayscale
+# OCR_FAST_DPI render with OCR_FAST_CONFIG (psm 4: one column of variable-size
+# text, skipping full layout analysis) and re-reads at OCR_DPI only pages whose
+# mean word confidence is below OCR_MIN_CONFIDENCE.
+OCR_MODE = os.getenv("OCR_MODE", "fixed").lower()
+OCR_FAST_DPI = int(os.getenv("OCR_FAST_DPI", "150"))
+OCR_FAST_CONFIG = os.getenv("OCR_FAST_CONFIG", "--psm 4")
+OCR_MIN_CONFIDENCE = float(os.getenv("OCR_MIN_CONFIDENCE", "80"))
+
+# Clean up rendered pages (binarize, deskew, crop, skip blank pages) before OCR
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "").lower() in ("1", "true", "yes")
+
+
+class TextBlock(NamedTuple):
+    """One streamed unit of document text"""
+    index: int          # 1-based page number (PDF) or block number (DOCX)
+    text: str
+    engine: str         # pdfplumber, pypdf2, ocr or python-docx
+    kind: str           # page, paragraph or table_row
+    char_count: int
+    elapsed_ms: float
+    dpi: Optional[int] = None           # OCR resolution actually used
+    confidence: Optional[float] = None  # Mean Tesseract word confidence (adaptive OCR)
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+if OCR_PREPROCESS and preprocess_page is None:
+    logger.warning("OCR_PREPROCESS is set but NumPy is not installed; pages will not be preprocessed")
+
+
+def _preprocessing() -> bool:
+    return OCR_PREPROCESS and preprocess_page is not None
+
+
+def _prepare_page(image: Any, dpi: int) -> Optional[Any]:
+    """Preprocess a page for Tesseract if enabled; None means the page is blank"""
+    if not _preprocessing():
+        return image
+    return preprocess_page(image, dpi)
 
-def extract_text_from_pdf_with_ocr(file_content: bytes) -> str:
+
+def ocr_with_confidence(image: Any, config: str) -> Tuple[str, Optional[float]]:
     """
-    Extract text from image-based PDF using OCR
-    
+    OCR one page image and measure Tesseract's confidence in it
+
     Args:
-        file_content: PDF file content as bytes
-        
+        image: PIL image of the page
+        config: Tesseract config string (e.g. "--psm 4")
+
     Returns:
-        Extracted text as string
+        (text, mean word confidence 0-100, or None when no words were found).
+        Lines are rebuilt from Tesseract's layout, with a blank line between
+        blocks.
+    """
+    import pytesseract
+
+    data = pytesseract.image_to_data(image, lang=OCR_LANG, config=config, output_type=pytesseract.Output.DICT)
+    lines = {}
+    confidences = []
+    for word, conf, block, par, line in zip(
+        data["text"], data["conf"], data["block_num"], data["par_num"], data["line_num"]
+    ):
+        word = word.strip()
+        if not word:
+            continue
+        lines.setdefault((block, par, line), []).append(word)
+        conf = float(conf)
+        if conf >= 0:
+            confidences.append(conf)
+
+    parts = []
+    previous_block = None
+    for (block, _, _), words in lines.items():
+        if previous_block is not None and block != previous_block:
+            parts.append("")
+        parts.append(" ".join(words))
+        previous_block = block
+
+    confidence = round(sum(confidences) / len(confidences), 1) if confidences else None
+    return "\n".join(parts), confidence
+
+
+def _adaptive_ocr_page(
+    file_content: bytes,
+    page_number: int,
+    image: Any,
+    cancel_token: Optional[CancelToken],
+) -> Tuple[str, int, Optional[float]]:
+    """
+    Read a page from its fast render, escalating to OCR_DPI on low confidence
+
+    Returns:
+        (text, dpi used, confidence)
+    """
+    from pdf2image import convert_from_bytes
+
+    cache = get_ocr_cache()
+    settings = {
+        "mode": "adaptive", "dpi": OCR_FAST_DPI, "lang": OCR_LANG, "config": OCR_FAST_CONFIG,
+        "min_confidence": OCR_MIN_CONFIDENCE, "escalation_dpi": OCR_DPI, "escalation_config": OCR_TESSERACT_CONFIG,
+    }
+    if _preprocessing():
+        settings["preprocess"] = PREPROCESS_VERSION
+    key = page_cache_key(image, settings)
+    cached = cache.get(key)
+    if cached is not None:
+        entry = json.loads(cached)
+        logger.info(f"OCR cache hit for page {page_number}")
+        return entry["text"], entry["dpi"], entry["confidence"]
+
+    prepared = _prepare_page(image, OCR_FAST_DPI)
+    if prepared is None:
+        logger.info(f"OCR page {page_number}: blank, skipped")
+        cache.put(key, json.dumps({"text": "", "dpi": OCR_FAST_DPI, "confidence": None}))
+        return "", OCR_FAST_DPI, None
+
+    text, confidence = ocr_with_confidence(prepared, OCR_FAST_CONFIG)
+    del prepared
+    dpi = OCR_FAST_DPI
+    if confidence is None or confidence < OCR_MIN_CONFIDENCE:
+        if cancel_token is not None:
+            cancel_token.checkpoint()
+        logger.info(f"OCR page {page_number}: confidence {confidence} at {dpi} dpi, retrying at {OCR_DPI} dpi")
+        high_res = convert_from_bytes(
+            file_content, dpi=OCR_DPI, grayscale=True, first_page=page_number, last_page=page_number
+        )[0]
+        prepared = _prepare_page(high_res, OCR_DPI)
+        if prepared is not None:
+            high_res = prepared
+        del prepared
+        high_text, high_confidence = ocr_with_confidence(high_res, OCR_TESSERACT_CONFIG)
+        del high_res
+        if (high_confidence or -1.0) >= (confidence or -1.0):
+            text, confidence, dpi = high_text, high_confidence, OCR_DPI
+
+    cache.put(key, json.dumps({"text": text, "dpi": dpi, "confidence": confidence}))
+    return text, dpi, confidence
+
+
+def _pdf_page_count(file_content: bytes) -> Optional[int]:
+    """Page count from poppler's pdfinfo (None if it cannot read the document)"""
+    from pdf2image import pdfinfo_from_bytes
+    try:
+        return int(pdfinfo_from_bytes(file_content)["Pages"])
+    except Exception as e:
+        logger.warning(f"Could not count PDF pages: {e}")
+        return None
+
+
+def iter_ocr_pages(
+    file_content: bytes,
+    cancel_token: Optional[CancelToken] = None,
+    page_count: Optional[int] = None,
+    pages: Optional[Sequence[int]] = None,
+) -> Iterator[TextBlock]:
+    """
+    Stream OCR text from an image-based PDF, one page at a time
+
+    When the page count is known, pages are rasterized one by one so only a
+    single page image is held in memory. Otherwise every page is rendered up
+    front, and the whole document is checked against the raster budget
+    first. Pages whose rendered image was
+    OCR'd before with the same settings come from the OCR page cache. With
+    OCR_MODE=adaptive pages are read at OCR_FAST_DPI first and escalated to
+    OCR_DPI only when Tesseract's confidence is low. With OCR_PREPROCESS set,
+    pages are cleaned up first and blank pages never reach Tesseract.
+
+    Args:
+        file_content: PDF file content as bytes
+        cancel_token: Checked between pages; raises ParseCancelled when set
+        page_count: Page count if already known (enables page-by-page rendering)
+        pages: Only OCR these 1-based pages (needs page_count)
+
+    Yields:
+        TextBlock per page (including pages with no text) with the DPI used
+        and, in adaptive mode, the page confidence
+
+    Raises:
+        MemoryBudgetExceeded: The pages held at once would exceed RASTER_BUDGET_MB
     """
     try:
         from pdf2image import convert_from_bytes
         import pytesseract
-        
+
         logger.info("Attempting OCR extraction for image-based PDF")
-        
-        # Convert PDF pages to images
-        images = convert_from_bytes(file_content, dpi=300)
-        
-        text_content = []
-        for i, image in enumerate(images, 1):
-            logger.info(f"OCR processing page {i}/{len(images)}")
-            # Extract text from image using Tesseract
-            page_text = pytesseract.image_to_string(image)
-            if page_text.strip():
-                text_content.append(page_text)
-        
-        full_text = "\n".join(text_content)
-        logger.info(f"OCR extracted {len(full_text)} chars from {len(images)} pages")
-        return full_text.strip()
-        
+
+        if cancel_token is not None:
+            cancel_token.checkpoint()
+
+        cache = get_ocr_cache()
+        settings = {"dpi": OCR_DPI, "lang": OCR_LANG, "config": OCR_TESSERACT_CONFIG}
+        if _preprocessing():
+            settings["preprocess"] = PREPROCESS_VERSION
+        adaptive = OCR_MODE == "adaptive"
+        render_options = {"dpi": OCR_FAST_DPI, "grayscale": True} if adaptive else {"dpi": OCR_DPI}
+
+        if page_count is not None:
+            # One page image alive at a time
+            check_raster_budget(1, OCR_DPI)
+            total = page_count
+
+            def render(page_number):
+                return convert_from_bytes(
+                    file_content, first_page=page_number, last_page=page_number, **render_options
+                )[0]
+        else:
+            # Convert PDF pages to images, all held at once
+            document_pages = _pdf_page_count(file_content)
+            if document_pages is not None:
+                check_raster_budget(document_pages, render_options["dpi"])
+            images = convert_from_bytes(file_content, **render_options)
+            total = len(images)
+
+            def render(page_number):
+                image = images[page_number - 1]
+                images[page_number - 1] = None
+                return image
+
+        numbers = list(pages) if pages is not None and page_count is not None else list(range(1, total + 1))
+        for position, i in enumerate(numbers):
+            if cancel_token is not None:
+                cancel_token.checkpoint(pending_pages=len(numbers) - position)
+            start = time.perf_counter()
+            image = render(i)
+            if adaptive:
+                page_text, dpi, confidence = _adaptive_ocr_page(file_content, i, image, cancel_token)
+                logger.info(f"OCR page {i}/{total}: {dpi} dpi, confidence {confidence}")
+            else:
+                dpi, confidence = OCR_DPI, None
+                key = page_cache_key(image, settings)
+                page_text = cache.get(key)
+                if page_text is not None:
+                    logger.info(f"OCR cache hit for page {i}/{total}")
+                else:
+                    prepared = _prepare_page(image, OCR_DPI)
+                    if prepared is None:
+                        logger.info(f"OCR page {i}/{total}: blank, skipped")
+                        page_text = ""
+                    else:
+                        logger.info(f"OCR processing page {i}/{total}")
+                        # Extract text from image using Tesseract
+                        page_text = pytesseract.image_to_string(prepared, lang=OCR_LANG, config=OCR_TESSERACT_CONFIG)
+                    del prepared
+                    cache.put(key, page_text)
+            del image
+            yield TextBlock(i, page_text, "ocr", "page", len(page_text), _elapsed_ms(start), dpi, confidence)
+
+    except (ParseCancelled, MemoryBudgetExceeded):
+        raise
     except ImportError as e:
         logger.warning(f"OCR libraries not available: {e}")
-        return ""
     except Exception as e:
         logger.error(f"OCR extraction failed: {str(e)}")
-        return ""
 
 
-def extract_text_from_pdf(file_content: bytes) -> str:
+def extract_text_from_pdf_with_ocr(
+    file_content: bytes,
+    cancel_token: Optional[CancelToken] = None,
+    page_count: Optional[int] = None,
+) -> str:
     """
-    Extract text content from a PDF file
-    
+    Extract text from image-based PDF using OCR
+
     Args:
         file_content: PDF file content as bytes
-        
+        cancel_token: Checked between pages; raises ParseCancelled when set
+        page_count: Page count if already known (enables page-by-page rendering)
+
     Returns:
         Extracted text as string
     """
+    text_content = []
+    pages = 0
+    for block in iter_ocr_pages(file_content, cancel_token, page_count):
+        pages += 1
+        if block.text.strip():
+            text_content.append(block.text)
+
+    full_text = "\n".join(text_content)
+    logger.info(f"OCR extracted {len(full_text)} chars from {pages} pages")
+    return full_text.strip()
+
+
+def _iter_pypdf2_pages(file_content: bytes, first_page: int, cancel_token: Optional[CancelToken]) -> Iterator[TextBlock]:
+    """Stream pages with PyPDF2, starting at `first_page` (1-based)"""
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_content))
+    total = len(pdf_reader.pages)
+
+    logger.info(f"Trying PyPDF2 extraction for {total} pages")
+    for page_num in range(first_page, total + 1):
+        if cancel_token is not None:
+            cancel_token.checkpoint(pending_pages=total - page_num + 1)
+        start = time.perf_counter()
+        page_text = pdf_reader.pages[page_num - 1].extract_text()
+        if page_text:
+            yield TextBlock(page_num, page_text, "pypdf2", "page", len(page_text), _elapsed_ms(start))
+
+
+def iter_pdf_pages(
+    file_content: bytes,
+    cancel_token: Optional[CancelToken] = None,
+    ocr_fallback: bool = True,
+    plan: Optional[DocumentTriage] = None,
+) -> Iterator[TextBlock]:
+    """
+    Stream text from a PDF one page at a time
+
+    Each pdfplumber page is closed (flushing its layout caches) as soon as
+    its text is read. If no page has a text layer the document is OCR'd; if
+    pdfplumber fails, PyPDF2 continues from the first page not yet yielded.
+    A triage plan can skip pdfplumber for documents without a text layer,
+    or OCR the image-only pages of a hybrid document in page order.
+
+    Args:
+        file_content: PDF file content as bytes
+        cancel_token: Checked between pages; raises ParseCancelled when set
+        ocr_fallback: OCR the document when it has no text layer
+        plan: Triage of the document (None: the text pipeline)
+
+    Yields:
+        TextBlock for every page with text
+    """
+    if plan is not None and plan.pipeline == PIPELINE_OCR:
+        if ocr_fallback:
+            logger.info(f"Triage found no text layer, OCRing {plan.pages} pages")
+            with stage("ocr"):
+                for block in iter_ocr_pages(file_content, cancel_token, page_count=plan.pages):
+                    if block.text.strip():
+                        yield block
+        return
+    hybrid = plan is not None and plan.pipeline == PIPELINE_HYBRID and ocr_fallback
+
+    yielded = 0
+    last_page = 0
     try:
-        text_content = []
-        
-        # Create a BytesIO object from the file content
-        pdf_file = io.BytesIO(file_content)
-        
         # Use pdfplumber to extract text
-        with pdfplumber.open(pdf_file) as pdf:
-            logger.info(f"PDF has {len(pdf.pages)} pages")
+        with pdfplumber.open(io.BytesIO(file_content)) as pdf:
+            page_count = len(pdf.pages)
+            logger.info(f"PDF has {page_count} pages")
             for page_num, page in enumerate(pdf.pages, 1):
+                if cancel_token is not None:
+                    cancel_token.checkpoint(pending_pages=page_count - page_num + 1)
+                start = time.perf_counter()
                 try:
                     page_text = page.extract_text()
-                    if page_text:
-                        text_content.append(page_text)
-                        logger.info(f"Page {page_num}: extracted {len(page_text)} chars")
-                    else:
-                        logger.warning(f"Page {page_num}: no text extracted (might be image-based)")
                 except Exception as e:
                     logger.warning(f"Failed to extract text from page {page_num}: {str(e)}")
-                    continue
-        
-        # Join all pages with newlines
-        full_text = "\n".join(text_content)
-        logger.info(f"Total extracted text from PDF: {len(full_text)} chars")
-        
-        # If no text was extracted, try OCR
-        if not full_text.strip():
-            logger.info("No text extracted, attempting OCR...")
-            return extract_text_from_pdf_with_ocr(file_content)
-        
-        return full_text.strip()
-        
+                    page_text = None
+                finally:
+                    page.close()
+                last_page = page_num
+                if page_text:
+                    logger.info(f"Page {page_num}: extracted {len(page_text)} chars")
+                    yielded += 1
+                    yield TextBlock(page_num, page_text, "pdfplumber", "page", len(page_text), _elapsed_ms(start))
+                elif hybrid and plan.needs_ocr(page_num):
+                    with stage("ocr"):
+                        for block in iter_ocr_pages(file_content, cancel_token, page_count, pages=[page_num]):
+                            if block.text.strip():
+                                yielded += 1
+                                yield block
+                else:
+                    logger.warning(f"Page {page_num}: no text extracted (might be image-based)")
+
+    except (ParseCancelled, MemoryBudgetExceeded):
+        raise
     except Exception as e:
         logger.error(f"Error extracting text from PDF with pdfplumber: {str(e)}")
         # Try a more basic extraction approach if pdfplumber fails
         try:
-            import PyPDF2
-            pdf_file = io.BytesIO(file_content)
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text_content = []
-            
-            logger.info(f"Trying PyPDF2 extraction for {len(pdf_reader.pages)} pages")
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                page_text = page.extract_text()
-                if page_text:
-                    text_content.append(page_text)
-            
-            full_text = "\n".join(text_content)
-            logger.info(f"PyPDF2 extracted {len(full_text)} chars")
-            return full_text.strip()
+            yield from _iter_pypdf2_pages(file_content, last_page + 1, cancel_token)
+        except ParseCancelled:
+            raise
         except Exception as e2:
             logger.error(f"PyPDF2 also failed: {str(e2)}")
             raise Exception(f"Failed to extract text from PDF (tried pdfplumber and PyPDF2): {str(e)}")
+        return
 
+    # If no text was extracted, try OCR
+    if not yielded and ocr_fallback:
+        logger.info("No text extracted, attempting OCR...")
+        with stage("ocr"):
+            for block in iter_ocr_pages(file_content, cancel_token, page_count=page_count):
+                if block.text.strip():
+                    yield block
 
-def extract_text_from_docx(file_content: bytes) -> str:
+
+def extract_text_from_pdf(file_content: bytes, cancel_token: Optional[CancelToken] = None) -> str:
     """
-    Extract text content from a DOCX file
-    
+    Extract text content from a PDF file
+
     Args:
-        file_content: DOCX file content as bytes
-        
+        file_content: PDF file content as bytes
+        cancel_token: Checked between pages; raises ParseCancelled when set
+
     Returns:
         Extracted text as string
     """
+    # Join all pages with newlines
+    full_text = "\n".join(block.text for block in iter_pdf_pages(file_content, cancel_token))
+    logger.info(f"Total extracted text from PDF: {len(full_text)} chars")
+    return full_text.strip()
+
+
+def iter_docx_blocks(file_content: bytes) -> Iterator[TextBlock]:
+    """
+    Stream non-empty paragraphs, then table rows, from a DOCX file
+
+    Args:
+        file_content: DOCX file content as bytes
+
+    Yields:
+        TextBlock per paragraph or table row (cells joined with " | ")
+    """
     try:
-        # Create a BytesIO object from the file content
-        docx_file = io.BytesIO(file_content)
-        
         # Use python-docx to extract text
-        document = Document(docx_file)
-        
-        text_content = []
-        
-        # Extract text from paragraphs
-        for paragraph in document.paragraphs:
-            if paragraph.text.strip():
-                text_content.append(paragraph.text.strip())
-        
-        # Also extract text from tables
-        for table in document.tables:
-            for row in table.rows:
-                row_text = []
-                for cell in row.cells:
-                    cell_text = cell.text.strip()
-                    if cell_text:
-                        row_text.append(cell_text)
-                if row_text:
-                    text_content.append(" | ".join(row_text))
-        
-        # Join all text with newlines
-        full_text = "\n".join(text_content)
-        return full_text.strip()
-        
+        document = Document(io.BytesIO(file_content))
     except Exception as e:
         logger.error(f"Error extracting text from DOCX: {str(e)}")
         raise Exception(f"Failed to extract text from DOCX: {str(e)}")
 
+    index = 0
+    start = time.perf_counter()
+    # Extract text from paragraphs
+    for paragraph in document.paragraphs:
+        text = paragraph.text.strip()
+        if text:
+            index += 1
+            yield TextBlock(index, text, "python-docx", "paragraph", len(text), _elapsed_ms(start))
+            start = time.perf_counter()
+
+    # Also extract text from tables
+    for table in document.tables:
+        for row in table.rows:
+            row_text = []
+            for cell in row.cells:
+                cell_text = cell.text.strip()
+                if cell_text:
+                    row_text.append(cell_text)
+            if row_text:
+                text = " | ".join(row_text)
+                index += 1
+                yield TextBlock(index, text, "python-docx", "table_row", len(text), _elapsed_ms(start))
+                start = time.perf_counter()
+
+
+def extract_text_from_docx(file_content: bytes) -> str:
+    """
+    Extract text content from a DOCX file
+
+    Args:
+        file_content: DOCX file content as bytes
+
+    Returns:
+        Extracted text as string
+    """
+    # Join all text with newlines
+    full_text = "\n".join(block.text for block in iter_docx_blocks(file_content))
+    return full_text.strip()
+
+
+def iter_document_blocks(
+    file_content: bytes,
+    file_extension: str,
+    cancel_token: Optional[CancelToken] = None,
+    ocr_fallback: bool = True,
+    plan: Optional[DocumentTriage] = None,
+) -> Iterator[TextBlock]:
+    """
+    Stream text blocks from a PDF or DOCX file
+
+    Args:
+        file_content: File content as bytes
+        file_extension: Lowercased extension including the dot
+        cancel_token: Checked between PDF pages
+        ocr_fallback: OCR PDFs that have no text layer
+        plan: Triage of the document, choosing the PDF pipeline
+
+    Yields:
+        TextBlock per PDF page or DOCX paragraph/table row
+    """
+    if file_extension == '.pdf':
+        yield from iter_pdf_pages(file_content, cancel_token, ocr_fallback=ocr_fallback, plan=plan)
+    elif file_extension in ('.docx', '.doc'):
+        yield from iter_docx_blocks(file_content)
+    else:
+        logger.error(f"Unsupported file format: {file_extension}")
+
 
 def extract_text_from_file(file_path: str) -> Optional[str]:
     """
     Extract text from a file based on its extension
-    
+
     Args:
         file_path: Path to the file
-        
+
     Returns:
         Extracted text or None if extraction fails
     """
     try:
         with open(file_path, 'rb') as f:
             file_content = f.read()
-        
+
         if file_path.lower().endswith('.pdf'):
             return extract_text_from_pdf(file_content)
         elif file_path.lower().endswith(('.docx', '.doc')):
@@ -182,7 +560,7 @@ def extract_text_from_file(file_path: str) -> Optional[str]:
         else:
             logger.error(f"Unsupported file format: {file_path}")
             return None
-            
+
     except Exception as e:
         logger.error(f"Error extracting text from {file_path}: {str(e)}")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,148 @@
+"""
+Extracted Text Store Module
+Compressed, content-addressed store of extracted resume text plus, per
+document, the fields last extracted from it and the extractor version that
+produced them, so fields can be re-extracted without re-downloading or
+re-parsing the original files
+"""
+import os
+import time
+import zlib
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import msgpack
+
+try:
+    from models import ParsedResume
+except ImportError:
+    from resume_parser.models import ParsedResume
+
+logger = logging.getLogger(__name__)
+
+# Root directory of the store (unset disables it)
+TEXT_STORE_DIR = os.getenv("TEXT_STORE_DIR", "")
+
+COMPRESSION_LEVEL = 6
+
+
+def text_key(text: str) -> str:
+    """Content address of a text"""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def _document_name(doc_id: str) -> str:
+    return hashlib.blake2b(doc_id.encode("utf-8"), digest_size=20).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write via a temp file and rename, so readers never see partial files"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class TextStore:
+    """
+    Text objects under objects/, one msgpack record per document under documents/
+
+    Texts are zlib-compressed and named by the hash of their content, so
+    the same resume stored under several ids (or parsed twice) is kept
+    once. Document records point at a text and hold the extracted fields
+    in the ParsedResume encoding, so they carry its schema version.
+    Writes are atomic renames, so several processes can share a store.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+
+    def _object_path(self, key: str) -> Path:
+        return self.root / "objects" / key[:2] / f"{key}.z"
+
+    def _document_path(self, doc_id: str) -> Path:
+        name = _document_name(doc_id)
+        return self.root / "documents" / name[:2] / f"{name}.mp"
+
+    def put_text(self, text: str) -> str:
+        """
+        Store a text if it is not stored yet
+
+        Args:
+            text: Extracted resume text
+
+        Returns:
+            Its content key
+        """
+        key = text_key(text)
+        path = self._object_path(key)
+        if not path.exists():
+            _write_atomic(path, zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL))
+        return key
+
+    def get_text(self, key: str) -> str:
+        """
+        Read a stored text
+
+        Raises:
+            KeyError: No text is stored under the key
+        """
+        try:
+            with open(self._object_path(key), "rb") as f:
+                return zlib.decompress(f.read()).decode("utf-8")
+        except FileNotFoundError:
+            raise KeyError(key)
+
+    def save_document(self, doc_id: str, key: str, fields: Dict[str, Any], version: str) -> None:
+        """
+        Record the text and fields of a document, replacing any earlier record
+
+        Args:
+            doc_id: Document id (file path or URL)
+            key: Content key of its stored text
+            fields: Extracted fields
+            version: Extractor version that produced the fields
+        """
+        record = {
+            "doc_id": doc_id,
+            "text_key": key,
+            "fields": ParsedResume.from_fields(fields).to_bytes(),
+            "version": version,
+            "updated": time.time(),
+        }
+        _write_atomic(self._document_path(doc_id), msgpack.packb(record, use_bin_type=True))
+
+    def load_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        """Return the record of a document, or None if it is not stored"""
+        try:
+            return self._read_record(self._document_path(doc_id))
+        except FileNotFoundError:
+            return None
+
+    @staticmethod
+    def _read_record(path: Path) -> Dict[str, Any]:
+        with open(path, "rb") as f:
+            record = msgpack.unpackb(f.read(), raw=False)
+        record["fields"] = ParsedResume.from_bytes(record["fields"]).fields()
+        return record
+
+    def record(self, doc_id: str, text: str, fields: Dict[str, Any], version: str) -> None:
+        """Store a text and the fields extracted from it for a document"""
+        self.save_document(doc_id, self.put_text(text), fields, version)
+
+    def iter_documents(self) -> Iterator[Dict[str, Any]]:
+        """Yield every document record, in a stable order"""
+        for path in sorted((self.root / "documents").glob("*/*.mp")):
+            try:
+                yield self._read_record(path)
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning(f"Skipping unreadable text store record {path}: {e}")
+
+
+def get_text_store() -> Optional[TextStore]:
+    """Return the store configured by TEXT_STORE_DIR, or None if disabled"""
+    return TextStore(TEXT_STORE_DIR) if TEXT_STORE_DIR else None
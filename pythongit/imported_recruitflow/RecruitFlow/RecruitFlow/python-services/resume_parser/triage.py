@@ -0,0 +1,320 @@
+"""
+Document Triage Module
+Inspects an upload's structure before any text is extracted: for PDFs the
+header, trailer, cross-reference table and page tree (never the page content
+streams), for DOCX the zip directory. Finds the page count, encryption and
+which pages have a text layer in a few milliseconds, chooses the extraction
+pipeline (text, hybrid, OCR) and rejects inputs that cannot be parsed before
+they are queued, loaded by pdfplumber or python-docx, or sent to Affinda.
+"""
+import io
+import os
+import re
+import time
+import zipfile
+import logging
+import threading
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from pdfminer.pdfparser import PDFParser
+from pdfminer.pdfdocument import PDFDocument, PDFEncryptionError, PDFPasswordIncorrect
+from pdfminer.pdftypes import resolve1
+
+logger = logging.getLogger(__name__)
+
+# Pages whose resources are inspected for a text layer; later pages are
+# assumed to match (the page count itself is always exact)
+TRIAGE_SCAN_PAGES = int(os.getenv("TRIAGE_SCAN_PAGES", "20"))
+
+# Reject documents with more pages than this (0 disables)
+PARSE_MAX_PAGES = int(os.getenv("PARSE_MAX_PAGES", "0"))
+
+# Reject documents with more pages to OCR than this (0 disables)
+PARSE_MAX_OCR_PAGES = int(os.getenv("PARSE_MAX_OCR_PAGES", "0"))
+
+PIPELINE_TEXT = "text"      # text layer (or DOCX text); OCR only if no page has text
+PIPELINE_HYBRID = "hybrid"  # text layer, plus OCR of the pages that are only images
+PIPELINE_OCR = "ocr"        # no text layer: straight to OCR, no pdfplumber pass
+PIPELINE_REJECT = "reject"
+
+# PDF readers accept the header anywhere in the first kilobyte
+PDF_HEADER_WINDOW = 1024
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+# OLE compound file: Word 97-2003 documents, and password-protected DOCX
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+OLE_ENCRYPTED_STREAM = "EncryptedPackage".encode("utf-16-le")
+
+# Nested form XObjects followed when looking for fonts
+MAX_FORM_DEPTH = 3
+
+_DOCX_PAGES = re.compile(rb"<(?:\w+:)?Pages>(\d+)</(?:\w+:)?Pages>")
+
+
+class DocumentTriage(NamedTuple):
+    """What triage found out about a document, and the pipeline chosen for it"""
+    kind: str                   # pdf, docx, doc or unknown
+    pipeline: str               # text, hybrid, ocr or reject
+    size: int                   # bytes
+    pages: Optional[int] = None             # None when the structure could not be read
+    encrypted: bool = False
+    text_pages: Optional[int] = None        # scanned pages with a text layer
+    image_pages: Tuple[int, ...] = ()       # 1-based scanned pages with images and no text layer
+    scanned_pages: int = 0                  # pages whose resources were inspected
+    status_code: Optional[int] = None       # HTTP status for rejections
+    reason: Optional[str] = None            # why it was rejected (or could not be read)
+    elapsed_ms: float = 0.0
+
+    @property
+    def rejected(self) -> bool:
+        return self.pipeline == PIPELINE_REJECT
+
+    def needs_ocr(self, page_number: int) -> bool:
+        """Whether a page that gave no text should be OCR'd in the hybrid pipeline"""
+        return page_number in self.image_pages or page_number > self.scanned_pages
+
+    def fields(self) -> Dict[str, Any]:
+        """JSON-friendly summary"""
+        summary = self._asdict()
+        summary["image_pages"] = list(self.image_pages)
+        return summary
+
+
+class TriageRejected(Exception):
+    """Triage found the document cannot be parsed"""
+
+    def __init__(self, triage: DocumentTriage):
+        super().__init__(triage.reason)
+        self.triage = triage
+        self.status_code = triage.status_code or 422
+
+
+def _reject(kind: str, size: int, status_code: int, reason: str, **found: Any) -> DocumentTriage:
+    return DocumentTriage(kind, PIPELINE_REJECT, size, status_code=status_code, reason=reason, **found)
+
+
+def _name(value: Any) -> Optional[str]:
+    """Name of a PDF name object (/Image -> "Image")"""
+    return getattr(value, "name", None)
+
+
+def _resource_kinds(resources: Any, depth: int = 0) -> Tuple[bool, bool]:
+    """
+    Whether page resources can draw text, and whether they draw images
+
+    Fonts used only inside form XObjects are followed MAX_FORM_DEPTH deep.
+
+    Returns:
+        (has fonts, has image XObjects)
+    """
+    resources = resolve1(resources)
+    if not isinstance(resources, dict):
+        return False, False
+    fonts = bool(resolve1(resources.get("Font")))
+    images = False
+    xobjects = resolve1(resources.get("XObject"))
+    if isinstance(xobjects, dict):
+        for reference in xobjects.values():
+            xobject = resolve1(reference)
+            attrs = getattr(xobject, "attrs", None)
+            if not isinstance(attrs, dict):
+                continue
+            subtype = _name(attrs.get("Subtype"))
+            if subtype == "Image":
+                images = True
+            elif subtype == "Form" and depth < MAX_FORM_DEPTH and not fonts:
+                form_fonts, form_images = _resource_kinds(attrs.get("Resources"), depth + 1)
+                fonts = fonts or form_fonts
+                images = images or form_images
+    return fonts, images
+
+
+def _iter_page_resources(document: Any, limit: int):
+    """Resources of the first `limit` pages, inherited ones included, walking only the page tree"""
+    stack = [(document.catalog.get("Pages"), None)]
+    seen = set()
+    found = 0
+    while stack and found < limit:
+        reference, inherited = stack.pop()
+        # A malformed tree may list a node twice or loop back to an ancestor
+        key = getattr(reference, "objid", id(reference))
+        if key in seen:
+            continue
+        seen.add(key)
+        node = resolve1(reference)
+        if not isinstance(node, dict):
+            continue
+        resources = node.get("Resources", inherited)
+        kids = resolve1(node.get("Kids"))
+        if kids is None:
+            found += 1
+            yield resources
+        else:
+            stack.extend((kid, resources) for kid in reversed(kids))
+
+
+def triage_pdf(content: bytes, scan_pages: int = TRIAGE_SCAN_PAGES) -> DocumentTriage:
+    """
+    Triage a PDF from its trailer, cross-reference table and page tree
+
+    Documents whose structure pdfminer cannot read are not rejected: they
+    go to the text pipeline, where pdfplumber, PyPDF2's more forgiving
+    parser and Affinda may still get something out of them.
+
+    Args:
+        content: Raw PDF bytes
+        scan_pages: Pages whose resources are inspected
+
+    Returns:
+        DocumentTriage
+    """
+    size = len(content)
+    if PDF_MAGIC not in content[:PDF_HEADER_WINDOW]:
+        return _reject("unknown", size, 422, "Not a PDF file (no %PDF header)")
+    try:
+        document = PDFDocument(PDFParser(io.BytesIO(content)))
+    except PDFPasswordIncorrect:
+        return _reject("pdf", size, 422, "PDF is password-protected", encrypted=True)
+    except PDFEncryptionError as e:
+        return _reject("pdf", size, 422, f"PDF encryption is not supported: {e}", encrypted=True)
+    except Exception as e:
+        logger.warning(f"Triage could not read the PDF structure, using the text pipeline: {e}")
+        return DocumentTriage("pdf", PIPELINE_TEXT, size, reason=f"Unreadable structure: {e}")
+
+    encrypted = document.encryption is not None
+    try:
+        pages = int(resolve1(resolve1(document.catalog.get("Pages")).get("Count")))
+        text_pages = 0
+        image_pages = []
+        scanned = 0
+        for scanned, resources in enumerate(_iter_page_resources(document, scan_pages), 1):
+            fonts, images = _resource_kinds(resources)
+            if fonts:
+                text_pages += 1
+            elif images:
+                image_pages.append(scanned)
+    except Exception as e:
+        logger.warning(f"Triage could not read the PDF page tree, using the text pipeline: {e}")
+        return DocumentTriage("pdf", PIPELINE_TEXT, size, encrypted=encrypted, reason=f"Unreadable page tree: {e}")
+
+    if pages <= 0:
+        return _reject("pdf", size, 422, "PDF has no pages", pages=0, encrypted=encrypted)
+    if not scanned:
+        pipeline = PIPELINE_TEXT
+    elif not text_pages:
+        # Without fonts no page can hold text for pdfplumber to find
+        pipeline = PIPELINE_OCR
+    elif image_pages:
+        pipeline = PIPELINE_HYBRID
+    else:
+        pipeline = PIPELINE_TEXT
+    return DocumentTriage(
+        "pdf", pipeline, size, pages=pages, encrypted=encrypted, text_pages=text_pages,
+        image_pages=tuple(image_pages), scanned_pages=scanned,
+    )
+
+
+def triage_docx(content: bytes) -> DocumentTriage:
+    """
+    Triage a Word upload from its zip directory
+
+    Returns:
+        DocumentTriage; Word 97-2003 (.doc) and password-protected files are
+        rejected, as python-docx reads neither
+    """
+    size = len(content)
+    if content.startswith(OLE_MAGIC):
+        if OLE_ENCRYPTED_STREAM in content:
+            return _reject("docx", size, 422, "Word document is password-protected", encrypted=True)
+        return _reject("doc", size, 415, "Word 97-2003 (.doc) files are not supported; save the file as .docx")
+    if not content.startswith(ZIP_MAGIC):
+        return _reject("unknown", size, 422, "Not a Word document (no zip or OLE signature)")
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(content))
+        names = set(archive.namelist())
+        if "word/document.xml" not in names:
+            return _reject("unknown", size, 422, "Not a Word document (no word/document.xml)")
+        pages = None
+        if "docProps/app.xml" in names and archive.getinfo("docProps/app.xml").file_size < 64 * 1024:
+            # Word's own count as of the last save; absent for generated files
+            match = _DOCX_PAGES.search(archive.read("docProps/app.xml"))
+            pages = int(match.group(1)) if match else None
+    except (zipfile.BadZipFile, KeyError, OSError, RuntimeError) as e:
+        return _reject("docx", size, 422, f"Corrupted Word document: {e}")
+    return DocumentTriage("docx", PIPELINE_TEXT, size, pages=pages)
+
+
+def triage_document(
+    content: bytes,
+    file_extension: str,
+    max_pages: int = PARSE_MAX_PAGES,
+    max_ocr_pages: int = PARSE_MAX_OCR_PAGES,
+) -> DocumentTriage:
+    """
+    Inspect a document and choose how to parse it
+
+    Args:
+        content: Raw file bytes
+        file_extension: Lowercased extension including the dot
+        max_pages: Reject documents with more pages (0: no limit)
+        max_ocr_pages: Reject documents with more pages to OCR (0: no limit)
+
+    Returns:
+        DocumentTriage (pipeline "reject" with status_code and reason when
+        the document cannot be parsed)
+    """
+    start = time.perf_counter()
+    if file_extension == ".pdf":
+        triage = triage_pdf(content)
+    elif file_extension in (".docx", ".doc"):
+        triage = triage_docx(content)
+    else:
+        triage = _reject("unknown", len(content), 400, f"Unsupported file format: {file_extension}")
+
+    if not triage.rejected and triage.pages is not None:
+        if max_pages > 0 and triage.pages > max_pages:
+            triage = triage._replace(
+                pipeline=PIPELINE_REJECT, status_code=413,
+                reason=f"Document has {triage.pages} pages, over the limit of {max_pages}",
+            )
+        elif max_ocr_pages > 0 and triage.pipeline != PIPELINE_TEXT:
+            ocr_pages = triage.pages if triage.pipeline == PIPELINE_OCR else (
+                len(triage.image_pages) + max(0, triage.pages - triage.scanned_pages)
+            )
+            if ocr_pages > max_ocr_pages:
+                triage = triage._replace(
+                    pipeline=PIPELINE_REJECT, status_code=413,
+                    reason=f"Document has {ocr_pages} pages to OCR, over the limit of {max_ocr_pages}",
+                )
+    return triage._replace(elapsed_ms=round((time.perf_counter() - start) * 1000, 2))
+
+
+class TriageStats:
+    """Pipelines chosen, rejections by reason and triage time"""
+
+    def __init__(self):
+        self.by_pipeline: Dict[str, int] = {}
+        self.rejected_by_status: Dict[int, int] = {}
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, triage: DocumentTriage) -> DocumentTriage:
+        with self._lock:
+            self.by_pipeline[triage.pipeline] = self.by_pipeline.get(triage.pipeline, 0) + 1
+            if triage.rejected:
+                status = triage.status_code or 422
+                self.rejected_by_status[status] = self.rejected_by_status.get(status, 0) + 1
+            self.total_ms += triage.elapsed_ms
+            self.max_ms = max(self.max_ms, triage.elapsed_ms)
+        return triage
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            documents = sum(self.by_pipeline.values())
+            return {
+                "documents": documents,
+                "by_pipeline": dict(self.by_pipeline),
+                "rejected_by_status": {str(status): count for status, count in self.rejected_by_status.items()},
+                "mean_ms": round(self.total_ms / documents, 2) if documents else 0.0,
+                "max_ms": round(self.max_ms, 2),
+            }
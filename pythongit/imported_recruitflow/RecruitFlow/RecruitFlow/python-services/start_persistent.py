@@ -1,27 +1,39 @@
 #!/usr/bin/env python
 """
 Start the FastAPI resume parser service with proper error handling
+
+The service runs in a child process so its memory is returned to the OS when
+it exits. A clean exit (the memory governor recycling the worker) restarts
+it immediately; a crash restarts it after a short delay.
 """
 import sys
 import os
 import time
+import signal
+import subprocess
 
-# Add the resume_parser directory to the Python path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'resume_parser'))
+RESUME_PARSER_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resume_parser')
 
-# Import and run the app
-from main import app
-import uvicorn
+WORKER_COMMAND = [
+    sys.executable, "-m", "uvicorn", "main:app",
+    "--host", "0.0.0.0", "--port", "8001", "--log-level", "info",
+]
 
 if __name__ == "__main__":
     print("Starting Resume Parser Service on http://0.0.0.0:8001", flush=True)
     print("Service is ready for connections...", flush=True)
-    
-    # Keep retrying if the service crashes
+
+    # Keep restarting the worker when it exits
     while True:
         try:
-            uvicorn.run(app, host="0.0.0.0", port=8001, log_level="info")
-        except Exception as e:
-            print(f"Service crashed with error: {e}", flush=True)
-            print("Restarting in 5 seconds...", flush=True)
-            time.sleep(5)
\ No newline at end of file
+            exit_code = subprocess.call(WORKER_COMMAND, cwd=RESUME_PARSER_DIR)
+        except KeyboardInterrupt:
+            break
+        # uvicorn re-raises SIGTERM after its graceful shutdown, so a recycled
+        # worker reports -SIGTERM rather than 0
+        if exit_code in (0, -signal.SIGTERM):
+            print("Worker recycled; restarting", flush=True)
+            continue
+        print(f"Service crashed with exit code {exit_code}", flush=True)
+        print("Restarting in 5 seconds...", flush=True)
+        time.sleep(5)
@@ -0,0 +1,156 @@
+"""
+Unit tests for adaptive-resolution OCR
+"""
+import pytest
+from unittest.mock import patch
+from PIL import Image
+
+from resume_parser import text_extractor
+from resume_parser.ocr_cache import OCRPageCache
+
+
+def _page(color, size=40):
+    return Image.new('L', (size, size), color=color)
+
+
+def _tesseract_data(words, conf):
+    """image_to_data output for one line of words with the given confidence"""
+    return {
+        "text": [""] + words,
+        "conf": [-1] + [conf] * len(words),
+        "block_num": [1] * (len(words) + 1),
+        "par_num": [1] * (len(words) + 1),
+        "line_num": [0] + [1] * len(words),
+    }
+
+
+@pytest.fixture
+def adaptive(monkeypatch):
+    monkeypatch.setattr(text_extractor, 'OCR_MODE', 'adaptive')
+    cache = OCRPageCache(memory_bytes=1024 * 1024)
+    monkeypatch.setattr(text_extractor, 'get_ocr_cache', lambda: cache)
+
+
+class TestOCRWithConfidence:
+    """Test text and confidence reconstruction from Tesseract data"""
+
+    def test_lines_blocks_and_mean_confidence(self):
+        """Test that lines are rebuilt and blocks separated by a blank line"""
+        data = {
+            "text": ["", "Jane", "Doe", "", "Python", " "],
+            "conf": [-1, 90, 80, -1, 70, -1],
+            "block_num": [1, 1, 1, 2, 2, 2],
+            "par_num": [1, 1, 1, 1, 1, 1],
+            "line_num": [0, 1, 1, 0, 1, 1],
+        }
+        with patch('pytesseract.image_to_data', return_value=data):
+            text, confidence = text_extractor.ocr_with_confidence(_page(0), "--psm 4")
+        assert text == "Jane Doe\n\nPython"
+        assert confidence == 80.0
+
+    def test_no_words(self):
+        """Test that a page without words has no confidence"""
+        with patch('pytesseract.image_to_data', return_value=_tesseract_data([], 0)):
+            assert text_extractor.ocr_with_confidence(_page(0), "") == ("", None)
+
+
+class TestAdaptiveOCR:
+    """Test low-resolution first pass and escalation"""
+
+    def test_confident_pages_stay_at_low_dpi(self, adaptive):
+        """Test that a clean page is read once, at the fast resolution"""
+        with patch('pdf2image.convert_from_bytes', return_value=[_page(10)]) as mock_render, \
+                patch('pytesseract.image_to_data', return_value=_tesseract_data(["Jane", "Doe"], 95)) as mock_ocr:
+            blocks = list(text_extractor.iter_ocr_pages(b'pdf'))
+
+        assert mock_ocr.call_count == 1
+        assert mock_render.call_args.kwargs == {"dpi": text_extractor.OCR_FAST_DPI, "grayscale": True}
+        assert blocks[0].text == "Jane Doe"
+        assert blocks[0].dpi == text_extractor.OCR_FAST_DPI
+        assert blocks[0].confidence == 95.0
+
+    def test_low_confidence_pages_escalate(self, adaptive):
+        """Test that only the low-confidence page is re-read at full resolution"""
+        renders = [[_page(10), _page(20)], [_page(30, size=80)]]
+        results = [
+            _tesseract_data(["Clean"], 92),
+            _tesseract_data(["Bl0rry"], 40),
+            _tesseract_data(["Blurry"], 88),
+        ]
+        with patch('pdf2image.convert_from_bytes', side_effect=renders) as mock_render, \
+                patch('pytesseract.image_to_data', side_effect=results):
+            blocks = list(text_extractor.iter_ocr_pages(b'pdf'))
+
+        assert mock_render.call_args.kwargs == {
+            "dpi": text_extractor.OCR_DPI, "grayscale": True, "first_page": 2, "last_page": 2
+        }
+        assert [(b.text, b.dpi, b.confidence) for b in blocks] == [
+            ("Clean", text_extractor.OCR_FAST_DPI, 92.0),
+            ("Blurry", text_extractor.OCR_DPI, 88.0),
+        ]
+
+    def test_cached_pages_keep_dpi_and_confidence(self, adaptive):
+        """Test that cache hits report the original DPI and confidence"""
+        with patch('pdf2image.convert_from_bytes', side_effect=lambda *a, **k: [_page(10)]), \
+                patch('pytesseract.image_to_data', return_value=_tesseract_data(["Jane"], 91)) as mock_ocr:
+            first = list(text_extractor.iter_ocr_pages(b'pdf'))
+            second = list(text_extractor.iter_ocr_pages(b'pdf'))
+
+        assert mock_ocr.call_count == 1
+        assert (second[0].text, second[0].dpi, second[0].confidence) == ("Jane", text_extractor.OCR_FAST_DPI, 91.0)
+        assert (first[0].text, first[0].dpi, first[0].confidence) == ("Jane", text_extractor.OCR_FAST_DPI, 91.0)
+
+
+class TestPreprocessedOCR:
+    """Test that preprocessing keeps blank pages away from Tesseract"""
+
+    def test_blank_pages_skip_tesseract(self, monkeypatch):
+        """Test that only the page with ink is OCR'd, and it is binarized first"""
+        from PIL import ImageDraw
+        monkeypatch.setattr(text_extractor, 'OCR_PREPROCESS', True)
+        cache = OCRPageCache(memory_bytes=1024 * 1024)
+        monkeypatch.setattr(text_extractor, 'get_ocr_cache', lambda: cache)
+
+        text_page = Image.new('L', (2550, 3300), 230)
+        ImageDraw.Draw(text_page).rectangle([200, 200, 2000, 230], fill=20)
+        blank_page = Image.new('L', (2550, 3300), 235)
+
+        with patch('pdf2image.convert_from_bytes', return_value=[blank_page, text_page]), \
+                patch('pytesseract.image_to_string', return_value="Jane Doe") as mock_ocr:
+            blocks = list(text_extractor.iter_ocr_pages(b'pdf'))
+
+        assert [b.text for b in blocks] == ["", "Jane Doe"]
+        assert mock_ocr.call_count == 1
+        ocr_input = mock_ocr.call_args.args[0]
+        assert ocr_input.size[1] < text_page.size[1]
+
+
+class TestRasterBudget:
+    """Test the raster memory budget for each rendering mode"""
+
+    @pytest.fixture
+    def budget(self, monkeypatch):
+        check = text_extractor.check_raster_budget
+        monkeypatch.setattr(text_extractor, 'check_raster_budget',
+                            lambda pages, dpi: check(pages, dpi, budget_mb=100))
+
+    def test_whole_document_rendering_is_budgeted(self, budget):
+        """Test that a long document is refused before any page is rendered"""
+        with patch('pdf2image.pdfinfo_from_bytes', return_value={"Pages": 200}), \
+                patch('pdf2image.convert_from_bytes') as mock_render:
+            with pytest.raises(text_extractor.MemoryBudgetExceeded):
+                list(text_extractor.iter_ocr_pages(b'pdf'))
+        assert mock_render.call_count == 0
+
+    def test_page_by_page_rendering_holds_one_page(self, budget, monkeypatch):
+        """Test that the same document is OCR'd when pages are rendered one at a time"""
+        cache = OCRPageCache(memory_bytes=1024 * 1024)
+        monkeypatch.setattr(text_extractor, 'get_ocr_cache', lambda: cache)
+        with patch('pdf2image.convert_from_bytes', side_effect=lambda *a, **kw: [_page(kw["first_page"])]), \
+                patch('pytesseract.image_to_string', return_value="Jane Doe"):
+            blocks = list(text_extractor.iter_ocr_pages(b'pdf', page_count=200))
+        assert len(blocks) == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
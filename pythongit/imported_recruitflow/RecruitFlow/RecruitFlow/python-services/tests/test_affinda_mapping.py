@@ -33,7 +33,7 @@ def test_affinda_mapping_success(monkeypatch):
         return affinda_response, affinda_response.get('text')
 
     async def mock_download(file_path: str):
-        return b'fake-bytes'
+        return b'%PDF-1.4 fake'
 
     # Set API key to trigger Affinda path
     monkeypatch.setenv('AFFINDA_API_KEY', 'test-key')
@@ -55,3 +55,64 @@ def test_affinda_mapping_success(monkeypatch):
     assert 'San Francisco' in data['address']
     assert isinstance(data['skills'], list)
     assert 'Python' in data['skills']
+
+
+def test_mapping_prefers_shallow_and_container_fields():
+    """Fields under container keys rank with top-level ones; deeper matches lose."""
+    from resume_parser.affinda_mapping import map_affinda_response
+
+    response = {
+        "meta": {"owner": {"email": "owner@affinda.com"}},
+        "data": {"emails": ["bob@example.com"], "name": "Bob Example"},
+        "skills": "Python; SQL,Go",
+    }
+    mapped = map_affinda_response(response)
+
+    assert mapped['email'] == ["bob@example.com"]
+    assert mapped['full_name'] == "Bob Example"
+    assert mapped['skills'] == ["Python", "SQL", "Go"]
+    assert mapped['phone'] is None
+
+
+def test_mapping_reuses_resolved_paths_per_shape():
+    """Responses with the same shape resolve paths once."""
+    from resume_parser import affinda_mapping
+
+    affinda_mapping._resolve_paths.cache_clear()
+    first = affinda_mapping.map_affinda_response({"data": {"name": "A One", "email": "a@x.com"}})
+    second = affinda_mapping.map_affinda_response({"data": {"name": "B Two", "email": "b@x.com"}})
+
+    info = affinda_mapping._resolve_paths.cache_info()
+    assert info.misses == 1 and info.hits == 1
+    assert first['full_name'] == "A One"
+    assert second['full_name'] == "B Two"
+
+
+def test_mapping_shares_resolved_paths_across_list_lengths():
+    """Responses that differ only in how many emails, jobs or skills they list resolve paths once."""
+    from resume_parser import affinda_mapping
+
+    affinda_mapping._resolve_paths.cache_clear()
+    short = affinda_mapping.map_affinda_response({
+        "data": {"name": "A One", "emails": ["a@x.com"], "workExperience": [{"jobTitle": "Dev", "location": "Boston"}],
+                 "skills": [{"name": "Python"}]},
+    })
+    long = affinda_mapping.map_affinda_response({
+        "data": {"name": "B Two", "emails": ["b@x.com", "b2@x.com"],
+                 "workExperience": [{"jobTitle": "Lead", "location": "Austin"}, {"jobTitle": "Dev", "location": "Boston"}],
+                 "skills": [{"name": "Go"}, {"name": "SQL"}, {"name": "Rust"}]},
+    })
+
+    info = affinda_mapping._resolve_paths.cache_info()
+    assert info.misses == 1 and info.hits == 1
+    assert short['full_name'] == "A One" and long['full_name'] == "B Two"
+    assert long['email'] == ["b@x.com", "b2@x.com"]
+    # A field inside list entries resolves to the first entry, as before
+    assert short['address'] == "Boston" and long['address'] == "Austin"
+
+
+def test_mapping_rejects_unknown_schema():
+    from resume_parser.affinda_mapping import map_affinda_response
+
+    with pytest.raises(ValueError):
+        map_affinda_response({"name": "X"}, schema_version="v0")
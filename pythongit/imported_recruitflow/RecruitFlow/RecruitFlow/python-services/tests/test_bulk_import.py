@@ -0,0 +1,125 @@
+"""
+Tests for the resumable bulk-import command
+"""
+import sys
+import os
+import csv
+import json
+import zipfile
+import pytest
+from docx import Document
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+import bulk_import
+from bulk_import import checkpoint_path, iter_sources, run_bulk_import
+
+
+def _make_docx(path, lines):
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    """A folder with two resumes, a junk file and a zip with two more"""
+    folder = tmp_path / "resumes"
+    folder.mkdir()
+    _make_docx(folder / "a.docx", ["Alice Example", "alice@example.com", "Skills: Python, SQL"])
+    _make_docx(folder / "b.docx", ["Bob Example", "bob@example.com"])
+    (folder / "notes.txt").write_text("not a resume")
+
+    archive = tmp_path / "archive.zip"
+    member = tmp_path / "c.docx"
+    _make_docx(member, ["Carol Example", "carol@example.com"])
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.write(member, "nested/c.docx")
+        zf.writestr("nested/broken.pdf", b"not a pdf")
+    return [str(folder), str(archive)]
+
+
+class TestBulkImport:
+    """Test enumeration, output and resuming"""
+
+    def test_iter_sources_walks_folders_and_zips(self, corpus):
+        """Test that supported files are found without unpacking archives"""
+        ids = [doc_id for doc_id, _, _ in iter_sources(corpus)]
+        assert len(ids) == 4
+        assert any(doc_id.endswith("archive.zip!nested/c.docx") for doc_id in ids)
+        assert not any(doc_id.endswith("notes.txt") for doc_id in ids)
+
+    def test_ndjson_output_matches_parse_payload(self, corpus, tmp_path):
+        """Test NDJSON records carry /parse fields and failures are recorded"""
+        output = tmp_path / "out.ndjson"
+        counts = run_bulk_import(corpus, str(output), workers=1)
+        assert counts == {"parsed": 3, "failed": 1, "skipped": 0}
+
+        records = {r["file_path"].rsplit("/", 1)[-1]: r for r in map(json.loads, output.read_text().splitlines())}
+        assert records["a.docx"]["name"] == "Alice Example"
+        assert "Python" in records["a.docx"]["skills"]
+        assert records["c.docx"]["email"] == "carol@example.com"
+        assert records["broken.pdf"]["success"] is False
+
+    def test_resume_skips_completed_and_drops_partial_rows(self, corpus, tmp_path):
+        """Test that a re-run after a crash resumes without duplicates"""
+        output = tmp_path / "out.csv"
+        run_bulk_import(corpus, str(output), workers=1)
+        rows_before = list(csv.DictReader(output.open(newline="")))
+
+        # Simulate a crash: drop the last checkpoint line and leave a torn row
+        checkpoint = checkpoint_path(output)
+        lines = checkpoint.read_text().splitlines(keepends=True)
+        checkpoint.write_text("".join(lines[:-1]))
+        with output.open("a") as f:
+            f.write('"torn,row')
+
+        counts = run_bulk_import(corpus, str(output), workers=1)
+        assert counts["skipped"] == 3
+        assert counts["parsed"] + counts["failed"] == 1
+
+        rows_after = list(csv.DictReader(output.open(newline="")))
+        assert len(rows_after) == len(rows_before) == 4
+        assert len({row["file_path"] for row in rows_after}) == 4
+
+    def test_parallel_workers(self, corpus, tmp_path):
+        """Test the process-pool path produces every record"""
+        output = tmp_path / "out.ndjson"
+        counts = run_bulk_import(corpus, str(output), workers=2)
+        assert counts["parsed"] == 3
+        assert len(output.read_text().splitlines()) == 4
+
+    def test_crashed_worker_fails_only_its_document(self, corpus, tmp_path, monkeypatch):
+        """Test that a document killing its worker is recorded and the run continues"""
+        parse_document = bulk_import.parse_document
+
+        def crashing_parse(content, name):
+            if name.endswith("b.docx"):
+                os._exit(1)  # e.g. a segfault in a native parser
+            return parse_document(content, name)
+
+        # Workers are forked, so they inherit the patch
+        monkeypatch.setattr(bulk_import, "parse_document", crashing_parse)
+        output = tmp_path / "out.ndjson"
+        counts = run_bulk_import(corpus, str(output), workers=2)
+        assert counts == {"parsed": 2, "failed": 2, "skipped": 0}
+
+        records = {r["file_path"].rsplit("/", 1)[-1]: r for r in map(json.loads, output.read_text().splitlines())}
+        assert len(records) == 4
+        assert records["b.docx"] == {"file_path": records["b.docx"]["file_path"], "success": False,
+                                     "error": "Worker process crashed"}
+        assert records["a.docx"]["name"] == "Alice Example"
+        assert len(checkpoint_path(output).read_text().splitlines()) == 4
+
+    def test_refuses_output_without_checkpoint(self, corpus, tmp_path):
+        """Test that an unrelated existing output is not overwritten"""
+        output = tmp_path / "existing.ndjson"
+        output.write_text('{"keep": true}\n')
+        with pytest.raises(ValueError):
+            run_bulk_import(corpus, str(output), workers=1)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,106 @@
+"""
+Tests for parse cancellation on deadline or client disconnect
+"""
+import os
+import time
+import asyncio
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+
+import resume_parser.main as main_mod
+from resume_parser import text_extractor
+from resume_parser.cancellation import (
+    CancelToken, ParseCancelled, REASON_DEADLINE, REASON_DISCONNECT, await_cancellable, cancel_stats
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_env():
+    if 'AFFINDA_API_KEY' in os.environ:
+        del os.environ['AFFINDA_API_KEY']
+    yield
+    if 'AFFINDA_API_KEY' in os.environ:
+        del os.environ['AFFINDA_API_KEY']
+
+
+def test_token_expires_at_deadline():
+    token = CancelToken(time.monotonic() - 1)
+    assert token.cancelled
+    assert token.reason == REASON_DEADLINE
+    assert not CancelToken().cancelled
+
+
+def test_explicit_cancel_keeps_first_reason():
+    token = CancelToken()
+    token.cancel(REASON_DISCONNECT)
+    token.cancel(REASON_DEADLINE)
+    assert token.reason == REASON_DISCONNECT
+    with pytest.raises(ParseCancelled):
+        token.checkpoint()
+
+
+def test_await_cancellable_stops_slow_work():
+    """The wrapped coroutine is cancelled as soon as the token is."""
+    finished = []
+
+    async def slow():
+        await asyncio.sleep(5)
+        finished.append(True)
+
+    async def scenario():
+        token = CancelToken.from_budget_ms(50)
+        start = time.monotonic()
+        with pytest.raises(ParseCancelled):
+            await await_cancellable(slow(), token)
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(scenario())
+    assert elapsed < 1
+    assert finished == []
+
+
+def test_pdf_extraction_stops_between_pages():
+    """Pages after the cancellation point are skipped and counted."""
+    token = CancelToken()
+
+    def disconnect_after_read():
+        token.cancel(REASON_DISCONNECT)
+        return "page 1"
+
+    pages = [MagicMock() for _ in range(5)]
+    for i, page in enumerate(pages):
+        page.extract_text.return_value = f"page {i}"
+    pages[1].extract_text.side_effect = disconnect_after_read
+
+    before = cancel_stats.snapshot()["pages_skipped"]
+    with patch('pdfplumber.open') as mock_pdf:
+        mock_pdf.return_value.__enter__.return_value.pages = pages
+        with pytest.raises(ParseCancelled):
+            text_extractor.extract_text_from_pdf(b'fake', token)
+
+    assert pages[2].extract_text.call_count == 0
+    assert cancel_stats.snapshot()["pages_skipped"] - before == 3
+
+
+def test_parse_deadline_cancels_affinda_call(monkeypatch):
+    """A request deadline returns 504 and cancels the in-flight Affinda call."""
+    async def slow_affinda(file_bytes, filename='resume', api_key=None):
+        await asyncio.sleep(5)
+        return {}, None
+
+    async def mock_download(file_path: str):
+        return b'%PDF-1.4 fake'
+
+    monkeypatch.setenv('AFFINDA_API_KEY', 'test-key')
+    monkeypatch.setattr(main_mod, 'parse_with_affinda', slow_affinda)
+    monkeypatch.setattr(main_mod, 'download_file_from_storage', mock_download)
+
+    before = main_mod.cancel_stats.snapshot()
+    client = TestClient(main_mod.app)
+    resp = client.get('/parse', params={'file_path': 'resume.pdf'}, headers={'X-Parse-Deadline-Ms': '100'})
+    assert resp.status_code == 504
+
+    after = client.get('/metrics').json()["cancellation"]
+    assert after["affinda_calls_cancelled"] == before["affinda_calls_cancelled"] + 1
+    assert after["requests_cancelled"]["deadline"] == before["requests_cancelled"]["deadline"] + 1
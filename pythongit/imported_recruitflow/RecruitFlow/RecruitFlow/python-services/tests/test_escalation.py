@@ -0,0 +1,132 @@
+"""
+Tests for local-first extraction with confidence-gated Affinda escalation
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+import resume_parser.main as main_mod
+from resume_parser.contact_mapper import extract_contact_info
+from resume_parser.escalation import (
+    EscalationStats,
+    effective_confidence,
+    low_confidence_fields,
+    merge_contact_info,
+)
+from resume_parser.pipeline import text_quality
+from resume_parser.text_extractor import TextBlock
+
+CLEAN_RESUME = "Jane Smith\njane.smith@example.com\n(555) 123-4567\nAustin, TX 78701\nSkills: Python, Docker"
+
+
+def test_field_confidence():
+    contact_info = extract_contact_info(CLEAN_RESUME)
+    confidence = contact_info['field_confidence']
+    assert set(confidence) == {'full_name', 'email', 'phone', 'address', 'linkedin', 'skills'}
+    assert confidence['email'] >= 0.9
+    assert confidence['phone'] >= 0.9
+    assert confidence['address'] == 0.9
+    assert confidence['linkedin'] == 0.0
+    assert confidence['full_name'] == contact_info['name_confidence']
+
+
+def test_text_quality_weights_ocr_confidence():
+    blocks = [
+        TextBlock(1, "x" * 300, "pdfplumber", "page", 300, 1.0),
+        TextBlock(2, "y" * 100, "ocr", "page", 100, 1.0, 300, 60.0),
+    ]
+    assert text_quality(blocks) == pytest.approx(0.9)
+    assert text_quality([TextBlock(1, "z", "ocr", "page", 1, 1.0)]) == 0.7
+    assert text_quality([]) == 0.0
+
+
+def test_low_quality_text_lowers_every_field():
+    contact_info = extract_contact_info(CLEAN_RESUME)
+    assert low_confidence_fields(effective_confidence(contact_info, 1.0)) == []
+    assert low_confidence_fields(effective_confidence(contact_info, 0.4)) == ['full_name', 'email', 'phone']
+
+
+def test_merge_takes_only_weak_fields():
+    local = {
+        'full_name': 'Jane Smith', 'email': None, 'phone': '555', 'address': 'Python, CA',
+        'location': {'state': 'CA'}, 'linkedin': None, 'skills': ['Python'],
+    }
+    affinda = {
+        'full_name': 'J. Smith', 'email': 'jane@example.com', 'phone': None,
+        'address': 'Austin, TX', 'linkedin': None, 'skills': ['python', 'Go'],
+    }
+    confidence = {'full_name': 0.9, 'email': 0.0, 'phone': 0.2, 'address': 0.3, 'linkedin': 0.0, 'skills': 0.2}
+    merged = merge_contact_info(local, affinda, confidence)
+    assert merged['full_name'] == 'Jane Smith'
+    assert merged['email'] == 'jane@example.com'
+    assert merged['phone'] == '555'
+    assert merged['address'] == 'Austin, TX'
+    assert merged['location'] is None
+    assert merged['skills'] == ['Python', 'Go']
+    assert merged['affinda_fields'] == ['email', 'address', 'skills']
+    assert merged['field_confidence']['email'] == 0.9
+
+
+def test_stats():
+    stats = EscalationStats(expected_latency_ms=1000)
+    stats.record_local(affinda_available=True)
+    stats.record_escalation(['phone'], latency_ms=2000)
+    stats.record_local(affinda_available=True)
+    stats.record_local(affinda_available=False)
+    snapshot = stats.stats()
+    assert snapshot['requests'] == 4
+    assert snapshot['escalation_rate'] == 0.25
+    assert snapshot['escalated_by_field'] == {'phone': 1}
+    # The first saving used the prior, the second the measured latency
+    assert snapshot['latency_saved_ms'] == 3000.0
+
+
+@pytest.fixture
+def parse_client(monkeypatch):
+    """Client with an Affinda key, mocked download and fresh counters"""
+    monkeypatch.setenv('AFFINDA_API_KEY', 'test-key')
+    monkeypatch.setattr(main_mod, 'AFFINDA_MODE', 'escalate')
+    monkeypatch.setattr(main_mod, 'escalation_stats', EscalationStats())
+    affinda_calls = []
+
+    async def mock_download(file_path: str):
+        return b'%PDF-1.4 fake'
+
+    async def mock_affinda(file_bytes, filename='resume', api_key=None):
+        affinda_calls.append(filename)
+        return {"data": {"name": "Affinda Name", "phones": ["+1 555 000 1111"]}}, None
+
+    monkeypatch.setattr(main_mod, 'download_file_from_storage', mock_download)
+    monkeypatch.setattr(main_mod, 'parse_with_affinda', mock_affinda)
+    return TestClient(main_mod.app), affinda_calls
+
+
+def test_confident_parse_skips_affinda(parse_client, monkeypatch):
+    client, affinda_calls = parse_client
+    monkeypatch.setattr(main_mod, 'extract_scored_text', lambda *args: (CLEAN_RESUME, 1.0))
+
+    data = client.get('/parse', params={'file_path': 'clean.pdf'}).json()
+    assert data['name'] == 'Jane Smith'
+    assert data['affinda_fields'] == []
+    assert data['confidence']['email'] >= 0.9
+    assert affinda_calls == []
+
+    escalation = client.get('/metrics').json()['escalation']
+    assert escalation['escalated'] == 0
+    assert escalation['latency_saved_ms'] > 0
+
+
+def test_missing_required_field_escalates(parse_client, monkeypatch):
+    client, affinda_calls = parse_client
+    no_phone = "Jane Smith\njane.smith@example.com\nAustin, TX 78701"
+    monkeypatch.setattr(main_mod, 'extract_scored_text', lambda *args: (no_phone, 1.0))
+
+    data = client.get('/parse', params={'file_path': 'no-phone.pdf'}).json()
+    assert affinda_calls == ['no-phone.pdf']
+    assert data['name'] == 'Jane Smith'
+    # The typed model keeps the first of Affinda's phone numbers
+    assert data['phone'] == '+1 555 000 1111'
+    assert data['affinda_fields'] == ['phone']
+
+    escalation = client.get('/metrics').json()['escalation']
+    assert escalation['escalation_rate'] == 1.0
+    assert escalation['escalated_by_field'] == {'phone': 1}
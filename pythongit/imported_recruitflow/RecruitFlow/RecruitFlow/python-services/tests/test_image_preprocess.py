@@ -0,0 +1,107 @@
+"""
+Unit tests for OCR page preprocessing
+"""
+import sys
+import os
+import pytest
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+from image_preprocess import (
+    binarize,
+    downscale,
+    estimate_skew,
+    preprocess_page,
+    remove_specks,
+    trim_borders,
+)
+
+
+def _text_page(width=1275, height=1650, lines=20, background=230):
+    """A 150 dpi page with dark bars standing in for lines of text"""
+    page = Image.new('L', (width, height), background)
+    draw = ImageDraw.Draw(page)
+    for i in range(lines):
+        draw.rectangle([100, 100 + i * 60, 1100, 112 + i * 60], fill=20)
+    return page
+
+
+class TestPreprocessSteps:
+    """Test the individual vectorized steps"""
+
+    def test_binarize_matches_local_mean_definition(self):
+        """Test the separable window sums against a brute-force local mean"""
+        gray = np.random.default_rng(1).integers(0, 256, (40, 53)).astype(np.uint8)
+        half = 7
+        expected = np.zeros(gray.shape, dtype=bool)
+        for i in range(gray.shape[0]):
+            for j in range(gray.shape[1]):
+                window = gray[max(0, i - half):i + half + 1, max(0, j - half):j + half + 1]
+                expected[i, j] = int(gray[i, j]) * window.size * 100 < int(window.sum()) * 85
+        assert (binarize(gray, dpi=10) == expected).all()
+
+    def test_binarize_handles_uneven_lighting(self):
+        """Test that text on a gradient background is found without the gradient"""
+        gray = np.tile(np.linspace(120, 250, 400).astype(np.uint8), (200, 1))
+        gray[100:104, 50:350] = (gray[100:104, 50:350] * 0.5).astype(np.uint8)
+        mask = binarize(gray, dpi=150)
+        assert mask[100:104, 60:340].mean() > 0.9
+        assert mask[:90].mean() < 0.01
+
+    def test_downscale_oversized_pages(self):
+        """Test that pages beyond the size limit are shrunk by block means"""
+        gray = np.full((6600, 5100), 200, dtype=np.uint8)
+        small, dpi = downscale(gray, 300)
+        assert small.shape == (3300, 2550) and dpi == 150
+        same, dpi = downscale(gray[:3300, :2550], 300)
+        assert same.shape == (3300, 2550) and dpi == 300
+
+    def test_remove_specks(self):
+        """Test that isolated pixels go and strokes stay"""
+        mask = np.zeros((20, 20), dtype=bool)
+        mask[2, 2] = True
+        mask[10:13, 5:15] = True
+        cleaned = remove_specks(mask)
+        assert not cleaned[2, 2]
+        assert cleaned[10:13, 5:15].all()
+
+    def test_trim_borders(self):
+        """Test that black scanner edges are cut off"""
+        mask = np.zeros((100, 80), dtype=bool)
+        mask[:5] = True
+        mask[:, -3:] = True
+        assert trim_borders(mask).shape == (95, 77)
+
+    def test_estimate_skew(self):
+        """Test that a rotated page's skew is recovered"""
+        skewed = _text_page().rotate(-2, fillcolor=230)
+        mask = binarize(np.asarray(skewed), dpi=150)
+        assert estimate_skew(mask) == pytest.approx(2.0, abs=0.25)
+
+
+class TestPreprocessPage:
+    """Test the full preprocessing pipeline"""
+
+    def test_blank_and_noisy_pages_are_skipped(self):
+        """Test that empty or speckled pages are reported as blank"""
+        assert preprocess_page(Image.new('L', (1275, 1650), 240), 150) is None
+        noisy = np.full((1650, 1275), 235, dtype=np.uint8)
+        noisy.flat[np.random.default_rng(0).integers(0, noisy.size, 3000)] = 0
+        assert preprocess_page(Image.fromarray(noisy), 150) is None
+
+    def test_page_is_deskewed_and_cropped(self):
+        """Test that output is binary, straight and smaller than the input"""
+        page = _text_page().rotate(-2, fillcolor=230).convert('RGB')
+        result = preprocess_page(page, 150)
+        assert result.mode == 'L'
+        assert result.size[0] < page.size[0] and result.size[1] < page.size[1]
+        pixels = np.asarray(result)
+        assert set(np.unique(pixels)) <= {0, 255}
+        assert abs(estimate_skew(pixels == 0)) < 0.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,128 @@
+"""
+Tests for load-adaptive quality tiers and background reparses
+"""
+import asyncio
+import httpx
+import pytest
+
+import resume_parser.main as main_mod
+from resume_parser.load_shedding import TIER_DEGRADED, TIER_FULL, LoadShedder, ReparseQueue
+from resume_parser.single_flight import SingleFlight
+
+
+def test_disabled_by_default_threshold():
+    shedder = LoadShedder(enter_depth=0, exit_depth=0)
+    assert not shedder.enabled
+    assert shedder.choose(1000, "interactive") == TIER_FULL
+
+
+def test_hysteresis():
+    shedder = LoadShedder(enter_depth=4, exit_depth=1)
+    assert shedder.observe(3) == TIER_FULL
+    assert shedder.observe(4) == TIER_DEGRADED
+    # Stays degraded until the queue drains to the exit depth
+    assert shedder.observe(3) == TIER_DEGRADED
+    assert shedder.observe(1) == TIER_FULL
+    stats = shedder.stats()
+    assert stats["switches"] == 2
+    assert [s["to"] for s in stats["recent_switches"]] == [TIER_DEGRADED, TIER_FULL]
+
+
+def test_only_interactive_requests_are_degraded():
+    shedder = LoadShedder(enter_depth=1, exit_depth=0)
+    assert shedder.choose(5, "interactive") == TIER_DEGRADED
+    assert shedder.choose(5, "background") == TIER_FULL
+    assert shedder.choose(5, "interactive", allow_degraded=False) == TIER_FULL
+    assert shedder.stats()["requests"] == {TIER_FULL: 2, TIER_DEGRADED: 1}
+
+
+def test_reparse_queue_results():
+    reparses = ReparseQueue(max_pending=2, capacity=10)
+
+    async def ok():
+        await asyncio.sleep(0.01)
+        return {"name": "Jane"}
+
+    async def broken():
+        raise ValueError("corrupt")
+
+    async def run():
+        first = reparses.submit(ok)
+        second = reparses.submit(broken)
+        assert reparses.submit(ok) is None
+        assert reparses.get(first) == {"status": "pending"}
+        await asyncio.sleep(0.05)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert reparses.get(first) == {"status": "done", "result": {"name": "Jane"}}
+    assert reparses.get(second) == {"status": "failed", "error": "corrupt"}
+    assert reparses.stats() == {"pending": 0, "enqueued": 2, "rejected": 1, "completed": 1, "failed": 1}
+
+
+def test_reparse_results_are_bounded():
+    reparses = ReparseQueue(capacity=2)
+
+    async def ok():
+        return {}
+
+    async def run():
+        ids = [reparses.submit(ok) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        return ids
+
+    ids = asyncio.run(run())
+    assert reparses.get(ids[0]) is None
+    assert reparses.get(ids[2])["status"] == "done"
+
+
+def test_degraded_parse_and_reparse(monkeypatch):
+    """Under load /parse answers from the fast path and reparses in the background."""
+    monkeypatch.delenv('AFFINDA_API_KEY', raising=False)
+    monkeypatch.setattr(main_mod, 'single_flight', SingleFlight())
+    monkeypatch.setattr(main_mod, 'reparses', ReparseQueue())
+    monkeypatch.setattr(main_mod, 'load_shedder', LoadShedder(enter_depth=1, exit_depth=0))
+    monkeypatch.setattr(main_mod.scheduler, 'queue_depth', lambda: 3)
+    ocr_flags = []
+
+    async def mock_download(file_path: str):
+        return b'%PDF-1.4 fake'
+
+    def mock_extract(file_content, file_extension, cancel_token=None, ocr=True):
+        ocr_flags.append(ocr)
+        return "Jane Doe\njane.doe@example.com\nSkills: Python, Docker"
+
+    def mock_scored_extract(file_content, file_extension, cancel_token=None, ocr=True):
+        return mock_extract(file_content, file_extension, cancel_token, ocr), 1.0
+
+    monkeypatch.setattr(main_mod, 'download_file_from_storage', mock_download)
+    monkeypatch.setattr(main_mod, 'extract_text', mock_extract)
+    monkeypatch.setattr(main_mod, 'extract_scored_text', mock_scored_extract)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main_mod.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            degraded = (await client.get('/parse', params={'file_path': 'resume.pdf'})).json()
+            await asyncio.sleep(0.1)
+            reparse = await client.get(f"/parse/reparse/{degraded['reparse_id']}")
+            unknown = await client.get('/parse/reparse/nope')
+            full = await client.get('/parse', params={'file_path': 'resume.pdf', 'allow_degraded': 'false'})
+            metrics = (await client.get('/metrics')).json()
+            return degraded, reparse, unknown, full.json(), metrics
+
+    degraded, reparse, unknown, full, metrics = asyncio.run(run())
+    assert degraded["degraded"] is True
+    assert degraded["email"] == "jane.doe@example.com"
+    assert degraded["skills"] == []
+    assert reparse.json()["status"] == "done"
+    assert reparse.json()["result"]["degraded"] is False
+    assert "Python" in reparse.json()["result"]["skills"]
+    assert unknown.status_code == 404
+    assert full["degraded"] is False and "reparse_id" not in full
+    assert ocr_flags == [False, True, True]
+    assert metrics["load_shedding"]["requests"] == {TIER_FULL: 1, TIER_DEGRADED: 1}
+    assert metrics["load_shedding"]["reparses"]["completed"] == 1
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
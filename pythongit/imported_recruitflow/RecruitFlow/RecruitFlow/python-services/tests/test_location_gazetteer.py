@@ -0,0 +1,100 @@
+"""
+Unit tests for the trie-based location gazetteer
+"""
+import sys
+import os
+import re
+import time
+import pytest
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+from location_gazetteer import TRIE, LocationTrie, extract_location
+from contact_mapper import extract_contact_info
+
+
+class TestLocationTrie:
+    """Test the phrase trie and its compiled pattern"""
+
+    def test_lookup(self):
+        """Test that phrases resolve to their entries"""
+        assert TRIE.lookup("San Francisco") == {"city": ["CA"]}
+        assert TRIE.lookup("st. louis") == {"city": ["MO"]}
+        assert set(TRIE.lookup("Washington")) == {"city", "state"}
+        assert TRIE.lookup("Springfield Gardens") == {}
+
+    def test_pattern_prefers_longest_phrase(self):
+        """Test that the compiled pattern matches the longest phrase"""
+        trie = LocationTrie()
+        trie.add("Kansas", "state", "KS")
+        trie.add("Kansas City", "city", "MO")
+        trie.add("Newark", "city", "NJ")
+        trie.add("New York", "city", "NY")
+        pattern = re.compile(r"\b" + trie.pattern() + r"\b", re.IGNORECASE)
+        assert pattern.search("in Kansas City, MO").group() == "Kansas City"
+        assert pattern.search("Kansas").group() == "Kansas"
+        assert pattern.search("Newark").group() == "Newark"
+        assert pattern.search("New  York").group() == "New  York"
+
+
+class TestExtractLocation:
+    """Test structured location extraction"""
+
+    def test_city_state_zip(self):
+        """Test the common US format"""
+        location = extract_location("Jane Doe\njane@example.com\nSan Francisco, CA 94105")
+        assert location.fields() == {
+            "city": "San Francisco", "state": "CA", "postal": "94105", "country": "United States",
+        }
+        assert location.text == "San Francisco, CA 94105"
+
+    def test_full_state_name_and_country(self):
+        """Test spelled-out states and a trailing country"""
+        location = extract_location("Seattle, Washington, USA")
+        assert (location.city, location.state, location.country) == ("Seattle", "WA", "United States")
+
+    def test_ambiguous_city_uses_written_state(self):
+        """Test that Portland resolves by the state next to it"""
+        assert extract_location("Portland, ME").state == "ME"
+        assert extract_location("Portland, Oregon").state == "OR"
+
+    def test_unlisted_city_anchored_by_zip(self):
+        """Test cities missing from the gazetteer when a ZIP code follows"""
+        location = extract_location("Smallville, KS 66002")
+        assert (location.city, location.state, location.postal) == ("Smallville", "KS", "66002")
+
+    def test_international(self):
+        """Test 'City, Country' outside the US"""
+        location = extract_location("jane@example.com | Berlin, Germany")
+        assert (location.city, location.country) == ("Berlin", "Germany")
+
+    def test_prose_is_not_a_location(self):
+        """Test that skill lists and prose are not read as places"""
+        assert extract_location("Experience with Python, CA and Go, NY") is None
+        assert extract_location("Experience in Python, India") is None
+        assert extract_location("Newarkish, NJ") is None
+
+    def test_labelled_line(self):
+        """Test that labelled lines are returned as written"""
+        location = extract_location("Address: 12 Baker Street, London, UK")
+        assert location.text == "12 Baker Street, London, UK"
+        assert (location.city, location.country) == ("London", "United Kingdom")
+        assert extract_location("Location: Remote").text == "Remote"
+
+    def test_linear_time(self):
+        """Test that a large adversarial region is scanned quickly"""
+        text = "Austin, TX 78701\n" + "Experience with Python, CA and Go, NY. " * 5000
+        start = time.perf_counter()
+        assert extract_location(text).city == "Austin"
+        assert time.perf_counter() - start < 0.5
+
+    def test_contact_info_location(self):
+        """Test that contact info carries the structured fields"""
+        contact_info = extract_contact_info("Jane Doe\njane@example.com\nAustin, TX 78701")
+        assert contact_info['address'] == "Austin, TX 78701"
+        assert contact_info['location']['city'] == "Austin"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,125 @@
+"""
+Tests for the event-loop lag watchdog
+"""
+import time
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import resume_parser.main as main_mod
+from resume_parser.loop_watchdog import LoopWatchdog, _request
+
+
+class TestLagWindow:
+    """Test lag percentiles and the health threshold"""
+
+    def test_long_stall_counts_for_the_ticks_it_swallowed(self):
+        watchdog = LoopWatchdog(interval_ms=100, unhealthy_ms=500)
+        for _ in range(100):
+            watchdog.record_lag(1.0)
+        watchdog.record_lag(1000.0)
+        lag = watchdog.lag()
+        # 1000, 900, ... 100 ms: ten of 110 samples
+        assert lag["max"] == 1000.0
+        assert lag["p95"] == 500.0
+        assert lag["p50"] == 1.0
+        assert not watchdog.healthy()
+
+    def test_short_blip_stays_healthy(self):
+        watchdog = LoopWatchdog(interval_ms=100, unhealthy_ms=500)
+        for _ in range(300):
+            watchdog.record_lag(1.0)
+        watchdog.record_lag(600.0)
+        assert watchdog.lag()["max"] == 600.0
+        assert watchdog.healthy()
+
+    def test_old_samples_leave_the_window(self):
+        watchdog = LoopWatchdog(interval_ms=100, unhealthy_ms=500, window_s=60)
+        watchdog.record_lag(5000.0, now=time.monotonic() - 61)
+        assert watchdog.lag() is None
+        assert watchdog.healthy()
+
+    def test_threshold_zero_never_unhealthy(self):
+        watchdog = LoopWatchdog(interval_ms=100, unhealthy_ms=0)
+        watchdog.record_lag(10000.0)
+        assert watchdog.healthy()
+
+
+def test_stall_report_names_the_blocking_request():
+    def blocking_call():
+        time.sleep(0.5)
+
+    async def handler():
+        blocking_call()
+
+    async def run():
+        watchdog = LoopWatchdog(interval_ms=20, slow_callback_ms=100, unhealthy_ms=300, window_s=10)
+        watchdog.start()
+        try:
+            await asyncio.sleep(0.1)
+            # Tasks created while a request is being served carry its label
+            token = _request.set("GET /parse")
+            task = asyncio.create_task(handler())
+            _request.reset(token)
+            await task
+            await asyncio.sleep(0.1)
+            return watchdog.stats()
+        finally:
+            await watchdog.stop()
+
+    stats = asyncio.run(run())
+    assert stats["stalls"] == 1
+    stall = stats["slow_callbacks"][0]
+    assert stall["request"] == "GET /parse"
+    assert any("blocking_call" in frame for frame in stall["stack"])
+    assert stall["lag_ms"] >= 400
+    assert not stats["healthy"]
+
+
+def test_stall_found_after_the_loop_woke_is_dropped():
+    watchdog = LoopWatchdog(interval_ms=100, slow_callback_ms=100)
+    watchdog._beat = 1.0
+    # The sampler woke (and cleared the heartbeat) before the capture landed
+    assert not watchdog._report({"request": None}, beat=2.0)
+    assert watchdog._stall is None and watchdog.stalls == 0
+    assert watchdog._report({"request": "GET /parse"}, beat=1.0)
+    assert watchdog._stall["request"] == "GET /parse" and watchdog.stalls == 1
+
+
+def test_health_reports_lag_and_fails_when_over_threshold(monkeypatch):
+    watchdog = LoopWatchdog(interval_ms=100, unhealthy_ms=500)
+    monkeypatch.setattr(main_mod, 'loop_watchdog', watchdog)
+    client = TestClient(main_mod.app)
+
+    response = client.get('/health')
+    assert response.status_code == 200
+    assert response.json()['event_loop']['healthy']
+
+    watchdog.record_lag(3000.0)
+    response = client.get('/health')
+    assert response.status_code == 503
+    assert response.json()['status'] == 'unhealthy'
+    assert response.json()['event_loop']['lag_ms']['max'] == 3000.0
+
+
+def test_blocking_endpoint_code_is_reported_in_metrics(monkeypatch):
+    watchdog = main_mod.loop_watchdog
+    monkeypatch.setattr(watchdog, 'interval_ms', 20)
+    monkeypatch.setattr(watchdog, 'slow_callback_ms', 100)
+
+    async def slow_download(file_path: str):
+        time.sleep(0.4)  # blocks the event loop
+        return b'not a pdf'
+
+    monkeypatch.setattr(main_mod, 'download_file_from_storage', slow_download)
+    with TestClient(main_mod.app) as client:
+        file_url = 'https://bucket.example.com/resumes/slow.pdf'
+        assert client.get('/parse', params={'file_path': file_url}).status_code == 422
+        time.sleep(0.1)
+        metrics = client.get('/metrics')
+        stalls = metrics.json()['event_loop']['slow_callbacks']
+    # File URLs (often pre-signed) stay out of stall reports
+    assert stalls[-1]['request'] == 'GET /parse'
+    assert 'bucket.example.com' not in metrics.text
+    assert any('slow_download' in frame for frame in stalls[-1]['stack'])
+    assert not watchdog.running
@@ -0,0 +1,78 @@
+"""
+Unit tests for the worker memory governor
+"""
+import sys
+import os
+import pytest
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+from memory_governor import (
+    MemoryBudgetExceeded,
+    MemoryGovernor,
+    check_raster_budget,
+    current_rss_bytes,
+    tracemalloc_snapshot,
+)
+
+
+class TestMemoryGovernor:
+    """Test recycling decisions and budgets"""
+
+    def test_rss_is_reported(self):
+        """Test that the current RSS can be read"""
+        assert current_rss_bytes() > 0
+
+    def test_recycles_after_max_jobs_once_idle(self):
+        """Test that recycling waits for in-flight work to finish"""
+        recycled = []
+        governor = MemoryGovernor(max_jobs=2, max_rss_mb=0, recycle=lambda: recycled.append(True))
+
+        governor.job_started()
+        governor.job_started()
+        governor.job_started()
+        governor.job_finished()
+        governor.job_finished()
+        assert governor.draining
+        assert recycled == []
+
+        governor.job_finished()
+        assert recycled == [True]
+
+    def test_recycles_above_rss_limit(self):
+        """Test that an RSS above the limit triggers recycling"""
+        recycled = []
+        governor = MemoryGovernor(max_jobs=0, max_rss_mb=1, recycle=lambda: recycled.append(True))
+        governor.job_started()
+        governor.job_finished()
+        assert recycled == [True]
+        assert "RSS" in governor.stats()["drain_reason"]
+
+    def test_disabled_by_default(self):
+        """Test that zero limits never recycle"""
+        recycled = []
+        governor = MemoryGovernor(max_jobs=0, max_rss_mb=0, recycle=lambda: recycled.append(True))
+        for _ in range(10):
+            governor.job_started()
+            governor.job_finished()
+        assert recycled == []
+        assert not governor.draining
+
+    def test_raster_budget(self):
+        """Test page count x DPI budget checks"""
+        check_raster_budget(2, 300, budget_mb=100)
+        with pytest.raises(MemoryBudgetExceeded):
+            check_raster_budget(200, 300, budget_mb=100)
+        check_raster_budget(200, 300, budget_mb=0)
+
+    def test_tracemalloc_snapshot(self):
+        """Test on-demand allocation snapshots"""
+        assert tracemalloc_snapshot()["tracing"] is False
+        snapshot = tracemalloc_snapshot(top=5, start=True, stop=True)
+        assert snapshot["tracing"] is False
+        assert len(snapshot["top"]) <= 5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,110 @@
+"""
+Tests for the typed ParsedResume model and its binary encoding
+"""
+import sys
+import os
+import json
+import msgpack
+from docx import Document
+import pytest
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+from bulk_import import parse_source_packed, unpack_source_result
+from contact_mapper import extract_contact_info
+from models import SCHEMA_VERSION, ParsedResume
+from pipeline import build_parse_response
+
+RESUME = (
+    "Jane Smith\njane.smith@example.com\n(555) 123-4567\nAustin, TX 78701\n"
+    "linkedin.com/in/janesmith\nSkills: Python, Docker, AWS"
+)
+
+
+class TestParsedResume:
+    """Test the model and its /parse payload"""
+
+    def test_response_matches_dict_builder(self):
+        """Test that to_response yields the payload the dict builder always produced"""
+        contact_info = extract_contact_info(RESUME)
+        resume = ParsedResume.from_contact_info("jane.pdf", ".pdf", RESUME, contact_info)
+        response = resume.to_response()
+        assert response == build_parse_response("jane.pdf", ".pdf", RESUME, contact_info)
+        assert response["name"] == "Jane Smith"
+        assert response["skills"] == list(contact_info["skills"])
+        assert response["location"]["state"] == "TX"
+        assert response["text_length"] == len(RESUME)
+        assert resume.to_response(file_path="other.pdf")["file_path"] == "other.pdf"
+
+    def test_skills_are_interned(self):
+        """Test that parses share one string per skill name"""
+        first = ParsedResume(skills=["".join(["Pyt", "hon"])])
+        second = ParsedResume(skills=["".join(["Py", "thon"])])
+        assert first.skills[0] is second.skills[0]
+
+    def test_affinda_values_are_coerced(self):
+        """Test that list and object values become strings"""
+        resume = ParsedResume(name={"raw": "Jane Smith", "first": "Jane"}, phone=["", "+1 555 0100"], email=None)
+        assert resume.name == "Jane Smith"
+        assert resume.phone == "+1 555 0100"
+        assert resume.email == ""
+
+    def test_slots(self):
+        """Test that instances carry no per-instance dict"""
+        resume = ParsedResume()
+        assert not hasattr(resume, "__dict__")
+        with pytest.raises(AttributeError):
+            resume.unknown = 1
+
+
+class TestEncoding:
+    """Test the schema-versioned msgpack encoding"""
+
+    def test_round_trip(self):
+        """Test that every attribute survives encode/decode"""
+        contact_info = extract_contact_info(RESUME)
+        contact_info["affinda_fields"] = ["phone"]
+        resume = ParsedResume.from_contact_info("jane.pdf", ".pdf", RESUME, contact_info, degraded=True)
+        decoded = ParsedResume.from_bytes(resume.to_bytes())
+        assert decoded == resume
+        assert decoded.to_response() == resume.to_response()
+
+    def test_smaller_than_json(self):
+        """Test that the encoding is smaller than the JSON payload"""
+        resume = ParsedResume.from_contact_info("jane.pdf", ".pdf", RESUME, extract_contact_info(RESUME))
+        assert len(resume.to_bytes()) < len(json.dumps(resume.to_response()).encode("utf-8"))
+
+    def test_unknown_schema_version_is_rejected(self):
+        """Test that a future layout is not misread"""
+        values = msgpack.unpackb(ParsedResume(name="Jane").to_bytes())
+        values[0] = SCHEMA_VERSION + 1
+        with pytest.raises(ValueError, match="schema version"):
+            ParsedResume.from_bytes(msgpack.packb(values))
+
+    def test_garbage_is_rejected(self):
+        """Test that bytes that are not an encoded resume raise ValueError"""
+        for data in (b"\xc1", msgpack.packb({"name": "Jane"}), msgpack.packb([SCHEMA_VERSION, "x"])):
+            with pytest.raises(ValueError):
+                ParsedResume.from_bytes(data)
+
+    def test_worker_results_cross_as_bytes(self, tmp_path):
+        """Test the bulk-import worker handoff"""
+        path = tmp_path / "jane.docx"
+        document = Document()
+        for line in RESUME.splitlines():
+            document.add_paragraph(line)
+        document.save(path)
+
+        doc_id, packed, error = parse_source_packed((str(path), None, str(path)))
+        assert error is None and isinstance(packed, bytes)
+        record = unpack_source_result((doc_id, packed, error))
+        assert record["file_path"] == str(path)
+        assert record["email"] == "jane.smith@example.com"
+
+        missing = unpack_source_result(parse_source_packed(("gone.pdf", None, str(tmp_path / "gone.pdf"))))
+        assert missing["success"] is False and missing["error"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,92 @@
+"""
+Unit tests for gazetteer-backed name recognition
+"""
+import sys
+import os
+import json
+import pytest
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+from name_gazetteer import (
+    FIRST_NAMES,
+    SURNAMES,
+    BloomFilter,
+    fold,
+    recognize_name,
+)
+
+LABELLED_SET = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'data', 'names_labelled.jsonl')
+
+
+class TestGazetteer:
+    """Test the Bloom filter gazetteer"""
+
+    def test_bloom_filter_membership(self):
+        """Test that added items are always found and others rarely are"""
+        bloom = BloomFilter(500)
+        for i in range(500):
+            bloom.add(f"name{i}")
+        assert all(f"name{i}" in bloom for i in range(500))
+        false_positives = sum(f"other{i}" in bloom for i in range(5000))
+        assert false_positives < 150
+
+    def test_fold(self):
+        """Test accent stripping and punctuation removal"""
+        assert fold("José") == "jose"
+        assert fold("O'Brien") == "obrien"
+        assert fold("MÜLLER") == "muller"
+
+    def test_bundled_names_loaded(self):
+        """Test that the data files are loaded into the filters"""
+        assert "john" in FIRST_NAMES
+        assert "maria" in FIRST_NAMES
+        assert "doe" in SURNAMES
+
+
+class TestRecognizeName:
+    """Test name recognition in the header region"""
+
+    def test_accented_name(self):
+        """Test that non-ASCII names are kept as written"""
+        match = recognize_name("José García\nIngeniero de Software")
+        assert match.name == "José García"
+
+    def test_all_caps_header_is_title_cased(self):
+        """Test that ALL CAPS names are returned in title case"""
+        assert recognize_name("JOHN DOE\nSenior Developer").name == "John Doe"
+
+    def test_title_and_credentials_stripped(self):
+        """Test that honorifics and post-nominals are removed"""
+        assert recognize_name("Robert Smith, PhD\nPrincipal Scientist").name == "Robert Smith"
+        assert recognize_name("Mrs. Linda Williams").name == "Linda Williams"
+
+    def test_headings_and_locations_rejected(self):
+        """Test that section headings, job titles and places are not names"""
+        assert recognize_name("Curriculum Vitae\nSenior Software Engineer\nSan Francisco, CA") is None
+
+    def test_name_label(self):
+        """Test that a 'Name:' label is honoured and boosts confidence"""
+        match = recognize_name("Name: Carlos Mendes\nEmail: carlos@example.com")
+        assert match.name == "Carlos Mendes"
+        assert match.confidence == 1.0
+
+    def test_confidence_reflects_gazetteer_hits(self):
+        """Test that known names score higher than unknown capitalized words"""
+        known = recognize_name("Jane Smith")
+        unknown = recognize_name("Zorblax Quintaveer")
+        assert known.confidence > unknown.confidence
+        assert 0 < unknown.confidence < 1
+
+    def test_labelled_set(self):
+        """Test the benchmark's labelled set end to end"""
+        with open(LABELLED_SET, encoding='utf-8') as f:
+            cases = [json.loads(line) for line in f if line.strip()]
+        for case in cases:
+            match = recognize_name(case["text"])
+            assert (match.name if match else None) == case["name"], case["text"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
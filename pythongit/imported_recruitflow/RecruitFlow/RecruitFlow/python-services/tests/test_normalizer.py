@@ -0,0 +1,61 @@
+"""
+Unit tests for the shared text-normalization stage
+"""
+import sys
+import os
+import pytest
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+from normalizer import ResumeDocument, as_document, normalize_text
+from contact_mapper import extract_contact_info, extract_skills
+
+
+class TestNormalizeText:
+    """Test canonicalization of extracted text"""
+
+    def test_ligatures_and_spaces(self):
+        """Test that ligatures, non-breaking spaces and space runs are folded"""
+        assert normalize_text("Pro\ufb01cient\u00a0in   Work\ufb02ow") == "Proficient in Workflow"
+
+    def test_soft_hyphens_and_zero_width(self):
+        """Test that invisible characters are dropped"""
+        assert normalize_text("Java\u00adScript\u200b Dev\ufeff") == "JavaScript Dev"
+
+    def test_hyphenated_line_breaks(self):
+        """Test that words split across lines are rejoined, names are not"""
+        assert normalize_text("project manage-\nment") == "project management"
+        assert normalize_text("Jean-\nPaul") == "Jean-\nPaul"
+
+    def test_line_endings_dashes_and_blank_lines(self):
+        """Test CRLF, typographic dashes and blank-line collapsing"""
+        text = "Jane Doe  \r\n\r\n\r\n\r\n2019 \u2013 2021\r\n"
+        assert normalize_text(text) == "Jane Doe\n\n2019 - 2021"
+
+    def test_empty(self):
+        """Test empty input"""
+        assert normalize_text("") == ""
+
+
+class TestResumeDocument:
+    """Test the shared document object"""
+
+    def test_views_are_consistent(self):
+        """Test that text, lowercase view and sections describe the same text"""
+        document = ResumeDocument("Jane Doe\nSKILLS\nPy\ufb01le, SQL")
+        assert document.text == "Jane Doe\nSKILLS\nPyfile, SQL"
+        assert document.lower == document.text.lower()
+        assert document.sections.get("skills") == "Pyfile, SQL"
+        assert as_document(document) is document
+
+    def test_extractors_accept_document(self):
+        """Test that extractors give the same result for a document and raw text"""
+        text = "Jane Doe\njane.doe@example.com\nSkills: Python, Django, Work\ufb02ow Automation"
+        document = ResumeDocument(text)
+        assert extract_contact_info(document) == extract_contact_info(text)
+        assert "Workflow Automation" in extract_skills(document)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,102 @@
+"""
+Unit tests for the OCR page cache
+"""
+import sys
+import os
+import pytest
+from unittest.mock import patch
+from PIL import Image
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+import ocr_cache
+import text_extractor
+from ocr_cache import OCRPageCache, page_cache_key
+
+
+def _page(color):
+    return Image.new('L', (40, 40), color=color)
+
+
+class TestOCRPageCache:
+    """Test cache keys and tier behaviour"""
+
+    def test_key_depends_on_pixels_and_settings(self):
+        """Test that the key changes with the image or the OCR settings"""
+        settings = {"dpi": 300, "lang": "eng"}
+        key = page_cache_key(_page(255), settings)
+        assert key == page_cache_key(_page(255), settings)
+        assert key != page_cache_key(_page(0), settings)
+        assert key != page_cache_key(_page(255), {"dpi": 150, "lang": "eng"})
+
+    def test_memory_tier_evicts_least_recently_used(self):
+        """Test LRU eviction once the memory budget is exceeded"""
+        cache = OCRPageCache(memory_bytes=10)
+        cache.put("a", "12345")
+        cache.put("b", "12345")
+        assert cache.get("a") == "12345"
+        cache.put("c", "12345")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "12345"
+        assert cache.stats()["evictions"] == 1
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that entries written to disk are found by a new cache"""
+        cache = OCRPageCache(memory_bytes=1024, disk_dir=str(tmp_path), disk_bytes=1024)
+        cache.put("abc123", "page text")
+
+        reopened = OCRPageCache(memory_bytes=1024, disk_dir=str(tmp_path), disk_bytes=1024)
+        assert reopened.get("abc123") == "page text"
+        assert reopened.stats()["disk_hits"] == 1
+
+    def test_failed_disk_write_leaves_no_entry(self, tmp_path):
+        """Test that an interrupted write never becomes a cache hit after a restart"""
+        cache = OCRPageCache(memory_bytes=1024, disk_dir=str(tmp_path), disk_bytes=1024)
+        with patch.object(ocr_cache.os, "replace", side_effect=OSError("No space left on device")):
+            cache.put("abc123", "page text")
+        assert cache.stats()["disk_entries"] == 0
+        assert list(tmp_path.glob("*/*")) == []
+
+        reopened = OCRPageCache(memory_bytes=1024, disk_dir=str(tmp_path), disk_bytes=1024)
+        assert reopened.get("abc123") is None
+
+    def test_disk_tier_is_bounded(self, tmp_path):
+        """Test that the disk tier evicts old entries beyond its budget"""
+        cache = OCRPageCache(memory_bytes=0, disk_dir=str(tmp_path), disk_bytes=20)
+        cache.put("k1", "x" * 10)
+        cache.put("k2", "x" * 10)
+        cache.put("k3", "x" * 10)
+
+        assert cache.get("k1") is None
+        assert cache.get("k3") == "x" * 10
+        assert cache.stats()["disk_bytes"] <= 20
+
+    def test_blank_pages_are_cached(self):
+        """Test that empty OCR output is a hit, not a miss"""
+        cache = OCRPageCache(memory_bytes=1024)
+        cache.put("blank", "")
+        assert cache.get("blank") == ""
+
+
+class TestOCRWithCache:
+    """Test that OCR only runs on pages it has not seen"""
+
+    def test_changed_pdf_only_ocrs_new_pages(self, monkeypatch):
+        """Test reprocessing a PDF with one new page"""
+        monkeypatch.setattr(ocr_cache, '_cache', OCRPageCache(memory_bytes=1024 * 1024))
+        pages_v1 = [_page(10), _page(20)]
+        pages_v2 = [_page(10), _page(20), _page(30)]
+
+        with patch('pdf2image.convert_from_bytes', side_effect=[pages_v1, pages_v2]), \
+                patch('pytesseract.image_to_string', return_value="text") as mock_ocr:
+            text_extractor.extract_text_from_pdf_with_ocr(b'v1')
+            assert mock_ocr.call_count == 2
+
+            text_extractor.extract_text_from_pdf_with_ocr(b'v2')
+            assert mock_ocr.call_count == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
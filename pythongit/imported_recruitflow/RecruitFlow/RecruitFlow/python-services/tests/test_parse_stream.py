@@ -0,0 +1,107 @@
+"""
+Tests for progressive Server-Sent Events results from /parse/stream
+"""
+import json
+import time
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import resume_parser.main as main_mod
+from resume_parser.profiling import ProfilingController
+from resume_parser.recorder import TrafficRecorder, iter_records
+from resume_parser.single_flight import SingleFlight
+from resume_parser.text_extractor import TextBlock
+
+PAGES = [
+    TextBlock(1, "Jane Smith\njane.smith@example.com\n(555) 123-4567", "pdfplumber", "page", 48, 3.0),
+    TextBlock(2, "Experience\nBuilt services in Python and Docker\nLinkedIn: linkedin.com/in/janesmith",
+              "ocr", "page", 80, 900.0, 300, 92.0),
+]
+
+
+def read_events(response):
+    """Parse an event stream into (event, data) pairs"""
+    events = []
+    for chunk in response.text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in chunk.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv('AFFINDA_API_KEY', raising=False)
+    monkeypatch.setattr(main_mod, 'single_flight', SingleFlight())
+
+    async def mock_download(file_path: str):
+        if "missing" in file_path:
+            raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
+        return b'%PDF-1.4 fake'
+
+    def mock_extract(file_content, file_extension, cancel_token=None, ocr=True, on_block=None):
+        for block in PAGES:
+            if on_block is not None:
+                on_block(block)
+            time.sleep(0.02)
+        return "\n".join(block.text for block in PAGES), 0.96
+
+    monkeypatch.setattr(main_mod, 'download_file_from_storage', mock_download)
+    monkeypatch.setattr(main_mod, 'extract_scored_text', mock_extract)
+    return TestClient(main_mod.app)
+
+
+def test_events_arrive_in_order_and_end_with_parse_payload(client):
+    response = client.get('/parse/stream', params={'file_path': 'resume.pdf'})
+    assert response.status_code == 200
+    assert response.headers['content-type'].startswith('text/event-stream')
+
+    events = read_events(response)
+    names = [name for name, _ in events]
+    assert names[0] == 'contact'
+    assert names[-3:] == ['skills', 'text', 'result']
+
+    first_contact = events[0][1]
+    assert first_contact['final'] is False
+    assert first_contact['name'] == 'Jane Smith'
+    assert first_contact['email'] == 'jane.smith@example.com'
+    assert first_contact['linkedin'] == ''
+
+    # The LinkedIn URL is on page 2, so the contact fields are re-sent
+    final_contact = [data for name, data in events if name == 'contact'][-1]
+    assert final_contact['final'] is True
+    assert final_contact['linkedin'] == 'https://linkedin.com/in/janesmith'
+
+    data = dict(events)
+    assert 'Python' in data['skills']['skills']
+    assert data['text']['stats']['pages'] == 2
+    assert data['text']['stats']['ocr_pages'] == 1
+
+    assert data['result'] == client.get('/parse', params={'file_path': 'resume.pdf'}).json()
+
+
+def test_streams_are_coalesced_recorded_and_profiled(client, monkeypatch, tmp_path):
+    archive = tmp_path / "archive"
+    monkeypatch.setattr(main_mod, 'recorder', TrafficRecorder(str(archive)))
+    profiler = ProfilingController(token="secret", output_dir=str(tmp_path))
+    profiler.open_window(30)
+    monkeypatch.setattr(main_mod, 'profiler', profiler)
+
+    events = read_events(client.get('/parse/stream', params={'file_path': 'https://files.example.com/resume.pdf'}))
+    assert events[-1][0] == 'result'
+    assert main_mod.single_flight.stats()['executions'] == 1
+
+    [record] = list(iter_records(str(archive)))
+    assert record['output']['skills'] == events[-1][1]['skills']
+    assert record['stages']['parse;extraction'] > 0
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+
+def test_failures_become_error_events(client):
+    events = read_events(client.get('/parse/stream', params={'file_path': 'missing.pdf'}))
+    assert events == [('error', {'status_code': 404, 'detail': 'File not found: missing.pdf'})]
+
+
+def test_invalid_requests_are_rejected_before_streaming(client):
+    response = client.get('/parse/stream', params={'file_path': 'resume.txt'})
+    assert response.status_code == 400
@@ -0,0 +1,140 @@
+"""
+Tests for token-gated request profiling
+"""
+import io
+import os
+import json
+import pytest
+from docx import Document
+from fastapi.testclient import TestClient
+
+import resume_parser.main as main_mod
+from resume_parser.profiling import (
+    ProfileSession, ProfilingController, activate, current_session, profiled_call, stage
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_env():
+    if 'AFFINDA_API_KEY' in os.environ:
+        del os.environ['AFFINDA_API_KEY']
+    yield
+    if 'AFFINDA_API_KEY' in os.environ:
+        del os.environ['AFFINDA_API_KEY']
+
+
+@pytest.fixture
+def docx_download(monkeypatch):
+    document = Document()
+    document.add_paragraph("Jane Doe")
+    document.add_paragraph("jane.doe@example.com | (555) 123-4567")
+    document.add_paragraph("Skills: Python, SQL")
+    buffer = io.BytesIO()
+    document.save(buffer)
+
+    async def mock_download(file_path: str):
+        return buffer.getvalue()
+
+    monkeypatch.setattr(main_mod, 'download_file_from_storage', mock_download)
+
+
+@pytest.fixture
+def profiler(monkeypatch, tmp_path):
+    controller = ProfilingController(token="secret", output_dir=str(tmp_path))
+    monkeypatch.setattr(main_mod, 'profiler', controller)
+    return controller
+
+
+def test_hooks_are_noops_without_session():
+    assert current_session() is None
+    with stage("anything"):
+        pass
+    assert profiled_call(sum, [1, 2, 3]) == 6
+
+
+def test_session_collects_nested_stages_and_cpu():
+    session = ProfileSession(label="unit")
+    with activate(session):
+        with stage("outer"):
+            with stage("inner"):
+                profiled_call(sorted, range(1000))
+    assert current_session() is None
+
+    paths = [entry["stage"] for entry in session.report()["stages"]]
+    assert paths == ["outer;inner", "outer"]
+    folded = session.collapsed_stacks()
+    assert len(folded) == 2
+    assert all(int(line.rsplit(" ", 1)[1]) >= 0 for line in folded)
+    assert "sorted" in session.cpu_summary()
+    assert isinstance(session.report()["allocations"], list)
+
+
+def test_parse_profile_requires_token(docx_download, profiler):
+    client = TestClient(main_mod.app)
+    resp = client.get('/parse', params={'file_path': 'resume.docx', 'profile': 'return'})
+    assert resp.status_code == 403
+    resp = client.get('/parse', params={'file_path': 'resume.docx', 'profile': 'return'},
+                      headers={'X-Profile-Token': 'wrong'})
+    assert resp.status_code == 403
+
+
+def test_non_ascii_profile_token_is_refused_not_an_error(docx_download, profiler):
+    assert ProfilingController(token="sécret").authorized("sécret")
+    assert not profiler.authorized("sécret")
+    client = TestClient(main_mod.app)
+    resp = client.get('/parse', params={'file_path': 'resume.docx', 'profile': 'return'},
+                      headers={'X-Profile-Token': 'sécret'.encode()})
+    assert resp.status_code == 403
+
+
+def test_parse_profile_disabled_without_configured_token(docx_download, monkeypatch):
+    monkeypatch.setattr(main_mod, 'profiler', ProfilingController(token=""))
+    client = TestClient(main_mod.app)
+    resp = client.get('/parse', params={'file_path': 'resume.docx', 'profile': 'return'},
+                      headers={'X-Profile-Token': ''})
+    assert resp.status_code == 403
+
+
+def test_parse_profile_returned_inline(docx_download, profiler):
+    client = TestClient(main_mod.app)
+    resp = client.get('/parse', params={'file_path': 'resume.docx', 'profile': 'return'},
+                      headers={'X-Profile-Token': 'secret'})
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body["email"] == "jane.doe@example.com"
+
+    stages = {entry["stage"] for entry in body["profile"]["stages"]}
+    assert {"parse", "parse;download", "parse;extraction", "parse;extraction;extract_text",
+            "parse;extraction;contact_info"} <= stages
+    assert "extract_contact_info" in body["profile"]["cpu"]
+
+
+def test_parse_profile_saved_to_directory(docx_download, profiler, tmp_path):
+    client = TestClient(main_mod.app)
+    resp = client.get('/parse', params={'file_path': 'resume.docx', 'profile': 'save'},
+                      headers={'X-Profile-Token': 'secret'})
+    assert resp.status_code == 200
+    saved = resp.json()["profile"]["saved"]
+    assert set(saved) == {"cpu", "flamegraph", "report"}
+    for path in saved.values():
+        assert os.path.dirname(path) == str(tmp_path)
+        assert os.path.exists(path)
+    assert json.loads(open(saved["report"]).read())["label"] == "resume.docx"
+
+
+def test_profile_window_saves_every_parse(docx_download, profiler, tmp_path):
+    client = TestClient(main_mod.app)
+    assert client.post('/debug/profile', params={'seconds': 30}).status_code == 403
+    resp = client.post('/debug/profile', params={'seconds': 30}, headers={'X-Profile-Token': 'secret'})
+    assert resp.status_code == 200
+
+    resp = client.get('/parse', params={'file_path': 'resume.docx'})
+    assert resp.status_code == 200
+    assert "profile" not in resp.json()
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+
+def test_profile_window_hidden_when_disabled(monkeypatch):
+    monkeypatch.setattr(main_mod, 'profiler', ProfilingController(token=""))
+    client = TestClient(main_mod.app)
+    assert client.post('/debug/profile', headers={'X-Profile-Token': 'x'}).status_code == 404
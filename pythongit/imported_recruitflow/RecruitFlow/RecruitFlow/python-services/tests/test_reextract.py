@@ -0,0 +1,109 @@
+"""
+Tests for the extracted text store and batch field re-extraction
+"""
+import sys
+import os
+import json
+import pytest
+from docx import Document
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+import contact_mapper
+import text_store
+from bulk_import import run_bulk_import
+from pipeline import extractor_version
+from reextract import run_reextract
+from text_store import TextStore
+
+
+def _make_docx(path, lines):
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    document.save(path)
+
+
+@pytest.fixture
+def stored_corpus(tmp_path, monkeypatch):
+    """Two resumes bulk-imported with the text store enabled"""
+    store_dir = tmp_path / "store"
+    monkeypatch.setattr(text_store, 'TEXT_STORE_DIR', str(store_dir))
+    folder = tmp_path / "resumes"
+    folder.mkdir()
+    _make_docx(folder / "a.docx", ["Alice Example", "alice@example.com", "Worked with Python and Zephyr RTOS"])
+    _make_docx(folder / "b.docx", ["Bob Example", "bob@example.com", "Skills: Java"])
+    run_bulk_import([str(folder)], str(tmp_path / "import.ndjson"), workers=1)
+    return str(store_dir)
+
+
+class TestTextStore:
+    """Test the content-addressed text store"""
+
+    def test_texts_are_compressed_and_deduplicated(self, tmp_path):
+        """Test that identical texts are stored once, compressed"""
+        store = TextStore(str(tmp_path))
+        text = "Jane Doe\njane@example.com\n" + "Python developer. " * 200
+        store.record("a.pdf", text, {"name": "Jane Doe"}, "1+abc")
+        store.record("copy-of-a.pdf", text, {"name": "Jane Doe"}, "1+abc")
+
+        objects = list((tmp_path / "objects").glob("*/*.z"))
+        assert len(objects) == 1
+        assert objects[0].stat().st_size < len(text) / 5
+        record = store.load_document("copy-of-a.pdf")
+        assert store.get_text(record["text_key"]) == text
+        assert sorted(r["doc_id"] for r in store.iter_documents()) == ["a.pdf", "copy-of-a.pdf"]
+
+    def test_missing_entries(self, tmp_path):
+        """Test lookups of unknown documents and texts"""
+        store = TextStore(str(tmp_path))
+        assert store.load_document("nope.pdf") is None
+        with pytest.raises(KeyError):
+            store.get_text("0" * 40)
+
+    def test_bulk_import_fills_store(self, stored_corpus):
+        """Test that parsed documents are recorded with the current version"""
+        records = list(TextStore(stored_corpus).iter_documents())
+        assert len(records) == 2
+        assert {r["version"] for r in records} == {extractor_version()}
+        assert all(r["fields"]["email"] for r in records)
+
+
+class TestReextract:
+    """Test batch re-extraction after a taxonomy change"""
+
+    def test_only_changed_candidates_are_output(self, stored_corpus, tmp_path, monkeypatch):
+        """Test that a new skill yields a change record for the affected resume only"""
+        old_version = extractor_version()
+        monkeypatch.setattr(contact_mapper, 'TECH_SKILLS', contact_mapper.TECH_SKILLS + ('Zephyr RTOS',))
+        assert extractor_version() != old_version
+
+        output = tmp_path / "changed.ndjson"
+        counts = run_reextract(stored_corpus, str(output), workers=1)
+        assert counts["changed"] == 1
+        assert counts["unchanged"] == 1
+        assert counts["failed"] == 0
+
+        [change] = [json.loads(line) for line in output.read_text().splitlines()]
+        assert change["file_path"].endswith("a.docx")
+        assert change["changed"] == ["skills"]
+        assert "Zephyr RTOS" in change["skills"]
+        assert change["previous_version"] == old_version
+        assert change["version"] == extractor_version()
+
+        # The store now holds the new version, so a second run has nothing to do
+        counts = run_reextract(stored_corpus, str(output), workers=1)
+        assert counts["up_to_date"] == 2
+        assert output.read_text() == ""
+
+    def test_parallel_chunks(self, stored_corpus, tmp_path):
+        """Test the process-pool path over small chunks"""
+        output = tmp_path / "changed.ndjson"
+        counts = run_reextract(stored_corpus, str(output), workers=2, chunk_size=1, force=True)
+        assert counts["unchanged"] == 2
+        assert counts["changed"] == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
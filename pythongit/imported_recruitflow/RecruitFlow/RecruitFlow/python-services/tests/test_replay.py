@@ -0,0 +1,127 @@
+"""
+Tests for /parse traffic recording and offline replay
+"""
+import sys
+import os
+import json
+import pytest
+from docx import Document
+from fastapi.testclient import TestClient
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+import replay
+from recorder import TrafficRecorder, iter_records, load_salt, redact_value
+from replay import run_replay
+
+service = replay.service
+
+LINES = ["Jane Smith", "jane.smith@example.com", "Austin, TX 78701", "Skills: Python, Docker"]
+
+# The default redaction without "affinda": Affinda responses kept for replay
+KEEP_AFFINDA = "name,email,phone,address,location,linkedin,text,file_path"
+
+
+@pytest.fixture
+def recorded(tmp_path, monkeypatch):
+    """A service recording into a fresh archive, and a resume to parse"""
+    archive = tmp_path / "archive"
+    monkeypatch.setattr(service, 'recorder', TrafficRecorder(str(archive)))
+    monkeypatch.setenv('AFFINDA_API_KEY', 'test-key')
+    monkeypatch.setattr(service, 'AFFINDA_MODE', 'escalate')
+    affinda_calls = []
+
+    async def mock_affinda(file_bytes, filename='resume', api_key=None):
+        affinda_calls.append(filename)
+        return {"data": {"phones": ["+1 555 000 1111"]}}, None
+
+    monkeypatch.setattr(service, 'parse_with_affinda', mock_affinda)
+    path = tmp_path / "jane.docx"
+    document = Document()
+    for line in LINES:
+        document.add_paragraph(line)
+    document.save(path)
+    return TestClient(service.app), str(archive), str(path), affinda_calls
+
+
+def test_recording_redacts_personal_fields(recorded):
+    client, archive, path, affinda_calls = recorded
+    response = client.get('/parse', params={'file_path': path}).json()
+    assert affinda_calls == ['jane.docx']
+
+    [record] = list(iter_records(archive))
+    salt = load_salt(archive)
+    assert record['output']['name'] == redact_value('Jane Smith', salt)
+    assert record['output']['skills'] == response['skills']
+    assert record['file_path'] == redact_value(path, salt)
+    # Affinda's answer holds contact details verbatim and is dropped by default
+    assert record['affinda'] == [] and record['affinda_redacted'] is True
+    assert 'Jane' not in json.dumps(record)
+    assert '555 000 1111' not in json.dumps(record)
+    assert record['params']['affinda_available'] is True
+    assert record['stages']['parse;extraction'] > 0
+    assert client.get('/metrics').json()['recording']['recorded'] == 1
+
+
+def test_replay_is_unchanged_against_same_build(recorded, tmp_path, monkeypatch):
+    client, archive, path, affinda_calls = recorded
+    monkeypatch.setattr(service, 'recorder', TrafficRecorder(archive, redact=KEEP_AFFINDA))
+    client.get('/parse', params={'file_path': path})
+    [record] = list(iter_records(archive))
+    assert record['affinda'][0]['response'] == {"data": {"phones": ["+1 555 000 1111"]}}
+    monkeypatch.delenv('AFFINDA_API_KEY')
+
+    report = tmp_path / "replay.ndjson"
+    summary = run_replay(archive, str(report), repeat=2)
+    assert summary['replayed'] == 1
+    assert summary['changed'] == 0
+    # Affinda answered from the archive, not the network
+    assert affinda_calls == ['jane.docx']
+
+    [line] = [json.loads(text) for text in report.read_text().splitlines()]
+    assert line['status'] == 'unchanged'
+    assert line['nondeterministic'] is False
+    assert 'delta' in line['extraction_ms']
+    assert 'parse;extraction;extract_text' in line['stages']
+
+
+def test_fields_from_dropped_affinda_responses_are_unverified(recorded, tmp_path, monkeypatch):
+    client, archive, path, _ = recorded
+    client.get('/parse', params={'file_path': path})
+    monkeypatch.delenv('AFFINDA_API_KEY')
+
+    report = tmp_path / "replay.ndjson"
+    assert run_replay(archive, str(report))['changed'] == 0
+    [line] = [json.loads(text) for text in report.read_text().splitlines()]
+    assert line['unverified'] == ['phone']
+
+
+def test_replay_reports_output_changes(recorded, tmp_path, monkeypatch):
+    client, archive, path, _ = recorded
+    client.get('/parse', params={'file_path': path})
+
+    extract = service.extract_contact_info
+
+    def with_extra_skill(text, *args):
+        info = extract(text, *args)
+        info['skills'] = info['skills'] + ['Kubernetes']
+        return info
+
+    monkeypatch.setattr(service, 'extract_contact_info', with_extra_skill)
+    report = tmp_path / "replay.ndjson"
+    summary = run_replay(archive, str(report))
+    assert summary['changed_by_field'] == {'skills': 1}
+    [line] = [json.loads(text) for text in report.read_text().splitlines()]
+    assert 'Kubernetes' in line['diff']['skills']['replayed']
+
+
+def test_hash_only_archives_need_the_originals(recorded, tmp_path, monkeypatch):
+    client, archive, path, _ = recorded
+    monkeypatch.setattr(service, 'recorder', TrafficRecorder(archive, documents='hash'))
+    client.get('/parse', params={'file_path': path})
+    assert not (tmp_path / "archive" / "documents").exists()
+
+    report = tmp_path / "replay.ndjson"
+    assert run_replay(archive, str(report))['missing'] == 1
+    assert run_replay(archive, str(report), documents=str(tmp_path))['replayed'] == 1
@@ -10,7 +10,12 @@ import io
 # Add the resume_parser directory to the path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
 
-from text_extractor import extract_text_from_pdf, extract_text_from_docx
+from text_extractor import (
+    extract_text_from_pdf,
+    extract_text_from_docx,
+    iter_pdf_pages,
+    iter_document_blocks,
+)
 from contact_mapper import (
     extract_email, 
     extract_phone, 
@@ -84,6 +89,58 @@ class TestTextExtractor:
             assert "jane.smith@example.com" in result
 
 
+class TestStreamingExtraction:
+    """Test the page/block iterator API"""
+    
+    def test_iter_pdf_pages_yields_metadata_and_closes_pages(self):
+        """Test per-page blocks and that page caches are released"""
+        with patch('pdfplumber.open') as mock_pdf:
+            pages = [MagicMock(), MagicMock(), MagicMock()]
+            pages[0].extract_text.return_value = "John Doe"
+            pages[1].extract_text.return_value = None
+            pages[2].extract_text.return_value = "Experience"
+            mock_pdf.return_value.__enter__.return_value.pages = pages
+            
+            blocks = list(iter_pdf_pages(b'fake_pdf_content'))
+        
+        assert [b.index for b in blocks] == [1, 3]
+        assert blocks[0].text == "John Doe"
+        assert blocks[0].engine == "pdfplumber"
+        assert blocks[0].char_count == len("John Doe")
+        assert blocks[0].elapsed_ms >= 0
+        for page in pages:
+            page.close.assert_called_once()
+    
+    def test_iter_pdf_pages_is_lazy(self):
+        """Test that pages are only read as the consumer asks for them"""
+        with patch('pdfplumber.open') as mock_pdf:
+            pages = [MagicMock() for _ in range(3)]
+            for i, page in enumerate(pages):
+                page.extract_text.return_value = f"page {i}"
+            mock_pdf.return_value.__enter__.return_value.pages = pages
+            
+            first = next(iter_pdf_pages(b'fake_pdf_content'))
+        
+        assert first.text == "page 0"
+        assert pages[1].extract_text.call_count == 0
+    
+    def test_iter_document_blocks_docx(self):
+        """Test DOCX paragraphs and table rows stream as blocks"""
+        from docx import Document
+        document = Document()
+        document.add_paragraph("Jane Smith")
+        document.add_paragraph("   ")
+        table = document.add_table(rows=1, cols=2)
+        table.rows[0].cells[0].text = "Python"
+        table.rows[0].cells[1].text = "SQL"
+        buffer = io.BytesIO()
+        document.save(buffer)
+        
+        blocks = list(iter_document_blocks(buffer.getvalue(), '.docx'))
+        assert [(b.kind, b.text) for b in blocks] == [("paragraph", "Jane Smith"), ("table_row", "Python | SQL")]
+        assert all(b.engine == "python-docx" for b in blocks)
+
+
 class TestContactMapper:
     """Test contact information extraction"""
     
@@ -0,0 +1,225 @@
+"""
+Tests for consistent-hash routing across parser replicas
+"""
+import asyncio
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+import resume_parser.router as router_mod
+from resume_parser.router import HashRing, ReplicaPool, create_app, replica_id, routing_key
+
+REPLICAS = ["http://replica-a:8001", "http://replica-b:8002", "http://replica-c:8003"]
+
+
+class TestHashRing:
+    """Test key placement and movement"""
+
+    def test_keys_spread_over_replicas(self):
+        """Test that every replica owns a fair share of keys"""
+        ring = HashRing(REPLICAS)
+        owners = [ring.preference(f"content:{i}")[0] for i in range(3000)]
+        for replica in REPLICAS:
+            assert 700 < owners.count(replica) < 1300
+
+    def test_adding_a_replica_moves_only_its_share(self):
+        """Test that keys move only to the new replica, about 1/n of them"""
+        ring = HashRing(REPLICAS)
+        keys = [f"content:{i}" for i in range(3000)]
+        before = {key: ring.preference(key)[0] for key in keys}
+        ring.add("http://replica-d:8004")
+        moved = [key for key in keys if ring.preference(key)[0] != before[key]]
+        assert all(ring.preference(key)[0] == "http://replica-d:8004" for key in moved)
+        assert 500 < len(moved) < 1000
+
+    def test_preference_lists_every_replica_once(self):
+        """Test the failover order"""
+        ring = HashRing(REPLICAS)
+        order = ring.preference("content:abc")
+        assert sorted(order) == sorted(REPLICAS)
+        ring.remove(order[0])
+        assert ring.preference("content:abc") == order[1:]
+
+
+def test_unhealthy_replicas_go_last():
+    pool = ReplicaPool(REPLICAS, fail_threshold=2)
+    order = pool.candidates("content:abc")
+    pool.mark_failure(order[0])
+    assert pool.candidates("content:abc") == order
+    pool.mark_failure(order[0])
+    assert pool.candidates("content:abc") == order[1:] + order[:1]
+    pool.mark_success(order[0])
+    assert pool.candidates("content:abc") == order
+
+
+class AsyncBody(httpx.AsyncByteStream):
+    """A response body that is streamed, as from a real connection"""
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+    async def __aiter__(self):
+        yield self.data
+
+
+class FakeReplicas:
+    """Replicas and object storage behind an httpx.MockTransport"""
+
+    def __init__(self):
+        self.down = set()
+        self.slow = set()
+        self.busy = set()
+        self.parsed = []
+        # Replicas answering through a proxy that returns HTML error pages
+        self.html = False
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        base = f"{request.url.scheme}://{request.url.host}:{request.url.port}"
+        if request.url.host == "storage":
+            return httpx.Response(200, headers={"ETag": '"etag-' + request.url.path.strip("/") + '"'})
+        if base in self.down:
+            raise httpx.ConnectError("connection refused", request=request)
+        if base in self.slow and request.url.path.startswith("/parse"):
+            self.parsed.append((base, request.url.params.get("file_path"), None))
+            raise httpx.ReadTimeout("timed out waiting for the parse", request=request)
+        if self.html and request.url.path.startswith("/parse"):
+            status = 200 if request.url.path == "/parse" else 502
+            return httpx.Response(status, text="<html>Bad Gateway</html>", headers={"Content-Type": "text/html"})
+        if base in self.busy and request.url.path.startswith("/parse"):
+            return httpx.Response(503, headers={"Retry-After": "5", "Content-Type": "application/json"},
+                                  stream=AsyncBody(b'{"detail": "Worker is recycling"}'))
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "healthy"})
+        if request.url.path == "/parse":
+            self.parsed.append((base, request.url.params["file_path"], request.url.params.get("caller")))
+            return httpx.Response(200, json={"success": True, "file_path": request.url.params["file_path"],
+                                             "reparse_id": "r1"})
+        if request.url.path == "/parse/reparse/r1":
+            return httpx.Response(200, json={"status": "done", "reparse_id": "r1", "replica": base})
+        return httpx.Response(404, json={"detail": "Not Found"})
+
+
+@pytest.fixture
+def routed():
+    replicas = FakeReplicas()
+    app = create_app(REPLICAS, transport=httpx.MockTransport(replicas.handler), health_interval=0)
+    return TestClient(app), app.state.pool, replicas
+
+
+def test_same_content_goes_to_same_replica(routed):
+    client, pool, replicas = routed
+    for _ in range(3):
+        response = client.get('/parse', params={'file_path': 'http://storage/resume-1.pdf'})
+        assert response.status_code == 200
+    assert len({base for base, _, _ in replicas.parsed}) == 1
+    assert response.headers['x-parse-replica'] == pool.candidates('etag:etag-resume-1.pdf')[0]
+    # The original client, not the router, is the caller replicas share capacity by
+    assert replicas.parsed[0][2] == 'testclient'
+
+
+def test_failover_to_next_replica(routed):
+    client, pool, replicas = routed
+    key = 'content:abc'
+    first, second = pool.candidates(key)[:2]
+    replicas.down.add(first)
+
+    response = client.get('/parse', params={'file_path': 'resume.pdf', 'content_hash': 'abc'})
+    assert response.status_code == 200
+    assert response.headers['x-parse-replica'] == second
+    assert pool.stats()['failovers'] == 1
+
+    # The health probe confirms the failure and takes the replica out
+    asyncio.run(pool.check(httpx.AsyncClient(transport=httpx.MockTransport(replicas.handler))))
+    assert pool.stats()['replicas'][first]['healthy'] is False
+    assert pool.candidates(key)[0] == second
+
+    replicas.down.clear()
+    asyncio.run(pool.check(httpx.AsyncClient(transport=httpx.MockTransport(replicas.handler))))
+    assert pool.candidates(key)[0] == first
+
+
+def test_slow_replica_is_not_failed_over(routed):
+    client, pool, replicas = routed
+    owner = pool.candidates('content:abc')[0]
+    replicas.slow.add(owner)
+
+    response = client.get('/parse', params={'file_path': 'resume.pdf', 'content_hash': 'abc'})
+    assert response.status_code == 504
+    # The parse may still be running on its replica; it is not started again elsewhere
+    assert [base for base, _, _ in replicas.parsed] == [owner]
+    assert pool.stats()['failovers'] == 0
+    assert pool.stats()['replicas'][owner]['errors'] == 0
+    assert client.get(f"/parse/reparse/{replica_id(owner)}.r1").status_code == 504
+
+
+def test_last_503_keeps_its_retry_after(routed):
+    client, pool, replicas = routed
+    replicas.busy.update(REPLICAS)
+    for path in ('/parse', '/parse/stream'):
+        response = client.get(path, params={'file_path': 'resume.pdf', 'content_hash': 'abc'})
+        assert response.status_code == 503
+        assert response.headers['retry-after'] == '5'
+        assert response.headers['content-type'] == 'application/json'
+        assert response.headers['x-parse-replica'] in REPLICAS
+        assert response.json() == {"detail": "Worker is recycling"}
+
+
+def test_no_replica_available(routed):
+    client, pool, replicas = routed
+    replicas.down.update(REPLICAS)
+    response = client.get('/parse', params={'file_path': 'resume.pdf', 'content_hash': 'abc'})
+    assert response.status_code == 503
+
+
+def test_reparse_ids_route_back_to_their_replica(routed):
+    client, pool, replicas = routed
+    data = client.get('/parse', params={'file_path': 'resume.pdf', 'content_hash': 'abc'}).json()
+    owner = pool.candidates('content:abc')[0]
+    assert data['reparse_id'] == f"{replica_id(owner)}.r1"
+
+    result = client.get(f"/parse/reparse/{data['reparse_id']}").json()
+    assert result['replica'] == owner
+    assert result['reparse_id'] == data['reparse_id']
+    assert client.get('/parse/reparse/unknown').status_code == 404
+
+
+def test_non_json_replica_bodies_pass_through(routed):
+    client, pool, replicas = routed
+    replicas.html = True
+    response = client.get('/parse', params={'file_path': 'resume.pdf', 'content_hash': 'abc'})
+    assert response.status_code == 200
+    assert response.text == "<html>Bad Gateway</html>"
+    assert response.headers['content-type'].startswith('text/html')
+
+    response = client.get(f"/parse/reparse/{replica_id(REPLICAS[0])}.r1")
+    assert response.status_code == 502
+    assert response.text == "<html>Bad Gateway</html>"
+
+
+def test_replicas_can_be_added_with_token(routed, monkeypatch):
+    client, pool, replicas = routed
+    assert client.post('/router/replicas', params={'url': 'http://replica-d:8004'}).status_code == 403
+
+    monkeypatch.setattr(router_mod, 'ROUTER_ADMIN_TOKEN', 'secret')
+    response = client.post('/router/replicas', params={'url': 'http://replica-d:8004'},
+                           headers={'X-Router-Token': 'secret'})
+    assert response.status_code == 200
+    assert 'http://replica-d:8004' in response.json()['replicas']
+    assert client.post('/router/replicas', params={'url': 'http://replica-e:8005'},
+                       headers={'X-Router-Token': 'sécret'.encode()}).status_code == 403
+    assert client.delete('/router/replicas', params={'url': 'http://replica-d:8004'},
+                         headers={'X-Router-Token': 'secret'}).json()['replicas'].keys() == set(REPLICAS)
+
+
+def test_local_files_are_keyed_by_content(tmp_path):
+    first, second = tmp_path / "a.pdf", tmp_path / "copy.pdf"
+    first.write_bytes(b"same bytes")
+    second.write_bytes(b"same bytes")
+
+    async def keys():
+        async with httpx.AsyncClient() as client:
+            return [await routing_key(client, str(path)) for path in (first, second, tmp_path / "missing.pdf")]
+
+    a, b, missing = asyncio.run(keys())
+    assert a == b and a.startswith("content:")
+    assert missing == f"path:{tmp_path / 'missing.pdf'}"
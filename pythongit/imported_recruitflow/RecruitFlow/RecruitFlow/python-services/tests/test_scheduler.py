@@ -0,0 +1,131 @@
+"""
+Unit tests for the admission scheduler
+"""
+import sys
+import os
+import time
+import asyncio
+import pytest
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+from scheduler import AdmissionScheduler, AdmissionTicket, QueueTimeout
+
+
+async def _job(scheduler, order, label, priority="interactive", caller="c", deadline=None, hold=0.01):
+    async with scheduler.admit(priority=priority, caller=caller, deadline=deadline):
+        order.append(label)
+        await asyncio.sleep(hold)
+
+
+class TestAdmissionScheduler:
+    """Test ordering, fairness and deadlines"""
+
+    def test_interactive_runs_before_background(self):
+        """Test that queued interactive work overtakes queued background work"""
+        async def scenario():
+            scheduler = AdmissionScheduler(max_concurrent=1)
+            order = []
+            blocker = asyncio.create_task(_job(scheduler, order, "running", hold=0.05))
+            await asyncio.sleep(0)
+            jobs = [asyncio.create_task(_job(scheduler, order, f"bg{i}", priority="background")) for i in range(3)]
+            await asyncio.sleep(0)
+            jobs.append(asyncio.create_task(_job(scheduler, order, "fg")))
+            await asyncio.gather(blocker, *jobs)
+            return order
+
+        order = asyncio.run(scenario())
+        assert order[:2] == ["running", "fg"]
+
+    def test_callers_share_fairly(self):
+        """Test round-robin between callers in the same class"""
+        async def scenario():
+            scheduler = AdmissionScheduler(max_concurrent=1)
+            order = []
+            blocker = asyncio.create_task(_job(scheduler, order, "running"))
+            await asyncio.sleep(0)
+            jobs = [asyncio.create_task(_job(scheduler, order, f"bulk{i}", caller="bulk")) for i in range(3)]
+            await asyncio.sleep(0)
+            jobs.append(asyncio.create_task(_job(scheduler, order, "user", caller="recruiter")))
+            await asyncio.gather(blocker, *jobs)
+            return order
+
+        order = asyncio.run(scenario())
+        assert order.index("user") < order.index("bulk1")
+
+    def test_expired_work_is_dropped(self):
+        """Test that a request past its queue deadline never runs"""
+        async def scenario():
+            scheduler = AdmissionScheduler(max_concurrent=1)
+            order = []
+            blocker = asyncio.create_task(_job(scheduler, order, "running", hold=0.1))
+            await asyncio.sleep(0)
+            with pytest.raises(QueueTimeout):
+                await _job(scheduler, order, "late", deadline=time.monotonic() + 0.02)
+            await blocker
+            return scheduler, order
+
+        scheduler, order = asyncio.run(scenario())
+        assert order == ["running"]
+        stats = scheduler.stats()
+        assert stats["classes"]["interactive"]["expired"] == 1
+        assert stats["classes"]["interactive"]["queue_depth"] == 0
+        assert stats["running"] == 0
+
+    def test_stats_report_wait_times(self):
+        """Test per-class queue statistics"""
+        async def scenario():
+            scheduler = AdmissionScheduler(max_concurrent=2)
+            order = []
+            await asyncio.gather(*[_job(scheduler, order, i, priority="background") for i in range(4)])
+            return scheduler
+
+        stats = asyncio.run(scenario()).stats()
+        background = stats["classes"]["background"]
+        assert background["admitted"] == 4
+        assert background["wait_ms_max"] > 0
+        assert stats["classes"]["interactive"]["admitted"] == 0
+
+    def test_raised_ticket_moves_up_the_queue(self):
+        """Test that queued work raised to interactive overtakes background work queued before it"""
+        async def scenario():
+            scheduler = AdmissionScheduler(max_concurrent=1)
+            order = []
+            ticket = AdmissionTicket("background", "bulk")
+
+            async def shared():
+                async with scheduler.admit(ticket=ticket):
+                    order.append("shared")
+
+            blocker = asyncio.create_task(_job(scheduler, order, "running", hold=0.05))
+            await asyncio.sleep(0)
+            jobs = [asyncio.create_task(_job(scheduler, order, "bg", priority="background", caller="bulk2")),
+                    asyncio.create_task(shared())]
+            await asyncio.sleep(0)
+            assert ticket.raise_to("interactive", "recruiter")
+            assert not ticket.raise_to("background", "bulk")
+            depths = {name: cls["queue_depth"] for name, cls in scheduler.stats()["classes"].items()}
+            await asyncio.gather(blocker, *jobs)
+            return scheduler, order, depths
+
+        scheduler, order, depths = asyncio.run(scenario())
+        assert depths == {"interactive": 1, "background": 1}
+        assert order == ["running", "shared", "bg"]
+        stats = scheduler.stats()
+        assert stats["running"] == 0
+        assert stats["classes"]["interactive"]["running"] == stats["classes"]["background"]["running"] == 0
+        assert stats["classes"]["interactive"]["admitted"] == 2
+
+    def test_unknown_priority(self):
+        """Test that unknown classes are rejected"""
+        async def scenario():
+            async with AdmissionScheduler().admit(priority="urgent"):
+                pass
+
+        with pytest.raises(ValueError):
+            asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
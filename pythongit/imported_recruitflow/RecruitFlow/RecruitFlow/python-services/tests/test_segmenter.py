@@ -0,0 +1,98 @@
+"""
+Unit tests for the resume section segmenter
+"""
+import sys
+import os
+import random
+import time
+import pytest
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+from segmenter import segment_resume
+from contact_mapper import extract_contact_info
+
+
+def _best_time(func, arg, repeats=3):
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+class TestSegmenter:
+    """Test section splitting"""
+
+    def test_sections_split_on_headings(self):
+        """Test that known headings start new sections"""
+        text = """Jane Smith
+jane@example.com
+
+SKILLS
+Python, SQL
+
+Work Experience
+Acme Corp - Engineer
+
+Education:
+BSc Computer Science"""
+
+        sections = segment_resume(text)
+        assert "Jane Smith" in sections.get('header')
+        assert sections.get('skills') == "Python, SQL"
+        assert "Acme Corp" in sections.get('experience')
+        assert "BSc Computer Science" in sections.get('education')
+
+    def test_inline_heading_content(self):
+        """Test headings with content after the colon"""
+        sections = segment_resume("John Doe\nTechnical Skills: Python, Go\nCloud: AWS")
+        assert sections.get('skills') == "Python, Go\nCloud: AWS"
+        assert sections.get('header') == "John Doe"
+
+    def test_repeated_headings_are_merged(self):
+        """Test that repeated sections are concatenated"""
+        sections = segment_resume("Skills: Python\nEducation\nMIT\nCertifications: AWS")
+        assert "Python" in sections.get('skills')
+        assert "AWS" in sections.get('skills')
+
+    def test_no_headings(self):
+        """Test text without headings stays in the header section"""
+        sections = segment_resume("Jane Smith\njane@example.com")
+        assert sections.get('header') == "Jane Smith\njane@example.com"
+        assert sections.contact_region == sections.get('header')
+
+    def test_input_budget(self):
+        """Test that oversized input is truncated to the budget"""
+        sections = segment_resume("a" * 500, max_chars=100)
+        assert sections.truncated
+        assert len(sections.text) == 100
+
+
+class TestLinearTime:
+    """Fuzz/timing tests that fail on super-linear extraction"""
+
+    # Inputs that made the old skill-header and city regexes backtrack
+    GENERATORS = {
+        'prose': lambda n: "word " * (n // 5),
+        'skills_block': lambda n: "John Doe\nSkills: " + "python go rust\n" * (n // 15),
+        'state_tokens': lambda n: "John Doe\n" + "lorem ipsum CA dolor " * (n // 21),
+        'random': lambda n: ''.join(
+            random.Random(n).choice("abcdefgh ABCD,\n.:@0123CA") for _ in range(n)
+        ),
+    }
+
+    @pytest.mark.parametrize("name", sorted(GENERATORS))
+    def test_extract_contact_info_scales_linearly(self, name):
+        """Quadrupling the input must not cost much more than 4x the time"""
+        generate = self.GENERATORS[name]
+        small = _best_time(extract_contact_info, generate(10000))
+        large = _best_time(extract_contact_info, generate(40000))
+        # Linear code lands near 4x; the old quadratic patterns were ~12-16x
+        assert large < small * 8, f"{name}: {small:.4f}s -> {large:.4f}s"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
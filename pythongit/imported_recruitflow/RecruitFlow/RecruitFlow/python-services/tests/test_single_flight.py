@@ -0,0 +1,196 @@
+"""
+Tests for single-flight coalescing of identical parses
+"""
+import os
+import time
+import asyncio
+import httpx
+import pytest
+
+import resume_parser.main as main_mod
+from resume_parser.scheduler import AdmissionScheduler, AdmissionTicket
+from resume_parser.single_flight import SingleFlight, content_key, path_key
+
+
+def test_keys():
+    assert content_key(b"abc") == content_key(b"abc")
+    assert content_key(b"abc") != content_key(b"abd")
+    assert path_key("/no/such/file.pdf") == "path:/no/such/file.pdf"
+
+
+def test_path_key_changes_with_mtime(tmp_path):
+    resume = tmp_path / "resume.pdf"
+    resume.write_bytes(b"v1")
+    first = path_key(str(resume))
+    assert path_key(str(resume)) == first
+    os.utime(resume, ns=(time.time_ns(), time.time_ns() + 10**9))
+    assert path_key(str(resume)) != first
+
+
+def test_concurrent_calls_share_one_execution():
+    flights = SingleFlight()
+    calls = []
+
+    async def work(token):
+        calls.append(token)
+        await asyncio.sleep(0.05)
+        return {"name": "Jane"}
+
+    async def run():
+        return await asyncio.gather(*(flights.do("k", work) for _ in range(5)))
+
+    results = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(result == {"name": "Jane"} for result in results)
+    assert flights.stats() == {"executions": 1, "parses_saved": 4, "in_flight": 0}
+
+
+def test_finished_flights_are_not_cached():
+    flights = SingleFlight()
+
+    async def work(token):
+        return len(flights._flights)
+
+    async def run():
+        await flights.do("k", work)
+        await flights.do("k", work)
+
+    asyncio.run(run())
+    assert flights.stats()["executions"] == 2
+
+
+def test_errors_are_shared():
+    flights = SingleFlight()
+
+    async def work(token):
+        await asyncio.sleep(0.01)
+        raise ValueError("corrupt")
+
+    async def run():
+        return await asyncio.gather(flights.do("k", work), flights.do("k", work), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert [type(r) for r in results] == [ValueError, ValueError]
+
+
+def test_work_survives_until_last_waiter_leaves():
+    flights = SingleFlight()
+    tokens = []
+
+    async def work(token):
+        tokens.append(token)
+        await asyncio.sleep(0.2)
+        return "done"
+
+    async def run():
+        leaver = asyncio.ensure_future(flights.do("k", work))
+        stayer = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0.02)
+        leaver.cancel()
+        await asyncio.sleep(0.02)
+        assert not tokens[0].cancelled
+        assert await stayer == "done"
+
+        lonely = asyncio.ensure_future(flights.do("k2", work))
+        await asyncio.sleep(0.02)
+        lonely.cancel()
+        await asyncio.sleep(0.02)
+        assert tokens[1].cancelled
+        assert flights.stats()["in_flight"] == 0
+
+    asyncio.run(run())
+
+
+def test_shared_deadline_is_the_latest():
+    flights = SingleFlight()
+    tokens = []
+
+    async def work(token):
+        tokens.append(token)
+        await asyncio.sleep(0.02)
+
+    async def run():
+        now = time.monotonic()
+        await asyncio.gather(
+            flights.do("k", work, deadline=now + 1),
+            flights.do("k", work, deadline=now + 5),
+        )
+        assert tokens[0].deadline == pytest.approx(now + 5)
+
+        await asyncio.gather(flights.do("k", work, deadline=now + 1), flights.do("k", work))
+        assert tokens[1].deadline is None
+
+    asyncio.run(run())
+
+
+def test_interactive_joiner_is_not_queued_at_background_priority():
+    flights = SingleFlight()
+    scheduler = AdmissionScheduler(max_concurrent=1)
+    order = []
+
+    def parse(key, label, priority, caller):
+        # Like /parse: the work is admitted on the ticket of whoever started it
+        ticket = AdmissionTicket(priority, caller)
+
+        async def work(token):
+            async with scheduler.admit(ticket=ticket):
+                order.append(label)
+        return flights.do(key, work, ticket=ticket), ticket
+
+    async def run():
+        release = asyncio.Event()
+
+        async def running():
+            async with scheduler.admit():
+                await release.wait()
+
+        blocker = asyncio.create_task(running())
+        await asyncio.sleep(0)
+        # A background reparse starts the flight, then unrelated bulk work queues behind it
+        reparse, ticket = parse("k", "shared", "background", "reparser")
+        first = asyncio.create_task(reparse)
+        bulk = asyncio.create_task(parse("other", "bulk", "background", "bulk")[0])
+        await asyncio.sleep(0)
+        joiner = asyncio.create_task(parse("k", "never runs", "interactive", "alice")[0])
+        await asyncio.sleep(0)
+        classes = scheduler.stats()["classes"]
+        assert classes["interactive"]["queue_depth"] == 1
+        assert classes["background"]["queue_depth"] == 1
+        assert (ticket.priority, ticket.caller) == ("interactive", "alice")
+        release.set()
+        await asyncio.gather(blocker, first, bulk, joiner)
+
+    asyncio.run(run())
+    assert order == ["shared", "bulk"]
+
+
+def test_concurrent_parse_requests_share_extraction(monkeypatch):
+    """Two simultaneous /parse calls for one file run a single extraction."""
+    monkeypatch.delenv('AFFINDA_API_KEY', raising=False)
+    monkeypatch.setattr(main_mod, 'single_flight', SingleFlight())
+    extractions = []
+
+    async def mock_download(file_path: str):
+        return b'%PDF-1.4 fake'
+
+    def slow_extract(file_content, file_extension, cancel_token=None, ocr=True):
+        extractions.append(file_extension)
+        time.sleep(0.2)
+        return "Jane Doe\njane.doe@example.com", 1.0
+
+    monkeypatch.setattr(main_mod, 'download_file_from_storage', mock_download)
+    monkeypatch.setattr(main_mod, 'extract_scored_text', slow_extract)
+
+    async def run():
+        transport = httpx.ASGITransport(app=main_mod.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await asyncio.gather(
+                client.get('/parse', params={'file_path': 'same-resume.pdf'}),
+                client.get('/parse', params={'file_path': 'same-resume.pdf'}),
+            )
+
+    responses = asyncio.run(run())
+    assert [r.status_code for r in responses] == [200, 200]
+    assert all(r.json()["email"] == "jane.doe@example.com" for r in responses)
+    assert extractions == ['.pdf']
+    assert main_mod.single_flight.stats()["parses_saved"] == 1
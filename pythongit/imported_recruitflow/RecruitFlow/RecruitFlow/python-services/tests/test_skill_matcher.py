@@ -0,0 +1,118 @@
+"""
+Unit tests for typo-tolerant skill matching
+"""
+import sys
+import os
+import json
+import pytest
+
+# Add the resume_parser directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'resume_parser'))
+
+from contact_mapper import SKILL_ALIASES, TECH_SKILLS, extract_skills
+from skill_matcher import SkillIndex, edit_distance, get_skill_index, tokenize
+
+LABELLED_SET = os.path.join(os.path.dirname(__file__), '..', 'benchmarks', 'data', 'skills_labelled.jsonl')
+
+
+@pytest.fixture
+def index():
+    return get_skill_index(TECH_SKILLS, SKILL_ALIASES)
+
+
+class TestSkillIndex:
+    """Test lookups against the taxonomy"""
+
+    def test_tokens_keep_skill_punctuation(self):
+        """Test that C++, .NET and Node.js survive tokenization"""
+        assert tokenize("c++, c# and .net core on node.js. ci/cd") == [
+            "c++", "c#", "and", ".net", "core", "on", "node.js", "ci", "cd",
+        ]
+
+    def test_tokens_never_split_accented_words(self):
+        """Test that no ASCII fragment is cut from the middle of a word"""
+        assert tokenize("résumé of josé núñez, currículo vitae") == ["of", "vitae"]
+
+    def test_edit_distance(self):
+        """Test substitutions, adjacent swaps and the early cut-off"""
+        assert edit_distance("kubernates", "kubernetes", 2) == 1
+        assert edit_distance("djnago", "django", 1) == 1
+        assert edit_distance("python", "java", 2) == 3
+
+    def test_aliases_and_compact_spellings(self, index):
+        """Test that variants are reported as the taxonomy entry"""
+        assert index.match("Postgres").skill == "PostgreSQL"
+        assert index.match("ReactJS").skill == "React"
+        assert index.match("Node").skill == "Node.js"
+        assert index.match("Power-BI").skill == "Power BI"
+        assert index.match("scikit learn").skill == "Scikit-learn"
+
+    def test_typos(self, index):
+        """Test that typos within the allowed edits are corrected"""
+        match = index.match("Kubernates")
+        assert match.skill == "Kubernetes" and match.distance == 1
+        assert index.match("Terrafrom").skill == "Terraform"
+        assert index.match("Pytorh").skill == "PyTorch"
+
+    def test_short_words_only_match_exactly(self, index):
+        """Test that short words are not read as misspelled skills"""
+        assert index.match("Scale") is None
+        assert index.match("Leadership") is None
+
+    def test_typo_matching_can_be_disabled(self):
+        """Test that a zero edit distance keeps alias matching only"""
+        exact_only = SkillIndex(TECH_SKILLS, SKILL_ALIASES, max_distance=0)
+        assert exact_only.match("Kubernates") is None
+        assert exact_only.match("K8s").skill == "Kubernetes"
+
+    def test_find_in_prose(self, index):
+        """Test that multi-word and punctuated skills are found in running text"""
+        text = "Built REST APIs in Golang on Spring Boot and .NET Core; CI/CD with GitLab CI".lower()
+        assert index.find(text) == ["Go", "Spring", "Spring Boot", ".NET", ".NET Core", "GitLab CI", "GitLab", "CI/CD", "REST"]
+
+    def test_index_follows_taxonomy_changes(self, index):
+        """Test that a new taxonomy object gets a new index"""
+        assert get_skill_index(TECH_SKILLS, SKILL_ALIASES) is index
+        extended = get_skill_index(TECH_SKILLS + ('Zephyr RTOS',), SKILL_ALIASES)
+        assert extended is not index
+        assert extended.find("ported drivers to zephyr rtos") == ["Zephyr RTOS"]
+
+
+class TestExtractSkills:
+    """Test skill extraction from resumes"""
+
+    def test_skills_section_items_are_canonicalized(self):
+        """Test that variants and typos in the skills section become taxonomy entries"""
+        skills = extract_skills("Jane Doe\nSkills\nPostgres, Kubernates, Languages: Golang")
+        assert skills == ["Go", "PostgreSQL", "Kubernetes"]
+
+    def test_accented_words_are_not_skills(self):
+        """Test that "Résumé" does not yield the skill R"""
+        assert extract_skills("Résumé of Jane Doe") == []
+        assert extract_skills("Currículo de José Núñez\nSkills\nPython, Docker") == ["Python", "Docker"]
+
+    def test_sentences_are_not_skills(self):
+        """Test that prose in the skills section is dropped and short phrases kept"""
+        skills = extract_skills(
+            "Jane Doe\nSkills\nI love building reliable systems for happy customers.\n"
+            "Python, Stakeholder Management"
+        )
+        assert skills == ["Python", "Stakeholder Management"]
+
+    def test_labelled_set(self):
+        """Test precision and recall on the benchmark's labelled set"""
+        with open(LABELLED_SET, encoding='utf-8') as f:
+            cases = [json.loads(line) for line in f if line.strip()]
+        hits = found = wanted = 0
+        for case in cases:
+            got = {skill.lower() for skill in extract_skills(case["text"])}
+            expected = {skill.lower() for skill in case["skills"]}
+            hits += len(got & expected)
+            found += len(got)
+            wanted += len(expected)
+        assert hits / found >= 0.95
+        assert hits / wanted >= 0.95
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
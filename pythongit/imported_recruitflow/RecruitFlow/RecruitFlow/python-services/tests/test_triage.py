@@ -0,0 +1,212 @@
+"""
+Tests for document triage and the pipelines it chooses
+"""
+import io
+import zipfile
+import zlib
+
+import pytest
+from fastapi.testclient import TestClient
+
+import resume_parser.main as main_mod
+import resume_parser.text_extractor as text_extractor
+from resume_parser.text_extractor import TextBlock, iter_pdf_pages
+from resume_parser.triage import (
+    PIPELINE_HYBRID,
+    PIPELINE_OCR,
+    PIPELINE_REJECT,
+    PIPELINE_TEXT,
+    TriageStats,
+    triage_document,
+    triage_pdf,
+)
+
+ENCRYPT = (b" /Encrypt << /Filter /Standard /V 1 /R 2 /O <" + b"41" * 32 + b"> /U <" + b"42" * 32
+           + b"> /P -4 >> /ID [<0123456789abcdef0123456789abcdef> <0123456789abcdef0123456789abcdef>]")
+
+
+def build_pdf(pages, trailer_extra=b""):
+    """Minimal PDF with one page per entry: "text", "image" (an image XObject) or "blank" """
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    next_id = 4
+    for number, kind in enumerate(pages, start=1):
+        page_id, content_id = next_id, next_id + 1
+        next_id += 2
+        kids.append(page_id)
+        if kind == "text":
+            stream = b"BT /F1 12 Tf 72 720 Td (Page %d Jane Smith) Tj ET" % number
+            resources = b"<< /Font << /F1 3 0 R >> >>"
+        elif kind == "image":
+            pixels = zlib.compress(b"\xff" * 48)
+            objects[next_id] = (b"<< /Type /XObject /Subtype /Image /Width 4 /Height 4 /ColorSpace /DeviceRGB "
+                                b"/BitsPerComponent 8 /Filter /FlateDecode /Length %d >>\nstream\n" % len(pixels)
+                                + pixels + b"\nendstream")
+            stream = b"q 612 0 0 792 0 0 cm /Im1 Do Q"
+            resources = b"<< /XObject << /Im1 %d 0 R >> >>" % next_id
+            next_id += 1
+        else:
+            stream = b""
+            resources = b"<< >>"
+        objects[page_id] = (b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources " + resources
+                            + b" /Contents %d 0 R >>" % content_id)
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = b"<< /Type /Pages /Kids [" + b" ".join(b"%d 0 R" % k for k in kids) + b"] /Count %d >>" % len(pages)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for obj_id in sorted(objects):
+        offsets[obj_id] = len(out)
+        out += b"%d 0 obj\n" % obj_id + objects[obj_id] + b"\nendobj\n"
+    xref = len(out)
+    size = max(objects) + 1
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for obj_id in range(1, size):
+        out += b"%010d 00000 n \n" % offsets[obj_id]
+    out += b"trailer\n<< /Size %d /Root 1 0 R" % size + trailer_extra + b" >>\nstartxref\n%d\n%%%%EOF\n" % xref
+    return bytes(out)
+
+
+def build_docx(pages=None):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("[Content_Types].xml", "<Types/>")
+        archive.writestr("word/document.xml", "<w:document/>")
+        if pages is not None:
+            archive.writestr("docProps/app.xml", f"<Properties><Pages>{pages}</Pages></Properties>")
+    return buffer.getvalue()
+
+
+class TestTriagePdf:
+    """Test the pipeline chosen from the PDF structure"""
+
+    def test_text_layer(self):
+        triage = triage_pdf(build_pdf(["text", "text"]))
+        assert triage.pipeline == PIPELINE_TEXT
+        assert triage.pages == 2 and triage.text_pages == 2
+
+    def test_scanned_document_goes_to_ocr(self):
+        triage = triage_pdf(build_pdf(["image"] * 3))
+        assert triage.pipeline == PIPELINE_OCR
+        assert triage.image_pages == (1, 2, 3)
+
+    def test_mixed_document_is_hybrid(self):
+        triage = triage_pdf(build_pdf(["text", "image", "blank"]))
+        assert triage.pipeline == PIPELINE_HYBRID
+        assert triage.image_pages == (2,)
+        assert triage.needs_ocr(2) and not triage.needs_ocr(3)
+
+    def test_pages_past_the_scan_are_ocr_candidates(self):
+        triage = triage_pdf(build_pdf(["text"] * 4 + ["image"]), scan_pages=2)
+        assert triage.pipeline == PIPELINE_TEXT
+        assert triage.scanned_pages == 2
+        assert triage.needs_ocr(5)
+
+    def test_password_protected(self):
+        triage = triage_pdf(build_pdf(["text"], trailer_extra=ENCRYPT))
+        assert triage.pipeline == PIPELINE_REJECT
+        assert triage.status_code == 422
+        assert triage.encrypted
+
+    def test_not_a_pdf(self):
+        triage = triage_document(b"<html>login page</html>", ".pdf")
+        assert triage.rejected and triage.status_code == 422
+
+    def test_unreadable_structure_still_gets_parsed(self):
+        """Test that a damaged xref falls back to the full extractors instead of a rejection"""
+        triage = triage_pdf(b"%PDF-1.4 truncated")
+        assert triage.pipeline == PIPELINE_TEXT
+        assert triage.reason.startswith("Unreadable structure")
+
+
+class TestTriageLimits:
+    """Test DOCX triage and the page limits"""
+
+    def test_docx(self):
+        triage = triage_document(build_docx(pages=3), ".docx")
+        assert triage.pipeline == PIPELINE_TEXT and triage.pages == 3
+
+    def test_legacy_doc_is_unsupported(self):
+        ole = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + b"\x00" * 504
+        triage = triage_document(ole, ".doc")
+        assert triage.rejected and triage.status_code == 415
+
+    def test_zip_that_is_not_a_word_document(self):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w") as archive:
+            archive.writestr("notes.txt", "hello")
+        assert triage_document(buffer.getvalue(), ".docx").status_code == 422
+
+    def test_page_limits(self):
+        portfolio = build_pdf(["text"] * 5)
+        assert triage_document(portfolio, ".pdf", max_pages=4).status_code == 413
+        assert not triage_document(portfolio, ".pdf", max_pages=5).rejected
+        scanned = build_pdf(["image"] * 3)
+        assert triage_document(scanned, ".pdf", max_ocr_pages=2).status_code == 413
+        assert not triage_document(portfolio, ".pdf", max_ocr_pages=2).rejected
+
+    def test_stats(self):
+        stats = TriageStats()
+        stats.record(triage_document(build_pdf(["text"]), ".pdf"))
+        stats.record(triage_document(b"junk", ".pdf"))
+        snapshot = stats.stats()
+        assert snapshot["documents"] == 2
+        assert snapshot["by_pipeline"] == {PIPELINE_TEXT: 1, PIPELINE_REJECT: 1}
+        assert snapshot["rejected_by_status"] == {"422": 1}
+
+
+class TestTriagedExtraction:
+    """Test that extraction follows the chosen pipeline"""
+
+    @pytest.fixture
+    def ocr_calls(self, monkeypatch):
+        calls = []
+
+        def fake_ocr(content, cancel_token=None, page_count=None, pages=None):
+            calls.append((page_count, pages))
+            for number in pages or range(1, page_count + 1):
+                yield TextBlock(number, f"ocr page {number}", "ocr", "page", 10, 1.0)
+
+        monkeypatch.setattr(text_extractor, "iter_ocr_pages", fake_ocr)
+        return calls
+
+    def test_hybrid_ocrs_image_pages_in_order(self, ocr_calls):
+        content = build_pdf(["text", "image", "text"])
+        blocks = list(iter_pdf_pages(content, plan=triage_pdf(content)))
+        assert [(block.index, block.engine) for block in blocks] == [(1, "pdfplumber"), (2, "ocr"), (3, "pdfplumber")]
+        assert ocr_calls == [(3, [2])]
+
+    def test_ocr_pipeline_skips_the_text_pass(self, ocr_calls, monkeypatch):
+        def no_pdfplumber(*args, **kwargs):
+            raise AssertionError("pdfplumber should not open a scanned document")
+
+        monkeypatch.setattr(text_extractor.pdfplumber, "open", no_pdfplumber)
+        content = build_pdf(["image", "image"])
+        blocks = list(iter_pdf_pages(content, plan=triage_pdf(content)))
+        assert [block.text for block in blocks] == ["ocr page 1", "ocr page 2"]
+        assert ocr_calls == [(2, None)]
+
+
+def test_unparseable_upload_fails_before_extraction(monkeypatch):
+    monkeypatch.setattr(main_mod, 'triage_stats', TriageStats())
+    extracted = []
+
+    async def mock_download(file_path: str):
+        return b'<html>Access denied</html>'
+
+    def mock_extract(*args, **kwargs):
+        extracted.append(args)
+        return "Jane Smith", 1.0
+
+    monkeypatch.setattr(main_mod, 'download_file_from_storage', mock_download)
+    monkeypatch.setattr(main_mod, 'extract_scored_text', mock_extract)
+    client = TestClient(main_mod.app)
+
+    response = client.get('/parse', params={'file_path': 'https://files.example.com/resume.pdf'})
+    assert response.status_code == 422
+    assert 'Not a PDF' in response.json()['detail']
+    assert extracted == []
+    assert client.get('/metrics').json()['triage']['rejected_by_status'] == {'422': 1}